@@ -4,6 +4,7 @@ import argparse
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -31,6 +32,67 @@ def resolve_target(explicit: str | None) -> Path:
     )
 
 
+def find_workflow_files(paths: list[str]) -> list[Path]:
+    files: list[Path] = []
+    for name in paths:
+        path = Path(name)
+        if path.is_dir():
+            files.extend(
+                sorted(p for p in path.iterdir() if p.suffix in ('.yml', '.yaml'))
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def import_workflow(path: Path, check: bool) -> str:
+    from yamloom import Workflow
+
+    text = str(Workflow.from_yaml(path))
+    if check and str(Workflow.from_yaml(text)) != text:
+        raise ValueError('re-importing the generated YAML does not reproduce it')
+    return text
+
+
+def run_import(paths: list[str], output: str | None, check: bool, jobs: int) -> int:
+    files = find_workflow_files(paths)
+    if not files:
+        print('No workflow files found.', file=sys.stderr)
+        return 2
+    if output is not None:
+        # files are written by name, so two files of the same name would overwrite each other
+        seen: dict[str, Path] = {}
+        for path in files:
+            if path.name in seen:
+                print(
+                    f'{path}: cannot write to {output} as {seen[path.name]} '
+                    'has the same name',
+                    file=sys.stderr,
+                )
+                return 2
+            seen[path.name] = path
+
+    # parsing releases the GIL, so files are imported in parallel
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(import_workflow, path, check) for path in files]
+
+    failures = 0
+    for path, future in zip(files, futures):
+        try:
+            text = future.result()
+        except (OSError, ValueError) as exc:
+            failures += 1
+            print(f'{path}: {exc}', file=sys.stderr)
+            continue
+        if output is not None:
+            target = Path(output) / path.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text)
+        print(f'{path}: ok')
+
+    return 1 if failures else 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description='Run yamloom workflow generator.')
     parser.add_argument(
@@ -38,8 +100,35 @@ def main() -> int:
         dest='file',
         help='Path to workflow generator script (overrides defaults).',
     )
+    subparsers = parser.add_subparsers(dest='command')
+    import_parser = subparsers.add_parser(
+        'import', help='Import existing workflow YAML files.'
+    )
+    import_parser.add_argument(
+        'paths',
+        nargs='+',
+        help='Workflow files, or directories such as .github/workflows/.',
+    )
+    import_parser.add_argument(
+        '--output',
+        help='Directory to write the YAML generated from each imported workflow.',
+    )
+    import_parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Fail if re-importing the generated YAML does not reproduce it exactly.',
+    )
+    import_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=0,
+        help='Number of files to import in parallel (defaults to the CPU count).',
+    )
     args = parser.parse_args()
 
+    if args.command == 'import':
+        return run_import(args.paths, args.output, args.check, args.jobs)
+
     try:
         target = resolve_target(args.file)
     except FileNotFoundError as exc:
@@ -25,7 +25,9 @@ StringOrBoolLike: TypeAlias = StringLike | BoolLike
 
 expressions: ModuleType
 
-class Step: ...
+class Step:
+    def replace(self, **changes: Any) -> Step: ...
+    def evolve(self, **changes: Any) -> Step: ...
 
 _TActionStep = TypeVar('_TActionStep', bound='ActionStep')
 
@@ -149,6 +151,7 @@ class Matrix:
         exclude: list | None = None,
         **matrix: Any,
     ) -> None: ...
+    def expand(self, *, warn_at: int = 200) -> list[dict[str, Any]]: ...
 
 class Strategy:
     def __init__(
@@ -205,6 +208,8 @@ class Job:
         with_opts: Mapping | None = None,
         secrets: JobSecrets | None = None,
     ) -> None: ...
+    def replace(self, **changes: Any) -> Job: ...
+    def evolve(self, **changes: Any) -> Job: ...
 
 class BranchProtectionRuleEvent:
     def __init__(
@@ -555,8 +560,110 @@ class Workflow:
     def dump(
         self, path: Path | str, *, overwrite: bool = True, validate: bool = True
     ) -> None: ...
+    def prune(self, known_context: Mapping[str, Any]) -> Workflow: ...
+    def diff(self, other: Workflow) -> list[WorkflowChange]: ...
+    def graph(
+        self, durations: Mapping[str, float | list[float]] | Path | str | None = None
+    ) -> JobGraph: ...
+    def to_dict(self) -> dict[str, Any]: ...
+    def artifact_graph(self) -> ArtifactGraph: ...
+    def optimize(
+        self,
+        *,
+        needs: Literal['reduce', 'keep'] | None = None,
+        steps: Literal['merge', 'keep'] | None = None,
+        jobs: Literal['fuse', 'keep'] | None = None,
+        durations: Mapping[str, float | list[float]] | Path | str | None = None,
+        boot_time: float = 30.0,
+    ) -> Workflow: ...
+    def infer_timeouts(
+        self,
+        durations: Mapping[str, float | list[float]] | Path | str,
+        *,
+        percentile: float = 95.0,
+        margin: float = 1.5,
+    ) -> Workflow: ...
+    def auto_concurrency(
+        self,
+        policy: Literal['pull-requests', 'branches'] = 'pull-requests',
+        *,
+        level: Literal['workflow', 'jobs'] = 'workflow',
+        overwrite: bool = False,
+    ) -> Workflow: ...
+    def cache_dependencies(
+        self, *, restore_only: bool = False
+    ) -> tuple[Workflow, list[str]]: ...
+    def to_cache_bytes(self) -> bytes: ...
+    @staticmethod
+    def from_cache_bytes(data: bytes | memoryview) -> Workflow: ...
+    @staticmethod
+    def cache_version() -> str: ...
+    @staticmethod
+    def from_yaml(text_or_path: str | Path) -> Workflow: ...
+    def replace(self, **changes: Any) -> Workflow: ...
+    def evolve(self, **changes: Any) -> Workflow: ...
+
+class ArtifactGraph:
+    @property
+    def edges(self) -> list[tuple[str, str, str]]: ...
+    @property
+    def unmatched_downloads(self) -> list[tuple[str, str]]: ...
+    @property
+    def missing_needs(self) -> list[tuple[str, str]]: ...
+    @property
+    def unused_uploads(self) -> list[tuple[str, str]]: ...
+    @property
+    def already_compressed(self) -> list[tuple[str, str]]: ...
+    def suggestions(self) -> list[str]: ...
+    def is_valid(self) -> bool: ...
+
+class JobGraph:
+    @property
+    def levels(self) -> list[list[str]]: ...
+    @property
+    def cycles(self) -> list[list[str]]: ...
+    @property
+    def unknown_needs(self) -> list[tuple[str, str]]: ...
+    @property
+    def critical_path(self) -> list[str]: ...
+    @property
+    def critical_path_duration(self) -> float: ...
+    def is_valid(self) -> bool: ...
+
+class WorkflowChange:
+    @property
+    def kind(self) -> Literal['added', 'removed', 'changed', 'reordered']: ...
+    @property
+    def path(self) -> list[str]: ...
+    @property
+    def old(self) -> Any: ...
+    @property
+    def new(self) -> Any: ...
+
+class WorkflowBuilder:
+    def __init__(
+        self,
+        *,
+        on: Events,
+        name: Ostr = None,
+        run_name: Ostrlike = None,
+        permissions: Permissions | None = None,
+        env: Mapping[str, StringLike] | None = None,
+        defaults: Defaults | None = None,
+        concurrency: Concurrency | None = None,
+    ) -> None: ...
+    def add_job(self, job_id: str, job: Job, *, replace: bool = False) -> None: ...
+    def remove_job(self, job_id: str) -> Job: ...
+    def freeze(self) -> Workflow: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, job_id: str) -> bool: ...
+
+def _load_samples(
+    timings: Mapping[str, float | list[float]] | Path | str,
+) -> dict[str, list[float]]: ...
 
 __all__ = [
+    'ArtifactGraph',
     'BranchProtectionRuleEvent',
     'CheckRunEvent',
     'CheckSuiteEvent',
@@ -576,6 +683,7 @@ __all__ = [
     'IssueCommentEvent',
     'IssuesEvent',
     'Job',
+    'JobGraph',
     'JobSecrets',
     'LabelEvent',
     'Matrix',
@@ -600,7 +708,9 @@ __all__ = [
     'Strategy',
     'WatchEvent',
     'Workflow',
+    'WorkflowBuilder',
     'WorkflowCallEvent',
+    'WorkflowChange',
     'WorkflowDispatchEvent',
     'WorkflowDispatchInput',
     'WorkflowInput',
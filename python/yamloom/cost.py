@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import math
+import re
+import statistics
+import warnings
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ._yamloom import Matrix
+from .sharding import load_samples
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from ._yamloom import Workflow
+    from .sharding import Timings
+
+__all__ = [
+    'DEFAULT_PRICING',
+    'AxisCost',
+    'CostEstimate',
+    'JobCost',
+    'Total',
+    'estimate',
+]
+
+DEFAULT_PRICING: dict[str, float] = {
+    'ubuntu': 0.008,
+    'windows': 0.016,
+    'macos': 0.08,
+    'self-hosted': 0.0,
+}
+"""The price per minute in USD of GitHub-hosted standard runners, by label prefix."""
+
+_DEFAULT_DURATION = 60.0
+_MATRIX_EXPRESSION = re.compile(r'\$\{\{\s*matrix\.([\w-]+)\s*\}\}')
+
+
+class JobCost(NamedTuple):
+    """The expected cost of the runs of a job on one runner for one trigger event."""
+
+    event: str
+    job: str
+    runner: str
+    runs: int
+    minutes: float
+    cost: float
+
+
+class AxisCost(NamedTuple):
+    """The marginal cost of a matrix axis: what the job would save with one value."""
+
+    event: str
+    job: str
+    axis: str
+    values: int
+    minutes: float
+    cost: float
+
+
+class Total(NamedTuple):
+    """Expected billable minutes and their cost."""
+
+    minutes: float
+    cost: float
+
+
+class CostEstimate(NamedTuple):
+    """The expected billable minutes and cost of a workflow, as returned by `estimate`.
+
+    Attributes
+    ----------
+    jobs
+        The cost of each job for each trigger event, split by runner label.
+    axes
+        The marginal cost of each matrix axis of each job, for each trigger event.
+    """
+
+    jobs: list[JobCost]
+    axes: list[AxisCost]
+
+    def by_event(self) -> dict[str, Total]:
+        """Total the expected minutes and cost of one run for each trigger event."""
+        return _totals((job.event, job) for job in self.jobs)
+
+    def by_runner(self, event: str | None = None) -> dict[str, Total]:
+        """Total the expected minutes and cost for each runner label.
+
+        Parameters
+        ----------
+        event
+            Only count runs triggered by this event. By default, the runs for all
+            events are added up, as if each event triggered the workflow once.
+        """
+        return _totals(
+            (job.runner, job)
+            for job in self.jobs
+            if event is None or job.event == event
+        )
+
+
+def _totals(items: Iterable[tuple[str, JobCost]]) -> dict[str, Total]:
+    totals: dict[str, Total] = {}
+    for key, job in items:
+        minutes, cost = totals.get(key, (0.0, 0.0))
+        totals[key] = Total(minutes + job.minutes, cost + job.cost)
+    return totals
+
+
+def _runner_label(runs_on: Any, combination: Mapping[str, Any]) -> str:
+    if isinstance(runs_on, dict):
+        labels = runs_on.get('labels', runs_on.get('group', ''))
+    else:
+        labels = runs_on
+    if isinstance(labels, list):
+        labels = ', '.join(str(label) for label in labels)
+    return _MATRIX_EXPRESSION.sub(
+        lambda match: str(combination.get(match[1], match[0])), str(labels)
+    )
+
+
+def _price(label: str, pricing: Mapping[str, float]) -> float:
+    for part in [label, *label.split(', ')]:
+        if part in pricing:
+            return pricing[part]
+    prefixes = [
+        prefix
+        for part in label.split(', ')
+        for prefix in pricing
+        if part.startswith(prefix)
+    ]
+    return pricing[max(prefixes, key=len)] if prefixes else 0.0
+
+
+def _combinations(matrix: Any) -> list[dict[str, Any]]:
+    if not isinstance(matrix, dict):
+        # a matrix from an expression is only known at run time
+        return [{}]
+    try:
+        with warnings.catch_warnings():
+            # the size of the matrix is not what is being estimated here
+            warnings.simplefilter('ignore')
+            return Matrix(**matrix).expand()
+    except (TypeError, ValueError):
+        # as are axes, includes and excludes given as expressions
+        return [{}]
+
+
+def estimate(
+    workflow: Workflow,
+    history: Timings = 'timings.json',
+    pricing: Mapping[str, float] | None = None,
+    *,
+    default: float | None = None,
+) -> CostEstimate:
+    """Estimate the billable runner minutes and cost of a workflow.
+
+    For each event which triggers the workflow, jobs whose conditions rule out that
+    event are left out (see `Workflow.prune`). Every combination of a job's matrix is
+    a separate run, billed in whole minutes: the expected billable minutes of a run
+    are the mean of its historical durations rounded up to the minute. Jobs calling
+    reusable workflows are not counted.
+
+    Parameters
+    ----------
+    workflow
+        The workflow to estimate.
+    history
+        Historical durations of the jobs in seconds: a mapping of job IDs to a
+        duration or a list of durations, or the path of a JSON file containing one.
+    pricing
+        The price per minute of each runner label. Labels which are not listed are
+        priced by their longest listed prefix, or free if there is none. Defaults to
+        `DEFAULT_PRICING`.
+    default
+        The duration assumed for jobs without history, in seconds. Defaults to the
+        mean of the known durations (or a minute if there are none).
+
+    Returns
+    -------
+    CostEstimate
+        The cost of each job and matrix axis for each trigger event.
+
+    Examples
+    --------
+    >>> costs = estimate(workflow, 'timings.json')
+    >>> costs.by_event()['pull_request'].minutes
+    """
+    if pricing is None:
+        pricing = DEFAULT_PRICING
+    samples = load_samples(history)
+    if default is None:
+        known = [duration for durations in samples.values() for duration in durations]
+        default = statistics.fmean(known) if known else _DEFAULT_DURATION
+
+    def billed(job_id: str) -> float:
+        durations = samples.get(job_id, [default])
+        return statistics.fmean(math.ceil(d / 60) for d in durations)
+
+    def cost(
+        event: str, job_id: str, runs_on: Any, combinations: list[dict[str, Any]]
+    ) -> list[JobCost]:
+        runs: dict[str, int] = {}
+        for combination in combinations:
+            runner = _runner_label(runs_on, combination)
+            runs[runner] = runs.get(runner, 0) + 1
+        minutes = billed(job_id)
+        return [
+            JobCost(
+                event,
+                job_id,
+                runner,
+                count,
+                count * minutes,
+                count * minutes * _price(runner, pricing),
+            )
+            for runner, count in runs.items()
+        ]
+
+    jobs: list[JobCost] = []
+    axes: list[AxisCost] = []
+    triggers = workflow.to_dict()['on']
+    for event in [triggers] if isinstance(triggers, str) else triggers:
+        pruned = workflow.prune({'github': {'event_name': event}}).to_dict()
+        for job_id, job in pruned['jobs'].items():
+            if 'uses' in job:
+                continue
+            matrix = job.get('strategy', {}).get('matrix')
+            runs_on = job.get('runs-on', '')
+            costs = cost(event, job_id, runs_on, _combinations(matrix))
+            jobs.extend(costs)
+            if not isinstance(matrix, dict):
+                continue
+            for axis, values in matrix.items():
+                if axis in ('include', 'exclude') or not isinstance(values, list):
+                    continue
+                reduced = cost(
+                    event,
+                    job_id,
+                    runs_on,
+                    _combinations({**matrix, axis: values[:1]}),
+                )
+                axes.append(
+                    AxisCost(
+                        event,
+                        job_id,
+                        axis,
+                        len(values),
+                        sum(c.minutes for c in costs) - sum(c.minutes for c in reduced),
+                        sum(c.cost for c in costs) - sum(c.cost for c in reduced),
+                    )
+                )
+    return CostEstimate(jobs, axes)
@@ -1,4 +1,5 @@
-from typing import ClassVar, Union
+from collections.abc import Iterable, Mapping
+from typing import Any, ClassVar, Union
 
 BoolLike = Union[bool, BooleanExpression]
 NumberLike = Union[float, int, NumberExpression]
@@ -17,6 +18,9 @@ class BooleanExpression:
         self, condition: BoolLike, else_expr: BoolLike
     ) -> BooleanExpression: ...
     def to_json(self) -> ObjectExpression: ...
+    def cache_key(self) -> str: ...
+    def same_as(self, other: object) -> bool: ...
+    def evaluate(self, context: Mapping[str, Any]) -> bool | None: ...
 
 class NumberExpression:
     def as_bool(self) -> BooleanExpression: ...
@@ -32,6 +36,8 @@ class NumberExpression:
         self, condition: BoolLike, else_expr: NumberLike
     ) -> NumberExpression: ...
     def to_json(self) -> ObjectExpression: ...
+    def cache_key(self) -> str: ...
+    def same_as(self, other: object) -> bool: ...
 
 class StringExpression:
     def as_bool(self) -> BooleanExpression: ...
@@ -55,6 +61,8 @@ class StringExpression:
     def if_else(
         self, condition: BoolLike, else_expr: StringLike
     ) -> StringExpression: ...
+    def cache_key(self) -> str: ...
+    def same_as(self, other: object) -> bool: ...
 
 class ArrayExpression:
     def as_num(self) -> NumberExpression: ...
@@ -62,6 +70,8 @@ class ArrayExpression:
     def contains(self, other: ObjectExpression) -> BooleanExpression: ...
     def join(self, separator: StringLike | None = None) -> StringExpression: ...
     def to_json(self) -> ObjectExpression: ...
+    def cache_key(self) -> str: ...
+    def same_as(self, other: object) -> bool: ...
 
 class ObjectExpression:
     def as_num(self) -> NumberExpression: ...
@@ -77,6 +87,8 @@ class ObjectExpression:
     def __getitem__(self, key: str) -> ObjectExpression: ...
     def __getattr__(self, key: str) -> ObjectExpression: ...
     def get(self, key: str) -> ObjectExpression: ...
+    def cache_key(self) -> str: ...
+    def same_as(self, other: object) -> bool: ...
 
 class GithubContext:
     @property
@@ -334,6 +346,8 @@ class context:  # noqa: N801
     needs: ClassVar[NeedsContext]
     inputs: ClassVar[InputsContext]
 
+def all_of(conditions: Iterable[BoolLike]) -> BooleanExpression: ...
+def any_of(conditions: Iterable[BoolLike]) -> BooleanExpression: ...
 def success() -> BooleanExpression: ...
 def always() -> BooleanExpression: ...
 def cancelled() -> BooleanExpression: ...
@@ -348,7 +362,9 @@ __all__ = [
     'NumberExpression',
     'ObjectExpression',
     'StringExpression',
+    'all_of',
     'always',
+    'any_of',
     'cancelled',
     'context',
     'failure',
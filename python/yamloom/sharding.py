@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import heapq
+import shlex
+import statistics
+from typing import TYPE_CHECKING, NamedTuple
+
+from ._yamloom import Matrix, Strategy, _load_samples
+from .expressions import context
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Mapping
+
+    from typing_extensions import TypeAlias
+
+    from .expressions import StringExpression
+
+    Timings: TypeAlias = (
+        Mapping[str, float | list[float]] | str | os.PathLike[str] | None
+    )
+
+__all__ = ['Sharding', 'assign', 'load_samples', 'load_timings', 'shard']
+
+
+class Sharding(NamedTuple):
+    """A strategy running one job per shard, and the items of the current shard.
+
+    Attributes
+    ----------
+    strategy
+        A `Strategy` whose matrix has a ``shard`` value for each shard.
+    items
+        An expression for the shell-quoted items of the shard a job is running, e.g.
+        ``script(f'pytest {items}')``.
+    """
+
+    strategy: Strategy
+    items: StringExpression
+
+
+def load_samples(timings: Timings) -> dict[str, list[float]]:
+    """Load historical durations in seconds, keyed by item.
+
+    Each item maps to a single duration or a non-empty list of past durations. A path
+    which does not exist yet is treated as having no timings. This is the same format
+    as the ``durations`` of `Workflow.graph`, `Workflow.optimize` and
+    `Workflow.infer_timeouts`.
+
+    Parameters
+    ----------
+    timings
+        A mapping of items to durations, or the path of a JSON file containing one.
+
+    Returns
+    -------
+    dict of str to list of float
+    """
+    if timings is None:
+        return {}
+    return _load_samples(timings)
+
+
+def load_timings(timings: Timings) -> dict[str, float]:
+    """Load the median historical duration in seconds of each item.
+
+    Parameters
+    ----------
+    timings
+        A mapping of items to durations, or the path of a JSON file containing one
+        (see `load_samples`).
+
+    Returns
+    -------
+    dict of str to float
+    """
+    return {
+        item: statistics.median(samples)
+        for item, samples in load_samples(timings).items()
+    }
+
+
+def assign(
+    items: Iterable[str],
+    timings: Timings = 'timings.json',
+    shards: int = 2,
+    *,
+    default: float | None = None,
+) -> list[list[str]]:
+    """Balance items across shards by their historical durations.
+
+    Items are assigned longest first, each to the shard with the least total duration
+    so far (the greedy longest-processing-time algorithm). Within a shard, items keep
+    their given order.
+
+    Parameters
+    ----------
+    items
+        The items to distribute, such as test files or packages.
+    timings
+        Historical durations of the items (see `load_timings`).
+    shards
+        The maximum number of shards. No empty shards are returned, so there may be
+        fewer if there are fewer items.
+    default
+        The duration assumed for items without timings. Defaults to the mean of the
+        known durations (or 1 second if there are none).
+
+    Returns
+    -------
+    list of list of str
+        The items of each shard.
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        msg = 'Cannot shard an empty list of items'
+        raise ValueError(msg)
+    if shards < 1:
+        msg = 'The number of shards must be at least 1'
+        raise ValueError(msg)
+    durations = load_timings(timings)
+    if default is None:
+        known = [durations[item] for item in items if item in durations]
+        default = statistics.fmean(known) if known else 1.0
+    position = {item: i for i, item in enumerate(items)}
+    loads = [(0.0, i) for i in range(min(shards, len(items)))]
+    assigned: list[list[str]] = [[] for _ in loads]
+    for item in sorted(items, key=lambda item: -durations.get(item, default)):
+        load, index = heapq.heappop(loads)
+        assigned[index].append(item)
+        heapq.heappush(loads, (load + durations.get(item, default), index))
+    return [sorted(shard, key=position.__getitem__) for shard in assigned]
+
+
+def shard(
+    items: Iterable[str],
+    timings: Timings = 'timings.json',
+    shards: int = 2,
+    *,
+    default: float | None = None,
+) -> Sharding:
+    """Build a matrix strategy which splits items across balanced shards.
+
+    Parameters
+    ----------
+    items
+        The items to distribute, such as test files or packages.
+    timings
+        Historical durations of the items in seconds: a mapping of items to a duration
+        or a list of past durations, or the path of a JSON file containing one.
+    shards
+        The maximum number of shards (and so of jobs).
+    default
+        The duration assumed for items without timings (see `assign`).
+
+    Returns
+    -------
+    Sharding
+        The strategy to use for the job, and an expression for the items of each shard.
+
+    Examples
+    --------
+    >>> strategy, files = shard(test_files, 'timings.json', shards=4)
+    >>> Job(steps=[script(f'pytest {files}')], strategy=strategy, ...)
+    """
+    assigned = assign(items, timings, shards, default=default)
+    matrix = Matrix(shard=[shlex.join(items) for items in assigned])
+    return Sharding(Strategy(matrix=matrix), context.matrix.shard.as_str())
@@ -2,12 +2,13 @@
 #![allow(clippy::too_many_arguments)]
 
 use std::{
+    collections::HashMap,
     fmt::Display,
     fs::{OpenOptions, create_dir_all},
     io::Write,
     path::Path,
     str::FromStr,
-    sync::LazyLock,
+    sync::{Arc, LazyLock},
 };
 
 use hashlink::LinkedHashMap;
@@ -171,7 +172,7 @@ where
     }
 }
 
-#[derive(Clone)]
+#[derive(Clone, PartialEq)]
 pub struct PyMap<K, V>(LinkedHashMap<K, V>)
 where
     K: std::cmp::Eq + std::hash::Hash;
@@ -355,6 +356,7 @@ impl PushYaml for Array {
     }
 }
 
+#[derive(PartialEq)]
 pub enum Either<A, B> {
     A(A),
     B(B),
@@ -425,46 +427,520 @@ where
     }
 }
 
+/// A compact binary encoding of the Rust data behind the Python classes.
+///
+/// Lengths and integers are LEB128 varints (signed integers are zigzag encoded), strings are
+/// length-prefixed UTF-8, and `Option`s and enum variants are prefixed with a one-byte tag.
+pub trait Encode {
+    fn encode(&self, out: &mut Vec<u8>);
+    fn to_bytes(&self) -> Vec<u8> {
+        let mut out = Vec::new();
+        self.encode(&mut out);
+        out
+    }
+}
+
+pub trait Decode: Sized {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self>;
+    fn from_bytes(bytes: &[u8]) -> PyResult<Self> {
+        let mut input = Decoder::new(bytes);
+        let value = Self::decode(&mut input)?;
+        input.finish()?;
+        Ok(value)
+    }
+}
+
+/// A cursor over encoded bytes which borrows rather than copies them.
+pub struct Decoder<'a> {
+    bytes: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> Decoder<'a> {
+    pub fn new(bytes: &'a [u8]) -> Self {
+        Self { bytes, pos: 0 }
+    }
+    pub fn error(&self, message: &str) -> PyErr {
+        PyValueError::new_err(format!(
+            "Invalid encoded data at byte {}: {message}",
+            self.pos
+        ))
+    }
+    pub fn invalid_tag(&self, tag: u8) -> PyErr {
+        self.error(&format!("unexpected tag {tag}"))
+    }
+    pub fn take(&mut self, len: usize) -> PyResult<&'a [u8]> {
+        let end = self
+            .pos
+            .checked_add(len)
+            .filter(|end| *end <= self.bytes.len())
+            .ok_or_else(|| self.error("unexpected end of data"))?;
+        let bytes = &self.bytes[self.pos..end];
+        self.pos = end;
+        Ok(bytes)
+    }
+    pub fn byte(&mut self) -> PyResult<u8> {
+        Ok(self.take(1)?[0])
+    }
+    pub fn varint(&mut self) -> PyResult<u64> {
+        let mut value = 0u64;
+        for shift in (0..64).step_by(7) {
+            let byte = self.byte()?;
+            value |= u64::from(byte & 0x7f) << shift;
+            if byte & 0x80 == 0 {
+                return Ok(value);
+            }
+        }
+        Err(self.error("varint is too long"))
+    }
+    /// A collection length, which can never exceed the number of remaining bytes.
+    pub fn length(&mut self) -> PyResult<usize> {
+        let len = usize::try_from(self.varint()?).map_err(|_| self.error("length overflow"))?;
+        if len > self.bytes.len() - self.pos {
+            return Err(self.error("length exceeds the remaining data"));
+        }
+        Ok(len)
+    }
+    pub fn finish(&self) -> PyResult<()> {
+        if self.pos == self.bytes.len() {
+            Ok(())
+        } else {
+            Err(self.error("trailing data"))
+        }
+    }
+}
+
+fn encode_varint(mut value: u64, out: &mut Vec<u8>) {
+    while value >= 0x80 {
+        out.push((value as u8) | 0x80);
+        value >>= 7;
+    }
+    out.push(value as u8);
+}
+
+fn encode_length(len: usize, out: &mut Vec<u8>) {
+    encode_varint(len as u64, out);
+}
+
+/// Implement `Encode` and `Decode` by encoding each field (or variant index) in order.
+macro_rules! impl_codec {
+    ($name:ident { $($field:ident),* $(,)? }) => {
+        impl $crate::Encode for $name {
+            fn encode(&self, out: &mut Vec<u8>) {
+                $( $crate::Encode::encode(&self.$field, out); )*
+            }
+        }
+        impl $crate::Decode for $name {
+            fn decode(input: &mut $crate::Decoder<'_>) -> ::pyo3::PyResult<Self> {
+                Ok(Self { $( $field: $crate::Decode::decode(input)?, )* })
+            }
+        }
+    };
+    ($name:ident ( $inner:ty )) => {
+        impl $crate::Encode for $name {
+            fn encode(&self, out: &mut Vec<u8>) {
+                $crate::Encode::encode(&self.0, out);
+            }
+        }
+        impl $crate::Decode for $name {
+            fn decode(input: &mut $crate::Decoder<'_>) -> ::pyo3::PyResult<Self> {
+                Ok(Self(<$inner as $crate::Decode>::decode(input)?))
+            }
+        }
+    };
+    (enum $name:ident { $($variant:ident),* $(,)? }) => {
+        impl $crate::Encode for $name {
+            fn encode(&self, out: &mut Vec<u8>) {
+                out.push(*self as u8);
+            }
+        }
+        impl $crate::Decode for $name {
+            fn decode(input: &mut $crate::Decoder<'_>) -> ::pyo3::PyResult<Self> {
+                const VARIANTS: &[$name] = &[$($name::$variant),*];
+                let tag = input.byte()?;
+                VARIANTS
+                    .get(usize::from(tag))
+                    .copied()
+                    .ok_or_else(|| input.invalid_tag(tag))
+            }
+        }
+    };
+}
+
+impl Encode for bool {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.push(u8::from(*self));
+    }
+}
+impl Decode for bool {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        match input.byte()? {
+            0 => Ok(false),
+            1 => Ok(true),
+            tag => Err(input.invalid_tag(tag)),
+        }
+    }
+}
+impl Encode for u8 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.push(*self);
+    }
+}
+impl Decode for u8 {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        input.byte()
+    }
+}
+impl Encode for u32 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_varint(u64::from(*self), out);
+    }
+}
+impl Decode for u32 {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        u32::try_from(input.varint()?).map_err(|_| input.error("integer overflow"))
+    }
+}
+impl Encode for usize {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_length(*self, out);
+    }
+}
+impl Decode for usize {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        usize::try_from(input.varint()?).map_err(|_| input.error("integer overflow"))
+    }
+}
+impl Encode for i64 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_varint(((*self << 1) ^ (*self >> 63)) as u64, out);
+    }
+}
+impl Decode for i64 {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let value = input.varint()?;
+        Ok(((value >> 1) as i64) ^ -((value & 1) as i64))
+    }
+}
+impl Encode for f64 {
+    fn encode(&self, out: &mut Vec<u8>) {
+        out.extend_from_slice(&self.to_le_bytes());
+    }
+}
+impl Decode for f64 {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let bytes = input.take(8)?;
+        Ok(f64::from_le_bytes(bytes.try_into().expect("eight bytes")))
+    }
+}
+impl Encode for str {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_length(self.len(), out);
+        out.extend_from_slice(self.as_bytes());
+    }
+}
+impl Encode for String {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.as_str().encode(out);
+    }
+}
+impl Decode for String {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let len = input.length()?;
+        let bytes = input.take(len)?;
+        std::str::from_utf8(bytes)
+            .map(str::to_string)
+            .map_err(|_| input.error("invalid UTF-8"))
+    }
+}
+impl<T: Encode> Encode for Option<T> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        match self {
+            None => out.push(0),
+            Some(value) => {
+                out.push(1);
+                value.encode(out);
+            }
+        }
+    }
+}
+impl<T: Decode> Decode for Option<T> {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        match input.byte()? {
+            0 => Ok(None),
+            1 => Ok(Some(T::decode(input)?)),
+            tag => Err(input.invalid_tag(tag)),
+        }
+    }
+}
+impl<T: Encode> Encode for Vec<T> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_length(self.len(), out);
+        for item in self {
+            item.encode(out);
+        }
+    }
+}
+impl<T: Decode> Decode for Vec<T> {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let len = input.length()?;
+        let mut items = Vec::with_capacity(len);
+        for _ in 0..len {
+            items.push(T::decode(input)?);
+        }
+        Ok(items)
+    }
+}
+impl<T: Encode> Encode for Arc<T> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        (**self).encode(out);
+    }
+}
+impl<T: Decode> Decode for Arc<T> {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        Ok(Arc::new(T::decode(input)?))
+    }
+}
+impl<A: Encode, B: Encode> Encode for Either<A, B> {
+    fn encode(&self, out: &mut Vec<u8>) {
+        match self {
+            Either::A(a) => {
+                out.push(0);
+                a.encode(out);
+            }
+            Either::B(b) => {
+                out.push(1);
+                b.encode(out);
+            }
+        }
+    }
+}
+impl<A: Decode, B: Decode> Decode for Either<A, B> {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        match input.byte()? {
+            0 => Ok(Either::A(A::decode(input)?)),
+            1 => Ok(Either::B(B::decode(input)?)),
+            tag => Err(input.invalid_tag(tag)),
+        }
+    }
+}
+impl<A: Encode, B: Encode> Encode for (A, B) {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.0.encode(out);
+        self.1.encode(out);
+    }
+}
+impl<A: Decode, B: Decode> Decode for (A, B) {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        Ok((A::decode(input)?, B::decode(input)?))
+    }
+}
+impl<A: Encode, B: Encode, C: Encode> Encode for (A, B, C) {
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.0.encode(out);
+        self.1.encode(out);
+        self.2.encode(out);
+    }
+}
+impl<A: Decode, B: Decode, C: Decode> Decode for (A, B, C) {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        Ok((A::decode(input)?, B::decode(input)?, C::decode(input)?))
+    }
+}
+impl<K, V> Encode for LinkedHashMap<K, V>
+where
+    K: Encode + std::cmp::Eq + std::hash::Hash,
+    V: Encode,
+{
+    fn encode(&self, out: &mut Vec<u8>) {
+        encode_length(self.len(), out);
+        for (key, value) in self {
+            key.encode(out);
+            value.encode(out);
+        }
+    }
+}
+impl<K, V> Decode for LinkedHashMap<K, V>
+where
+    K: Decode + std::cmp::Eq + std::hash::Hash,
+    V: Decode,
+{
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let len = input.length()?;
+        let mut map = LinkedHashMap::with_capacity(len);
+        for _ in 0..len {
+            let key = K::decode(input)?;
+            map.insert(key, V::decode(input)?);
+        }
+        Ok(map)
+    }
+}
+impl<K, V> Encode for PyMap<K, V>
+where
+    K: Encode + std::cmp::Eq + std::hash::Hash,
+    V: Encode,
+{
+    fn encode(&self, out: &mut Vec<u8>) {
+        self.0.encode(out);
+    }
+}
+impl<K, V> Decode for PyMap<K, V>
+where
+    K: Decode + std::cmp::Eq + std::hash::Hash,
+    V: Decode,
+{
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        Ok(Self(LinkedHashMap::decode(input)?))
+    }
+}
+impl<K, V> Encode for HashMap<K, V>
+where
+    K: Encode + Ord,
+    V: Encode,
+{
+    fn encode(&self, out: &mut Vec<u8>) {
+        // sort the entries so equal maps always encode to the same bytes
+        let mut entries: Vec<(&K, &V)> = self.iter().collect();
+        entries.sort_unstable_by(|a, b| a.0.cmp(b.0));
+        encode_length(entries.len(), out);
+        for (key, value) in entries {
+            key.encode(out);
+            value.encode(out);
+        }
+    }
+}
+impl<K, V> Decode for HashMap<K, V>
+where
+    K: Decode + std::cmp::Eq + std::hash::Hash,
+    V: Decode,
+{
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        let len = input.length()?;
+        let mut map = HashMap::with_capacity(len);
+        for _ in 0..len {
+            let key = K::decode(input)?;
+            map.insert(key, V::decode(input)?);
+        }
+        Ok(map)
+    }
+}
+impl Encode for Yaml {
+    fn encode(&self, out: &mut Vec<u8>) {
+        match self {
+            Yaml::Real(value) => {
+                out.push(0);
+                value.encode(out);
+            }
+            Yaml::Integer(value) => {
+                out.push(1);
+                value.encode(out);
+            }
+            Yaml::String(value) => {
+                out.push(2);
+                value.encode(out);
+            }
+            Yaml::Boolean(value) => {
+                out.push(3);
+                value.encode(out);
+            }
+            Yaml::Array(values) => {
+                out.push(4);
+                values.encode(out);
+            }
+            Yaml::Hash(hash) => {
+                out.push(5);
+                hash.encode(out);
+            }
+            Yaml::Alias(index) => {
+                out.push(6);
+                index.encode(out);
+            }
+            Yaml::Null => out.push(7),
+            Yaml::BadValue => out.push(8),
+        }
+    }
+}
+impl Decode for Yaml {
+    fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+        Ok(match input.byte()? {
+            0 => Yaml::Real(String::decode(input)?),
+            1 => Yaml::Integer(i64::decode(input)?),
+            2 => Yaml::String(String::decode(input)?),
+            3 => Yaml::Boolean(bool::decode(input)?),
+            4 => Yaml::Array(Vec::decode(input)?),
+            5 => Yaml::Hash(Hash::decode(input)?),
+            6 => Yaml::Alias(usize::decode(input)?),
+            7 => Yaml::Null,
+            8 => Yaml::BadValue,
+            tag => return Err(input.invalid_tag(tag)),
+        })
+    }
+}
+
 /// A Pythonic implementation of GitHub Actions syntax
 #[pymodule]
 #[pyo3(name = "_yamloom")]
 mod yamloom {
-    use std::{collections::HashMap, fmt::Display, path::PathBuf, str::FromStr};
+    use std::{
+        collections::{HashMap, HashSet},
+        ffi::CString,
+        fmt::Display,
+        ops::{Deref, DerefMut},
+        path::PathBuf,
+        str::FromStr,
+        sync::Arc,
+    };
 
+    use hashlink::LinkedHashMap;
     use pyo3::{
-        exceptions::{PyRuntimeError, PyValueError},
+        exceptions::{PyKeyError, PyRuntimeError, PyTypeError, PyUserWarning, PyValueError},
         prelude::*,
-        types::{PyBool, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple},
+        types::{
+            PyBool, PyBytes, PyDict, PyFloat, PyInt, PyList, PyMapping, PyString, PyTuple, PyType,
+        },
     };
+    use serde_json::{Map, Value};
     use yaml_rust2::{
-        Yaml,
+        Yaml, YamlLoader,
         yaml::{Array, Hash},
     };
 
     use crate::{
-        Either, InsertYaml, MaybeYamlable, PushYaml, PyMap, TryArray, TryHash, TryYamlable,
-        WORKFLOW_SCHEMA, Yamlable, yaml_to_json,
+        Decode, Decoder, Either, Encode, InsertYaml, MaybeYamlable, PushYaml, PyMap, TryArray,
+        TryHash, TryYamlable, WORKFLOW_SCHEMA, WORKFLOW_SCHEMA_FINGERPRINT, Yamlable, yaml_to_json,
         yamloom::expressions::{
-            Allowed, ArrayExpression, BooleanExpression, Contexts, Funcs, NumberExpression,
-            ObjectExpression, StringExpression, YamlExpression,
+            Allowed, ArrayExpression, BooleanExpression, Contexts, Funcs, JobStatus,
+            NumberExpression, ObjectExpression, StringExpression, YamlExpression,
+            parse_raw_boolean_expression, parse_raw_condition, parse_raw_number_expression,
+            parse_raw_string_expression, py_to_json, validate_raw_string,
         },
     };
 
     #[pymodule]
     mod expressions {
-        use std::marker::PhantomData;
+        use std::{
+            borrow::Cow,
+            collections::{HashMap, HashSet},
+            marker::PhantomData,
+            sync::{Arc, LazyLock, Mutex, MutexGuard, OnceLock, PoisonError},
+        };
 
         use bitflags::bitflags;
+        use hashlink::LruCache;
         use pyo3::{
             exceptions::PyRuntimeError,
-            types::{PyFloat, PyInt},
+            types::{
+                PyBool, PyDict, PyDictMethods, PyFloat, PyInt, PyList, PyListMethods, PyString,
+                PyTuple, PyTupleMethods,
+            },
         };
+        use serde_json::{Map, Number, Value};
 
-        use crate::push_escaped_control;
+        use crate::{Decode, Decoder, Encode, push_escaped_control};
 
         use super::{
-            Bound, Display, Either, Py, PyAny, PyAnyMethods, PyResult, PyValueError, Yaml,
-            Yamlable, pyclass, pyfunction, pymethods,
+            Bound, Display, Either, Py, PyAny, PyAnyMethods, PyResult, PyValueError, Python,
+            Reduced, Yaml, Yamlable, pyclass, pyfunction, pymethods, reduce,
         };
 
         type StringLike = Either<StringExpression, String>;
@@ -538,2919 +1014,6385 @@ mod yamloom {
             }
         }
 
-        #[derive(Clone)]
-        struct ExprBase {
-            text: String,
-            meta: ExprMeta,
+        #[derive(Clone, Copy, Debug, PartialEq, Eq, Hash)]
+        enum BinaryOp {
+            And,
+            Or,
+            Eq,
+            Ne,
+            Lt,
+            Le,
+            Gt,
+            Ge,
         }
 
-        impl ExprBase {
-            fn new(text: String, meta: ExprMeta) -> Self {
-                Self { text, meta }
+        impl BinaryOp {
+            const fn symbol(self) -> &'static str {
+                match self {
+                    BinaryOp::And => "&&",
+                    BinaryOp::Or => "||",
+                    BinaryOp::Eq => "==",
+                    BinaryOp::Ne => "!=",
+                    BinaryOp::Lt => "<",
+                    BinaryOp::Le => "<=",
+                    BinaryOp::Gt => ">",
+                    BinaryOp::Ge => ">=",
+                }
             }
 
-            fn with_contexts(text: impl Into<String>, contexts: Contexts) -> Self {
-                Self::new(text.into(), ExprMeta::with_contexts(contexts))
+            /// Binding strength of the operator, following the GitHub expression grammar.
+            const fn precedence(self) -> u8 {
+                match self {
+                    BinaryOp::Or => 1,
+                    BinaryOp::And => 2,
+                    BinaryOp::Eq | BinaryOp::Ne => 3,
+                    BinaryOp::Lt | BinaryOp::Le | BinaryOp::Gt | BinaryOp::Ge => 4,
+                }
             }
         }
 
-        struct Expression<K> {
-            base: ExprBase,
-            _kind: PhantomData<K>,
+        const NOT_PRECEDENCE: u8 = 5;
+        const PRIMARY_PRECEDENCE: u8 = 6;
+
+        #[derive(Debug, PartialEq, Eq, Hash)]
+        enum Literal {
+            Null,
+            Bool(bool),
+            Number(String),
+            String(String),
         }
 
-        impl<K> Clone for Expression<K> {
-            fn clone(&self) -> Self {
-                Self {
-                    base: self.base.clone(),
-                    _kind: PhantomData,
-                }
-            }
+        /// A node in the expression tree.
+        ///
+        /// Operators never format their operands eagerly. Instead, they share the operand nodes
+        /// through an `Arc` and the text is only rendered once, when the expression is emitted.
+        #[derive(Debug, PartialEq, Eq, Hash)]
+        enum ExprNode {
+            Path(Cow<'static, str>),
+            Literal(Literal),
+            Index(Arc<ExprNode>, String),
+            /// An index which is itself an expression, e.g. ``matrix[inputs.axis]``.
+            Subscript(Arc<ExprNode>, Arc<ExprNode>),
+            Call(&'static str, Vec<Arc<ExprNode>>),
+            Not(Arc<ExprNode>),
+            Binary(BinaryOp, Arc<ExprNode>, Arc<ExprNode>),
+            /// A flattened run of `&&` or `||` operands.
+            Chain(BinaryOp, Vec<Arc<ExprNode>>),
+            IfElse {
+                condition: Arc<ExprNode>,
+                then: Arc<ExprNode>,
+                otherwise: Arc<ExprNode>,
+            },
         }
 
-        impl<K> Expression<K> {
-            fn new(text: String, meta: ExprMeta) -> Self {
-                Self {
-                    base: ExprBase::new(text, meta),
-                    _kind: PhantomData,
-                }
+        impl ExprNode {
+            fn path(path: &'static str) -> Arc<Self> {
+                Arc::new(Self::Path(Cow::Borrowed(path)))
             }
 
-            fn from_base(base: ExprBase) -> Self {
-                Self {
-                    base,
-                    _kind: PhantomData,
-                }
+            fn bool(value: bool) -> Arc<Self> {
+                Arc::new(Self::Literal(Literal::Bool(value)))
             }
 
-            fn text(&self) -> &str {
-                &self.base.text
+            fn number(value: String) -> Arc<Self> {
+                Arc::new(Self::Literal(Literal::Number(value)))
             }
 
-            fn meta(&self) -> ExprMeta {
-                self.base.meta
+            fn string(value: String) -> Arc<Self> {
+                Arc::new(Self::Literal(Literal::String(value)))
             }
-        }
 
-        struct BoolKind;
-        struct NumberKind;
-        struct StringKind;
-        struct ArrayKind;
-        struct ObjectKind;
+            fn index(base: &Arc<Self>, key: &str) -> Arc<Self> {
+                Arc::new(Self::Index(base.clone(), key.to_string()))
+            }
 
-        #[derive(Clone, Copy, Debug)]
-        pub(super) struct Allowed {
-            contexts: Contexts,
-            funcs: Funcs,
-            label: &'static str,
-        }
+            fn call(name: &'static str, args: Vec<Arc<Self>>) -> Arc<Self> {
+                Arc::new(Self::Call(name, args))
+            }
 
-        impl Allowed {
-            pub(super) const fn new(contexts: Contexts, funcs: Funcs, label: &'static str) -> Self {
-                Self {
-                    contexts,
-                    funcs,
-                    label,
+            fn not(inner: &Arc<Self>) -> Arc<Self> {
+                Arc::new(Self::Not(inner.clone()))
+            }
+
+            fn binary(op: BinaryOp, lhs: &Arc<Self>, rhs: Arc<Self>) -> Arc<Self> {
+                Arc::new(Self::Binary(op, lhs.clone(), rhs))
+            }
+
+            fn if_else(condition: Arc<Self>, then: &Arc<Self>, otherwise: Arc<Self>) -> Arc<Self> {
+                Arc::new(Self::IfElse {
+                    condition,
+                    then: then.clone(),
+                    otherwise,
+                })
+            }
+
+            fn as_bool_literal(&self) -> Option<bool> {
+                match self {
+                    ExprNode::Literal(Literal::Bool(value)) => Some(*value),
+                    _ => None,
                 }
             }
 
-            fn validate(self, meta: ExprMeta, expr: &str) -> PyResult<()> {
-                let disallowed_contexts = meta.contexts & !self.contexts;
-                let disallowed_funcs = meta.funcs & !self.funcs;
-                if disallowed_contexts.is_empty() && disallowed_funcs.is_empty() {
-                    return Ok(());
+            /// Whether the tree calls one of the job status functions.
+            ///
+            /// GitHub only adds its implicit ``success() &&`` to conditions without a status
+            /// function, so operands containing one must never be folded away.
+            fn has_status_check(&self) -> bool {
+                match self {
+                    ExprNode::Path(_) | ExprNode::Literal(_) => false,
+                    ExprNode::Index(base, _) => base.has_status_check(),
+                    ExprNode::Subscript(base, index) => {
+                        base.has_status_check() || index.has_status_check()
+                    }
+                    ExprNode::Call(name, args) => {
+                        matches!(*name, "always" | "success" | "failure" | "cancelled")
+                            || args.iter().any(|arg| arg.has_status_check())
+                    }
+                    ExprNode::Not(inner) => inner.has_status_check(),
+                    ExprNode::Binary(_, lhs, rhs) => {
+                        lhs.has_status_check() || rhs.has_status_check()
+                    }
+                    ExprNode::Chain(_, operands) => operands.iter().any(|op| op.has_status_check()),
+                    ExprNode::IfElse {
+                        condition,
+                        then,
+                        otherwise,
+                    } => {
+                        condition.has_status_check()
+                            || then.has_status_check()
+                            || otherwise.has_status_check()
+                    }
                 }
+            }
 
-                let allowed_contexts = contexts_to_names(self.contexts);
-                let allowed_funcs = funcs_to_names(self.funcs);
-                let used_contexts = contexts_to_names(disallowed_contexts);
-                let used_funcs = funcs_to_names(disallowed_funcs);
+            fn collect_operands<'a>(
+                self: &'a Arc<Self>,
+                op: BinaryOp,
+                out: &mut Vec<&'a Arc<Self>>,
+            ) {
+                match &**self {
+                    ExprNode::Binary(inner, lhs, rhs) if *inner == op => {
+                        lhs.collect_operands(op, out);
+                        rhs.collect_operands(op, out);
+                    }
+                    ExprNode::Chain(inner, operands) if *inner == op => {
+                        for operand in operands {
+                            operand.collect_operands(op, out);
+                        }
+                    }
+                    _ => out.push(self),
+                }
+            }
 
-                let mut message = format!(
-                    "Key '{}' does not allow the context(s) {{{}}}",
-                    self.label,
-                    used_contexts.join(", ")
-                );
-                if !used_funcs.is_empty() {
-                    message.push_str(&format!(" or function(s) {{{}}}", used_funcs.join(", ")));
+            /// Simplify a run of `&&` / `||` operands.
+            ///
+            /// Nested runs of the same operator are flattened, identical operands are kept only
+            /// once, and boolean literals are folded.
+            fn simplify_chain(self: &Arc<Self>, op: BinaryOp) -> Arc<Self> {
+                // `true` is the identity of `&&` and absorbs `||` (and vice versa for `false`)
+                let identity = op == BinaryOp::And;
+                let mut operands = Vec::new();
+                self.collect_operands(op, &mut operands);
+                let mut seen = HashSet::with_capacity(operands.len());
+                let mut kept: Vec<Arc<Self>> = Vec::with_capacity(operands.len());
+                let mut absorbed = false;
+                for operand in operands {
+                    let operand = operand.simplified();
+                    let mut flattened = Vec::new();
+                    operand.collect_operands(op, &mut flattened);
+                    for item in flattened {
+                        match item.as_bool_literal() {
+                            Some(value) if value == identity => {}
+                            Some(_) => absorbed = true,
+                            None => {
+                                if seen.insert(item.clone()) {
+                                    kept.push(item.clone());
+                                }
+                            }
+                        }
+                    }
                 }
-                message.push_str(&format!(
-                    " used in this expression:\n{}\n\nAllowed contexts: {{{}}}",
-                    expr,
-                    allowed_contexts.join(", ")
-                ));
-                if !self.funcs.is_empty() {
-                    message.push_str(&format!(
-                        "\nAllowed functions: {{{}}}",
-                        allowed_funcs.join(", ")
-                    ));
+                if absorbed {
+                    if kept.iter().any(|operand| operand.has_status_check()) {
+                        kept.push(Self::bool(!identity));
+                    } else {
+                        return Self::bool(!identity);
+                    }
+                }
+                match kept.len() {
+                    0 => Self::bool(identity),
+                    1 => kept.pop().expect("length checked"),
+                    _ => Arc::new(Self::Chain(op, kept)),
                 }
-                Err(PyRuntimeError::new_err(message))
             }
-        }
 
-        fn contexts_to_names(contexts: Contexts) -> Vec<&'static str> {
-            let mut out = Vec::new();
-            if contexts.contains(Contexts::GITHUB) {
-                out.push("github");
-            }
-            if contexts.contains(Contexts::NEEDS) {
-                out.push("needs");
-            }
-            if contexts.contains(Contexts::STRATEGY) {
-                out.push("strategy");
-            }
-            if contexts.contains(Contexts::MATRIX) {
-                out.push("matrix");
-            }
-            if contexts.contains(Contexts::JOB) {
-                out.push("job");
-            }
-            if contexts.contains(Contexts::JOBS) {
-                out.push("jobs");
-            }
-            if contexts.contains(Contexts::RUNNER) {
-                out.push("runner");
-            }
-            if contexts.contains(Contexts::STEPS) {
-                out.push("steps");
-            }
-            if contexts.contains(Contexts::ENV) {
-                out.push("env");
+            /// Return an equivalent, simplified tree which is used for rendering.
+            fn simplified(self: &Arc<Self>) -> Arc<Self> {
+                match &**self {
+                    ExprNode::Path(_) | ExprNode::Literal(_) => self.clone(),
+                    ExprNode::Index(base, key) => {
+                        Arc::new(Self::Index(base.simplified(), key.clone()))
+                    }
+                    ExprNode::Subscript(base, index) => {
+                        Arc::new(Self::Subscript(base.simplified(), index.simplified()))
+                    }
+                    ExprNode::Call(name, args) => Arc::new(Self::Call(
+                        name,
+                        args.iter().map(|arg| arg.simplified()).collect(),
+                    )),
+                    ExprNode::Not(inner) => {
+                        let inner = inner.simplified();
+                        if let Some(value) = inner.as_bool_literal() {
+                            Self::bool(!value)
+                        } else if let ExprNode::Not(double) = &*inner {
+                            double.clone()
+                        } else {
+                            Arc::new(Self::Not(inner))
+                        }
+                    }
+                    ExprNode::Binary(op @ (BinaryOp::And | BinaryOp::Or), ..)
+                    | ExprNode::Chain(op, _) => self.simplify_chain(*op),
+                    ExprNode::Binary(op, lhs, rhs) => {
+                        Arc::new(Self::Binary(*op, lhs.simplified(), rhs.simplified()))
+                    }
+                    ExprNode::IfElse {
+                        condition,
+                        then,
+                        otherwise,
+                    } => Arc::new(Self::IfElse {
+                        condition: condition.simplified(),
+                        then: then.simplified(),
+                        otherwise: otherwise.simplified(),
+                    }),
+                }
             }
-            if contexts.contains(Contexts::VARS) {
-                out.push("vars");
+
+            fn precedence(&self) -> u8 {
+                match self {
+                    ExprNode::Binary(op, ..) | ExprNode::Chain(op, _) => op.precedence(),
+                    ExprNode::IfElse { .. } => BinaryOp::Or.precedence(),
+                    ExprNode::Not(_) => NOT_PRECEDENCE,
+                    ExprNode::Path(_)
+                    | ExprNode::Literal(_)
+                    | ExprNode::Index(..)
+                    | ExprNode::Subscript(..)
+                    | ExprNode::Call(..) => PRIMARY_PRECEDENCE,
+                }
             }
-            if contexts.contains(Contexts::SECRETS) {
-                out.push("secrets");
+
+            fn render(&self) -> String {
+                let mut out = String::new();
+                self.write_to(&mut out, 0);
+                out
             }
-            if contexts.contains(Contexts::INPUTS) {
-                out.push("inputs");
+
+            /// Write the node, wrapping it in parentheses only if it binds more loosely than
+            /// `min_precedence`.
+            fn write_to(&self, out: &mut String, min_precedence: u8) {
+                let wrap = self.precedence() < min_precedence;
+                if wrap {
+                    out.push('(');
+                }
+                match self {
+                    ExprNode::Path(path) => out.push_str(path),
+                    ExprNode::Literal(Literal::Null) => out.push_str("null"),
+                    ExprNode::Literal(Literal::Bool(value)) => {
+                        out.push_str(if *value { "true" } else { "false" })
+                    }
+                    ExprNode::Literal(Literal::Number(value)) => out.push_str(value),
+                    ExprNode::Literal(Literal::String(value)) => push_escaped_string(out, value),
+                    ExprNode::Index(base, key) => {
+                        base.write_to(out, PRIMARY_PRECEDENCE);
+                        // `*` is the object filter from parsed expressions, e.g. `needs.*.result`
+                        if key == "*" || validate_string(key) {
+                            out.push('.');
+                            out.push_str(key);
+                        } else {
+                            out.push('[');
+                            push_escaped_string(out, key);
+                            out.push(']');
+                        }
+                    }
+                    ExprNode::Subscript(base, index) => {
+                        base.write_to(out, PRIMARY_PRECEDENCE);
+                        out.push('[');
+                        index.write_to(out, 0);
+                        out.push(']');
+                    }
+                    ExprNode::Call(name, args) => {
+                        out.push_str(name);
+                        out.push('(');
+                        for (i, arg) in args.iter().enumerate() {
+                            if i > 0 {
+                                out.push_str(", ");
+                            }
+                            arg.write_to(out, 0);
+                        }
+                        out.push(')');
+                    }
+                    ExprNode::Not(inner) => {
+                        out.push('!');
+                        inner.write_to(out, NOT_PRECEDENCE);
+                    }
+                    ExprNode::Binary(op, lhs, rhs) => {
+                        lhs.write_to(out, op.precedence());
+                        out.push(' ');
+                        out.push_str(op.symbol());
+                        out.push(' ');
+                        rhs.write_to(out, op.precedence() + 1);
+                    }
+                    ExprNode::Chain(op, operands) => {
+                        for (i, operand) in operands.iter().enumerate() {
+                            if i > 0 {
+                                out.push(' ');
+                                out.push_str(op.symbol());
+                                out.push(' ');
+                            }
+                            operand.write_to(out, op.precedence() + 1);
+                        }
+                    }
+                    ExprNode::IfElse {
+                        condition,
+                        then,
+                        otherwise,
+                    } => {
+                        condition.write_to(out, BinaryOp::And.precedence());
+                        out.push_str(" && ");
+                        then.write_to(out, BinaryOp::And.precedence() + 1);
+                        out.push_str(" || ");
+                        otherwise.write_to(out, BinaryOp::Or.precedence() + 1);
+                    }
+                }
+                if wrap {
+                    out.push(')');
+                }
             }
-            out
         }
 
-        fn funcs_to_names(funcs: Funcs) -> Vec<&'static str> {
-            let mut out = Vec::new();
-            if funcs.contains(Funcs::HASH_FILES) {
-                out.push("hashFiles");
-            }
-            if funcs.contains(Funcs::ALWAYS) {
-                out.push("always");
-            }
-            if funcs.contains(Funcs::CANCELLED) {
-                out.push("cancelled");
-            }
-            if funcs.contains(Funcs::SUCCESS) {
-                out.push("success");
-            }
-            if funcs.contains(Funcs::FAILURE) {
-                out.push("failure");
+        /// The result of evaluating an expression against a partial context.
+        #[derive(Clone, Debug)]
+        enum Eval {
+            /// The exact value is known.
+            Value(Value),
+            /// Only the truthiness of the value is known.
+            Truthy,
+            Falsy,
+            /// The value depends on parts of the context which were not supplied.
+            Unknown,
+        }
+
+        impl Eval {
+            fn truthiness(&self) -> Option<bool> {
+                match self {
+                    Eval::Value(value) => Some(is_truthy(value)),
+                    Eval::Truthy => Some(true),
+                    Eval::Falsy => Some(false),
+                    Eval::Unknown => None,
+                }
             }
-            out
         }
 
-        fn render_string_like(value: StringLike) -> (String, ExprMeta) {
+        fn is_truthy(value: &Value) -> bool {
             match value {
-                Either::A(expr) => (expr.to_string(), expr.meta()),
-                Either::B(raw) => (escape_string(&raw), ExprMeta::empty()),
+                Value::Null => false,
+                Value::Bool(value) => *value,
+                Value::Number(value) => value.as_f64().is_some_and(|n| n != 0.0 && !n.is_nan()),
+                Value::String(value) => !value.is_empty(),
+                Value::Array(_) | Value::Object(_) => true,
             }
         }
 
-        fn render_bool_like(value: BoolLike) -> (String, ExprMeta) {
-            match value {
-                Either::A(expr) => (expr.to_string(), expr.meta()),
-                Either::B(raw) => (
-                    if raw {
-                        "true".to_string()
-                    } else {
-                        "false".to_string()
-                    },
-                    ExprMeta::empty(),
-                ),
+        fn parse_number(text: &str) -> f64 {
+            let text = text.trim();
+            if text.is_empty() {
+                0.0
+            } else if let Some(hex) = text.strip_prefix("0x") {
+                i64::from_str_radix(hex, 16).map_or(f64::NAN, |n| n as f64)
+            } else {
+                text.parse().unwrap_or(f64::NAN)
             }
         }
 
-        fn render_number_like(value: NumberLike) -> (String, ExprMeta) {
+        fn to_number(value: &Value) -> f64 {
             match value {
-                Either::A(expr) => (expr.to_string(), expr.meta()),
-                Either::B(raw) => (raw.to_string(), ExprMeta::empty()),
+                Value::Null => 0.0,
+                Value::Bool(value) => f64::from(u8::from(*value)),
+                Value::Number(value) => value.as_f64().unwrap_or(f64::NAN),
+                Value::String(value) => parse_number(value),
+                Value::Array(_) | Value::Object(_) => f64::NAN,
             }
         }
 
-        pub trait YamlExpression {
-            fn stringify(&self) -> &str;
-            fn as_expression_string(&self) -> String {
-                format!("${{{{ {} }}}}", self.stringify())
+        fn to_text(value: &Value) -> String {
+            match value {
+                Value::Null => String::new(),
+                Value::Bool(value) => value.to_string(),
+                Value::Number(value) => value
+                    .as_f64()
+                    .map_or_else(|| value.to_string(), |n| n.to_string()),
+                Value::String(value) => value.clone(),
+                Value::Array(_) => "Array".to_string(),
+                Value::Object(_) => "Object".to_string(),
             }
         }
-        impl<T> Yamlable for &T
-        where
-            T: YamlExpression,
-        {
-            fn as_yaml(&self) -> Yaml {
-                Yaml::Real(self.as_expression_string())
+
+        /// Compare two values with GitHub's loose, case-insensitive semantics.
+        ///
+        /// Returns `None` when the answer cannot be known locally (objects and arrays compare
+        /// by reference on the runner).
+        fn compare_values(op: BinaryOp, lhs: &Value, rhs: &Value) -> Option<bool> {
+            use std::cmp::Ordering;
+            let ordering = match (lhs, rhs) {
+                (Value::Array(_) | Value::Object(_), _)
+                | (_, Value::Array(_) | Value::Object(_)) => {
+                    return None;
+                }
+                (Value::String(lhs), Value::String(rhs)) => {
+                    Some(lhs.to_lowercase().cmp(&rhs.to_lowercase()))
+                }
+                (Value::Null, Value::Null) => Some(Ordering::Equal),
+                (Value::Bool(lhs), Value::Bool(rhs)) => Some(lhs.cmp(rhs)),
+                _ => to_number(lhs).partial_cmp(&to_number(rhs)),
+            };
+            match op {
+                BinaryOp::Eq => Some(ordering == Some(Ordering::Equal)),
+                BinaryOp::Ne => Some(ordering != Some(Ordering::Equal)),
+                BinaryOp::Lt => Some(ordering == Some(Ordering::Less)),
+                BinaryOp::Le => Some(matches!(ordering, Some(Ordering::Less | Ordering::Equal))),
+                BinaryOp::Gt => Some(ordering == Some(Ordering::Greater)),
+                BinaryOp::Ge => Some(matches!(
+                    ordering,
+                    Some(Ordering::Greater | Ordering::Equal)
+                )),
+                BinaryOp::And | BinaryOp::Or => None,
             }
         }
 
-        #[pyclass]
-        #[derive(Clone)]
-        pub struct BooleanExpression(Expression<BoolKind>);
-        impl YamlExpression for BooleanExpression {
-            fn stringify(&self) -> &str {
-                self.0.text()
+        fn lookup<'v>(value: &'v Value, key: &str) -> Option<&'v Value> {
+            match value {
+                Value::Object(object) => object.get(key).or_else(|| {
+                    object
+                        .iter()
+                        .find(|(name, _)| name.eq_ignore_ascii_case(key))
+                        .map(|(_, value)| value)
+                }),
+                Value::Array(items) => items.get(key.parse::<usize>().ok()?),
+                _ => None,
             }
         }
-        impl Display for BooleanExpression {
-            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-                write!(f, "{}", self.stringify())
+
+        fn format_template(template: &str, args: &[Value]) -> Option<String> {
+            let mut out = String::with_capacity(template.len());
+            let mut chars = template.chars().peekable();
+            while let Some(ch) = chars.next() {
+                match ch {
+                    '{' if chars.peek() == Some(&'{') => {
+                        chars.next();
+                        out.push('{');
+                    }
+                    '}' if chars.peek() == Some(&'}') => {
+                        chars.next();
+                        out.push('}');
+                    }
+                    '{' => {
+                        let mut digits = String::new();
+                        loop {
+                            match chars.next() {
+                                Some('}') => break,
+                                Some(c) if c.is_ascii_digit() => digits.push(c),
+                                _ => return None,
+                            }
+                        }
+                        out.push_str(&to_text(args.get(digits.parse::<usize>().ok()?)?));
+                    }
+                    _ => out.push(ch),
+                }
             }
+            Some(out)
         }
-        impl BooleanExpression {
-            fn new_expr(text: String, meta: ExprMeta) -> Self {
-                Self(Expression::new(text, meta))
+
+        /// Evaluate a built-in function whose arguments are all known.
+        ///
+        /// Status functions other than ``always()`` and ``hashFiles()`` depend on the runner and
+        /// are never known locally.
+        fn call_function(name: &str, args: &[Value]) -> Option<Value> {
+            let lower = |value: &Value| to_text(value).to_lowercase();
+            match (name, args) {
+                ("contains", [Value::Array(items), needle]) => {
+                    Some(Value::Bool(items.iter().any(|item| {
+                        compare_values(BinaryOp::Eq, item, needle) == Some(true)
+                    })))
+                }
+                ("contains", [haystack, needle]) => {
+                    Some(Value::Bool(lower(haystack).contains(&lower(needle))))
+                }
+                ("startsWith", [value, prefix]) => {
+                    Some(Value::Bool(lower(value).starts_with(&lower(prefix))))
+                }
+                ("endsWith", [value, suffix]) => {
+                    Some(Value::Bool(lower(value).ends_with(&lower(suffix))))
+                }
+                ("format", [template, rest @ ..]) => {
+                    format_template(&to_text(template), rest).map(Value::String)
+                }
+                ("join", [Value::Array(items), rest @ ..]) if rest.len() <= 1 => {
+                    let separator = rest.first().map_or_else(|| ",".to_string(), to_text);
+                    Some(Value::String(
+                        items
+                            .iter()
+                            .map(to_text)
+                            .collect::<Vec<String>>()
+                            .join(&separator),
+                    ))
+                }
+                ("join", [value, rest @ ..]) if rest.len() <= 1 => {
+                    Some(Value::String(to_text(value)))
+                }
+                ("toJSON", [value]) => serde_json::to_string_pretty(value).ok().map(Value::String),
+                ("fromJSON", [value]) => serde_json::from_str(&to_text(value)).ok(),
+                _ => None,
+            }
+        }
+
+        /// Combine `&&` / `||` operands lazily with three-valued logic.
+        fn evaluate_chain(op: BinaryOp, operands: impl Iterator<Item = Eval>) -> Eval {
+            // `&&` stops at the first falsy operand, `||` at the first truthy one
+            let stops_on = op == BinaryOp::Or;
+            let mut uncertain = false;
+            let mut last = Eval::Value(Value::Bool(op == BinaryOp::And));
+            for operand in operands {
+                match operand.truthiness() {
+                    Some(truthy) if truthy == stops_on => {
+                        return match (uncertain, stops_on) {
+                            (false, _) => operand,
+                            (true, true) => Eval::Truthy,
+                            (true, false) => Eval::Falsy,
+                        };
+                    }
+                    Some(_) => {}
+                    None => uncertain = true,
+                }
+                last = operand;
             }
+            if uncertain { Eval::Unknown } else { last }
+        }
 
-            fn from_base(base: ExprBase) -> Self {
-                Self(Expression::from_base(base))
+        /// The outcome of the status functions, e.g. while a needed job is skipped.
+        #[derive(Clone, Copy)]
+        pub(super) struct JobStatus {
+            pub(super) success: bool,
+            pub(super) failure: bool,
+            pub(super) cancelled: bool,
+        }
+
+        impl JobStatus {
+            fn of(&self, function: &str) -> Option<bool> {
+                match function {
+                    "success" => Some(self.success),
+                    "failure" => Some(self.failure),
+                    "cancelled" => Some(self.cancelled),
+                    _ => None,
+                }
             }
+        }
 
-            fn meta(&self) -> ExprMeta {
-                self.0.meta()
+        impl ExprNode {
+            fn evaluate(&self, context: &Value) -> Eval {
+                self.evaluate_with(context, None)
             }
 
-            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
-                allowed.validate(self.meta(), &self.as_expression_string())
+            /// Evaluate the tree, with status functions other than ``always()`` unknown unless a
+            /// status is given.
+            fn evaluate_with(&self, context: &Value, status: Option<JobStatus>) -> Eval {
+                match self {
+                    ExprNode::Path(path) => {
+                        let mut current = context;
+                        for segment in path.split('.') {
+                            match lookup(current, segment) {
+                                Some(value) => current = value,
+                                None => return Eval::Unknown,
+                            }
+                        }
+                        Eval::Value(current.clone())
+                    }
+                    ExprNode::Literal(Literal::Null) => Eval::Value(Value::Null),
+                    ExprNode::Literal(Literal::Bool(value)) => Eval::Value(Value::Bool(*value)),
+                    ExprNode::Literal(Literal::Number(value)) => Eval::Value(
+                        Number::from_f64(parse_number(value)).map_or(Value::Null, Value::Number),
+                    ),
+                    ExprNode::Literal(Literal::String(value)) => {
+                        Eval::Value(Value::String(value.clone()))
+                    }
+                    ExprNode::Index(base, key) => match base.evaluate_with(context, status) {
+                        Eval::Value(value) => lookup(&value, key)
+                            .cloned()
+                            .map_or(Eval::Unknown, Eval::Value),
+                        _ => Eval::Unknown,
+                    },
+                    ExprNode::Subscript(base, index) => {
+                        match (
+                            base.evaluate_with(context, status),
+                            index.evaluate_with(context, status),
+                        ) {
+                            (Eval::Value(value), Eval::Value(index)) => {
+                                lookup(&value, &to_text(&index))
+                                    .cloned()
+                                    .map_or(Eval::Unknown, Eval::Value)
+                            }
+                            _ => Eval::Unknown,
+                        }
+                    }
+                    ExprNode::Call("always", _) => Eval::Value(Value::Bool(true)),
+                    ExprNode::Call(name, args) => {
+                        if let Some(value) = status.and_then(|status| status.of(name)) {
+                            return Eval::Value(Value::Bool(value));
+                        }
+                        let mut values = Vec::with_capacity(args.len());
+                        for arg in args {
+                            match arg.evaluate_with(context, status) {
+                                Eval::Value(value) => values.push(value),
+                                _ => return Eval::Unknown,
+                            }
+                        }
+                        call_function(name, &values).map_or(Eval::Unknown, Eval::Value)
+                    }
+                    ExprNode::Not(inner) => inner
+                        .evaluate_with(context, status)
+                        .truthiness()
+                        .map_or(Eval::Unknown, |truthy| Eval::Value(Value::Bool(!truthy))),
+                    ExprNode::Binary(op @ (BinaryOp::And | BinaryOp::Or), lhs, rhs) => {
+                        evaluate_chain(
+                            *op,
+                            [lhs, rhs]
+                                .into_iter()
+                                .map(|n| n.evaluate_with(context, status)),
+                        )
+                    }
+                    ExprNode::Chain(op, operands) => evaluate_chain(
+                        *op,
+                        operands.iter().map(|n| n.evaluate_with(context, status)),
+                    ),
+                    ExprNode::Binary(op, lhs, rhs) => {
+                        match (
+                            lhs.evaluate_with(context, status),
+                            rhs.evaluate_with(context, status),
+                        ) {
+                            (Eval::Value(lhs), Eval::Value(rhs)) => compare_values(*op, &lhs, &rhs)
+                                .map_or(Eval::Unknown, |result| Eval::Value(Value::Bool(result))),
+                            _ => Eval::Unknown,
+                        }
+                    }
+                    ExprNode::IfElse {
+                        condition,
+                        then,
+                        otherwise,
+                    } => {
+                        let picked = evaluate_chain(
+                            BinaryOp::And,
+                            [condition, then]
+                                .into_iter()
+                                .map(|n| n.evaluate_with(context, status)),
+                        );
+                        evaluate_chain(
+                            BinaryOp::Or,
+                            [picked].into_iter().chain(std::iter::once_with(|| {
+                                otherwise.evaluate_with(context, status)
+                            })),
+                        )
+                    }
+                }
             }
         }
-        #[pymethods]
-        impl BooleanExpression {
-            fn as_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn as_str(&self) -> StringExpression {
-                StringExpression::new_expr(self.to_string(), self.meta())
+
+        /// Convert a Python context mapping into JSON for evaluation.
+        pub(super) fn py_to_json(obj: &Bound<'_, PyAny>) -> PyResult<Value> {
+            if obj.is_none() {
+                Ok(Value::Null)
+            } else if obj.is_instance_of::<PyBool>() {
+                Ok(Value::Bool(obj.extract::<bool>()?))
+            } else if obj.is_instance_of::<PyInt>() {
+                Ok(Value::from(obj.extract::<i64>()?))
+            } else if obj.is_instance_of::<PyFloat>() {
+                Ok(Number::from_f64(obj.extract::<f64>()?).map_or(Value::Null, Value::Number))
+            } else if obj.is_instance_of::<PyString>() {
+                Ok(Value::String(obj.extract::<String>()?))
+            } else if let Ok(dict) = obj.cast::<PyDict>() {
+                let mut map = Map::with_capacity(dict.len());
+                for (key, value) in dict.iter() {
+                    map.insert(key.extract::<String>()?, py_to_json(&value)?);
+                }
+                Ok(Value::Object(map))
+            } else if let Ok(list) = obj.cast::<PyList>() {
+                Ok(Value::Array(
+                    list.iter()
+                        .map(|item| py_to_json(&item))
+                        .collect::<PyResult<_>>()?,
+                ))
+            } else if let Ok(tuple) = obj.cast::<PyTuple>() {
+                Ok(Value::Array(
+                    tuple
+                        .iter()
+                        .map(|item| py_to_json(&item))
+                        .collect::<PyResult<_>>()?,
+                ))
+            } else {
+                Err(PyValueError::new_err(
+                    "Unsupported value in expression context",
+                ))
             }
-            fn as_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(self.to_string(), self.meta())
+        }
+
+        /// A raw string with its `${{ ... }}` segments parsed into expression trees.
+        pub(super) struct ParsedString {
+            segments: Vec<Arc<ExprNode>>,
+            meta: ExprMeta,
+        }
+
+        #[derive(Debug)]
+        enum Token<'a> {
+            Ident(&'a str),
+            Number(&'a str),
+            String(String),
+            Punct(&'static str),
+        }
+
+        const PUNCTUATION: [&str; 16] = [
+            "&&", "||", "==", "!=", "<=", ">=", "(", ")", "[", "]", ".", ",", "!", "<", ">", "*",
+        ];
+
+        /// Split one `${{ ... }}` segment into tokens, starting just after the opening braces.
+        ///
+        /// Returns the tokens and the offset just past the closing braces.
+        fn tokenize(text: &str, mut pos: usize) -> Result<(Vec<Token<'_>>, usize), String> {
+            let bytes = text.as_bytes();
+            let mut tokens = Vec::new();
+            loop {
+                while bytes.get(pos).is_some_and(u8::is_ascii_whitespace) {
+                    pos += 1;
+                }
+                let rest = &text[pos..];
+                let Some(&byte) = bytes.get(pos) else {
+                    return Err("missing closing '}}'".to_string());
+                };
+                if rest.starts_with("}}") {
+                    return Ok((tokens, pos + 2));
+                }
+                if byte == b'\'' {
+                    let mut value = String::new();
+                    let mut chars = rest.char_indices().skip(1).peekable();
+                    loop {
+                        match chars.next() {
+                            None => return Err("unterminated string literal".to_string()),
+                            Some((_, '\'')) if chars.peek().is_some_and(|(_, c)| *c == '\'') => {
+                                chars.next();
+                                value.push('\'');
+                            }
+                            Some((end, '\'')) => {
+                                pos += end + 1;
+                                break;
+                            }
+                            Some((_, c)) => value.push(c),
+                        }
+                    }
+                    tokens.push(Token::String(value));
+                } else if byte.is_ascii_digit()
+                    || (matches!(byte, b'-' | b'+')
+                        && bytes.get(pos + 1).is_some_and(u8::is_ascii_digit))
+                {
+                    let mut len = 1;
+                    while let Some(&c) = bytes.get(pos + len) {
+                        let exponent_sign =
+                            matches!(c, b'-' | b'+') && matches!(bytes[pos + len - 1], b'e' | b'E');
+                        if !(c.is_ascii_alphanumeric() || c == b'.' || exponent_sign) {
+                            break;
+                        }
+                        len += 1;
+                    }
+                    let number = &rest[..len];
+                    if parse_number(number).is_nan() {
+                        return Err(format!("invalid number '{number}'"));
+                    }
+                    tokens.push(Token::Number(number));
+                    pos += len;
+                } else if byte.is_ascii_alphabetic() || byte == b'_' {
+                    let len = rest
+                        .bytes()
+                        .position(|c| !(c.is_ascii_alphanumeric() || c == b'_' || c == b'-'))
+                        .unwrap_or(rest.len());
+                    tokens.push(Token::Ident(&rest[..len]));
+                    pos += len;
+                } else if let Some(punct) = PUNCTUATION.iter().find(|p| rest.starts_with(**p)) {
+                    tokens.push(Token::Punct(punct));
+                    pos += punct.len();
+                } else {
+                    let c = rest.chars().next().unwrap_or_default();
+                    return Err(format!("unexpected character '{c}'"));
+                }
             }
-            fn __invert__(&self) -> Self {
-                Self::new_expr(format!("!({self})"), self.meta())
+        }
+
+        fn context_named(name: &str) -> Option<(&'static str, Contexts)> {
+            const CONTEXTS: [(&str, Contexts); 12] = [
+                ("github", Contexts::GITHUB),
+                ("secrets", Contexts::SECRETS),
+                ("env", Contexts::ENV),
+                ("vars", Contexts::VARS),
+                ("inputs", Contexts::INPUTS),
+                ("needs", Contexts::NEEDS),
+                ("strategy", Contexts::STRATEGY),
+                ("matrix", Contexts::MATRIX),
+                ("job", Contexts::JOB),
+                ("runner", Contexts::RUNNER),
+                ("steps", Contexts::STEPS),
+                ("jobs", Contexts::JOBS),
+            ];
+            CONTEXTS
+                .into_iter()
+                .find(|(known, _)| known.eq_ignore_ascii_case(name))
+        }
+
+        fn function_named(name: &str) -> Option<(&'static str, Funcs)> {
+            const FUNCTIONS: [(&str, Funcs); 12] = [
+                ("contains", Funcs::NONE),
+                ("startsWith", Funcs::NONE),
+                ("endsWith", Funcs::NONE),
+                ("format", Funcs::NONE),
+                ("join", Funcs::NONE),
+                ("toJSON", Funcs::NONE),
+                ("fromJSON", Funcs::NONE),
+                ("hashFiles", Funcs::HASH_FILES),
+                ("success", Funcs::SUCCESS),
+                ("always", Funcs::ALWAYS),
+                ("cancelled", Funcs::CANCELLED),
+                ("failure", Funcs::FAILURE),
+            ];
+            FUNCTIONS
+                .into_iter()
+                .find(|(known, _)| known.eq_ignore_ascii_case(name))
+        }
+
+        /// A recursive descent parser for a single expression, recording the contexts and
+        /// functions it uses.
+        struct Parser<'t, 'a> {
+            tokens: &'t [Token<'a>],
+            pos: usize,
+            meta: ExprMeta,
+        }
+
+        impl<'t, 'a> Parser<'t, 'a> {
+            fn next(&mut self) -> Option<&'t Token<'a>> {
+                let token = self.tokens.get(self.pos);
+                self.pos += 1;
+                token
             }
-            fn __and__(&self, other: BoolLike) -> Self {
-                let (other, other_meta) = render_bool_like(other);
-                Self::new_expr(
-                    format!("({self} && {other})"),
-                    self.meta().union(other_meta),
-                )
+
+            fn eat(&mut self, punct: &str) -> bool {
+                let found =
+                    matches!(self.tokens.get(self.pos), Some(Token::Punct(p)) if *p == punct);
+                if found {
+                    self.pos += 1;
+                }
+                found
             }
-            fn __or__(&self, other: BoolLike) -> Self {
-                let (other, other_meta) = render_bool_like(other);
-                Self::new_expr(
-                    format!("({self} || {other})"),
-                    self.meta().union(other_meta),
-                )
+
+            fn expect(&mut self, punct: &str) -> Result<(), String> {
+                if self.eat(punct) {
+                    Ok(())
+                } else {
+                    Err(format!("expected '{punct}'"))
+                }
             }
-            fn __eq__(&self, other: BoolLike) -> Self {
-                let (other, other_meta) = render_bool_like(other);
-                Self::new_expr(
-                    format!("({self} == {other})"),
-                    self.meta().union(other_meta),
-                )
+
+            /// Parse a left-associative run of binary operators, loosest binding first.
+            fn parse_binary(&mut self, level: usize) -> Result<Arc<ExprNode>, String> {
+                const LEVELS: [&[(&str, BinaryOp)]; 4] = [
+                    &[("||", BinaryOp::Or)],
+                    &[("&&", BinaryOp::And)],
+                    &[("==", BinaryOp::Eq), ("!=", BinaryOp::Ne)],
+                    &[
+                        ("<", BinaryOp::Lt),
+                        ("<=", BinaryOp::Le),
+                        (">", BinaryOp::Gt),
+                        (">=", BinaryOp::Ge),
+                    ],
+                ];
+                let Some(ops) = LEVELS.get(level) else {
+                    return self.parse_unary();
+                };
+                let mut lhs = self.parse_binary(level + 1)?;
+                while let Some((_, op)) = ops.iter().find(|(symbol, _)| self.eat(symbol)) {
+                    let rhs = self.parse_binary(level + 1)?;
+                    lhs = ExprNode::binary(*op, &lhs, rhs);
+                }
+                Ok(lhs)
             }
-            fn __ne__(&self, other: BoolLike) -> Self {
-                let (other, other_meta) = render_bool_like(other);
-                Self::new_expr(
-                    format!("({self} != {other})"),
-                    self.meta().union(other_meta),
-                )
+
+            fn parse_unary(&mut self) -> Result<Arc<ExprNode>, String> {
+                if self.eat("!") {
+                    Ok(ExprNode::not(&self.parse_unary()?))
+                } else {
+                    self.parse_postfix()
+                }
             }
-            fn if_else(&self, condition: BoolLike, else_expr: BoolLike) -> BooleanExpression {
-                let (condition, condition_meta) = render_bool_like(condition);
-                let (else_expr, else_meta) = render_bool_like(else_expr);
-                let meta = self.meta().union(condition_meta).union(else_meta);
-                BooleanExpression::new_expr(format!("({condition} && {self} || {else_expr})"), meta)
+
+            fn parse_postfix(&mut self) -> Result<Arc<ExprNode>, String> {
+                let mut node = self.parse_primary()?;
+                loop {
+                    if self.eat(".") {
+                        node = match self.next() {
+                            // keep plain property chains as a single path, like `context` does
+                            Some(Token::Ident(name)) => match &*node {
+                                ExprNode::Path(path) => {
+                                    Arc::new(ExprNode::Path(Cow::Owned(format!("{path}.{name}"))))
+                                }
+                                _ => ExprNode::index(&node, name),
+                            },
+                            Some(Token::Punct("*")) => ExprNode::index(&node, "*"),
+                            _ => return Err("expected a property name after '.'".to_string()),
+                        };
+                    } else if self.eat("[") {
+                        let index = self.parse_binary(0)?;
+                        self.expect("]")?;
+                        node = match &*index {
+                            ExprNode::Literal(Literal::String(key)) => ExprNode::index(&node, key),
+                            _ => Arc::new(ExprNode::Subscript(node, index)),
+                        };
+                    } else {
+                        return Ok(node);
+                    }
+                }
             }
-            fn to_json(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("toJSON({self})"), self.meta())
+
+            fn parse_primary(&mut self) -> Result<Arc<ExprNode>, String> {
+                match self.next() {
+                    Some(Token::Punct("(")) => {
+                        let inner = self.parse_binary(0)?;
+                        self.expect(")")?;
+                        Ok(inner)
+                    }
+                    Some(Token::String(value)) => Ok(ExprNode::string(value.clone())),
+                    Some(Token::Number(value)) => Ok(ExprNode::number(value.to_string())),
+                    Some(Token::Ident("true")) => Ok(ExprNode::bool(true)),
+                    Some(Token::Ident("false")) => Ok(ExprNode::bool(false)),
+                    Some(Token::Ident("null")) => Ok(Arc::new(ExprNode::Literal(Literal::Null))),
+                    Some(Token::Ident(value @ ("NaN" | "Infinity"))) => {
+                        Ok(ExprNode::number(value.to_string()))
+                    }
+                    Some(Token::Ident(name)) if self.eat("(") => {
+                        let (name, funcs) = function_named(name)
+                            .ok_or_else(|| format!("unrecognized function '{name}'"))?;
+                        self.meta.funcs |= funcs;
+                        let mut args = Vec::new();
+                        if !self.eat(")") {
+                            loop {
+                                args.push(self.parse_binary(0)?);
+                                if self.eat(")") {
+                                    break;
+                                }
+                                self.expect(",")?;
+                            }
+                        }
+                        Ok(ExprNode::call(name, args))
+                    }
+                    Some(Token::Ident(name)) => {
+                        let (name, contexts) = context_named(name)
+                            .ok_or_else(|| format!("unrecognized named-value '{name}'"))?;
+                        self.meta.contexts |= contexts;
+                        Ok(ExprNode::path(name))
+                    }
+                    Some(token) => Err(format!("unexpected token {token:?}")),
+                    None => Err("unexpected end of expression".to_string()),
+                }
             }
-            fn __str__(&self) -> String {
-                self.as_expression_string()
+        }
+
+        fn parse_template(text: &str) -> Result<ParsedString, String> {
+            let mut segments = Vec::new();
+            let mut meta = ExprMeta::empty();
+            let mut rest = 0;
+            while let Some(offset) = text[rest..].find("${{") {
+                let (tokens, end) = tokenize(text, rest + offset + 3)?;
+                let mut parser = Parser {
+                    tokens: &tokens,
+                    pos: 0,
+                    meta: ExprMeta::empty(),
+                };
+                let node = parser.parse_binary(0)?;
+                if let Some(token) = tokens.get(parser.pos) {
+                    return Err(format!("unexpected token {token:?}"));
+                }
+                segments.push(node);
+                meta = meta.union(parser.meta);
+                rest = end;
             }
+            Ok(ParsedString { segments, meta })
         }
-        #[pyfunction]
-        fn success() -> BooleanExpression {
-            BooleanExpression::new_expr(
-                "success()".to_string(),
-                ExprMeta::with_funcs(Funcs::SUCCESS),
-            )
+
+        const PARSE_CACHE_CAPACITY: usize = 1024;
+
+        /// Parse results for raw strings, which generators tend to repeat many times.
+        static PARSE_CACHE: LazyLock<Mutex<LruCache<String, Result<Arc<ParsedString>, String>>>> =
+            LazyLock::new(|| Mutex::new(LruCache::new(PARSE_CACHE_CAPACITY)));
+
+        fn parse_cached(text: &str) -> PyResult<Arc<ParsedString>> {
+            let mut cache = PARSE_CACHE.lock().unwrap_or_else(PoisonError::into_inner);
+            let parsed = match cache.get(text) {
+                Some(parsed) => parsed.clone(),
+                None => {
+                    let parsed = parse_template(text).map(Arc::new);
+                    cache.insert(text.to_string(), parsed.clone());
+                    parsed
+                }
+            };
+            parsed
+                .map_err(|e| PyValueError::new_err(format!("Invalid expression in {text:?}: {e}")))
         }
-        #[pyfunction]
-        fn always() -> BooleanExpression {
-            BooleanExpression::new_expr("always()".to_string(), ExprMeta::with_funcs(Funcs::ALWAYS))
-        }
-        #[pyfunction]
-        fn cancelled() -> BooleanExpression {
-            BooleanExpression::new_expr(
-                "cancelled()".to_string(),
-                ExprMeta::with_funcs(Funcs::CANCELLED),
-            )
+
+        /// Check the `${{ ... }}` segments of a raw string against `allowed`.
+        pub(super) fn validate_raw_string(text: &str, allowed: Allowed) -> PyResult<()> {
+            if !text.contains("${{") {
+                return Ok(());
+            }
+            allowed.validate(parse_cached(text)?.meta, text)
         }
-        #[pyfunction]
-        fn failure() -> BooleanExpression {
-            BooleanExpression::new_expr(
-                "failure()".to_string(),
-                ExprMeta::with_funcs(Funcs::FAILURE),
-            )
+
+        /// Parse a raw ``if:`` condition, which is an expression even without `${{ }}`.
+        ///
+        /// Returns `None` for strings which mix text and expressions.
+        pub(super) fn parse_raw_condition(text: &str) -> PyResult<Option<BooleanExpression>> {
+            let trimmed = text.trim();
+            let bare = !trimmed.contains("${{");
+            let parsed = if bare {
+                parse_cached(&format!("${{{{ {trimmed} }}}}"))?
+            } else {
+                parse_cached(trimmed)?
+            };
+            let whole = parsed.segments.len() == 1
+                && (bare || (trimmed.starts_with("${{") && trimmed.ends_with("}}")));
+            Ok(whole.then(|| BooleanExpression::new_expr(parsed.segments[0].clone(), parsed.meta)))
         }
-        #[pyclass]
-        #[derive(Clone)]
-        pub struct NumberExpression(Expression<NumberKind>);
-        impl YamlExpression for NumberExpression {
-            fn stringify(&self) -> &str {
-                self.0.text()
+
+        /// Parse a raw string which consists of exactly one `${{ ... }}` expression.
+        ///
+        /// Returns `None` for plain strings and strings which mix text and expressions.
+        fn parse_whole_expression(text: &str) -> PyResult<Option<(Arc<ExprNode>, ExprMeta)>> {
+            let trimmed = text.trim();
+            if !trimmed.starts_with("${{") {
+                return Ok(None);
+            }
+            if let Ok((_, end)) = tokenize(trimmed, 3)
+                && end != trimmed.len()
+            {
+                return Ok(None);
             }
+            let parsed = parse_cached(trimmed)?;
+            Ok(Some((parsed.segments[0].clone(), parsed.meta)))
         }
-        impl Display for NumberExpression {
-            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-                write!(f, "{}", self.stringify())
-            }
+
+        pub(super) fn parse_raw_string_expression(
+            text: &str,
+        ) -> PyResult<Option<StringExpression>> {
+            Ok(parse_whole_expression(text)?
+                .map(|(node, meta)| StringExpression::new_expr(node, meta)))
         }
-        impl NumberExpression {
-            fn new_expr(text: String, meta: ExprMeta) -> Self {
-                Self(Expression::new(text, meta))
-            }
 
-            fn from_base(base: ExprBase) -> Self {
-                Self(Expression::from_base(base))
-            }
+        pub(super) fn parse_raw_boolean_expression(
+            text: &str,
+        ) -> PyResult<Option<BooleanExpression>> {
+            Ok(parse_whole_expression(text)?
+                .map(|(node, meta)| BooleanExpression::new_expr(node, meta)))
+        }
 
-            fn meta(&self) -> ExprMeta {
-                self.0.meta()
-            }
+        pub(super) fn parse_raw_number_expression(
+            text: &str,
+        ) -> PyResult<Option<NumberExpression>> {
+            Ok(parse_whole_expression(text)?
+                .map(|(node, meta)| NumberExpression::new_expr(node, meta)))
+        }
 
-            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
-                allowed.validate(self.meta(), &self.as_expression_string())
-            }
+        #[derive(Clone)]
+        struct ExprBase {
+            node: Arc<ExprNode>,
+            meta: ExprMeta,
+            text: Arc<OnceLock<String>>,
         }
-        #[pymethods]
-        impl NumberExpression {
-            fn as_bool(&self) -> BooleanExpression {
-                BooleanExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn as_str(&self) -> StringExpression {
-                StringExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn as_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn __lt__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} < {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn __le__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} <= {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn __gt__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} > {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn __ge__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} >= {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn __eq__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} == {other})"),
-                    self.meta().union(other_meta),
-                )
+
+        /// Number of cached accessor expressions kept before the table is reset.
+        const ACCESSOR_CACHE_CAPACITY: usize = 4096;
+
+        /// Shared expressions for context accessors.
+        ///
+        /// Fixed paths such as ``github.ref`` are interned once, and dynamic accessors such as
+        /// ``steps[id].outputs[key]`` are cached per (parent, key) pair, so repeated accesses
+        /// share both the tree and its rendered text.
+        #[derive(Default)]
+        struct AccessorCache {
+            paths: HashMap<&'static str, ExprBase>,
+            indexed: HashMap<(usize, u32), HashMap<String, ExprBase>>,
+            indexed_len: usize,
+        }
+
+        static ACCESSOR_CACHE: LazyLock<Mutex<AccessorCache>> = LazyLock::new(Mutex::default);
+
+        fn accessor_cache() -> MutexGuard<'static, AccessorCache> {
+            ACCESSOR_CACHE
+                .lock()
+                .unwrap_or_else(PoisonError::into_inner)
+        }
+
+        impl ExprBase {
+            fn new(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self {
+                    node,
+                    meta,
+                    text: Arc::default(),
+                }
             }
-            fn __ne__(&self, other: NumberLike) -> BooleanExpression {
-                let (other, other_meta) = render_number_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} != {other})"),
-                    self.meta().union(other_meta),
-                )
+
+            fn with_contexts(path: &'static str, contexts: Contexts) -> Self {
+                accessor_cache()
+                    .paths
+                    .entry(path)
+                    .or_insert_with(|| {
+                        Self::new(ExprNode::path(path), ExprMeta::with_contexts(contexts))
+                    })
+                    .clone()
             }
-            fn if_else(&self, condition: BoolLike, else_expr: NumberLike) -> NumberExpression {
-                let (condition, condition_meta) = render_bool_like(condition);
-                let (else_expr, else_meta) = render_number_like(else_expr);
-                let meta = self.meta().union(condition_meta).union(else_meta);
-                NumberExpression::new_expr(format!("({condition} && {self} || {else_expr})"), meta)
+
+            fn indexed(base: &Arc<ExprNode>, key: &str, contexts: Contexts) -> Self {
+                // Entries hold a reference to `base`, so its address cannot be reused while the
+                // entry exists.
+                let parent = (Arc::as_ptr(base) as usize, contexts.bits());
+                let mut cache = accessor_cache();
+                if let Some(hit) = cache.indexed.get(&parent).and_then(|keys| keys.get(key)) {
+                    return hit.clone();
+                }
+                if cache.indexed_len >= ACCESSOR_CACHE_CAPACITY {
+                    cache.indexed.clear();
+                    cache.indexed_len = 0;
+                }
+                let expr = Self::new(
+                    ExprNode::index(base, key),
+                    ExprMeta::with_contexts(contexts),
+                );
+                cache
+                    .indexed
+                    .entry(parent)
+                    .or_default()
+                    .insert(key.to_string(), expr.clone());
+                cache.indexed_len += 1;
+                expr
             }
-            fn to_json(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("toJSON({self})"), self.meta())
+
+            fn index(&self, key: &str) -> Self {
+                Self::indexed(&self.node, key, self.meta.contexts)
             }
-            fn __str__(&self) -> String {
-                self.as_expression_string()
+
+            fn text(&self) -> &str {
+                self.text.get_or_init(|| self.node.simplified().render())
             }
         }
-        #[pyclass]
-        #[derive(Clone)]
-        pub struct StringExpression(Expression<StringKind>);
-        impl YamlExpression for StringExpression {
-            fn stringify(&self) -> &str {
-                self.0.text()
+
+        struct Expression<K> {
+            base: ExprBase,
+            _kind: PhantomData<K>,
+        }
+
+        impl<K> Clone for Expression<K> {
+            fn clone(&self) -> Self {
+                Self {
+                    base: self.base.clone(),
+                    _kind: PhantomData,
+                }
             }
         }
-        impl Display for StringExpression {
-            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-                write!(f, "{}", self.stringify())
+
+        /// Structural equality of the expression trees, which share equal subtrees by `Arc`.
+        impl<K> PartialEq for Expression<K> {
+            fn eq(&self, other: &Self) -> bool {
+                self.base.meta == other.base.meta && self.base.node == other.base.node
             }
         }
-        impl StringExpression {
-            fn new_expr(text: String, meta: ExprMeta) -> Self {
-                Self(Expression::new(text, meta))
+
+        impl<K> Expression<K> {
+            fn new(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self {
+                    base: ExprBase::new(node, meta),
+                    _kind: PhantomData,
+                }
             }
 
             fn from_base(base: ExprBase) -> Self {
-                Self(Expression::from_base(base))
+                Self {
+                    base,
+                    _kind: PhantomData,
+                }
             }
 
-            fn meta(&self) -> ExprMeta {
-                self.0.meta()
+            /// Reinterpret the same tree (and its rendered text) as a different kind.
+            fn cast<T>(&self) -> Expression<T> {
+                Expression {
+                    base: self.base.clone(),
+                    _kind: PhantomData,
+                }
             }
 
-            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
-                allowed.validate(self.meta(), &self.as_expression_string())
-            }
-        }
-        #[pymethods]
-        impl StringExpression {
-            fn as_bool(&self) -> BooleanExpression {
-                BooleanExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn as_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn as_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(self.to_string(), self.meta())
-            }
-            fn __eq__(&self, other: StringLike) -> BooleanExpression {
-                let (other, other_meta) = render_string_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} == {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn __ne__(&self, other: StringLike) -> BooleanExpression {
-                let (other, other_meta) = render_string_like(other);
-                BooleanExpression::new_expr(
-                    format!("({self} != {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn contains(&self, other: StringLike) -> BooleanExpression {
-                let (other, other_meta) = render_string_like(other);
-                BooleanExpression::new_expr(
-                    format!("contains({self}, {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn startswith(&self, other: StringLike) -> BooleanExpression {
-                let (other, other_meta) = render_string_like(other);
-                BooleanExpression::new_expr(
-                    format!("startsWith({self}, {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn endswith(&self, other: StringLike) -> BooleanExpression {
-                let (other, other_meta) = render_string_like(other);
-                BooleanExpression::new_expr(
-                    format!("endsWith({self}, {other})"),
-                    self.meta().union(other_meta),
-                )
-            }
-            fn format(&self, args: Vec<StringLike>) -> StringExpression {
-                let mut meta = self.meta();
-                let args = args
-                    .into_iter()
-                    .map(|arg| {
-                        let (text, arg_meta) = render_string_like(arg);
-                        meta = meta.union(arg_meta);
-                        text
-                    })
-                    .collect::<Vec<String>>()
-                    .join(", ");
-                StringExpression::new_expr(format!("format({self}, {args})"), meta)
-            }
-            // I don't think we need join for single strings despite the docs
-            fn to_json(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("toJSON({self})"), self.meta())
+            fn text(&self) -> &str {
+                self.base.text()
             }
-            fn from_json_to_bool(&self) -> BooleanExpression {
-                BooleanExpression::new_expr(format!("fromJSON({self})"), self.meta())
+
+            fn node(&self) -> &Arc<ExprNode> {
+                &self.base.node
             }
-            fn from_json_to_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(format!("fromJSON({self})"), self.meta())
+
+            fn meta(&self) -> ExprMeta {
+                self.base.meta
             }
-            fn from_json_to_str(&self) -> Self {
-                Self::new_expr(format!("fromJSON({self})"), self.meta())
+        }
+
+        impl_codec!(
+            enum BinaryOp {
+                And,
+                Or,
+                Eq,
+                Ne,
+                Lt,
+                Le,
+                Gt,
+                Ge,
             }
-            fn from_json_to_array(&self) -> ArrayExpression {
-                ArrayExpression::new_expr(format!("fromJSON({self})"), self.meta())
+        );
+
+        impl Encode for ExprMeta {
+            fn encode(&self, out: &mut Vec<u8>) {
+                self.contexts.bits().encode(out);
+                self.funcs.bits().encode(out);
             }
-            fn from_json_to_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("fromJSON({self})"), self.meta())
+        }
+        impl Decode for ExprMeta {
+            fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+                Ok(Self {
+                    contexts: Contexts::from_bits_truncate(u32::decode(input)?),
+                    funcs: Funcs::from_bits_truncate(u32::decode(input)?),
+                })
             }
-            fn hash_files(&self, others: Option<Vec<StringLike>>) -> StringExpression {
-                if let Some(others) = others {
-                    let mut meta = self.meta().union(ExprMeta::with_funcs(Funcs::HASH_FILES));
-                    let args = others
-                        .into_iter()
-                        .map(|other| {
-                            let (text, other_meta) = render_string_like(other);
-                            meta = meta.union(other_meta);
-                            text
-                        })
-                        .collect::<Vec<String>>()
-                        .join(", ");
-                    StringExpression::new_expr(format!("hashFiles({self}, {args})"), meta)
-                } else {
-                    StringExpression::new_expr(
-                        format!("hashFiles({self})"),
-                        self.meta().union(ExprMeta::with_funcs(Funcs::HASH_FILES)),
-                    )
+        }
+
+        impl Encode for Literal {
+            fn encode(&self, out: &mut Vec<u8>) {
+                match self {
+                    Literal::Null => out.push(0),
+                    Literal::Bool(value) => {
+                        out.push(1);
+                        value.encode(out);
+                    }
+                    Literal::Number(value) => {
+                        out.push(2);
+                        value.encode(out);
+                    }
+                    Literal::String(value) => {
+                        out.push(3);
+                        value.encode(out);
+                    }
                 }
             }
-            fn if_else(&self, condition: BoolLike, else_expr: StringLike) -> StringExpression {
-                let (condition, condition_meta) = render_bool_like(condition);
-                let (else_expr, else_meta) = render_string_like(else_expr);
-                let meta = self.meta().union(condition_meta).union(else_meta);
-                StringExpression::new_expr(format!("({condition} && {self} || {else_expr})"), meta)
-            }
-            fn __str__(&self) -> String {
-                self.as_expression_string()
-            }
         }
-
-        impl Display for ArrayExpression {
-            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-                write!(f, "{}", self.stringify())
+        impl Decode for Literal {
+            fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+                Ok(match input.byte()? {
+                    0 => Literal::Null,
+                    1 => Literal::Bool(bool::decode(input)?),
+                    2 => Literal::Number(String::decode(input)?),
+                    3 => Literal::String(String::decode(input)?),
+                    tag => return Err(input.invalid_tag(tag)),
+                })
             }
         }
 
-        #[pyclass]
-        #[derive(Clone)]
-        pub struct ArrayExpression(Expression<ArrayKind>);
-        impl YamlExpression for ArrayExpression {
-            fn stringify(&self) -> &str {
-                self.0.text()
+        impl Encode for ExprNode {
+            fn encode(&self, out: &mut Vec<u8>) {
+                match self {
+                    ExprNode::Path(path) => {
+                        out.push(0);
+                        path.encode(out);
+                    }
+                    ExprNode::Literal(literal) => {
+                        out.push(1);
+                        literal.encode(out);
+                    }
+                    ExprNode::Index(base, key) => {
+                        out.push(2);
+                        base.encode(out);
+                        key.encode(out);
+                    }
+                    ExprNode::Subscript(base, index) => {
+                        out.push(3);
+                        base.encode(out);
+                        index.encode(out);
+                    }
+                    ExprNode::Call(name, args) => {
+                        out.push(4);
+                        name.encode(out);
+                        args.encode(out);
+                    }
+                    ExprNode::Not(inner) => {
+                        out.push(5);
+                        inner.encode(out);
+                    }
+                    ExprNode::Binary(op, lhs, rhs) => {
+                        out.push(6);
+                        op.encode(out);
+                        lhs.encode(out);
+                        rhs.encode(out);
+                    }
+                    ExprNode::Chain(op, operands) => {
+                        out.push(7);
+                        op.encode(out);
+                        operands.encode(out);
+                    }
+                    ExprNode::IfElse {
+                        condition,
+                        then,
+                        otherwise,
+                    } => {
+                        out.push(8);
+                        condition.encode(out);
+                        then.encode(out);
+                        otherwise.encode(out);
+                    }
+                }
             }
         }
-        impl ArrayExpression {
-            fn new_expr(text: String, meta: ExprMeta) -> Self {
-                Self(Expression::new(text, meta))
+        impl Decode for ExprNode {
+            fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+                Ok(match input.byte()? {
+                    0 => ExprNode::Path(Cow::Owned(String::decode(input)?)),
+                    1 => ExprNode::Literal(Literal::decode(input)?),
+                    2 => ExprNode::Index(Arc::decode(input)?, String::decode(input)?),
+                    3 => ExprNode::Subscript(Arc::decode(input)?, Arc::decode(input)?),
+                    4 => {
+                        let name = String::decode(input)?;
+                        let (name, _) = function_named(&name)
+                            .ok_or_else(|| input.error(&format!("unknown function '{name}'")))?;
+                        ExprNode::Call(name, Vec::decode(input)?)
+                    }
+                    5 => ExprNode::Not(Arc::decode(input)?),
+                    6 => ExprNode::Binary(
+                        BinaryOp::decode(input)?,
+                        Arc::decode(input)?,
+                        Arc::decode(input)?,
+                    ),
+                    7 => ExprNode::Chain(BinaryOp::decode(input)?, Vec::decode(input)?),
+                    8 => ExprNode::IfElse {
+                        condition: Arc::decode(input)?,
+                        then: Arc::decode(input)?,
+                        otherwise: Arc::decode(input)?,
+                    },
+                    tag => return Err(input.invalid_tag(tag)),
+                })
             }
+        }
 
-            fn meta(&self) -> ExprMeta {
-                self.0.meta()
+        impl<K> Encode for Expression<K> {
+            fn encode(&self, out: &mut Vec<u8>) {
+                self.node().encode(out);
+                self.meta().encode(out);
             }
-
-            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
-                allowed.validate(self.meta(), &self.as_expression_string())
+        }
+        impl<K> Decode for Expression<K> {
+            fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+                let node = Arc::decode(input)?;
+                Ok(Self::new(node, ExprMeta::decode(input)?))
             }
         }
-        #[pymethods]
-        impl ArrayExpression {
-            fn as_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(self.to_string(), self.meta())
+
+        struct BoolKind;
+        struct NumberKind;
+        struct StringKind;
+        struct ArrayKind;
+        struct ObjectKind;
+
+        #[derive(Clone, Copy, Debug)]
+        pub(super) struct Allowed {
+            contexts: Contexts,
+            funcs: Funcs,
+            label: &'static str,
+        }
+
+        impl Allowed {
+            pub(super) const fn new(contexts: Contexts, funcs: Funcs, label: &'static str) -> Self {
+                Self {
+                    contexts,
+                    funcs,
+                    label,
+                }
             }
-            fn as_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(self.to_string(), self.meta())
+
+            fn validate(self, meta: ExprMeta, expr: &str) -> PyResult<()> {
+                let disallowed_contexts = meta.contexts & !self.contexts;
+                let disallowed_funcs = meta.funcs & !self.funcs;
+                if disallowed_contexts.is_empty() && disallowed_funcs.is_empty() {
+                    return Ok(());
+                }
+
+                let allowed_contexts = contexts_to_names(self.contexts);
+                let allowed_funcs = funcs_to_names(self.funcs);
+                let used_contexts = contexts_to_names(disallowed_contexts);
+                let used_funcs = funcs_to_names(disallowed_funcs);
+
+                let mut message = format!(
+                    "Key '{}' does not allow the context(s) {{{}}}",
+                    self.label,
+                    used_contexts.join(", ")
+                );
+                if !used_funcs.is_empty() {
+                    message.push_str(&format!(" or function(s) {{{}}}", used_funcs.join(", ")));
+                }
+                message.push_str(&format!(
+                    " used in this expression:\n{}\n\nAllowed contexts: {{{}}}",
+                    expr,
+                    allowed_contexts.join(", ")
+                ));
+                if !self.funcs.is_empty() {
+                    message.push_str(&format!(
+                        "\nAllowed functions: {{{}}}",
+                        allowed_funcs.join(", ")
+                    ));
+                }
+                Err(PyRuntimeError::new_err(message))
             }
-            fn contains(&self, other: &ObjectExpression) -> BooleanExpression {
-                BooleanExpression::new_expr(
-                    format!("contains({}, {})", self, other.stringify()),
-                    self.meta().union(other.meta()),
-                )
+        }
+
+        fn contexts_to_names(contexts: Contexts) -> Vec<&'static str> {
+            let mut out = Vec::new();
+            if contexts.contains(Contexts::GITHUB) {
+                out.push("github");
             }
-            fn join(&self, separator: Option<StringLike>) -> StringExpression {
-                if let Some(sep) = separator {
-                    let (sep, sep_meta) = render_string_like(sep);
-                    StringExpression::new_expr(
-                        format!("join({self}, {sep})"),
-                        self.meta().union(sep_meta),
-                    )
-                } else {
-                    StringExpression::new_expr(format!("join({self})"), self.meta())
-                }
+            if contexts.contains(Contexts::NEEDS) {
+                out.push("needs");
             }
-            fn to_json(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("toJSON({self})"), self.meta())
+            if contexts.contains(Contexts::STRATEGY) {
+                out.push("strategy");
             }
-            fn __str__(&self) -> String {
-                self.as_expression_string()
+            if contexts.contains(Contexts::MATRIX) {
+                out.push("matrix");
+            }
+            if contexts.contains(Contexts::JOB) {
+                out.push("job");
+            }
+            if contexts.contains(Contexts::JOBS) {
+                out.push("jobs");
+            }
+            if contexts.contains(Contexts::RUNNER) {
+                out.push("runner");
+            }
+            if contexts.contains(Contexts::STEPS) {
+                out.push("steps");
+            }
+            if contexts.contains(Contexts::ENV) {
+                out.push("env");
+            }
+            if contexts.contains(Contexts::VARS) {
+                out.push("vars");
+            }
+            if contexts.contains(Contexts::SECRETS) {
+                out.push("secrets");
+            }
+            if contexts.contains(Contexts::INPUTS) {
+                out.push("inputs");
+            }
+            out
+        }
+
+        fn funcs_to_names(funcs: Funcs) -> Vec<&'static str> {
+            let mut out = Vec::new();
+            if funcs.contains(Funcs::HASH_FILES) {
+                out.push("hashFiles");
+            }
+            if funcs.contains(Funcs::ALWAYS) {
+                out.push("always");
+            }
+            if funcs.contains(Funcs::CANCELLED) {
+                out.push("cancelled");
+            }
+            if funcs.contains(Funcs::SUCCESS) {
+                out.push("success");
+            }
+            if funcs.contains(Funcs::FAILURE) {
+                out.push("failure");
+            }
+            out
+        }
+
+        fn string_like_node(value: StringLike) -> (Arc<ExprNode>, ExprMeta) {
+            match value {
+                Either::A(expr) => (expr.node().clone(), expr.meta()),
+                Either::B(raw) => (ExprNode::string(raw), ExprMeta::empty()),
+            }
+        }
+
+        fn bool_like_node(value: BoolLike) -> (Arc<ExprNode>, ExprMeta) {
+            match value {
+                Either::A(expr) => (expr.node().clone(), expr.meta()),
+                Either::B(raw) => (ExprNode::bool(raw), ExprMeta::empty()),
+            }
+        }
+
+        fn number_like_node(value: NumberLike) -> (Arc<ExprNode>, ExprMeta) {
+            match value {
+                Either::A(expr) => (expr.node().clone(), expr.meta()),
+                Either::B(raw) => (ExprNode::number(raw.to_string()), ExprMeta::empty()),
+            }
+        }
+
+        pub trait YamlExpression {
+            fn stringify(&self) -> &str;
+            fn as_expression_string(&self) -> String {
+                format!("${{{{ {} }}}}", self.stringify())
+            }
+        }
+        impl<T> Yamlable for &T
+        where
+            T: YamlExpression,
+        {
+            fn as_yaml(&self) -> Yaml {
+                Yaml::Real(self.as_expression_string())
+            }
+        }
+
+        /// Compare an expression's canonical text with any other expression object.
+        fn same_expression(text: &str, other: &Bound<'_, PyAny>) -> bool {
+            if let Ok(other) = other.extract::<BooleanExpression>() {
+                other.stringify() == text
+            } else if let Ok(other) = other.extract::<StringExpression>() {
+                other.stringify() == text
+            } else if let Ok(other) = other.extract::<NumberExpression>() {
+                other.stringify() == text
+            } else if let Ok(other) = other.extract::<ArrayExpression>() {
+                other.stringify() == text
+            } else if let Ok(other) = other.extract::<ObjectExpression>() {
+                other.stringify() == text
+            } else {
+                false
             }
         }
+
         #[pyclass]
-        #[derive(Clone)]
-        pub struct ObjectExpression(Expression<ObjectKind>);
-        impl YamlExpression for ObjectExpression {
+        #[derive(Clone, PartialEq)]
+        pub struct BooleanExpression(Expression<BoolKind>);
+        impl_codec!(BooleanExpression(Expression<BoolKind>));
+        impl YamlExpression for BooleanExpression {
             fn stringify(&self) -> &str {
                 self.0.text()
             }
         }
-        impl Display for ObjectExpression {
+        impl Display for BooleanExpression {
             fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
                 write!(f, "{}", self.stringify())
             }
         }
-        impl ObjectExpression {
-            fn format_access(base: &str, key: &str) -> String {
-                if validate_string(key) {
-                    format!("{base}.{key}")
-                } else {
-                    format!("{base}[{}]", escape_string(key))
-                }
-            }
-        }
-        impl ObjectExpression {
-            fn new_expr(text: String, meta: ExprMeta) -> Self {
-                Self(Expression::new(text, meta))
+        impl BooleanExpression {
+            fn new_expr(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self(Expression::new(node, meta))
             }
 
             fn from_base(base: ExprBase) -> Self {
                 Self(Expression::from_base(base))
             }
 
+            fn node(&self) -> &Arc<ExprNode> {
+                self.0.node()
+            }
+
             fn meta(&self) -> ExprMeta {
                 self.0.meta()
             }
 
+            fn binary(&self, op: BinaryOp, other: BoolLike) -> Self {
+                let (other, other_meta) = bool_like_node(other);
+                Self::new_expr(
+                    ExprNode::binary(op, self.node(), other),
+                    self.meta().union(other_meta),
+                )
+            }
+
             pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
                 allowed.validate(self.meta(), &self.as_expression_string())
             }
+
+            /// The truthiness of the expression in a partial context, or `None` if it depends on
+            /// values which are not known.
+            pub(super) fn truthiness_in(&self, context: &Value) -> Option<bool> {
+                self.node().evaluate(context).truthiness()
+            }
+
+            /// Like `truthiness_in`, with the status functions taking the given values.
+            pub(super) fn truthiness_with_status(
+                &self,
+                context: &Value,
+                status: JobStatus,
+            ) -> Option<bool> {
+                self.node()
+                    .evaluate_with(context, Some(status))
+                    .truthiness()
+            }
+
+            pub(super) fn has_status_check(&self) -> bool {
+                self.node().has_status_check()
+            }
         }
         #[pymethods]
-        impl ObjectExpression {
+        impl BooleanExpression {
             fn as_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(self.stringify().to_string(), self.meta())
+                NumberExpression(self.0.cast())
             }
             fn as_str(&self) -> StringExpression {
-                StringExpression::new_expr(self.stringify().to_string(), self.meta())
-            }
-            fn as_bool(&self) -> BooleanExpression {
-                BooleanExpression::new_expr(self.stringify().to_string(), self.meta())
+                StringExpression(self.0.cast())
             }
-            fn as_array(&self) -> ArrayExpression {
-                ArrayExpression::new_expr(self.stringify().to_string(), self.meta())
+            fn as_obj(&self) -> ObjectExpression {
+                ObjectExpression(self.0.cast())
             }
-            fn to_json(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("toJSON({})", self.stringify()), self.meta())
+            fn __invert__(&self) -> Self {
+                Self::new_expr(ExprNode::not(self.node()), self.meta())
             }
-            fn from_json_to_bool(&self) -> BooleanExpression {
-                BooleanExpression::new_expr(format!("fromJSON({})", self.stringify()), self.meta())
+            fn __and__(&self, other: BoolLike) -> Self {
+                self.binary(BinaryOp::And, other)
             }
-            fn from_json_to_num(&self) -> NumberExpression {
-                NumberExpression::new_expr(format!("fromJSON({})", self.stringify()), self.meta())
+            fn __or__(&self, other: BoolLike) -> Self {
+                self.binary(BinaryOp::Or, other)
             }
-            fn from_json_to_str(&self) -> Self {
-                Self::new_expr(format!("fromJSON({})", self.stringify()), self.meta())
+            fn __eq__(&self, other: BoolLike) -> Self {
+                self.binary(BinaryOp::Eq, other)
             }
-            fn from_json_to_array(&self) -> ArrayExpression {
-                ArrayExpression::new_expr(format!("fromJSON({})", self.stringify()), self.meta())
+            fn __ne__(&self, other: BoolLike) -> Self {
+                self.binary(BinaryOp::Ne, other)
             }
-            fn from_json_to_obj(&self) -> ObjectExpression {
-                ObjectExpression::new_expr(format!("fromJSON({})", self.stringify()), self.meta())
+            fn if_else(&self, condition: BoolLike, else_expr: BoolLike) -> BooleanExpression {
+                let (condition, condition_meta) = bool_like_node(condition);
+                let (else_expr, else_meta) = bool_like_node(else_expr);
+                let meta = self.meta().union(condition_meta).union(else_meta);
+                BooleanExpression::new_expr(
+                    ExprNode::if_else(condition, self.node(), else_expr),
+                    meta,
+                )
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> ObjectExpression {
-                ObjectExpression::new_expr(Self::format_access(self.stringify(), key), self.meta())
+            fn to_json(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(
+                    ExprNode::call("toJSON", vec![self.node().clone()]),
+                    self.meta(),
+                )
             }
-            fn __getattr__(&self, key: &str) -> ObjectExpression {
-                self.__getitem__(key)
+            /// A hashable token identifying this expression by its canonical text.
+            ///
+            /// Expressions override ``==`` to build new expressions, so use this (or
+            /// `same_as`) to deduplicate or memoize on expressions.
+            fn cache_key(&self) -> String {
+                self.stringify().to_string()
+            }
+            /// Check whether another expression renders to the same canonical text.
+            fn same_as(&self, other: &Bound<'_, PyAny>) -> bool {
+                same_expression(self.stringify(), other)
+            }
+            /// Evaluate the expression against a partially known context.
+            ///
+            /// Parameters
+            /// ----------
+            /// context
+            ///     A mapping of context names to their (possibly partial) contents, e.g.
+            ///     ``{'github': {'event_name': 'push'}}``.
+            ///
+            /// Returns
+            /// -------
+            /// bool or None
+            ///     Whether the expression is truthy, or None if that depends on values missing
+            ///     from `context` (including status functions like ``success()``).
+            fn evaluate(&self, context: &Bound<'_, PyAny>) -> PyResult<Option<bool>> {
+                Ok(self.truthiness_in(&py_to_json(context)?))
             }
             fn __str__(&self) -> String {
                 self.as_expression_string()
             }
-        }
 
-        #[pyclass]
-        pub struct GithubContext;
-        #[pymethods]
-        impl GithubContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("github", Contexts::GITHUB))
+            fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+                reduce(py, self, "BooleanExpression")
             }
-            #[getter]
-            fn action(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.action",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn action_path(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.action_path",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn action_ref(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.action_ref",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn action_repository(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.action_repository",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn action_status(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.action_status",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn actor(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.actor",
-                    Contexts::GITHUB,
-                ))
+        }
+        #[pyfunction]
+        fn success() -> BooleanExpression {
+            BooleanExpression::new_expr(
+                ExprNode::call("success", Vec::new()),
+                ExprMeta::with_funcs(Funcs::SUCCESS),
+            )
+        }
+        #[pyfunction]
+        fn always() -> BooleanExpression {
+            BooleanExpression::new_expr(
+                ExprNode::call("always", Vec::new()),
+                ExprMeta::with_funcs(Funcs::ALWAYS),
+            )
+        }
+        #[pyfunction]
+        fn cancelled() -> BooleanExpression {
+            BooleanExpression::new_expr(
+                ExprNode::call("cancelled", Vec::new()),
+                ExprMeta::with_funcs(Funcs::CANCELLED),
+            )
+        }
+        #[pyfunction]
+        fn failure() -> BooleanExpression {
+            BooleanExpression::new_expr(
+                ExprNode::call("failure", Vec::new()),
+                ExprMeta::with_funcs(Funcs::FAILURE),
+            )
+        }
+        fn chain_of(op: BinaryOp, conditions: &Bound<'_, PyAny>) -> PyResult<BooleanExpression> {
+            let mut meta = ExprMeta::empty();
+            let mut operands = Vec::new();
+            for condition in conditions.try_iter()? {
+                let (node, condition_meta) = bool_like_node(condition?.extract::<BoolLike>()?);
+                meta = meta.union(condition_meta);
+                operands.push(node);
+            }
+            let node = match operands.len() {
+                0 => ExprNode::bool(op == BinaryOp::And),
+                1 => operands.pop().expect("length checked"),
+                _ => Arc::new(ExprNode::Chain(op, operands)),
+            };
+            Ok(BooleanExpression::new_expr(node, meta))
+        }
+        /// Combine any number of conditions with ``&&`` into a single flat expression.
+        ///
+        /// Parameters
+        /// ----------
+        /// conditions
+        ///     An iterable of boolean expressions or literal booleans. An empty iterable yields
+        ///     ``true``.
+        ///
+        #[pyfunction]
+        fn all_of(conditions: &Bound<'_, PyAny>) -> PyResult<BooleanExpression> {
+            chain_of(BinaryOp::And, conditions)
+        }
+        /// Combine any number of conditions with ``||`` into a single flat expression.
+        ///
+        /// Parameters
+        /// ----------
+        /// conditions
+        ///     An iterable of boolean expressions or literal booleans. An empty iterable yields
+        ///     ``false``.
+        ///
+        #[pyfunction]
+        fn any_of(conditions: &Bound<'_, PyAny>) -> PyResult<BooleanExpression> {
+            chain_of(BinaryOp::Or, conditions)
+        }
+        #[pyclass]
+        #[derive(Clone, PartialEq)]
+        pub struct NumberExpression(Expression<NumberKind>);
+        impl_codec!(NumberExpression(Expression<NumberKind>));
+        impl YamlExpression for NumberExpression {
+            fn stringify(&self) -> &str {
+                self.0.text()
             }
-            #[getter]
-            fn actor_id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.actor_id",
-                    Contexts::GITHUB,
-                ))
+        }
+        impl Display for NumberExpression {
+            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+                write!(f, "{}", self.stringify())
             }
-            #[getter]
-            fn api_url(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.api_url",
-                    Contexts::GITHUB,
-                ))
+        }
+        impl NumberExpression {
+            fn new_expr(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self(Expression::new(node, meta))
             }
-            #[getter]
-            fn base_ref(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.base_ref",
-                    Contexts::GITHUB,
-                ))
+
+            fn from_base(base: ExprBase) -> Self {
+                Self(Expression::from_base(base))
             }
-            #[getter]
-            fn env(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("github.env", Contexts::GITHUB))
+
+            fn node(&self) -> &Arc<ExprNode> {
+                self.0.node()
             }
-            #[getter]
-            fn event(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    "github.event",
-                    Contexts::GITHUB,
-                ))
+
+            fn meta(&self) -> ExprMeta {
+                self.0.meta()
             }
-            #[getter]
-            fn event_name(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.event_name",
-                    Contexts::GITHUB,
-                ))
+
+            fn compare(&self, op: BinaryOp, other: NumberLike) -> BooleanExpression {
+                let (other, other_meta) = number_like_node(other);
+                BooleanExpression::new_expr(
+                    ExprNode::binary(op, self.node(), other),
+                    self.meta().union(other_meta),
+                )
             }
-            #[getter]
-            fn event_path(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.event_path",
-                    Contexts::GITHUB,
-                ))
+
+            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
+                allowed.validate(self.meta(), &self.as_expression_string())
             }
-            #[getter]
-            fn graphql_url(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.graphql_url",
-                    Contexts::GITHUB,
-                ))
+        }
+        #[pymethods]
+        impl NumberExpression {
+            fn as_bool(&self) -> BooleanExpression {
+                BooleanExpression(self.0.cast())
             }
-            #[getter]
-            fn head_ref(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.head_ref",
-                    Contexts::GITHUB,
-                ))
+            fn as_str(&self) -> StringExpression {
+                StringExpression(self.0.cast())
             }
-            #[getter]
-            fn job(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("github.job", Contexts::GITHUB))
+            fn as_obj(&self) -> ObjectExpression {
+                ObjectExpression(self.0.cast())
             }
-            #[getter]
-            fn path(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.path",
-                    Contexts::GITHUB,
-                ))
+            fn __lt__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Lt, other)
             }
-            #[getter]
-            fn r#ref(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("github.ref", Contexts::GITHUB))
+            fn __le__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Le, other)
             }
-            #[getter]
-            fn ref_name(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.ref_name",
-                    Contexts::GITHUB,
-                ))
+            fn __gt__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Gt, other)
             }
-            #[getter]
-            fn ref_protected(&self) -> BooleanExpression {
-                BooleanExpression::from_base(ExprBase::with_contexts(
-                    "github.ref_protected",
-                    Contexts::GITHUB,
-                ))
+            fn __ge__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Ge, other)
             }
-            #[getter]
-            fn ref_type(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.ref_type",
-                    Contexts::GITHUB,
-                ))
+            fn __eq__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Eq, other)
             }
-            #[getter]
-            fn repository(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.repository",
-                    Contexts::GITHUB,
-                ))
+            fn __ne__(&self, other: NumberLike) -> BooleanExpression {
+                self.compare(BinaryOp::Ne, other)
             }
-            #[getter]
-            fn reporitory_id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.reporitory_id",
-                    Contexts::GITHUB,
-                ))
+            fn if_else(&self, condition: BoolLike, else_expr: NumberLike) -> NumberExpression {
+                let (condition, condition_meta) = bool_like_node(condition);
+                let (else_expr, else_meta) = number_like_node(else_expr);
+                let meta = self.meta().union(condition_meta).union(else_meta);
+                NumberExpression::new_expr(
+                    ExprNode::if_else(condition, self.node(), else_expr),
+                    meta,
+                )
             }
-            #[getter]
-            fn repositor_owner(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.repositor_owner",
-                    Contexts::GITHUB,
-                ))
+            fn to_json(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(
+                    ExprNode::call("toJSON", vec![self.node().clone()]),
+                    self.meta(),
+                )
             }
-            #[getter]
-            fn repository_owner_id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.repository_owner_id",
-                    Contexts::GITHUB,
-                ))
+            /// A hashable token identifying this expression by its canonical text.
+            ///
+            /// Expressions override ``==`` to build new expressions, so use this (or
+            /// `same_as`) to deduplicate or memoize on expressions.
+            fn cache_key(&self) -> String {
+                self.stringify().to_string()
             }
-            #[getter]
-            fn repository_url(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.repositoryUrl",
-                    Contexts::GITHUB,
-                ))
+            /// Check whether another expression renders to the same canonical text.
+            fn same_as(&self, other: &Bound<'_, PyAny>) -> bool {
+                same_expression(self.stringify(), other)
             }
-            #[getter]
-            fn retention_days(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.retention_days",
-                    Contexts::GITHUB,
-                ))
+            fn __str__(&self) -> String {
+                self.as_expression_string()
             }
-            #[getter]
-            fn run_id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.run_id",
-                    Contexts::GITHUB,
-                ))
+
+            fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+                reduce(py, self, "NumberExpression")
             }
-            #[getter]
-            fn run_number(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.run_number",
-                    Contexts::GITHUB,
-                ))
+        }
+        #[pyclass]
+        #[derive(Clone, PartialEq)]
+        pub struct StringExpression(Expression<StringKind>);
+        impl_codec!(StringExpression(Expression<StringKind>));
+        impl YamlExpression for StringExpression {
+            fn stringify(&self) -> &str {
+                self.0.text()
             }
-            #[getter]
-            fn run_attempt(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.run_attempt",
-                    Contexts::GITHUB,
-                ))
+        }
+        impl Display for StringExpression {
+            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+                write!(f, "{}", self.stringify())
             }
-            #[getter]
-            fn secret_source(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.secret_source",
-                    Contexts::GITHUB,
-                ))
+        }
+        impl StringExpression {
+            fn new_expr(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self(Expression::new(node, meta))
             }
-            #[getter]
-            fn server_url(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.server_url",
-                    Contexts::GITHUB,
-                ))
+
+            fn from_base(base: ExprBase) -> Self {
+                Self(Expression::from_base(base))
             }
-            #[getter]
-            fn sha(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("github.sha", Contexts::GITHUB))
+
+            fn node(&self) -> &Arc<ExprNode> {
+                self.0.node()
             }
-            #[getter]
-            fn token(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.token",
-                    Contexts::GITHUB,
-                ))
-            }
-            #[getter]
-            fn triggering_actor(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.triggering_actor",
-                    Contexts::GITHUB,
-                ))
+
+            fn meta(&self) -> ExprMeta {
+                self.0.meta()
             }
-            #[getter]
-            fn workflow(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.workflow",
-                    Contexts::GITHUB,
-                ))
+
+            fn compare(&self, op: BinaryOp, other: StringLike) -> BooleanExpression {
+                let (other, other_meta) = string_like_node(other);
+                BooleanExpression::new_expr(
+                    ExprNode::binary(op, self.node(), other),
+                    self.meta().union(other_meta),
+                )
             }
-            #[getter]
-            fn workflow_ref(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.workflow_ref",
-                    Contexts::GITHUB,
-                ))
+
+            fn call_with(
+                &self,
+                name: &'static str,
+                others: Vec<StringLike>,
+            ) -> (Arc<ExprNode>, ExprMeta) {
+                let mut meta = self.meta();
+                let mut args = Vec::with_capacity(others.len() + 1);
+                args.push(self.node().clone());
+                for other in others {
+                    let (node, other_meta) = string_like_node(other);
+                    meta = meta.union(other_meta);
+                    args.push(node);
+                }
+                (ExprNode::call(name, args), meta)
             }
-            #[getter]
-            fn workflow_sha(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.workflow_sha",
-                    Contexts::GITHUB,
-                ))
+
+            fn unary_call(&self, name: &'static str) -> Arc<ExprNode> {
+                ExprNode::call(name, vec![self.node().clone()])
             }
-            #[getter]
-            fn workspace(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "github.workspace",
-                    Contexts::GITHUB,
-                ))
+
+            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
+                allowed.validate(self.meta(), &self.as_expression_string())
             }
         }
-
-        #[pyclass]
-        pub struct EnvContext;
         #[pymethods]
-        impl EnvContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("env", Contexts::ENV))
+        impl StringExpression {
+            fn as_bool(&self) -> BooleanExpression {
+                BooleanExpression(self.0.cast())
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access("env", key),
-                    Contexts::ENV,
-                ))
+            fn as_num(&self) -> NumberExpression {
+                NumberExpression(self.0.cast())
             }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
+            fn as_obj(&self) -> ObjectExpression {
+                ObjectExpression(self.0.cast())
             }
-        }
-
-        #[pyclass]
-        pub struct VarsContext;
-        #[pymethods]
-        impl VarsContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("vars", Contexts::VARS))
+            fn __eq__(&self, other: StringLike) -> BooleanExpression {
+                self.compare(BinaryOp::Eq, other)
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access("vars", key),
-                    Contexts::VARS,
-                ))
+            fn __ne__(&self, other: StringLike) -> BooleanExpression {
+                self.compare(BinaryOp::Ne, other)
             }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
+            fn contains(&self, other: StringLike) -> BooleanExpression {
+                let (node, meta) = self.call_with("contains", vec![other]);
+                BooleanExpression::new_expr(node, meta)
             }
-        }
-
-        #[pyclass]
-        pub struct JobContainerContext;
-        #[pymethods]
-        impl JobContainerContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("job.container", Contexts::JOB))
+            fn startswith(&self, other: StringLike) -> BooleanExpression {
+                let (node, meta) = self.call_with("startsWith", vec![other]);
+                BooleanExpression::new_expr(node, meta)
             }
-            #[getter]
-            fn id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "job.container.id",
-                    Contexts::JOB,
-                ))
+            fn endswith(&self, other: StringLike) -> BooleanExpression {
+                let (node, meta) = self.call_with("endsWith", vec![other]);
+                BooleanExpression::new_expr(node, meta)
             }
-            #[getter]
-            fn network(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    "job.container.network",
-                    Contexts::JOB,
-                ))
+            fn format(&self, args: Vec<StringLike>) -> StringExpression {
+                let (node, meta) = self.call_with("format", args);
+                StringExpression::new_expr(node, meta)
             }
-        }
-
-        #[pyclass]
-        pub struct JobServicesIdContext(String);
-        #[pymethods]
-        impl JobServicesIdContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(self.0.clone(), Contexts::JOB))
+            // I don't think we need join for single strings despite the docs
+            fn to_json(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(self.unary_call("toJSON"), self.meta())
             }
-            #[getter]
-            fn id(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.id", self.0),
-                    Contexts::JOB,
-                ))
+            fn from_json_to_bool(&self) -> BooleanExpression {
+                BooleanExpression::new_expr(self.unary_call("fromJSON"), self.meta())
             }
-            #[getter]
-            fn network(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.network", self.0),
-                    Contexts::JOB,
-                ))
+            fn from_json_to_num(&self) -> NumberExpression {
+                NumberExpression::new_expr(self.unary_call("fromJSON"), self.meta())
             }
-            #[getter]
-            fn ports(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.ports", self.0),
-                    Contexts::JOB,
-                ))
+            fn from_json_to_str(&self) -> Self {
+                Self::new_expr(self.unary_call("fromJSON"), self.meta())
             }
-        }
-
-        #[pyclass]
-        pub struct JobServicesContext;
-        #[pymethods]
-        impl JobServicesContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("job.services", Contexts::JOB))
+            fn from_json_to_array(&self) -> ArrayExpression {
+                ArrayExpression::new_expr(self.unary_call("fromJSON"), self.meta())
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> JobServicesIdContext {
-                JobServicesIdContext(ObjectExpression::format_access("job.services", key))
+            fn from_json_to_obj(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(self.unary_call("fromJSON"), self.meta())
             }
-            fn __getattr__(&self, key: &str) -> JobServicesIdContext {
-                self.__getitem__(key)
+            fn hash_files(&self, others: Option<Vec<StringLike>>) -> StringExpression {
+                let (node, meta) = self.call_with("hashFiles", others.unwrap_or_default());
+                StringExpression::new_expr(
+                    node,
+                    meta.union(ExprMeta::with_funcs(Funcs::HASH_FILES)),
+                )
             }
-        }
-
-        #[pyclass]
-        pub struct JobContext;
-        #[pymethods]
-        impl JobContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("job", Contexts::JOB))
+            fn if_else(&self, condition: BoolLike, else_expr: StringLike) -> StringExpression {
+                let (condition, condition_meta) = bool_like_node(condition);
+                let (else_expr, else_meta) = string_like_node(else_expr);
+                let meta = self.meta().union(condition_meta).union(else_meta);
+                StringExpression::new_expr(
+                    ExprNode::if_else(condition, self.node(), else_expr),
+                    meta,
+                )
             }
-            #[getter]
-            fn check_run_id(&self) -> NumberExpression {
-                NumberExpression::from_base(ExprBase::with_contexts(
-                    "job.check_run_id",
-                    Contexts::JOB,
-                ))
+            /// A hashable token identifying this expression by its canonical text.
+            ///
+            /// Expressions override ``==`` to build new expressions, so use this (or
+            /// `same_as`) to deduplicate or memoize on expressions.
+            fn cache_key(&self) -> String {
+                self.stringify().to_string()
             }
-            #[getter]
-            fn container(&self) -> JobContainerContext {
-                JobContainerContext
+            /// Check whether another expression renders to the same canonical text.
+            fn same_as(&self, other: &Bound<'_, PyAny>) -> bool {
+                same_expression(self.stringify(), other)
             }
-            #[getter]
-            fn services(&self) -> JobServicesContext {
-                JobServicesContext
+            fn __str__(&self) -> String {
+                self.as_expression_string()
             }
-            #[getter]
-            fn status(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("job.status", Contexts::JOB))
+
+            fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+                reduce(py, self, "StringExpression")
             }
         }
 
-        #[pyclass]
-        pub struct JobsJobIdOutputsContext(String);
-        #[pymethods]
-        impl JobsJobIdOutputsContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(self.0.clone(), Contexts::JOBS))
-            }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access(&self.0, key),
-                    Contexts::JOBS,
-                ))
-            }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
+        impl Display for ArrayExpression {
+            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+                write!(f, "{}", self.stringify())
             }
         }
 
         #[pyclass]
-        pub struct JobsJobIdContext(String);
-        #[pymethods]
-        impl JobsJobIdContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(self.0.clone(), Contexts::JOBS))
-            }
-            #[getter]
-            fn result(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.result", self.0),
-                    Contexts::JOBS,
-                ))
-            }
-            #[getter]
-            fn outputs(&self) -> JobsJobIdOutputsContext {
-                JobsJobIdOutputsContext(format!("{}.outputs", self.0))
+        #[derive(Clone, PartialEq)]
+        pub struct ArrayExpression(Expression<ArrayKind>);
+        impl_codec!(ArrayExpression(Expression<ArrayKind>));
+        impl YamlExpression for ArrayExpression {
+            fn stringify(&self) -> &str {
+                self.0.text()
             }
         }
+        impl ArrayExpression {
+            fn new_expr(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self(Expression::new(node, meta))
+            }
 
-        #[pyclass]
-        pub struct JobsContext;
-        #[pymethods]
-        impl JobsContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("jobs", Contexts::JOBS))
+            fn node(&self) -> &Arc<ExprNode> {
+                self.0.node()
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> JobsJobIdContext {
-                JobsJobIdContext(ObjectExpression::format_access("jobs", key))
+
+            fn meta(&self) -> ExprMeta {
+                self.0.meta()
             }
-            fn __getattr__(&self, key: &str) -> JobsJobIdContext {
-                self.__getitem__(key)
+
+            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
+                allowed.validate(self.meta(), &self.as_expression_string())
             }
         }
-
-        #[pyclass]
-        pub struct StepsStepIdOutputsContext(String);
         #[pymethods]
-        impl StepsStepIdOutputsContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    self.0.clone(),
-                    Contexts::STEPS,
-                ))
+        impl ArrayExpression {
+            fn as_num(&self) -> NumberExpression {
+                NumberExpression(self.0.cast())
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access(&self.0, key),
-                    Contexts::STEPS,
-                ))
+            fn as_obj(&self) -> ObjectExpression {
+                ObjectExpression(self.0.cast())
             }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
+            fn contains(&self, other: &ObjectExpression) -> BooleanExpression {
+                BooleanExpression::new_expr(
+                    ExprNode::call("contains", vec![self.node().clone(), other.node().clone()]),
+                    self.meta().union(other.meta()),
+                )
+            }
+            fn join(&self, separator: Option<StringLike>) -> StringExpression {
+                if let Some(sep) = separator {
+                    let (sep, sep_meta) = string_like_node(sep);
+                    StringExpression::new_expr(
+                        ExprNode::call("join", vec![self.node().clone(), sep]),
+                        self.meta().union(sep_meta),
+                    )
+                } else {
+                    StringExpression::new_expr(
+                        ExprNode::call("join", vec![self.node().clone()]),
+                        self.meta(),
+                    )
+                }
+            }
+            fn to_json(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(
+                    ExprNode::call("toJSON", vec![self.node().clone()]),
+                    self.meta(),
+                )
+            }
+            /// A hashable token identifying this expression by its canonical text.
+            ///
+            /// Expressions override ``==`` to build new expressions, so use this (or
+            /// `same_as`) to deduplicate or memoize on expressions.
+            fn cache_key(&self) -> String {
+                self.stringify().to_string()
+            }
+            /// Check whether another expression renders to the same canonical text.
+            fn same_as(&self, other: &Bound<'_, PyAny>) -> bool {
+                same_expression(self.stringify(), other)
+            }
+            fn __str__(&self) -> String {
+                self.as_expression_string()
             }
-        }
 
+            fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+                reduce(py, self, "ArrayExpression")
+            }
+        }
         #[pyclass]
-        pub struct StepsStepIdContext(String);
-        #[pymethods]
-        impl StepsStepIdContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    self.0.clone(),
-                    Contexts::STEPS,
-                ))
+        #[derive(Clone, PartialEq)]
+        pub struct ObjectExpression(Expression<ObjectKind>);
+        impl_codec!(ObjectExpression(Expression<ObjectKind>));
+        impl YamlExpression for ObjectExpression {
+            fn stringify(&self) -> &str {
+                self.0.text()
             }
-            #[getter]
-            fn outputs(&self) -> StepsStepIdOutputsContext {
-                StepsStepIdOutputsContext(format!("{}.outputs", self.0))
+        }
+        impl Display for ObjectExpression {
+            fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+                write!(f, "{}", self.stringify())
             }
-            #[getter]
-            fn conclusion(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.conclusion", self.0),
-                    Contexts::STEPS,
-                ))
+        }
+        impl ObjectExpression {
+            fn new_expr(node: Arc<ExprNode>, meta: ExprMeta) -> Self {
+                Self(Expression::new(node, meta))
             }
-            #[getter]
-            fn outcome(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.outcome", self.0),
-                    Contexts::STEPS,
-                ))
+
+            fn from_base(base: ExprBase) -> Self {
+                Self(Expression::from_base(base))
             }
-        }
 
-        #[pyclass]
-        pub struct StepsContext;
+            fn node(&self) -> &Arc<ExprNode> {
+                self.0.node()
+            }
+
+            fn meta(&self) -> ExprMeta {
+                self.0.meta()
+            }
+
+            fn unary_call(&self, name: &'static str) -> Arc<ExprNode> {
+                ExprNode::call(name, vec![self.node().clone()])
+            }
+
+            pub(super) fn validate_allowed(&self, allowed: Allowed) -> PyResult<()> {
+                allowed.validate(self.meta(), &self.as_expression_string())
+            }
+        }
         #[pymethods]
-        impl StepsContext {
-            #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("steps", Contexts::STEPS))
+        impl ObjectExpression {
+            fn as_num(&self) -> NumberExpression {
+                NumberExpression(self.0.cast())
+            }
+            fn as_str(&self) -> StringExpression {
+                StringExpression(self.0.cast())
+            }
+            fn as_bool(&self) -> BooleanExpression {
+                BooleanExpression(self.0.cast())
+            }
+            fn as_array(&self) -> ArrayExpression {
+                ArrayExpression(self.0.cast())
+            }
+            fn to_json(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(self.unary_call("toJSON"), self.meta())
+            }
+            fn from_json_to_bool(&self) -> BooleanExpression {
+                BooleanExpression::new_expr(self.unary_call("fromJSON"), self.meta())
+            }
+            fn from_json_to_num(&self) -> NumberExpression {
+                NumberExpression::new_expr(self.unary_call("fromJSON"), self.meta())
+            }
+            fn from_json_to_str(&self) -> Self {
+                Self::new_expr(self.unary_call("fromJSON"), self.meta())
+            }
+            fn from_json_to_array(&self) -> ArrayExpression {
+                ArrayExpression::new_expr(self.unary_call("fromJSON"), self.meta())
+            }
+            fn from_json_to_obj(&self) -> ObjectExpression {
+                ObjectExpression::new_expr(self.unary_call("fromJSON"), self.meta())
             }
             #[classattr]
             const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StepsStepIdContext {
-                StepsStepIdContext(ObjectExpression::format_access("steps", key))
+            fn __getitem__(&self, key: &str) -> ObjectExpression {
+                ObjectExpression::new_expr(ExprNode::index(self.node(), key), self.meta())
             }
-            fn __getattr__(&self, key: &str) -> StepsStepIdContext {
+            fn __getattr__(&self, key: &str) -> ObjectExpression {
                 self.__getitem__(key)
             }
+            /// A hashable token identifying this expression by its canonical text.
+            ///
+            /// Expressions override ``==`` to build new expressions, so use this (or
+            /// `same_as`) to deduplicate or memoize on expressions.
+            fn cache_key(&self) -> String {
+                self.stringify().to_string()
+            }
+            /// Check whether another expression renders to the same canonical text.
+            fn same_as(&self, other: &Bound<'_, PyAny>) -> bool {
+                same_expression(self.stringify(), other)
+            }
+            fn __str__(&self) -> String {
+                self.as_expression_string()
+            }
+
+            fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+                reduce(py, self, "ObjectExpression")
+            }
         }
 
         #[pyclass]
-        pub struct RunnerContext;
+        pub struct GithubContext;
         #[pymethods]
-        impl RunnerContext {
+        impl GithubContext {
             #[getter]
             fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("runner", Contexts::RUNNER))
+                ObjectExpression::from_base(ExprBase::with_contexts("github", Contexts::GITHUB))
             }
             #[getter]
-            fn name(&self) -> StringExpression {
+            fn action(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.name",
-                    Contexts::RUNNER,
+                    "github.action",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn os(&self) -> StringExpression {
-                StringExpression::from_base(ExprBase::with_contexts("runner.os", Contexts::RUNNER))
-            }
-            #[getter]
-            fn arch(&self) -> StringExpression {
+            fn action_path(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.arch",
-                    Contexts::RUNNER,
+                    "github.action_path",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn temp(&self) -> StringExpression {
+            fn action_ref(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.temp",
-                    Contexts::RUNNER,
+                    "github.action_ref",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn tool_cache(&self) -> StringExpression {
+            fn action_repository(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.tool_cache",
-                    Contexts::RUNNER,
+                    "github.action_repository",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn debug(&self) -> StringExpression {
+            fn action_status(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.debug",
-                    Contexts::RUNNER,
+                    "github.action_status",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn environment(&self) -> StringExpression {
+            fn actor(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "runner.environment",
-                    Contexts::RUNNER,
+                    "github.actor",
+                    Contexts::GITHUB,
                 ))
             }
-        }
-
-        #[pyclass]
-        pub struct SecretsContext;
-        #[pymethods]
-        impl SecretsContext {
             #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("secrets", Contexts::SECRETS))
+            fn actor_id(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.actor_id",
+                    Contexts::GITHUB,
+                ))
             }
             #[getter]
-            fn github_token(&self) -> StringExpression {
+            fn api_url(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    "secrets.GITHUB_TOKEN",
-                    Contexts::SECRETS,
+                    "github.api_url",
+                    Contexts::GITHUB,
                 ))
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
+            #[getter]
+            fn base_ref(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access("secrets", key),
-                    Contexts::SECRETS,
+                    "github.base_ref",
+                    Contexts::GITHUB,
                 ))
             }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
-            }
-        }
-
-        #[pyclass]
-        pub struct StrategyContext;
-        #[pymethods]
-        impl StrategyContext {
             #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("strategy", Contexts::STRATEGY))
+            fn env(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("github.env", Contexts::GITHUB))
             }
             #[getter]
-            fn fail_fast(&self) -> BooleanExpression {
-                BooleanExpression::from_base(ExprBase::with_contexts(
-                    "strategy.fail-fast",
-                    Contexts::STRATEGY,
+            fn event(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts(
+                    "github.event",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn job_index(&self) -> NumberExpression {
-                NumberExpression::from_base(ExprBase::with_contexts(
-                    "strategy.job-index",
-                    Contexts::STRATEGY,
+            fn event_name(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.event_name",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn job_total(&self) -> NumberExpression {
-                NumberExpression::from_base(ExprBase::with_contexts(
-                    "strategy.job-total",
-                    Contexts::STRATEGY,
+            fn event_path(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.event_path",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn max_parallel(&self) -> NumberExpression {
-                NumberExpression::from_base(ExprBase::with_contexts(
-                    "strategy.max-parallel",
-                    Contexts::STRATEGY,
+            fn graphql_url(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.graphql_url",
+                    Contexts::GITHUB,
                 ))
             }
-        }
-
-        #[pyclass]
-        pub struct MatrixContext;
-        #[pymethods]
-        impl MatrixContext {
             #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("matrix", Contexts::MATRIX))
-            }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access("matrix", key),
-                    Contexts::MATRIX,
+            fn head_ref(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.head_ref",
+                    Contexts::GITHUB,
                 ))
             }
-            fn __getattr__(&self, key: &str) -> ObjectExpression {
-                self.__getitem__(key)
+            #[getter]
+            fn job(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("github.job", Contexts::GITHUB))
             }
-        }
-
-        #[pyclass]
-        pub struct NeedsJobIdOutputsContext(String);
-        #[pymethods]
-        impl NeedsJobIdOutputsContext {
             #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    self.0.clone(),
-                    Contexts::NEEDS,
+            fn path(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.path",
+                    Contexts::GITHUB,
                 ))
             }
-            #[classattr]
-            const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> StringExpression {
+            #[getter]
+            fn r#ref(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("github.ref", Contexts::GITHUB))
+            }
+            #[getter]
+            fn ref_name(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access(&self.0, key),
-                    Contexts::NEEDS,
+                    "github.ref_name",
+                    Contexts::GITHUB,
                 ))
             }
-            fn __getattr__(&self, key: &str) -> StringExpression {
-                self.__getitem__(key)
+            #[getter]
+            fn ref_protected(&self) -> BooleanExpression {
+                BooleanExpression::from_base(ExprBase::with_contexts(
+                    "github.ref_protected",
+                    Contexts::GITHUB,
+                ))
             }
-        }
-
-        #[pyclass]
-        pub struct NeedsJobIdContext(String);
-        #[pymethods]
-        impl NeedsJobIdContext {
             #[getter]
-            fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    self.0.clone(),
-                    Contexts::NEEDS,
+            fn ref_type(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.ref_type",
+                    Contexts::GITHUB,
                 ))
             }
             #[getter]
-            fn outputs(&self) -> NeedsJobIdOutputsContext {
-                NeedsJobIdOutputsContext(format!("{}.outputs", self.0))
+            fn repository(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.repository",
+                    Contexts::GITHUB,
+                ))
             }
             #[getter]
-            fn result(&self) -> StringExpression {
+            fn reporitory_id(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.reporitory_id",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn repositor_owner(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.repositor_owner",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn repository_owner_id(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.repository_owner_id",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn repository_url(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.repositoryUrl",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn retention_days(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.retention_days",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn run_id(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.run_id",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn run_number(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.run_number",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn run_attempt(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.run_attempt",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn secret_source(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.secret_source",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn server_url(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.server_url",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn sha(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("github.sha", Contexts::GITHUB))
+            }
+            #[getter]
+            fn token(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.token",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn triggering_actor(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.triggering_actor",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn workflow(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.workflow",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn workflow_ref(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.workflow_ref",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn workflow_sha(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "github.workflow_sha",
+                    Contexts::GITHUB,
+                ))
+            }
+            #[getter]
+            fn workspace(&self) -> StringExpression {
                 StringExpression::from_base(ExprBase::with_contexts(
-                    format!("{}.result", self.0),
-                    Contexts::NEEDS,
+                    "github.workspace",
+                    Contexts::GITHUB,
                 ))
             }
         }
 
         #[pyclass]
-        pub struct NeedsContext;
+        pub struct EnvContext;
         #[pymethods]
-        impl NeedsContext {
+        impl EnvContext {
             #[getter]
             fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("needs", Contexts::NEEDS))
+                ObjectExpression::from_base(ExprBase::with_contexts("env", Contexts::ENV))
             }
             #[classattr]
             const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> NeedsJobIdContext {
-                NeedsJobIdContext(ObjectExpression::format_access("needs", key))
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(
+                    ExprBase::with_contexts("env", Contexts::ENV).index(key),
+                )
             }
-            fn __getattr__(&self, key: &str) -> NeedsJobIdContext {
+            fn __getattr__(&self, key: &str) -> StringExpression {
                 self.__getitem__(key)
             }
         }
 
         #[pyclass]
-        pub struct InputsContext;
+        pub struct VarsContext;
         #[pymethods]
-        impl InputsContext {
+        impl VarsContext {
             #[getter]
             fn expr(&self) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts("inputs", Contexts::INPUTS))
+                ObjectExpression::from_base(ExprBase::with_contexts("vars", Contexts::VARS))
             }
             #[classattr]
             const __contains__: Option<Py<PyAny>> = None;
-            fn __getitem__(&self, key: &str) -> ObjectExpression {
-                ObjectExpression::from_base(ExprBase::with_contexts(
-                    ObjectExpression::format_access("inputs", key),
-                    Contexts::INPUTS,
-                ))
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(
+                    ExprBase::with_contexts("vars", Contexts::VARS).index(key),
+                )
             }
-            fn __getattr__(&self, key: &str) -> ObjectExpression {
+            fn __getattr__(&self, key: &str) -> StringExpression {
                 self.__getitem__(key)
             }
         }
 
-        #[pyclass(name = "context")]
-        pub struct Context;
-        #[allow(non_upper_case_globals)]
+        #[pyclass]
+        pub struct JobContainerContext;
         #[pymethods]
-        impl Context {
-            #[classattr]
-            const github: GithubContext = GithubContext;
-            #[classattr]
-            const env: EnvContext = EnvContext;
-            #[classattr]
-            const vars: VarsContext = VarsContext;
-            #[classattr]
-            const job: JobContext = JobContext;
-            #[classattr]
-            const jobs: JobsContext = JobsContext;
-            #[classattr]
-            const steps: StepsContext = StepsContext;
-            #[classattr]
-            const runner: RunnerContext = RunnerContext;
-            #[classattr]
-            const secrets: SecretsContext = SecretsContext;
-            #[classattr]
-            const strategy: StrategyContext = StrategyContext;
-            #[classattr]
-            const matrix: MatrixContext = MatrixContext;
-            #[classattr]
-            const needs: NeedsContext = NeedsContext;
-            #[classattr]
-            const inputs: InputsContext = InputsContext;
-        }
-
-        // TODO: Does toJSON return a string?
-
-        fn escape_string(s: &str) -> String {
-            let mut out = String::with_capacity(s.len() + 2);
-            out.push('\'');
-            for ch in s.chars() {
-                if ch == '\'' {
-                    out.push_str("''");
-                } else if !push_escaped_control(&mut out, ch) {
-                    out.push(ch);
-                }
+        impl JobContainerContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("job.container", Contexts::JOB))
+            }
+            #[getter]
+            fn id(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "job.container.id",
+                    Contexts::JOB,
+                ))
+            }
+            #[getter]
+            fn network(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "job.container.network",
+                    Contexts::JOB,
+                ))
             }
-            out.push('\'');
-            out
         }
 
-        fn validate_string(s: &str) -> bool {
-            let mut chars = s.chars();
-            match chars.next() {
-                Some(c) if c.is_ascii_alphabetic() || c == '_' => {}
-                _ => return false,
+        #[pyclass]
+        pub struct JobServicesIdContext(ExprBase);
+        #[pymethods]
+        impl JobServicesIdContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[getter]
+            fn id(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("id"))
+            }
+            #[getter]
+            fn network(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("network"))
+            }
+            #[getter]
+            fn ports(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.index("ports"))
             }
-            chars.all(|c| c.is_ascii_alphanumeric() || c == '_' || c == '-')
         }
 
-        #[pyfunction]
-        fn lit_str(s: &str) -> StringExpression {
-            StringExpression::new_expr(escape_string(s), ExprMeta::empty())
-        }
-
-        #[pyfunction]
-        fn lit_bool(b: bool) -> BooleanExpression {
-            BooleanExpression::new_expr(
-                if b {
-                    "true".to_string()
-                } else {
-                    "false".to_string()
-                },
-                ExprMeta::empty(),
-            )
+        #[pyclass]
+        pub struct JobServicesContext;
+        #[pymethods]
+        impl JobServicesContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("job.services", Contexts::JOB))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> JobServicesIdContext {
+                JobServicesIdContext(
+                    ExprBase::with_contexts("job.services", Contexts::JOB).index(key),
+                )
+            }
+            fn __getattr__(&self, key: &str) -> JobServicesIdContext {
+                self.__getitem__(key)
+            }
         }
 
-        #[pyfunction]
-        fn lit_num(n: &Bound<PyAny>) -> PyResult<NumberExpression> {
-            if n.is_instance_of::<PyFloat>() {
-                Ok(NumberExpression::new_expr(
-                    n.extract::<f64>()?.to_string(),
-                    ExprMeta::empty(),
-                ))
-            } else if n.is_instance_of::<PyInt>() {
-                Ok(NumberExpression::new_expr(
-                    n.extract::<i64>()?.to_string(),
-                    ExprMeta::empty(),
+        #[pyclass]
+        pub struct JobContext;
+        #[pymethods]
+        impl JobContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("job", Contexts::JOB))
+            }
+            #[getter]
+            fn check_run_id(&self) -> NumberExpression {
+                NumberExpression::from_base(ExprBase::with_contexts(
+                    "job.check_run_id",
+                    Contexts::JOB,
                 ))
-            } else {
-                Err(PyValueError::new_err("Expected a number"))
+            }
+            #[getter]
+            fn container(&self) -> JobContainerContext {
+                JobContainerContext
+            }
+            #[getter]
+            fn services(&self) -> JobServicesContext {
+                JobServicesContext
+            }
+            #[getter]
+            fn status(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("job.status", Contexts::JOB))
             }
         }
-    }
 
-    type StringLike = Either<StringExpression, String>;
-    type BoolLike = Either<BooleanExpression, bool>;
-    type IntLike = Either<NumberExpression, i64>;
+        #[pyclass]
+        pub struct JobsJobIdOutputsContext(ExprBase);
+        #[pymethods]
+        impl JobsJobIdOutputsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(self.0.index(key))
+            }
+            fn __getattr__(&self, key: &str) -> StringExpression {
+                self.__getitem__(key)
+            }
+        }
 
-    macro_rules! ctx {
-        ($first:ident) => {
-            Contexts::$first
-        };
-        ($first:ident, $($rest:ident),+ $(,)?) => {
-            Contexts::$first$(.union(Contexts::$rest))+
-        };
-    }
+        #[pyclass]
+        pub struct JobsJobIdContext(ExprBase);
+        #[pymethods]
+        impl JobsJobIdContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[getter]
+            fn result(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("result"))
+            }
+            #[getter]
+            fn outputs(&self) -> JobsJobIdOutputsContext {
+                JobsJobIdOutputsContext(self.0.index("outputs"))
+            }
+        }
 
-    macro_rules! funcs {
-        ($first:ident) => {
-            Funcs::$first
-        };
-        ($first:ident, $($rest:ident),+ $(,)?) => {
-            Funcs::$first$(.union(Funcs::$rest))+
-        };
-    }
+        #[pyclass]
+        pub struct JobsContext;
+        #[pymethods]
+        impl JobsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("jobs", Contexts::JOBS))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> JobsJobIdContext {
+                JobsJobIdContext(ExprBase::with_contexts("jobs", Contexts::JOBS).index(key))
+            }
+            fn __getattr__(&self, key: &str) -> JobsJobIdContext {
+                self.__getitem__(key)
+            }
+        }
 
-    const ALLOWED_WORKFLOW_RUN_NAME: Allowed =
-        Allowed::new(ctx!(GITHUB, INPUTS, VARS), Funcs::NONE, "run-name");
-    const ALLOWED_WORKFLOW_CONCURRENCY: Allowed =
-        Allowed::new(ctx!(GITHUB, INPUTS, VARS), Funcs::NONE, "concurrency");
-    const ALLOWED_WORKFLOW_ENV: Allowed =
-        Allowed::new(ctx!(GITHUB, SECRETS, INPUTS, VARS), Funcs::NONE, "env");
-    const ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT: Allowed = Allowed::new(
-        ctx!(GITHUB, INPUTS, VARS),
-        Funcs::NONE,
-        "on.workflow_call.inputs.<inputs_id>.default",
-    );
-    const ALLOWED_WORKFLOW_CALL_OUTPUT_VALUE: Allowed = Allowed::new(
-        ctx!(GITHUB, JOBS, VARS, INPUTS),
-        Funcs::NONE,
-        "on.workflow_call.outputs.<output_id>.value",
-    );
+        #[pyclass]
+        pub struct StepsStepIdOutputsContext(ExprBase);
+        #[pymethods]
+        impl StepsStepIdOutputsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(self.0.index(key))
+            }
+            fn __getattr__(&self, key: &str) -> StringExpression {
+                self.__getitem__(key)
+            }
+        }
 
-    const ALLOWED_JOB_NAME: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.name",
-    );
-    const ALLOWED_JOB_IF: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, VARS, INPUTS),
-        funcs!(ALWAYS, CANCELLED, SUCCESS, FAILURE),
-        "jobs.<job_id>.if",
-    );
-    const ALLOWED_JOB_RUNS_ON: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.runs-on",
-    );
-    const ALLOWED_JOB_ENV: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, SECRETS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.env",
-    );
-    const ALLOWED_JOB_ENVIRONMENT: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.environment",
-    );
-    const ALLOWED_JOB_ENVIRONMENT_URL: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, STEPS, INPUTS
-        ),
-        Funcs::NONE,
-        "jobs.<job_id>.environment.url",
-    );
-    const ALLOWED_JOB_CONCURRENCY: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, INPUTS, VARS),
-        Funcs::NONE,
-        "jobs.<job_id>.concurrency",
-    );
-    const ALLOWED_JOB_OUTPUTS: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::NONE,
-        "jobs.<job_id>.outputs.<output_id>",
-    );
-    const ALLOWED_JOB_CONTINUE_ON_ERROR: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, VARS, MATRIX, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.continue-on-error",
-    );
-    const ALLOWED_JOB_DEFAULTS_RUN: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.defaults.run",
-    );
-    const ALLOWED_JOB_STRATEGY: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.strategy",
-    );
-    const ALLOWED_JOB_TIMEOUT_MINUTES: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.timeout-minutes",
-    );
-    const ALLOWED_JOB_WITH: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, INPUTS, VARS),
-        Funcs::NONE,
-        "jobs.<job_id>.with.<with_id>",
-    );
-    const ALLOWED_JOB_SECRETS: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, SECRETS, INPUTS, VARS),
-        Funcs::NONE,
-        "jobs.<job_id>.secrets.<secrets_id>",
-    );
+        #[pyclass]
+        pub struct StepsStepIdContext(ExprBase);
+        #[pymethods]
+        impl StepsStepIdContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[getter]
+            fn outputs(&self) -> StepsStepIdOutputsContext {
+                StepsStepIdOutputsContext(self.0.index("outputs"))
+            }
+            #[getter]
+            fn conclusion(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("conclusion"))
+            }
+            #[getter]
+            fn outcome(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("outcome"))
+            }
+        }
 
-    const ALLOWED_JOB_CONTAINER: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.container",
-    );
-    const ALLOWED_JOB_CONTAINER_CREDENTIALS: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, SECRETS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.container.credentials",
-    );
-    const ALLOWED_JOB_CONTAINER_ENV: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, INPUTS
-        ),
+        #[pyclass]
+        pub struct StepsContext;
+        #[pymethods]
+        impl StepsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("steps", Contexts::STEPS))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> StepsStepIdContext {
+                StepsStepIdContext(ExprBase::with_contexts("steps", Contexts::STEPS).index(key))
+            }
+            fn __getattr__(&self, key: &str) -> StepsStepIdContext {
+                self.__getitem__(key)
+            }
+        }
+
+        #[pyclass]
+        pub struct RunnerContext;
+        #[pymethods]
+        impl RunnerContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("runner", Contexts::RUNNER))
+            }
+            #[getter]
+            fn name(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.name",
+                    Contexts::RUNNER,
+                ))
+            }
+            #[getter]
+            fn os(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts("runner.os", Contexts::RUNNER))
+            }
+            #[getter]
+            fn arch(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.arch",
+                    Contexts::RUNNER,
+                ))
+            }
+            #[getter]
+            fn temp(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.temp",
+                    Contexts::RUNNER,
+                ))
+            }
+            #[getter]
+            fn tool_cache(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.tool_cache",
+                    Contexts::RUNNER,
+                ))
+            }
+            #[getter]
+            fn debug(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.debug",
+                    Contexts::RUNNER,
+                ))
+            }
+            #[getter]
+            fn environment(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "runner.environment",
+                    Contexts::RUNNER,
+                ))
+            }
+        }
+
+        #[pyclass]
+        pub struct SecretsContext;
+        #[pymethods]
+        impl SecretsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("secrets", Contexts::SECRETS))
+            }
+            #[getter]
+            fn github_token(&self) -> StringExpression {
+                StringExpression::from_base(ExprBase::with_contexts(
+                    "secrets.GITHUB_TOKEN",
+                    Contexts::SECRETS,
+                ))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(
+                    ExprBase::with_contexts("secrets", Contexts::SECRETS).index(key),
+                )
+            }
+            fn __getattr__(&self, key: &str) -> StringExpression {
+                self.__getitem__(key)
+            }
+        }
+
+        #[pyclass]
+        pub struct StrategyContext;
+        #[pymethods]
+        impl StrategyContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("strategy", Contexts::STRATEGY))
+            }
+            #[getter]
+            fn fail_fast(&self) -> BooleanExpression {
+                BooleanExpression::from_base(ExprBase::with_contexts(
+                    "strategy.fail-fast",
+                    Contexts::STRATEGY,
+                ))
+            }
+            #[getter]
+            fn job_index(&self) -> NumberExpression {
+                NumberExpression::from_base(ExprBase::with_contexts(
+                    "strategy.job-index",
+                    Contexts::STRATEGY,
+                ))
+            }
+            #[getter]
+            fn job_total(&self) -> NumberExpression {
+                NumberExpression::from_base(ExprBase::with_contexts(
+                    "strategy.job-total",
+                    Contexts::STRATEGY,
+                ))
+            }
+            #[getter]
+            fn max_parallel(&self) -> NumberExpression {
+                NumberExpression::from_base(ExprBase::with_contexts(
+                    "strategy.max-parallel",
+                    Contexts::STRATEGY,
+                ))
+            }
+        }
+
+        #[pyclass]
+        pub struct MatrixContext;
+        #[pymethods]
+        impl MatrixContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("matrix", Contexts::MATRIX))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> ObjectExpression {
+                ObjectExpression::from_base(
+                    ExprBase::with_contexts("matrix", Contexts::MATRIX).index(key),
+                )
+            }
+            fn __getattr__(&self, key: &str) -> ObjectExpression {
+                self.__getitem__(key)
+            }
+        }
+
+        #[pyclass]
+        pub struct NeedsJobIdOutputsContext(ExprBase);
+        #[pymethods]
+        impl NeedsJobIdOutputsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> StringExpression {
+                StringExpression::from_base(self.0.index(key))
+            }
+            fn __getattr__(&self, key: &str) -> StringExpression {
+                self.__getitem__(key)
+            }
+        }
+
+        #[pyclass]
+        pub struct NeedsJobIdContext(ExprBase);
+        #[pymethods]
+        impl NeedsJobIdContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(self.0.clone())
+            }
+            #[getter]
+            fn outputs(&self) -> NeedsJobIdOutputsContext {
+                NeedsJobIdOutputsContext(self.0.index("outputs"))
+            }
+            #[getter]
+            fn result(&self) -> StringExpression {
+                StringExpression::from_base(self.0.index("result"))
+            }
+        }
+
+        #[pyclass]
+        pub struct NeedsContext;
+        #[pymethods]
+        impl NeedsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("needs", Contexts::NEEDS))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> NeedsJobIdContext {
+                NeedsJobIdContext(ExprBase::with_contexts("needs", Contexts::NEEDS).index(key))
+            }
+            fn __getattr__(&self, key: &str) -> NeedsJobIdContext {
+                self.__getitem__(key)
+            }
+        }
+
+        #[pyclass]
+        pub struct InputsContext;
+        #[pymethods]
+        impl InputsContext {
+            #[getter]
+            fn expr(&self) -> ObjectExpression {
+                ObjectExpression::from_base(ExprBase::with_contexts("inputs", Contexts::INPUTS))
+            }
+            #[classattr]
+            const __contains__: Option<Py<PyAny>> = None;
+            fn __getitem__(&self, key: &str) -> ObjectExpression {
+                ObjectExpression::from_base(
+                    ExprBase::with_contexts("inputs", Contexts::INPUTS).index(key),
+                )
+            }
+            fn __getattr__(&self, key: &str) -> ObjectExpression {
+                self.__getitem__(key)
+            }
+        }
+
+        /// The contexts available in expressions, e.g. ``context.github.ref``.
+        ///
+        /// The context namespaces (such as ``context.github`` or ``context.needs.build``) only
+        /// build expressions and cannot be pickled; pickle the expressions built from them, or
+        /// their ``expr``, instead.
+        #[pyclass(name = "context")]
+        pub struct Context;
+        #[allow(non_upper_case_globals)]
+        #[pymethods]
+        impl Context {
+            #[classattr]
+            const github: GithubContext = GithubContext;
+            #[classattr]
+            const env: EnvContext = EnvContext;
+            #[classattr]
+            const vars: VarsContext = VarsContext;
+            #[classattr]
+            const job: JobContext = JobContext;
+            #[classattr]
+            const jobs: JobsContext = JobsContext;
+            #[classattr]
+            const steps: StepsContext = StepsContext;
+            #[classattr]
+            const runner: RunnerContext = RunnerContext;
+            #[classattr]
+            const secrets: SecretsContext = SecretsContext;
+            #[classattr]
+            const strategy: StrategyContext = StrategyContext;
+            #[classattr]
+            const matrix: MatrixContext = MatrixContext;
+            #[classattr]
+            const needs: NeedsContext = NeedsContext;
+            #[classattr]
+            const inputs: InputsContext = InputsContext;
+        }
+
+        // TODO: Does toJSON return a string?
+
+        fn push_escaped_string(out: &mut String, s: &str) {
+            out.reserve(s.len() + 2);
+            out.push('\'');
+            for ch in s.chars() {
+                if ch == '\'' {
+                    out.push_str("''");
+                } else if !push_escaped_control(out, ch) {
+                    out.push(ch);
+                }
+            }
+            out.push('\'');
+        }
+
+        fn validate_string(s: &str) -> bool {
+            let mut chars = s.chars();
+            match chars.next() {
+                Some(c) if c.is_ascii_alphabetic() || c == '_' => {}
+                _ => return false,
+            }
+            chars.all(|c| c.is_ascii_alphanumeric() || c == '_' || c == '-')
+        }
+
+        #[pyfunction]
+        fn lit_str(s: &str) -> StringExpression {
+            StringExpression::new_expr(ExprNode::string(s.to_string()), ExprMeta::empty())
+        }
+
+        #[pyfunction]
+        fn lit_bool(b: bool) -> BooleanExpression {
+            BooleanExpression::new_expr(ExprNode::bool(b), ExprMeta::empty())
+        }
+
+        #[pyfunction]
+        fn lit_num(n: &Bound<PyAny>) -> PyResult<NumberExpression> {
+            if n.is_instance_of::<PyFloat>() {
+                Ok(NumberExpression::new_expr(
+                    ExprNode::number(n.extract::<f64>()?.to_string()),
+                    ExprMeta::empty(),
+                ))
+            } else if n.is_instance_of::<PyInt>() {
+                Ok(NumberExpression::new_expr(
+                    ExprNode::number(n.extract::<i64>()?.to_string()),
+                    ExprMeta::empty(),
+                ))
+            } else {
+                Err(PyValueError::new_err("Expected a number"))
+            }
+        }
+    }
+
+    type StringLike = Either<StringExpression, String>;
+    type BoolLike = Either<BooleanExpression, bool>;
+    type IntLike = Either<NumberExpression, i64>;
+
+    macro_rules! ctx {
+        ($first:ident) => {
+            Contexts::$first
+        };
+        ($first:ident, $($rest:ident),+ $(,)?) => {
+            Contexts::$first$(.union(Contexts::$rest))+
+        };
+    }
+
+    macro_rules! funcs {
+        ($first:ident) => {
+            Funcs::$first
+        };
+        ($first:ident, $($rest:ident),+ $(,)?) => {
+            Funcs::$first$(.union(Funcs::$rest))+
+        };
+    }
+
+    const ALLOWED_WORKFLOW_RUN_NAME: Allowed =
+        Allowed::new(ctx!(GITHUB, INPUTS, VARS), Funcs::NONE, "run-name");
+    const ALLOWED_WORKFLOW_CONCURRENCY: Allowed =
+        Allowed::new(ctx!(GITHUB, INPUTS, VARS), Funcs::NONE, "concurrency");
+    const ALLOWED_WORKFLOW_ENV: Allowed =
+        Allowed::new(ctx!(GITHUB, SECRETS, INPUTS, VARS), Funcs::NONE, "env");
+    const ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT: Allowed = Allowed::new(
+        ctx!(GITHUB, INPUTS, VARS),
+        Funcs::NONE,
+        "on.workflow_call.inputs.<inputs_id>.default",
+    );
+    const ALLOWED_WORKFLOW_CALL_OUTPUT_VALUE: Allowed = Allowed::new(
+        ctx!(GITHUB, JOBS, VARS, INPUTS),
+        Funcs::NONE,
+        "on.workflow_call.outputs.<output_id>.value",
+    );
+
+    const ALLOWED_JOB_NAME: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.name",
+    );
+    const ALLOWED_JOB_IF: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, VARS, INPUTS),
+        funcs!(ALWAYS, CANCELLED, SUCCESS, FAILURE),
+        "jobs.<job_id>.if",
+    );
+    const ALLOWED_JOB_RUNS_ON: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.runs-on",
+    );
+    const ALLOWED_JOB_ENV: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, SECRETS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.env",
+    );
+    const ALLOWED_JOB_ENVIRONMENT: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.environment",
+    );
+    const ALLOWED_JOB_ENVIRONMENT_URL: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, STEPS, INPUTS
+        ),
+        Funcs::NONE,
+        "jobs.<job_id>.environment.url",
+    );
+    const ALLOWED_JOB_CONCURRENCY: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, INPUTS, VARS),
+        Funcs::NONE,
+        "jobs.<job_id>.concurrency",
+    );
+    const ALLOWED_JOB_OUTPUTS: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::NONE,
+        "jobs.<job_id>.outputs.<output_id>",
+    );
+    const ALLOWED_JOB_CONTINUE_ON_ERROR: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, VARS, MATRIX, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.continue-on-error",
+    );
+    const ALLOWED_JOB_DEFAULTS_RUN: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.defaults.run",
+    );
+    const ALLOWED_JOB_STRATEGY: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.strategy",
+    );
+    const ALLOWED_JOB_TIMEOUT_MINUTES: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.timeout-minutes",
+    );
+    const ALLOWED_JOB_WITH: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, INPUTS, VARS),
+        Funcs::NONE,
+        "jobs.<job_id>.with.<with_id>",
+    );
+    const ALLOWED_JOB_SECRETS: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, SECRETS, INPUTS, VARS),
+        Funcs::NONE,
+        "jobs.<job_id>.secrets.<secrets_id>",
+    );
+
+    const ALLOWED_JOB_CONTAINER: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.container",
+    );
+    const ALLOWED_JOB_CONTAINER_CREDENTIALS: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, SECRETS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.container.credentials",
+    );
+    const ALLOWED_JOB_CONTAINER_ENV: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, INPUTS
+        ),
         Funcs::NONE,
         "jobs.<job_id>.container.env.<env_id>",
     );
-    const ALLOWED_JOB_CONTAINER_IMAGE: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+    const ALLOWED_JOB_CONTAINER_IMAGE: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.container.image",
+    );
+
+    const ALLOWED_JOB_SERVICES: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.services",
+    );
+    const ALLOWED_JOB_SERVICES_CREDENTIALS: Allowed = Allowed::new(
+        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, SECRETS, INPUTS),
+        Funcs::NONE,
+        "jobs.<job_id>.services.<service_id>.credentials",
+    );
+    const ALLOWED_JOB_SERVICES_ENV: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, INPUTS
+        ),
         Funcs::NONE,
-        "jobs.<job_id>.container.image",
+        "jobs.<job_id>.services.<service_id>.env.<env_id>",
+    );
+
+    const ALLOWED_STEP_IF: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, STEPS, INPUTS
+        ),
+        funcs!(ALWAYS, CANCELLED, SUCCESS, FAILURE, HASH_FILES),
+        "jobs.<job_id>.steps.if",
+    );
+    const ALLOWED_STEP_NAME: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.name",
+    );
+    const ALLOWED_STEP_RUN: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.run",
+    );
+    const ALLOWED_STEP_ENV: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.env",
+    );
+    const ALLOWED_STEP_WITH: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.with",
+    );
+    const ALLOWED_STEP_WORKING_DIRECTORY: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.working-directory",
+    );
+    const ALLOWED_STEP_CONTINUE_ON_ERROR: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.continue-on-error",
+    );
+    const ALLOWED_STEP_TIMEOUT_MINUTES: Allowed = Allowed::new(
+        ctx!(
+            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
+        ),
+        Funcs::HASH_FILES,
+        "jobs.<job_id>.steps.timeout-minutes",
     );
 
-    const ALLOWED_JOB_SERVICES: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, VARS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.services",
-    );
-    const ALLOWED_JOB_SERVICES_CREDENTIALS: Allowed = Allowed::new(
-        ctx!(GITHUB, NEEDS, STRATEGY, MATRIX, ENV, VARS, SECRETS, INPUTS),
-        Funcs::NONE,
-        "jobs.<job_id>.services.<service_id>.credentials",
-    );
-    const ALLOWED_JOB_SERVICES_ENV: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, INPUTS
-        ),
-        Funcs::NONE,
-        "jobs.<job_id>.services.<service_id>.env.<env_id>",
-    );
+    fn validate_string_like(value: &StringLike, allowed: Allowed) -> PyResult<()> {
+        match value {
+            Either::A(expr) => expr.validate_allowed(allowed),
+            Either::B(text) => validate_raw_string(text, allowed),
+        }
+    }
+
+    fn validate_bool_like(value: &BoolLike, allowed: Allowed) -> PyResult<()> {
+        if let Either::A(expr) = value {
+            expr.validate_allowed(allowed)?;
+        }
+        Ok(())
+    }
+
+    fn validate_int_like(value: &IntLike, allowed: Allowed) -> PyResult<()> {
+        if let Either::A(expr) = value {
+            expr.validate_allowed(allowed)?;
+        }
+        Ok(())
+    }
+
+    fn validate_condition(
+        value: &Either<BooleanExpression, String>,
+        allowed: Allowed,
+    ) -> PyResult<()> {
+        match value {
+            Either::A(expr) => expr.validate_allowed(allowed),
+            Either::B(text) => match parse_raw_condition(text)? {
+                Some(expr) => expr.validate_allowed(allowed),
+                None => validate_raw_string(text, allowed),
+            },
+        }
+    }
+
+    /// The outcome of an ``if:`` condition in a partial context: `Some(false)` if it can never
+    /// pass, `Some(true)` if it always passes and can be dropped, `None` otherwise.
+    fn known_condition(
+        condition: &Option<Either<BooleanExpression, String>>,
+        context: &Value,
+    ) -> Option<bool> {
+        let expr = match condition.as_ref()? {
+            Either::A(expr) => expr.clone(),
+            Either::B(text) => parse_raw_condition(text).ok().flatten()?,
+        };
+        match expr.truthiness_in(context)? {
+            false => Some(false),
+            // `always()` and friends change when the condition is checked at all
+            true => (!expr.has_status_check()).then_some(true),
+        }
+    }
+
+    /// Whether an ``if:`` condition may use a status function such as ``always()``, which makes
+    /// it depend on the outcome of earlier steps or needed jobs. Raw conditions which cannot be
+    /// parsed are assumed to.
+    fn checks_status(condition: &Option<Either<BooleanExpression, String>>) -> bool {
+        match condition {
+            None => false,
+            Some(Either::A(expr)) => expr.has_status_check(),
+            Some(Either::B(text)) => match parse_raw_condition(text) {
+                Ok(Some(expr)) => expr.has_status_check(),
+                _ => true,
+            },
+        }
+    }
+
+    /// Whether a job still runs when some of its needs are skipped (because they can never run),
+    /// which is only the case for conditions which hold even though ``success()`` and
+    /// ``failure()`` are false, such as ``always()``, ``!cancelled()`` or checks of
+    /// ``needs.<job_id>.result``.
+    ///
+    /// Returns `None` if the job is skipped, or the condition to keep once the skipped needs are
+    /// removed from its ``needs``. A condition which refers to a skipped need is replaced by
+    /// ``always()`` or ``!cancelled()``, whichever it is equivalent to.
+    fn runs_after_skipped_needs(
+        condition: &Option<Either<BooleanExpression, String>>,
+        skipped: &HashSet<String>,
+        context: &Value,
+    ) -> Option<Option<Either<BooleanExpression, String>>> {
+        let expr = match condition.as_ref()? {
+            Either::A(expr) => expr.clone(),
+            Either::B(text) => match parse_raw_condition(text) {
+                Ok(Some(expr)) => expr,
+                // an unparseable condition might hold, so keep the job
+                _ => return Some(condition.clone()),
+            },
+        };
+        // without a status function, GitHub checks ``success() && ...``
+        if !expr.has_status_check() {
+            return None;
+        }
+        let mut context = context.clone();
+        if !context.is_object() {
+            context = Value::Object(Map::new());
+        }
+        if let Value::Object(root) = &mut context {
+            let needs = root
+                .entry("needs")
+                .or_insert_with(|| Value::Object(Map::new()));
+            if let Value::Object(needs) = needs {
+                for need in skipped {
+                    needs.insert(need.clone(), serde_json::json!({ "result": "skipped" }));
+                }
+            }
+        }
+        let running = JobStatus {
+            success: false,
+            failure: false,
+            cancelled: false,
+        };
+        let outcome = expr.truthiness_with_status(&context, running);
+        if outcome == Some(false) {
+            return None;
+        }
+        let text = expr.as_expression_string();
+        if outcome.is_none()
+            || !skipped
+                .iter()
+                .any(|need| references_context(&text, "needs", need))
+        {
+            // the condition (still) holds or depends on other needs, so it is kept as it is
+            return Some(condition.clone());
+        }
+        let cancelled = JobStatus {
+            cancelled: true,
+            ..running
+        };
+        let equivalent = match expr.truthiness_with_status(&context, cancelled) {
+            Some(true) => "${{ always() }}",
+            _ => "${{ !cancelled() }}",
+        };
+        Some(Some(Either::B(equivalent.to_string())))
+    }
+
+    fn validate_string_map(values: &PyMap<String, StringLike>, allowed: Allowed) -> PyResult<()> {
+        for (_, value) in values.iter() {
+            validate_string_like(value, allowed)?;
+        }
+        Ok(())
+    }
+
+    fn validate_string_vec(values: &[StringLike], allowed: Allowed) -> PyResult<()> {
+        for value in values {
+            validate_string_like(value, allowed)?;
+        }
+        Ok(())
+    }
+
+    fn validate_runs_on(runs_on: &RunsOn) -> PyResult<()> {
+        match runs_on {
+            RunsOn::String(value) => validate_string_like(value, ALLOWED_JOB_RUNS_ON),
+            RunsOn::Array(values) => validate_string_vec(values, ALLOWED_JOB_RUNS_ON),
+            RunsOn::Spec(spec) => match &spec.options {
+                RunsOnSpecOptions::Group(group) => validate_string_like(group, ALLOWED_JOB_RUNS_ON),
+                RunsOnSpecOptions::Labels(labels) => {
+                    validate_string_like(labels, ALLOWED_JOB_RUNS_ON)
+                }
+                RunsOnSpecOptions::GroupAndLabels(group, labels) => {
+                    validate_string_like(group, ALLOWED_JOB_RUNS_ON)?;
+                    validate_string_like(labels, ALLOWED_JOB_RUNS_ON)
+                }
+            },
+        }
+    }
+
+    fn validate_with_opts(opts: &Bound<'_, PyDict>, allowed: Allowed) -> PyResult<()> {
+        for (_, value) in opts.iter() {
+            if let Ok(expr) = value.extract::<BooleanExpression>() {
+                expr.validate_allowed(allowed)?;
+            } else if let Ok(expr) = value.extract::<StringExpression>() {
+                expr.validate_allowed(allowed)?;
+            } else if let Ok(expr) = value.extract::<NumberExpression>() {
+                expr.validate_allowed(allowed)?;
+            } else if let Ok(expr) = value.extract::<ArrayExpression>() {
+                expr.validate_allowed(allowed)?;
+            } else if let Ok(expr) = value.extract::<ObjectExpression>() {
+                expr.validate_allowed(allowed)?;
+            } else if value.is_instance_of::<PyString>() {
+                validate_raw_string(&value.extract::<String>()?, allowed)?;
+            }
+        }
+        Ok(())
+    }
+
+    fn validate_step_options(
+        name: Option<&StringLike>,
+        condition: Option<&Either<BooleanExpression, String>>,
+        working_directory: Option<&StringLike>,
+        env: Option<&PyMap<String, StringLike>>,
+        continue_on_error: Option<&BoolLike>,
+        timeout_minutes: Option<&IntLike>,
+    ) -> PyResult<()> {
+        if let Some(name) = name {
+            validate_string_like(name, ALLOWED_STEP_NAME)?;
+        }
+        if let Some(condition) = condition {
+            validate_condition(condition, ALLOWED_STEP_IF)?;
+        }
+        if let Some(working_directory) = working_directory {
+            validate_string_like(working_directory, ALLOWED_STEP_WORKING_DIRECTORY)?;
+        }
+        if let Some(env) = env {
+            validate_string_map(env, ALLOWED_STEP_ENV)?;
+        }
+        if let Some(continue_on_error) = continue_on_error {
+            validate_bool_like(continue_on_error, ALLOWED_STEP_CONTINUE_ON_ERROR)?;
+        }
+        if let Some(timeout_minutes) = timeout_minutes {
+            validate_int_like(timeout_minutes, ALLOWED_STEP_TIMEOUT_MINUTES)?;
+        }
+        Ok(())
+    }
+
+    fn validate_container_for_job(container: &Container) -> PyResult<()> {
+        validate_string_like(&container.image, ALLOWED_JOB_CONTAINER_IMAGE)?;
+        if let Some(options) = &container.options {
+            validate_string_like(options, ALLOWED_JOB_CONTAINER)?;
+        }
+        if let Some(volumes) = &container.volumes {
+            validate_string_vec(volumes, ALLOWED_JOB_CONTAINER)?;
+        }
+        if let Some(ports) = &container.ports {
+            for port in ports {
+                validate_int_like(port, ALLOWED_JOB_CONTAINER)?;
+            }
+        }
+        if let Some(credentials) = &container.credentials {
+            validate_string_like(&credentials.username, ALLOWED_JOB_CONTAINER_CREDENTIALS)?;
+            validate_string_like(&credentials.password, ALLOWED_JOB_CONTAINER_CREDENTIALS)?;
+        }
+        if let Some(env) = &container.env {
+            validate_string_map(env, ALLOWED_JOB_CONTAINER_ENV)?;
+        }
+        Ok(())
+    }
+
+    fn validate_container_for_service(container: &Container) -> PyResult<()> {
+        validate_string_like(&container.image, ALLOWED_JOB_SERVICES)?;
+        if let Some(options) = &container.options {
+            validate_string_like(options, ALLOWED_JOB_SERVICES)?;
+        }
+        if let Some(volumes) = &container.volumes {
+            validate_string_vec(volumes, ALLOWED_JOB_SERVICES)?;
+        }
+        if let Some(ports) = &container.ports {
+            for port in ports {
+                validate_int_like(port, ALLOWED_JOB_SERVICES)?;
+            }
+        }
+        if let Some(credentials) = &container.credentials {
+            validate_string_like(&credentials.username, ALLOWED_JOB_SERVICES_CREDENTIALS)?;
+            validate_string_like(&credentials.password, ALLOWED_JOB_SERVICES_CREDENTIALS)?;
+        }
+        if let Some(env) = &container.env {
+            validate_string_map(env, ALLOWED_JOB_SERVICES_ENV)?;
+        }
+        Ok(())
+    }
+
+    fn validate_concurrency(concurrency: &Concurrency, allowed: Allowed) -> PyResult<()> {
+        validate_string_like(&concurrency.group, allowed)?;
+        if let Some(cancel_in_progress) = &concurrency.cancel_in_progress {
+            validate_bool_like(cancel_in_progress, allowed)?;
+        }
+        Ok(())
+    }
+
+    fn validate_environment(environment: &Environment) -> PyResult<()> {
+        validate_string_like(&environment.name, ALLOWED_JOB_ENVIRONMENT)?;
+        if let Some(url) = &environment.url {
+            validate_string_like(url, ALLOWED_JOB_ENVIRONMENT_URL)?;
+        }
+        Ok(())
+    }
+    impl TryYamlable for Bound<'_, PyAny> {
+        fn try_as_yaml(&self) -> PyResult<Yaml> {
+            if self.is_none() {
+                Ok(Yaml::Null)
+            } else if let Ok(e) = self.extract::<StringExpression>() {
+                Ok((&e).as_yaml())
+            } else if let Ok(e) = self.extract::<BooleanExpression>() {
+                Ok((&e).as_yaml())
+            } else if let Ok(e) = self.extract::<NumberExpression>() {
+                Ok((&e).as_yaml())
+            } else if self.is_instance_of::<PyBool>() {
+                Ok(self.extract::<bool>()?.as_yaml())
+            } else if self.is_instance_of::<PyInt>() {
+                Ok(self.extract::<i64>()?.as_yaml())
+            } else if self.is_instance_of::<PyFloat>() {
+                Ok(self.extract::<f64>()?.as_yaml())
+            } else if self.is_instance_of::<PyString>() {
+                Ok(self.extract::<String>()?.as_yaml())
+            } else if let Ok(list) = self.cast::<PyList>() {
+                Ok(Yaml::Array(list.try_as_array()?))
+            } else if let Ok(dict) = self.cast::<PyDict>() {
+                Ok(Yaml::Hash(dict.try_as_hash()?))
+            } else {
+                Err(PyValueError::new_err("Invalid value"))
+            }
+        }
+    }
+
+    impl TryHash for Bound<'_, PyDict> {
+        fn try_as_hash(&self) -> PyResult<Hash> {
+            let mut dict_internals = Hash::new();
+            for (key, entry) in self.iter() {
+                if let Ok(key) = key.extract::<String>() {
+                    dict_internals.insert_yaml(key, entry.try_as_yaml()?);
+                } else {
+                    return Err(PyValueError::new_err("Invalid key"));
+                }
+            }
+            Ok(dict_internals)
+        }
+    }
+
+    impl TryArray for Bound<'_, PyList> {
+        fn try_as_array(&self) -> PyResult<Vec<Yaml>> {
+            let mut list_internals = Vec::new();
+            for entry in self.iter() {
+                list_internals.push(entry.try_as_yaml()?);
+            }
+            Ok(list_internals)
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    struct WithArgs {
+        options: Option<Hash>,
+        args: Option<StringLike>,
+        entrypoint: Option<StringLike>,
+    }
+
+    impl Yamlable for WithArgs {
+        fn as_yaml(&self) -> Yaml {
+            let mut entries = self.options.clone().unwrap_or_default();
+            entries.insert_yaml_opt("args", &self.args);
+            entries.insert_yaml_opt("entrypoint", &self.entrypoint);
+            Yaml::Hash(entries)
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    enum StepAction {
+        Run(StringLike),
+        Action {
+            uses: String,
+            with: Option<WithArgs>,
+        },
+    }
+    impl StepAction {
+        fn uses(&self) -> Option<String> {
+            match self {
+                StepAction::Run(_) => None,
+                StepAction::Action { uses, .. } => Some(uses.clone()),
+            }
+        }
+        fn with(&self) -> Option<WithArgs> {
+            match self {
+                StepAction::Run(_) => None,
+                StepAction::Action { with, .. } => with.clone(),
+            }
+        }
+        fn run(&self) -> Option<&StringLike> {
+            match self {
+                StepAction::Run(script) => Some(script),
+                StepAction::Action { .. } => None,
+            }
+        }
+    }
+
+    /// A single step of a `Job`.
+    ///
+    /// The data lives behind an `Arc`, so a step reused across many jobs is stored once.
+    /// Mutation goes through `DerefMut`, which copies the data first if it is shared.
+    #[pyclass(subclass)]
+    #[derive(Clone)]
+    struct Step(Arc<StepData>);
+
+    #[derive(Clone, PartialEq)]
+    struct StepData {
+        name: Option<StringLike>,
+        step_action: StepAction,
+        options: StepOptions,
+        recommended_permissions: Option<Permissions>,
+        skip_recommended_permissions: bool,
+    }
+
+    impl PartialEq for Step {
+        fn eq(&self, other: &Self) -> bool {
+            Arc::ptr_eq(&self.0, &other.0) || *self.0 == *other.0
+        }
+    }
+    impl From<StepData> for Step {
+        fn from(data: StepData) -> Self {
+            Self(Arc::new(data))
+        }
+    }
+    impl Deref for Step {
+        type Target = StepData;
+        fn deref(&self) -> &StepData {
+            &self.0
+        }
+    }
+    impl DerefMut for Step {
+        fn deref_mut(&mut self) -> &mut StepData {
+            Arc::make_mut(&mut self.0)
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    struct StepOptions {
+        condition: Option<Either<BooleanExpression, String>>,
+        working_directory: Option<StringLike>,
+        shell: Option<String>,
+        id: Option<String>,
+        env: Option<PyMap<String, StringLike>>,
+        continue_on_error: Option<BoolLike>,
+        timeout_minutes: Option<IntLike>,
+    }
+
+    #[pymethods]
+    impl Step {
+        /// Return a copy of the step with the given fields replaced.
+        ///
+        /// Only the replaced fields are validated. Supported keyword arguments are ``name``,
+        /// ``condition``, ``id``, ``env``, ``continue_on_error``, ``timeout_minutes``,
+        /// ``recommended_permissions`` and ``skip_recommended_permissions``, as well as
+        /// ``working_directory`` and ``shell`` for steps created with `script`.
+        ///
+        /// Returns
+        /// -------
+        /// Step
+        ///
+        #[pyo3(signature = (**changes))]
+        fn replace(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            let Some(changes) = changes else {
+                return Ok(self.clone());
+            };
+            let mut step = StepData::clone(self);
+            for (key, value) in changes.iter() {
+                let field = key.extract::<String>()?;
+                let options = &mut step.options;
+                match field.as_str() {
+                    "name" => {
+                        step.name = value.extract()?;
+                        validate_step_options(step.name.as_ref(), None, None, None, None, None)?;
+                    }
+                    "condition" => {
+                        options.condition = value.extract()?;
+                        validate_step_options(
+                            None,
+                            options.condition.as_ref(),
+                            None,
+                            None,
+                            None,
+                            None,
+                        )?;
+                    }
+                    "working_directory" | "shell"
+                        if matches!(step.step_action, StepAction::Action { .. }) =>
+                    {
+                        return Err(PyValueError::new_err(format!(
+                            "'{field}' can only be set on steps which run a script"
+                        )));
+                    }
+                    "working_directory" => {
+                        options.working_directory = value.extract()?;
+                        validate_step_options(
+                            None,
+                            None,
+                            options.working_directory.as_ref(),
+                            None,
+                            None,
+                            None,
+                        )?;
+                    }
+                    "shell" => options.shell = value.extract()?,
+                    "id" => options.id = value.extract()?,
+                    "env" => {
+                        options.env = value.extract()?;
+                        validate_step_options(None, None, None, options.env.as_ref(), None, None)?;
+                    }
+                    "continue_on_error" => {
+                        options.continue_on_error = value.extract()?;
+                        validate_step_options(
+                            None,
+                            None,
+                            None,
+                            None,
+                            options.continue_on_error.as_ref(),
+                            None,
+                        )?;
+                    }
+                    "timeout_minutes" => {
+                        options.timeout_minutes = value.extract()?;
+                        validate_step_options(
+                            None,
+                            None,
+                            None,
+                            None,
+                            None,
+                            options.timeout_minutes.as_ref(),
+                        )?;
+                    }
+                    "recommended_permissions" => step.recommended_permissions = value.extract()?,
+                    "skip_recommended_permissions" => {
+                        step.skip_recommended_permissions = value.extract()?;
+                    }
+                    _ => {
+                        return Err(PyTypeError::new_err(format!(
+                            "Step.replace() got an unexpected keyword argument '{field}'"
+                        )));
+                    }
+                }
+            }
+            Ok(step.into())
+        }
+        /// An alias of `Step.replace`.
+        #[pyo3(signature = (**changes))]
+        fn evolve(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            self.replace(changes)
+        }
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        /// Pickle the step (and support `copy.deepcopy`) through its binary encoding.
+        ///
+        /// The step is encoded by value: unpickling creates a new step, even for a step which
+        /// was shared by several jobs. An `ActionStep` (or a subclass of it, such as a prebuilt
+        /// action) is unpickled as an instance of its own type.
+        fn __reduce__<'py>(
+            slf: &Bound<'py, Self>,
+        ) -> PyResult<(Bound<'py, PyAny>, Bound<'py, PyTuple>)> {
+            let py = slf.py();
+            let data = PyBytes::new(py, &slf.borrow().to_bytes());
+            if slf.get_type().is(&py.get_type::<Step>()) {
+                let unpickle = py.import("yamloom._yamloom")?.getattr("_unpickle")?;
+                return Ok((unpickle, ("Step", data).into_pyobject(py)?));
+            }
+            let unpickle = py.import("yamloom._yamloom")?.getattr("_unpickle_step")?;
+            Ok((unpickle, (slf.get_type(), data).into_pyobject(py)?))
+        }
+    }
+    impl Yamlable for Step {
+        fn as_yaml(&self) -> Yaml {
+            let mut entries = Hash::new();
+            entries.insert_yaml_opt("name", &self.name);
+            entries.insert_yaml_opt("if", &self.options.condition);
+            entries.insert_yaml_opt("uses", self.step_action.uses());
+            entries.insert_yaml_opt("with", self.step_action.with());
+            entries.insert_yaml_opt("run", self.step_action.run());
+            entries.insert_yaml_opt("working-directory", &self.options.working_directory);
+            entries.insert_yaml_opt("shell", &self.options.shell);
+            entries.insert_yaml_opt("id", &self.options.id);
+            entries.insert_yaml_opt("env", &self.options.env);
+            entries.insert_yaml_opt("continue-on-error", &self.options.continue_on_error);
+            entries.insert_yaml_opt("timeout-minutes", &self.options.timeout_minutes);
+            Yaml::Hash(entries)
+        }
+    }
+    fn collect_script_lines(script: Vec<StringLike>) -> StringLike {
+        let lines = script
+            .into_iter()
+            .map(|line| match line {
+                Either::A(expr) => expr.as_expression_string(),
+                Either::B(raw) => raw,
+            })
+            .collect::<Vec<String>>()
+            .join("\n");
+        Either::B(lines)
+    }
+
+    /// Generate a `Step` from a list of shell commands.
+    ///
+    /// Parameters
+    /// ----------
+    /// *script
+    ///     A list of shell commands to run in sequence. These will be concatenated with newlines
+    ///     and passed as the ``run`` key of the generated step. Note that this must not exceed
+    ///     21,000 characters in total.
+    /// name
+    ///     The name of the step to display on GitHub.
+    /// condition
+    ///     A boolean expression which must be met for the step to run. Note that this represents the ``if`` key in the actual YAML file.
+    /// working_directory
+    ///     Specifies the directory in which the script is run.
+    /// shell
+    ///     Used to override the default shell settings of the runner's OS (or `Job`/`Workflow` defaults).
+    /// id
+    ///     A unique identifier for the step which can be referenced in expressions.
+    /// env
+    ///     Used to specify environment variables for the step.
+    /// permissions
+    ///     Recommended permissions required to run this script. These are merged into the
+    ///     job permissions when ``use_recommended_permissions`` is True.
+    /// continue_on_error
+    ///     Prevents the job from failing if this step fails.
+    /// timeout_minutes
+    ///     The maximum number of minutes to let the step run before GitHub automatically cancels it (defaults to 360 if not specified).
+    ///
+    #[pyfunction]
+    #[pyo3(signature = (*script, name = None, condition = None, working_directory = None, shell = None, id = None, env = None, permissions = None, continue_on_error = None, timeout_minutes= None))]
+    fn script(
+        script: &Bound<'_, PyTuple>,
+        name: Option<StringLike>,
+        condition: Option<Either<BooleanExpression, String>>,
+        working_directory: Option<StringLike>,
+        shell: Option<String>,
+        id: Option<String>,
+        env: Option<PyMap<String, StringLike>>,
+        permissions: Option<Permissions>,
+        continue_on_error: Option<BoolLike>,
+        timeout_minutes: Option<IntLike>,
+    ) -> PyResult<Step> {
+        let script = script
+            .iter()
+            .map(|item| item.extract::<StringLike>())
+            .collect::<PyResult<Vec<StringLike>>>()?;
+        make_script(
+            script,
+            name,
+            condition,
+            working_directory,
+            shell,
+            id,
+            env,
+            permissions,
+            continue_on_error,
+            timeout_minutes,
+        )
+    }
+    fn make_script(
+        script: Vec<StringLike>,
+        name: Option<StringLike>,
+        condition: Option<Either<BooleanExpression, String>>,
+        working_directory: Option<StringLike>,
+        shell: Option<String>,
+        id: Option<String>,
+        env: Option<PyMap<String, StringLike>>,
+        permissions: Option<Permissions>,
+        continue_on_error: Option<BoolLike>,
+        timeout_minutes: Option<IntLike>,
+    ) -> PyResult<Step> {
+        for line in &script {
+            validate_string_like(line, ALLOWED_STEP_RUN)?;
+        }
+        validate_step_options(
+            name.as_ref(),
+            condition.as_ref(),
+            working_directory.as_ref(),
+            env.as_ref(),
+            continue_on_error.as_ref(),
+            timeout_minutes.as_ref(),
+        )?;
+        let script = collect_script_lines(script);
+        Ok(Step::from(StepData {
+            name,
+            step_action: StepAction::Run(script),
+            options: StepOptions {
+                condition,
+                working_directory,
+                shell,
+                id,
+                env,
+                continue_on_error,
+                timeout_minutes,
+            },
+            recommended_permissions: permissions,
+            skip_recommended_permissions: false,
+        }))
+    }
+    fn make_action(
+        name: Option<StringLike>,
+        action: &str,
+        r#ref: Option<String>,
+        with_opts: Option<Hash>,
+        args: Option<StringLike>,
+        entrypoint: Option<StringLike>,
+        condition: Option<Either<BooleanExpression, String>>,
+        id: Option<String>,
+        env: Option<PyMap<String, StringLike>>,
+        continue_on_error: Option<BoolLike>,
+        timeout_minutes: Option<IntLike>,
+        skip_recommended_permissions: bool,
+        recommended_permissions: Option<Permissions>,
+    ) -> PyResult<Step> {
+        validate_step_options(
+            name.as_ref(),
+            condition.as_ref(),
+            None,
+            env.as_ref(),
+            continue_on_error.as_ref(),
+            timeout_minutes.as_ref(),
+        )?;
+        if let Some(args) = &args {
+            validate_string_like(args, ALLOWED_STEP_WITH)?;
+        }
+        if let Some(entrypoint) = &entrypoint {
+            validate_string_like(entrypoint, ALLOWED_STEP_WITH)?;
+        }
+        let with_args = if with_opts.is_some() || args.is_some() || entrypoint.is_some() {
+            Some(WithArgs {
+                options: with_opts,
+                args,
+                entrypoint,
+            })
+        } else {
+            None
+        };
+        Ok(Step::from(StepData {
+            name,
+            step_action: StepAction::Action {
+                uses: format!(
+                    "{}{}",
+                    action,
+                    r#ref.map(|s| format!("@{s}")).unwrap_or_default()
+                ),
+                with: with_args,
+            },
+            options: StepOptions {
+                condition,
+                working_directory: None,
+                shell: None,
+                id,
+                env,
+                continue_on_error,
+                timeout_minutes,
+            },
+            recommended_permissions,
+            skip_recommended_permissions,
+        }))
+    }
+
+    /// Generate a `Step` from a reusable unit of code called an action.
+    ///
+    /// Parameters
+    /// ----------
+    /// name
+    ///     The name of the step to display on GitHub.
+    /// action
+    ///     The location of the action's public GitHub repository (a string of the form {owner}/{repo}).
+    /// ref
+    ///     The branch, ref, or SHA of the action's repository to use. This is used to specify a specific version of an action.
+    /// with_opts
+    ///     A map of input parameters for the action. These are passed as the ``with`` key of the generated step.
+    /// args
+    ///     The inputs for a Docker container which are passed to the container's entrypoint. This
+    ///     is a subkey of the ``with`` key of the generated step.
+    /// entrypoint
+    ///     Overrides the Docker ENTRYPOINT in the action's Dockerfile or sets one if it was not
+    ///     specified. Accepts a single string defining the executable to run (note that this is
+    ///     different from Docker's ENTRYPOINT instruction which has both a shell and exec form).
+    ///     This is a subkey of the ``with`` key of the generated step.
+    /// condition
+    ///     A boolean expression which must be met for the step to run. Note that this represents the ``if`` key in the actual YAML file.
+    /// id
+    ///     A unique identifier for the step which can be referenced in expressions.
+    /// env
+    ///     Used to specify environment variables for the step.
+    /// continue_on_error
+    ///     Prevents the job from failing if this step fails.
+    /// timeout_minutes
+    ///     The maximum number of minutes to let the step run before GitHub automatically cancels it (defaults to 360 if not specified).
+    /// skip_recommended_permissions
+    ///     If True, ignore this step's recommended permissions when merging job permissions.
+    /// recommended_permissions
+    ///     Recommended permissions required to run this action.
+    ///
+    #[pyfunction]
+    #[pyo3(signature = (name, action, *, r#ref = None, with_opts = None, args = None, entrypoint = None, condition = None, id = None, env = None, continue_on_error = None, timeout_minutes = None, skip_recommended_permissions = false, recommended_permissions = None))]
+    fn action(
+        name: Option<StringLike>,
+        action: &str,
+        r#ref: Option<String>,
+        with_opts: Option<Bound<PyDict>>,
+        args: Option<StringLike>,
+        entrypoint: Option<StringLike>,
+        condition: Option<Either<BooleanExpression, String>>,
+        id: Option<String>,
+        env: Option<PyMap<String, StringLike>>,
+        continue_on_error: Option<BoolLike>,
+        timeout_minutes: Option<IntLike>,
+        skip_recommended_permissions: bool,
+        recommended_permissions: Option<Permissions>,
+    ) -> PyResult<Step> {
+        if let Some(with_opts) = &with_opts {
+            validate_with_opts(with_opts, ALLOWED_STEP_WITH)?;
+        }
+        make_action(
+            name,
+            action,
+            r#ref,
+            with_opts.map(|d| d.try_as_hash()).transpose()?,
+            args,
+            entrypoint,
+            condition,
+            id,
+            env,
+            continue_on_error,
+            timeout_minutes,
+            skip_recommended_permissions,
+            recommended_permissions,
+        )
+    }
+
+    #[pyclass(extends=Step, subclass)]
+    struct ActionStep;
+    #[pymethods]
+    impl ActionStep {
+        #[new]
+        #[pyo3(signature = (name, action, *, r#ref = None, with_opts = None, args = None, entrypoint = None, condition = None, id = None, env = None, continue_on_error = None, timeout_minutes = None, skip_recommended_permissions = false, recommended_permissions = None))]
+        fn new(
+            name: Option<StringLike>,
+            action: &str,
+            r#ref: Option<String>,
+            with_opts: Option<Bound<PyDict>>,
+            args: Option<StringLike>,
+            entrypoint: Option<StringLike>,
+            condition: Option<Either<BooleanExpression, String>>,
+            id: Option<String>,
+            env: Option<PyMap<String, StringLike>>,
+            continue_on_error: Option<BoolLike>,
+            timeout_minutes: Option<IntLike>,
+            skip_recommended_permissions: bool,
+            recommended_permissions: Option<Permissions>,
+        ) -> PyResult<(Self, Step)> {
+            if let Some(with_opts) = &with_opts {
+                validate_with_opts(with_opts, ALLOWED_STEP_WITH)?;
+            }
+            let step = make_action(
+                name,
+                action,
+                r#ref,
+                with_opts.map(|d| d.try_as_hash()).transpose()?,
+                args,
+                entrypoint,
+                condition,
+                id,
+                env,
+                continue_on_error,
+                timeout_minutes,
+                skip_recommended_permissions,
+                recommended_permissions,
+            )?;
+            Ok((ActionStep, step))
+        }
+    }
+
+    #[derive(Clone, Copy, PartialEq)]
+    enum ReadWriteNonePermission {
+        Read,
+        Write,
+        None,
+    }
+    impl FromStr for ReadWriteNonePermission {
+        type Err = PyErr;
+        fn from_str(s: &str) -> Result<Self, Self::Err> {
+            match s.to_lowercase().as_str() {
+                "read" => Ok(Self::Read),
+                "write" => Ok(Self::Write),
+                "none" => Ok(Self::None),
+                _ => Err(PyValueError::new_err("Invalid permission")),
+            }
+        }
+    }
+    impl Yamlable for &ReadWriteNonePermission {
+        fn as_yaml(&self) -> Yaml {
+            match self {
+                ReadWriteNonePermission::Read => "read",
+                ReadWriteNonePermission::Write => "write",
+                ReadWriteNonePermission::None => "none",
+            }
+            .as_yaml()
+        }
+    }
+    #[derive(Clone, Copy, PartialEq)]
+    enum WriteNonePermission {
+        Write,
+        None,
+    }
+    impl FromStr for WriteNonePermission {
+        type Err = PyErr;
+        fn from_str(s: &str) -> Result<Self, Self::Err> {
+            match s.to_lowercase().as_str() {
+                "write" => Ok(Self::Write),
+                "none" => Ok(Self::None),
+                _ => Err(PyValueError::new_err("Invalid permission")),
+            }
+        }
+    }
+    impl Yamlable for &WriteNonePermission {
+        fn as_yaml(&self) -> Yaml {
+            match self {
+                WriteNonePermission::Write => "write",
+                WriteNonePermission::None => "none",
+            }
+            .as_yaml()
+        }
+    }
+    #[derive(Clone, Copy, PartialEq)]
+    enum ReadNonePermission {
+        Read,
+        None,
+    }
+    impl FromStr for ReadNonePermission {
+        type Err = PyErr;
+        fn from_str(s: &str) -> Result<Self, Self::Err> {
+            match s.to_lowercase().as_str() {
+                "read" => Ok(Self::Read),
+                "none" => Ok(Self::None),
+                _ => Err(PyValueError::new_err("Invalid permission")),
+            }
+        }
+    }
+    impl Yamlable for &ReadNonePermission {
+        fn as_yaml(&self) -> Yaml {
+            match self {
+                ReadNonePermission::Read => "read",
+                ReadNonePermission::None => "none",
+            }
+            .as_yaml()
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    struct IndividualPermissions {
+        actions: Option<ReadWriteNonePermission>,
+        artifact_metadata: Option<ReadWriteNonePermission>,
+        attestations: Option<ReadWriteNonePermission>,
+        checks: Option<ReadWriteNonePermission>,
+        contents: Option<ReadWriteNonePermission>,
+        deployments: Option<ReadWriteNonePermission>,
+        id_token: Option<WriteNonePermission>,
+        issues: Option<ReadWriteNonePermission>,
+        models: Option<ReadNonePermission>,
+        discussions: Option<ReadWriteNonePermission>,
+        packages: Option<ReadWriteNonePermission>,
+        pages: Option<ReadWriteNonePermission>,
+        pull_requests: Option<ReadWriteNonePermission>,
+        security_events: Option<ReadWriteNonePermission>,
+        statuses: Option<ReadWriteNonePermission>,
+    }
+    impl IndividualPermissions {
+        fn is_empty(&self) -> bool {
+            self.actions.is_none()
+                && self.artifact_metadata.is_none()
+                && self.attestations.is_none()
+                && self.checks.is_none()
+                && self.contents.is_none()
+                && self.deployments.is_none()
+                && self.id_token.is_none()
+                && self.issues.is_none()
+                && self.models.is_none()
+                && self.discussions.is_none()
+                && self.packages.is_none()
+                && self.pages.is_none()
+                && self.pull_requests.is_none()
+                && self.security_events.is_none()
+                && self.statuses.is_none()
+        }
+    }
+    #[derive(Clone, PartialEq)]
+    enum PermissionsOptions {
+        Individual(IndividualPermissions),
+        ReadAll,
+        WriteAll,
+        None,
+    }
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Permissions {
+        options: PermissionsOptions,
+    }
+    #[pymethods]
+    impl Permissions {
+        #[new]
+        #[pyo3(signature= (actions=None, artifact_metadata=None, attestations=None, checks=None, contents=None, deployments=None, id_token=None, issues=None, models=None, discussions=None, packages=None, pages=None, pull_requests=None, security_events=None, statuses=None))]
+        fn new(
+            actions: Option<String>,
+            artifact_metadata: Option<String>,
+            attestations: Option<String>,
+            checks: Option<String>,
+            contents: Option<String>,
+            deployments: Option<String>,
+            id_token: Option<String>,
+            issues: Option<String>,
+            models: Option<String>,
+            discussions: Option<String>,
+            packages: Option<String>,
+            pages: Option<String>,
+            pull_requests: Option<String>,
+            security_events: Option<String>,
+            statuses: Option<String>,
+        ) -> PyResult<Self> {
+            Ok(Self {
+                options: PermissionsOptions::Individual(IndividualPermissions {
+                    actions: actions.map(|s| s.parse()).transpose()?,
+                    artifact_metadata: artifact_metadata.map(|s| s.parse()).transpose()?,
+                    attestations: attestations.map(|s| s.parse()).transpose()?,
+                    checks: checks.map(|s| s.parse()).transpose()?,
+                    contents: contents.map(|s| s.parse()).transpose()?,
+                    deployments: deployments.map(|s| s.parse()).transpose()?,
+                    id_token: id_token.map(|s| s.parse()).transpose()?,
+                    issues: issues.map(|s| s.parse()).transpose()?,
+                    models: models.map(|s| s.parse()).transpose()?,
+                    discussions: discussions.map(|s| s.parse()).transpose()?,
+                    packages: packages.map(|s| s.parse()).transpose()?,
+                    pages: pages.map(|s| s.parse()).transpose()?,
+                    pull_requests: pull_requests.map(|s| s.parse()).transpose()?,
+                    security_events: security_events.map(|s| s.parse()).transpose()?,
+                    statuses: statuses.map(|s| s.parse()).transpose()?,
+                }),
+            })
+        }
+        #[staticmethod]
+        fn none() -> Self {
+            Self {
+                options: PermissionsOptions::None,
+            }
+        }
+        #[staticmethod]
+        fn read_all() -> Self {
+            Self {
+                options: PermissionsOptions::ReadAll,
+            }
+        }
+        #[staticmethod]
+        fn write_all() -> Self {
+            Self {
+                options: PermissionsOptions::WriteAll,
+            }
+        }
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Permissions")
+        }
+    }
+    impl Yamlable for &Permissions {
+        fn as_yaml(&self) -> Yaml {
+            match &self.options {
+                PermissionsOptions::Individual(indiv_perms) => {
+                    let mut permissions = Hash::new();
+                    permissions.insert_yaml_opt("actions", &indiv_perms.actions);
+                    permissions
+                        .insert_yaml_opt("artifact-metadata", &indiv_perms.artifact_metadata);
+                    permissions.insert_yaml_opt("attestations", &indiv_perms.attestations);
+                    permissions.insert_yaml_opt("checks", &indiv_perms.checks);
+                    permissions.insert_yaml_opt("contents", &indiv_perms.contents);
+                    permissions.insert_yaml_opt("deployments", &indiv_perms.deployments);
+                    permissions.insert_yaml_opt("id-token", &indiv_perms.id_token);
+                    permissions.insert_yaml_opt("issues", &indiv_perms.issues);
+                    permissions.insert_yaml_opt("models", &indiv_perms.models);
+                    permissions.insert_yaml_opt("discussion", &indiv_perms.discussions);
+                    permissions.insert_yaml_opt("packages", &indiv_perms.packages);
+                    permissions.insert_yaml_opt("pages", &indiv_perms.pages);
+                    permissions.insert_yaml_opt("pull-requests", &indiv_perms.pull_requests);
+                    permissions.insert_yaml_opt("security-events", &indiv_perms.security_events);
+                    permissions.insert_yaml_opt("statuses", &indiv_perms.statuses);
+                    Yaml::Hash(permissions)
+                }
+                PermissionsOptions::ReadAll => "read-all".as_yaml(),
+                PermissionsOptions::WriteAll => "write-all".as_yaml(),
+                PermissionsOptions::None => Yaml::Hash(Hash::new()), // TODO: test
+            }
+        }
+    }
+
+    fn max_read_write_none(
+        left: ReadWriteNonePermission,
+        right: ReadWriteNonePermission,
+    ) -> ReadWriteNonePermission {
+        match (left, right) {
+            (ReadWriteNonePermission::Write, _) | (_, ReadWriteNonePermission::Write) => {
+                ReadWriteNonePermission::Write
+            }
+            (ReadWriteNonePermission::Read, _) | (_, ReadWriteNonePermission::Read) => {
+                ReadWriteNonePermission::Read
+            }
+            _ => ReadWriteNonePermission::None,
+        }
+    }
+    fn max_write_none(
+        left: WriteNonePermission,
+        right: WriteNonePermission,
+    ) -> WriteNonePermission {
+        match (left, right) {
+            (WriteNonePermission::Write, _) | (_, WriteNonePermission::Write) => {
+                WriteNonePermission::Write
+            }
+            _ => WriteNonePermission::None,
+        }
+    }
+    fn max_read_none(left: ReadNonePermission, right: ReadNonePermission) -> ReadNonePermission {
+        match (left, right) {
+            (ReadNonePermission::Read, _) | (_, ReadNonePermission::Read) => {
+                ReadNonePermission::Read
+            }
+            _ => ReadNonePermission::None,
+        }
+    }
+    fn merge_rw_opt(
+        left: Option<ReadWriteNonePermission>,
+        right: Option<ReadWriteNonePermission>,
+    ) -> Option<ReadWriteNonePermission> {
+        match (left, right) {
+            (None, None) => None,
+            (Some(value), None) | (None, Some(value)) => Some(value),
+            (Some(left), Some(right)) => Some(max_read_write_none(left, right)),
+        }
+    }
+    fn merge_write_opt(
+        left: Option<WriteNonePermission>,
+        right: Option<WriteNonePermission>,
+    ) -> Option<WriteNonePermission> {
+        match (left, right) {
+            (None, None) => None,
+            (Some(value), None) | (None, Some(value)) => Some(value),
+            (Some(left), Some(right)) => Some(max_write_none(left, right)),
+        }
+    }
+    fn merge_read_opt(
+        left: Option<ReadNonePermission>,
+        right: Option<ReadNonePermission>,
+    ) -> Option<ReadNonePermission> {
+        match (left, right) {
+            (None, None) => None,
+            (Some(value), None) | (None, Some(value)) => Some(value),
+            (Some(left), Some(right)) => Some(max_read_none(left, right)),
+        }
+    }
+    fn merge_individual(
+        left: &IndividualPermissions,
+        right: &IndividualPermissions,
+    ) -> IndividualPermissions {
+        IndividualPermissions {
+            actions: merge_rw_opt(left.actions, right.actions),
+            artifact_metadata: merge_rw_opt(left.artifact_metadata, right.artifact_metadata),
+            attestations: merge_rw_opt(left.attestations, right.attestations),
+            checks: merge_rw_opt(left.checks, right.checks),
+            contents: merge_rw_opt(left.contents, right.contents),
+            deployments: merge_rw_opt(left.deployments, right.deployments),
+            id_token: merge_write_opt(left.id_token, right.id_token),
+            issues: merge_rw_opt(left.issues, right.issues),
+            models: merge_read_opt(left.models, right.models),
+            discussions: merge_rw_opt(left.discussions, right.discussions),
+            packages: merge_rw_opt(left.packages, right.packages),
+            pages: merge_rw_opt(left.pages, right.pages),
+            pull_requests: merge_rw_opt(left.pull_requests, right.pull_requests),
+            security_events: merge_rw_opt(left.security_events, right.security_events),
+            statuses: merge_rw_opt(left.statuses, right.statuses),
+        }
+    }
+    fn individual_from_permissions(permissions: &Permissions) -> IndividualPermissions {
+        match &permissions.options {
+            PermissionsOptions::Individual(indiv) => indiv.clone(),
+            PermissionsOptions::None => IndividualPermissions {
+                actions: None,
+                artifact_metadata: None,
+                attestations: None,
+                checks: None,
+                contents: None,
+                deployments: None,
+                id_token: None,
+                issues: None,
+                models: None,
+                discussions: None,
+                packages: None,
+                pages: None,
+                pull_requests: None,
+                security_events: None,
+                statuses: None,
+            },
+            PermissionsOptions::ReadAll => IndividualPermissions {
+                actions: Some(ReadWriteNonePermission::Read),
+                artifact_metadata: Some(ReadWriteNonePermission::Read),
+                attestations: Some(ReadWriteNonePermission::Read),
+                checks: Some(ReadWriteNonePermission::Read),
+                contents: Some(ReadWriteNonePermission::Read),
+                deployments: Some(ReadWriteNonePermission::Read),
+                id_token: Some(WriteNonePermission::None),
+                issues: Some(ReadWriteNonePermission::Read),
+                models: Some(ReadNonePermission::Read),
+                discussions: Some(ReadWriteNonePermission::Read),
+                packages: Some(ReadWriteNonePermission::Read),
+                pages: Some(ReadWriteNonePermission::Read),
+                pull_requests: Some(ReadWriteNonePermission::Read),
+                security_events: Some(ReadWriteNonePermission::Read),
+                statuses: Some(ReadWriteNonePermission::Read),
+            },
+            PermissionsOptions::WriteAll => IndividualPermissions {
+                actions: Some(ReadWriteNonePermission::Write),
+                artifact_metadata: Some(ReadWriteNonePermission::Write),
+                attestations: Some(ReadWriteNonePermission::Write),
+                checks: Some(ReadWriteNonePermission::Write),
+                contents: Some(ReadWriteNonePermission::Write),
+                deployments: Some(ReadWriteNonePermission::Write),
+                id_token: Some(WriteNonePermission::Write),
+                issues: Some(ReadWriteNonePermission::Write),
+                models: Some(ReadNonePermission::Read),
+                discussions: Some(ReadWriteNonePermission::Write),
+                packages: Some(ReadWriteNonePermission::Write),
+                pages: Some(ReadWriteNonePermission::Write),
+                pull_requests: Some(ReadWriteNonePermission::Write),
+                security_events: Some(ReadWriteNonePermission::Write),
+                statuses: Some(ReadWriteNonePermission::Write),
+            },
+        }
+    }
+    fn merge_permissions(left: &Permissions, right: &Permissions) -> Permissions {
+        match (&left.options, &right.options) {
+            (PermissionsOptions::WriteAll, _) | (_, PermissionsOptions::WriteAll) => Permissions {
+                options: PermissionsOptions::WriteAll,
+            },
+            (PermissionsOptions::None, PermissionsOptions::None) => Permissions {
+                options: PermissionsOptions::None,
+            },
+            (
+                PermissionsOptions::ReadAll,
+                PermissionsOptions::None | PermissionsOptions::ReadAll,
+            )
+            | (PermissionsOptions::None, PermissionsOptions::ReadAll) => Permissions {
+                options: PermissionsOptions::ReadAll,
+            },
+            _ => Permissions {
+                options: PermissionsOptions::Individual(merge_individual(
+                    &individual_from_permissions(left),
+                    &individual_from_permissions(right),
+                )),
+            },
+        }
+    }
+    fn is_empty_individual_permissions(permissions: &Permissions) -> bool {
+        match &permissions.options {
+            PermissionsOptions::Individual(indiv) => indiv.is_empty(),
+            _ => false,
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    enum RunsOnSpecOptions {
+        Group(StringLike),
+        Labels(StringLike),
+        GroupAndLabels(StringLike, StringLike),
+    }
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct RunsOnSpec {
+        options: RunsOnSpecOptions,
+    }
+    #[pymethods]
+    impl RunsOnSpec {
+        #[new]
+        fn new(group: StringLike, labels: StringLike) -> Self {
+            Self {
+                options: RunsOnSpecOptions::GroupAndLabels(group, labels),
+            }
+        }
+        #[staticmethod]
+        fn group(group: StringLike) -> Self {
+            Self {
+                options: RunsOnSpecOptions::Group(group),
+            }
+        }
+        #[staticmethod]
+        fn labels(labels: StringLike) -> Self {
+            Self {
+                options: RunsOnSpecOptions::Labels(labels),
+            }
+        }
 
-    const ALLOWED_STEP_IF: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, STEPS, INPUTS
-        ),
-        funcs!(ALWAYS, CANCELLED, SUCCESS, FAILURE, HASH_FILES),
-        "jobs.<job_id>.steps.if",
-    );
-    const ALLOWED_STEP_NAME: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.name",
-    );
-    const ALLOWED_STEP_RUN: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.run",
-    );
-    const ALLOWED_STEP_ENV: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.env",
-    );
-    const ALLOWED_STEP_WITH: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.with",
-    );
-    const ALLOWED_STEP_WORKING_DIRECTORY: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.working-directory",
-    );
-    const ALLOWED_STEP_CONTINUE_ON_ERROR: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.continue-on-error",
-    );
-    const ALLOWED_STEP_TIMEOUT_MINUTES: Allowed = Allowed::new(
-        ctx!(
-            GITHUB, NEEDS, STRATEGY, MATRIX, JOB, RUNNER, ENV, VARS, SECRETS, STEPS, INPUTS
-        ),
-        Funcs::HASH_FILES,
-        "jobs.<job_id>.steps.timeout-minutes",
-    );
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "RunsOnSpec")
+        }
+    }
+    impl Yamlable for &RunsOnSpec {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            match &self.options {
+                RunsOnSpecOptions::Group(group) => out.insert_yaml("group", group),
+                RunsOnSpecOptions::Labels(labels) => out.insert_yaml("labels", labels),
+                RunsOnSpecOptions::GroupAndLabels(group, labels) => {
+                    out.insert_yaml("group", group);
+                    out.insert_yaml("labels", labels);
+                }
+            }
+            Yaml::Hash(out)
+        }
+    }
+
+    #[derive(Clone, PartialEq)]
+    enum RunsOn {
+        String(StringLike),
+        Array(Vec<StringLike>),
+        Spec(RunsOnSpec),
+    }
+    impl<'a, 'py> FromPyObject<'a, 'py> for RunsOn {
+        type Error = PyErr;
+
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            if let Ok(spec) = obj.extract::<RunsOnSpec>() {
+                Ok(Self::Spec(spec))
+            } else if let Ok(list) = obj.extract::<Vec<StringLike>>() {
+                Ok(Self::Array(list))
+            } else if let Ok(single) = obj.extract::<StringLike>() {
+                Ok(Self::String(single))
+            } else {
+                Err(PyValueError::new_err(
+                    "Expected a 'RunsOnSpec', list of strings, or a single string",
+                ))
+            }
+        }
+    }
+    impl Yamlable for &RunsOn {
+        fn as_yaml(&self) -> Yaml {
+            match self {
+                RunsOn::String(s) => s.as_yaml(),
+                RunsOn::Array(l) => l.as_yaml(),
+                RunsOn::Spec(spec) => spec.as_yaml(),
+            }
+        }
+    }
+
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Environment {
+        name: StringLike,
+        url: Option<StringLike>,
+    }
+    #[pymethods]
+    impl Environment {
+        #[new]
+        #[pyo3(signature = (name, url = None))]
+        fn new(name: StringLike, url: Option<StringLike>) -> Self {
+            Self { name, url }
+        }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Environment")
+        }
+    }
+    impl Yamlable for &Environment {
+        fn as_yaml(&self) -> Yaml {
+            if let Some(url) = &self.url {
+                let mut sub = Hash::new();
+                sub.insert_yaml("name", &self.name);
+                sub.insert_yaml("url", url);
+                Yaml::Hash(sub)
+            } else {
+                self.name.as_yaml()
+            }
+        }
+    }
+
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Concurrency {
+        group: StringLike,
+        cancel_in_progress: Option<BoolLike>,
+    }
+    #[pymethods]
+    impl Concurrency {
+        #[new]
+        #[pyo3(signature = (group, *, cancel_in_progress=None))]
+        fn new(group: StringLike, cancel_in_progress: Option<BoolLike>) -> Self {
+            Self {
+                group,
+                cancel_in_progress,
+            }
+        }
 
-    fn validate_string_like(value: &StringLike, allowed: Allowed) -> PyResult<()> {
-        if let Either::A(expr) = value {
-            expr.validate_allowed(allowed)?;
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
         }
-        Ok(())
-    }
 
-    fn validate_bool_like(value: &BoolLike, allowed: Allowed) -> PyResult<()> {
-        if let Either::A(expr) = value {
-            expr.validate_allowed(allowed)?;
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Concurrency")
         }
-        Ok(())
     }
-
-    fn validate_int_like(value: &IntLike, allowed: Allowed) -> PyResult<()> {
-        if let Either::A(expr) = value {
-            expr.validate_allowed(allowed)?;
+    impl Yamlable for &Concurrency {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            out.insert_yaml("group", &self.group);
+            out.insert_yaml_opt("cancel-in-progress", &self.cancel_in_progress);
+            Yaml::Hash(out)
         }
-        Ok(())
     }
 
-    fn validate_condition(
-        value: &Either<BooleanExpression, String>,
-        allowed: Allowed,
-    ) -> PyResult<()> {
-        if let Either::A(expr) = value {
-            expr.validate_allowed(allowed)?;
-        }
-        Ok(())
+    /// Build the concurrency settings used by `Workflow.auto_concurrency`.
+    ///
+    /// Runs which may be cancelled share a group per workflow (and job) and ref, while every
+    /// other run gets a group of its own, since GitHub also cancels pending runs in a group.
+    fn auto_concurrency(policy: &str, job_id: Option<&str>) -> PyResult<Concurrency> {
+        let cancellable = match policy {
+            "pull-requests" => "github.event_name == 'pull_request'",
+            // events like `schedule` have no repository in their payload, so without a known
+            // default branch a run is never cancelled
+            "branches" => {
+                "github.event.repository.default_branch \
+                 && github.ref != format('refs/heads/{0}', github.event.repository.default_branch) \
+                 && !startsWith(github.ref, 'refs/tags/')"
+            }
+            other => {
+                return Err(PyValueError::new_err(format!(
+                    "Unknown concurrency policy '{other}', expected 'pull-requests' or 'branches'"
+                )));
+            }
+        };
+        let run = format!("{cancellable} && github.ref || github.run_id");
+        let group = match job_id {
+            Some(job_id) => {
+                format!("${{{{ format('{{0}}-{job_id}-{{1}}', github.workflow, {run}) }}}}")
+            }
+            None => format!("${{{{ format('{{0}}-{{1}}', github.workflow, {run}) }}}}"),
+        };
+        let group = parse_raw_string_expression(&group)?
+            .ok_or_else(|| PyRuntimeError::new_err("Invalid concurrency group expression"))?;
+        let cancel_in_progress =
+            parse_raw_boolean_expression(&format!("${{{{ {cancellable} }}}}"))?
+                .ok_or_else(|| PyRuntimeError::new_err("Invalid cancel-in-progress expression"))?;
+        Ok(Concurrency::new(
+            Either::A(group),
+            Some(Either::A(cancel_in_progress)),
+        ))
     }
 
-    fn validate_string_map(values: &PyMap<String, StringLike>, allowed: Allowed) -> PyResult<()> {
-        for (_, value) in values.iter() {
-            validate_string_like(value, allowed)?;
-        }
-        Ok(())
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct RunDefaults {
+        shell: Option<StringLike>,
+        working_directory: Option<StringLike>,
     }
+    #[pymethods]
+    impl RunDefaults {
+        #[new]
+        #[pyo3(signature = (*, shell=None, working_directory=None))]
+        fn new(shell: Option<StringLike>, working_directory: Option<StringLike>) -> Self {
+            Self {
+                shell,
+                working_directory,
+            }
+        }
 
-    fn validate_string_vec(values: &[StringLike], allowed: Allowed) -> PyResult<()> {
-        for value in values {
-            validate_string_like(value, allowed)?;
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "RunDefaults")
         }
-        Ok(())
     }
-
-    fn validate_runs_on(runs_on: &RunsOn) -> PyResult<()> {
-        match runs_on {
-            RunsOn::String(value) => validate_string_like(value, ALLOWED_JOB_RUNS_ON),
-            RunsOn::Array(values) => validate_string_vec(values, ALLOWED_JOB_RUNS_ON),
-            RunsOn::Spec(spec) => match &spec.options {
-                RunsOnSpecOptions::Group(group) => validate_string_like(group, ALLOWED_JOB_RUNS_ON),
-                RunsOnSpecOptions::Labels(labels) => {
-                    validate_string_like(labels, ALLOWED_JOB_RUNS_ON)
-                }
-                RunsOnSpecOptions::GroupAndLabels(group, labels) => {
-                    validate_string_like(group, ALLOWED_JOB_RUNS_ON)?;
-                    validate_string_like(labels, ALLOWED_JOB_RUNS_ON)
-                }
-            },
+    impl MaybeYamlable for &RunDefaults {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("shell", &self.shell);
+            out.insert_yaml_opt("working-directory", &self.working_directory);
+            if out.is_empty() {
+                None
+            } else {
+                Some(Yaml::Hash(out))
+            }
         }
     }
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Defaults {
+        defaults: Option<PyMap<String, String>>,
+        run_defaults: Option<RunDefaults>,
+    }
+    #[pymethods]
+    impl Defaults {
+        #[new]
+        #[pyo3(signature = (*, defaults=None, run_defaults=None))]
+        fn new(defaults: Option<PyMap<String, String>>, run_defaults: Option<RunDefaults>) -> Self {
+            Self {
+                defaults,
+                run_defaults,
+            }
+        }
 
-    fn validate_with_opts(opts: &Bound<'_, PyDict>, allowed: Allowed) -> PyResult<()> {
-        for (_, value) in opts.iter() {
-            if let Ok(expr) = value.extract::<BooleanExpression>() {
-                expr.validate_allowed(allowed)?;
-            } else if let Ok(expr) = value.extract::<StringExpression>() {
-                expr.validate_allowed(allowed)?;
-            } else if let Ok(expr) = value.extract::<NumberExpression>() {
-                expr.validate_allowed(allowed)?;
-            } else if let Ok(expr) = value.extract::<ArrayExpression>() {
-                expr.validate_allowed(allowed)?;
-            } else if let Ok(expr) = value.extract::<ObjectExpression>() {
-                expr.validate_allowed(allowed)?;
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Defaults")
+        }
+    }
+    impl MaybeYamlable for &Defaults {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            let mut out = Hash::new();
+            if let Some(run_defaults) = &self.run_defaults {
+                out.insert_yaml_opt("run", run_defaults.maybe_as_yaml());
+            }
+            out.insert_yaml_opt("defaults", &self.defaults);
+            if out.is_empty() {
+                None
+            } else {
+                Some(Yaml::Hash(out))
             }
         }
-        Ok(())
     }
 
-    fn validate_step_options(
-        name: Option<&StringLike>,
-        condition: Option<&Either<BooleanExpression, String>>,
-        working_directory: Option<&StringLike>,
-        env: Option<&PyMap<String, StringLike>>,
-        continue_on_error: Option<&BoolLike>,
-        timeout_minutes: Option<&IntLike>,
-    ) -> PyResult<()> {
-        if let Some(name) = name {
-            validate_string_like(name, ALLOWED_STEP_NAME)?;
+    /// GitHub's maximum number of jobs generated by a single matrix.
+    const MATRIX_JOB_LIMIT: usize = 256;
+
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Matrix {
+        matrix: Option<Hash>,
+        include: Option<Array>,
+        exclude: Option<Array>,
+    }
+    #[pymethods]
+    impl Matrix {
+        #[new]
+        #[pyo3(signature = (*, include = None, exclude = None, **matrix))]
+        fn new(
+            include: Option<&Bound<'_, PyList>>,
+            exclude: Option<&Bound<'_, PyList>>,
+            matrix: Option<&Bound<'_, PyDict>>,
+        ) -> PyResult<Self> {
+            Ok(Self {
+                matrix: matrix
+                    .map(|m| {
+                        let mut hash = Hash::new();
+                        for (k, v) in m.iter() {
+                            hash.insert_yaml(k.try_as_yaml()?, v.try_as_yaml()?);
+                        }
+                        Ok::<Hash, PyErr>(hash)
+                    })
+                    .transpose()?,
+                include: include
+                    .map(|i| {
+                        let mut arr = Array::new();
+                        for v in i.iter() {
+                            arr.push_yaml(v.try_as_yaml()?);
+                        }
+                        Ok::<Array, PyErr>(arr)
+                    })
+                    .transpose()?,
+                exclude: exclude
+                    .map(|e| {
+                        let mut arr = Array::new();
+                        for v in e.iter() {
+                            arr.push_yaml(v.try_as_yaml()?);
+                        }
+                        Ok::<Array, PyErr>(arr)
+                    })
+                    .transpose()?,
+            })
         }
-        if let Some(condition) = condition {
-            validate_condition(condition, ALLOWED_STEP_IF)?;
+
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
         }
-        if let Some(working_directory) = working_directory {
-            validate_string_like(working_directory, ALLOWED_STEP_WORKING_DIRECTORY)?;
+
+        /// Compute the job combinations GitHub will run for this matrix.
+        ///
+        /// The combinations are the product of the matrix values, minus any which match an
+        /// ``exclude`` entry. Each ``include`` entry is then added to every combination whose
+        /// original values it does not overwrite, or appended as a new combination if there is
+        /// none.
+        ///
+        /// Parameters
+        /// ----------
+        /// warn_at
+        ///     Emit a warning if the matrix expands to at least this many jobs. A warning is always
+        ///     emitted above GitHub's limit of 256 jobs per matrix.
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If a matrix value is an expression (or otherwise not a list), or an ``include`` or
+        ///     ``exclude`` entry is not a mapping, since these can only be expanded by GitHub.
+        ///
+        /// Returns
+        /// -------
+        /// list of dict
+        ///     The matrix values of each job.
+        #[pyo3(signature = (*, warn_at = 200))]
+        fn expand<'py>(&self, py: Python<'py>, warn_at: usize) -> PyResult<Vec<Bound<'py, PyAny>>> {
+            let combinations = self.combinations()?;
+            let count = combinations.len();
+            let message = if count > MATRIX_JOB_LIMIT {
+                Some(format!(
+                    "Matrix expands to {count} jobs, more than GitHub's limit of {MATRIX_JOB_LIMIT}"
+                ))
+            } else if count >= warn_at {
+                Some(format!(
+                    "Matrix expands to {count} jobs, close to GitHub's limit of {MATRIX_JOB_LIMIT}"
+                ))
+            } else {
+                None
+            };
+            if let Some(message) = message {
+                let category = py.get_type::<PyUserWarning>();
+                PyErr::warn(py, &category, &CString::new(message)?, 1)?;
+            }
+            combinations
+                .into_iter()
+                .map(|combination| yaml_to_py(py, &Yaml::Hash(combination), "matrix"))
+                .collect()
         }
-        if let Some(env) = env {
-            validate_string_map(env, ALLOWED_STEP_ENV)?;
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Matrix")
         }
-        if let Some(continue_on_error) = continue_on_error {
-            validate_bool_like(continue_on_error, ALLOWED_STEP_CONTINUE_ON_ERROR)?;
+    }
+    impl Matrix {
+        fn combinations(&self) -> PyResult<Vec<Hash>> {
+            let mut axes = Vec::new();
+            for (key, values) in self.matrix.iter().flatten() {
+                let Yaml::Array(values) = values else {
+                    return Err(PyValueError::new_err(format!(
+                        "Matrix value '{}' is not a list and cannot be expanded locally",
+                        key.as_str().unwrap_or_default()
+                    )));
+                };
+                axes.push((key, values));
+            }
+            let mut combinations = if axes.is_empty() {
+                Vec::new()
+            } else {
+                vec![Hash::new()]
+            };
+            for (key, values) in &axes {
+                combinations = combinations
+                    .iter()
+                    .flat_map(|combination| {
+                        values.iter().map(|value| {
+                            let mut combination = combination.clone();
+                            combination.insert((*key).clone(), value.clone());
+                            combination
+                        })
+                    })
+                    .collect();
+            }
+            let entries = |list: &Option<Array>, name: &str| -> PyResult<Vec<Hash>> {
+                list.iter()
+                    .flatten()
+                    .map(|entry| match entry {
+                        Yaml::Hash(entry) => Ok(entry.clone()),
+                        _ => Err(PyValueError::new_err(format!(
+                            "Matrix {name} entries must be mappings to be expanded locally"
+                        ))),
+                    })
+                    .collect()
+            };
+            let exclude = entries(&self.exclude, "exclude")?;
+            combinations.retain(|combination| {
+                !exclude.iter().any(|entry| {
+                    entry
+                        .iter()
+                        .all(|(key, value)| combination.get(key) == Some(value))
+                })
+            });
+            let originals = combinations.len();
+            let is_axis = |key: &Yaml| axes.iter().any(|(axis, _)| *axis == key);
+            for entry in entries(&self.include, "include")? {
+                let mut added = false;
+                for combination in &mut combinations[..originals] {
+                    // original matrix values are never overwritten, but added values may be
+                    if entry
+                        .iter()
+                        .all(|(key, value)| !is_axis(key) || combination.get(key) == Some(value))
+                    {
+                        for (key, value) in &entry {
+                            match combination.get_mut(key) {
+                                Some(existing) => *existing = value.clone(),
+                                None => {
+                                    combination.insert(key.clone(), value.clone());
+                                }
+                            }
+                        }
+                        added = true;
+                    }
+                }
+                if !added {
+                    combinations.push(entry);
+                }
+            }
+            Ok(combinations)
         }
-        if let Some(timeout_minutes) = timeout_minutes {
-            validate_int_like(timeout_minutes, ALLOWED_STEP_TIMEOUT_MINUTES)?;
+    }
+    impl Yamlable for &Matrix {
+        fn as_yaml(&self) -> Yaml {
+            let mut matrix = self.matrix.clone().unwrap_or_default();
+            matrix.insert_yaml_opt("include", &self.include);
+            matrix.insert_yaml_opt("exclude", &self.exclude);
+            Yaml::Hash(matrix)
         }
-        Ok(())
     }
 
-    fn validate_container_for_job(container: &Container) -> PyResult<()> {
-        validate_string_like(&container.image, ALLOWED_JOB_CONTAINER_IMAGE)?;
-        if let Some(options) = &container.options {
-            validate_string_like(options, ALLOWED_JOB_CONTAINER)?;
-        }
-        if let Some(volumes) = &container.volumes {
-            validate_string_vec(volumes, ALLOWED_JOB_CONTAINER)?;
-        }
-        if let Some(ports) = &container.ports {
-            for port in ports {
-                validate_int_like(port, ALLOWED_JOB_CONTAINER)?;
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Strategy {
+        matrix: Option<Matrix>,
+        fast_fail: Option<BoolLike>,
+        max_parallel: Option<IntLike>,
+    }
+    #[pymethods]
+    impl Strategy {
+        #[new]
+        #[pyo3(signature = (*, matrix = None, fast_fail = None, max_parallel = None))]
+        fn new(
+            // TODO: prevent invalid state where all are None
+            matrix: Option<Matrix>,
+            fast_fail: Option<BoolLike>,
+            max_parallel: Option<IntLike>,
+        ) -> Self {
+            Self {
+                matrix,
+                fast_fail,
+                max_parallel,
             }
         }
-        if let Some(credentials) = &container.credentials {
-            validate_string_like(&credentials.username, ALLOWED_JOB_CONTAINER_CREDENTIALS)?;
-            validate_string_like(&credentials.password, ALLOWED_JOB_CONTAINER_CREDENTIALS)?;
-        }
-        if let Some(env) = &container.env {
-            validate_string_map(env, ALLOWED_JOB_CONTAINER_ENV)?;
-        }
-        Ok(())
-    }
 
-    fn validate_container_for_service(container: &Container) -> PyResult<()> {
-        validate_string_like(&container.image, ALLOWED_JOB_SERVICES)?;
-        if let Some(options) = &container.options {
-            validate_string_like(options, ALLOWED_JOB_SERVICES)?;
-        }
-        if let Some(volumes) = &container.volumes {
-            validate_string_vec(volumes, ALLOWED_JOB_SERVICES)?;
-        }
-        if let Some(ports) = &container.ports {
-            for port in ports {
-                validate_int_like(port, ALLOWED_JOB_SERVICES)?;
-            }
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
         }
-        if let Some(credentials) = &container.credentials {
-            validate_string_like(&credentials.username, ALLOWED_JOB_SERVICES_CREDENTIALS)?;
-            validate_string_like(&credentials.password, ALLOWED_JOB_SERVICES_CREDENTIALS)?;
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Strategy")
         }
-        if let Some(env) = &container.env {
-            validate_string_map(env, ALLOWED_JOB_SERVICES_ENV)?;
+    }
+    impl Yamlable for &Strategy {
+        fn as_yaml(&self) -> Yaml {
+            let mut strategy = Hash::new();
+            strategy.insert_yaml_opt("matrix", &self.matrix);
+            strategy.insert_yaml_opt("fail-fast", &self.fast_fail);
+            strategy.insert_yaml_opt("max-parallel", &self.max_parallel);
+            Yaml::Hash(strategy)
         }
-        Ok(())
     }
 
-    fn validate_concurrency(concurrency: &Concurrency, allowed: Allowed) -> PyResult<()> {
-        validate_string_like(&concurrency.group, allowed)?;
-        if let Some(cancel_in_progress) = &concurrency.cancel_in_progress {
-            validate_bool_like(cancel_in_progress, allowed)?;
-        }
-        Ok(())
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Credentials {
+        username: StringLike,
+        password: StringLike,
     }
+    #[pymethods]
+    impl Credentials {
+        #[new]
+        fn new(username: StringLike, password: StringLike) -> Self {
+            Self { username, password }
+        }
 
-    fn validate_environment(environment: &Environment) -> PyResult<()> {
-        validate_string_like(&environment.name, ALLOWED_JOB_ENVIRONMENT)?;
-        if let Some(url) = &environment.url {
-            validate_string_like(url, ALLOWED_JOB_ENVIRONMENT_URL)?;
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Credentials")
         }
-        Ok(())
     }
-    impl TryYamlable for Bound<'_, PyAny> {
-        fn try_as_yaml(&self) -> PyResult<Yaml> {
-            if self.is_none() {
-                Ok(Yaml::Null)
-            } else if let Ok(e) = self.extract::<StringExpression>() {
-                Ok((&e).as_yaml())
-            } else if let Ok(e) = self.extract::<BooleanExpression>() {
-                Ok((&e).as_yaml())
-            } else if let Ok(e) = self.extract::<NumberExpression>() {
-                Ok((&e).as_yaml())
-            } else if self.is_instance_of::<PyBool>() {
-                Ok(self.extract::<bool>()?.as_yaml())
-            } else if self.is_instance_of::<PyInt>() {
-                Ok(self.extract::<i64>()?.as_yaml())
-            } else if self.is_instance_of::<PyFloat>() {
-                Ok(self.extract::<f64>()?.as_yaml())
-            } else if self.is_instance_of::<PyString>() {
-                Ok(self.extract::<String>()?.as_yaml())
-            } else if let Ok(list) = self.cast::<PyList>() {
-                Ok(Yaml::Array(list.try_as_array()?))
-            } else if let Ok(dict) = self.cast::<PyDict>() {
-                Ok(Yaml::Hash(dict.try_as_hash()?))
-            } else {
-                Err(PyValueError::new_err("Invalid value"))
-            }
+    impl Yamlable for &Credentials {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            out.insert_yaml("username", &self.username);
+            out.insert_yaml("password", &self.password);
+            Yaml::Hash(out)
         }
     }
 
-    impl TryHash for Bound<'_, PyDict> {
-        fn try_as_hash(&self) -> PyResult<Hash> {
-            let mut dict_internals = Hash::new();
-            for (key, entry) in self.iter() {
-                if let Ok(key) = key.extract::<String>() {
-                    dict_internals.insert_yaml(key, entry.try_as_yaml()?);
-                } else {
-                    return Err(PyValueError::new_err("Invalid key"));
-                }
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct Container {
+        image: StringLike,
+        credentials: Option<Credentials>,
+        env: Option<PyMap<String, StringLike>>,
+        ports: Option<Vec<IntLike>>,
+        volumes: Option<Vec<StringLike>>,
+        options: Option<StringLike>,
+    }
+    #[pymethods]
+    impl Container {
+        #[new]
+        #[pyo3(signature = (image, *, credentials = None, env = None, ports = None, volumes = None, options = None))]
+        fn new(
+            image: StringLike,
+            credentials: Option<Credentials>,
+            env: Option<PyMap<String, StringLike>>,
+            ports: Option<Vec<IntLike>>,
+            volumes: Option<Vec<StringLike>>,
+            options: Option<StringLike>,
+        ) -> Self {
+            Self {
+                image,
+                credentials,
+                env,
+                ports,
+                volumes,
+                options,
             }
-            Ok(dict_internals)
         }
-    }
 
-    impl TryArray for Bound<'_, PyList> {
-        fn try_as_array(&self) -> PyResult<Vec<Yaml>> {
-            let mut list_internals = Vec::new();
-            for entry in self.iter() {
-                list_internals.push(entry.try_as_yaml()?);
-            }
-            Ok(list_internals)
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
         }
-    }
 
-    #[derive(Clone)]
-    struct WithArgs {
-        options: Option<Hash>,
-        args: Option<StringLike>,
-        entrypoint: Option<StringLike>,
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Container")
+        }
     }
-
-    impl Yamlable for WithArgs {
+    impl Yamlable for &Container {
         fn as_yaml(&self) -> Yaml {
-            let mut entries = self.options.clone().unwrap_or_default();
-            entries.insert_yaml_opt("args", &self.args);
-            entries.insert_yaml_opt("entrypoint", &self.entrypoint);
-            Yaml::Hash(entries)
+            let mut out = Hash::new();
+            out.insert_yaml("image", &self.image);
+            out.insert_yaml_opt("credentials", &self.credentials);
+            out.insert_yaml_opt("env", &self.env);
+            out.insert_yaml_opt("ports", &self.ports);
+            out.insert_yaml_opt("volumes", &self.volumes);
+            out.insert_yaml_opt("options", &self.options);
+            Yaml::Hash(out)
         }
     }
 
-    #[derive(Clone)]
-    enum StepAction {
-        Run(StringLike),
-        Action {
-            uses: String,
-            with: Option<WithArgs>,
-        },
+    #[derive(Clone, PartialEq)]
+    enum JobSecretsOptions {
+        Secrets(HashMap<String, StringLike>),
+        Inherit,
     }
-    impl StepAction {
-        fn uses(&self) -> Option<String> {
-            match self {
-                StepAction::Run(_) => None,
-                StepAction::Action { uses, .. } => Some(uses.clone()),
-            }
-        }
-        fn with(&self) -> Option<WithArgs> {
-            match self {
-                StepAction::Run(_) => None,
-                StepAction::Action { with, .. } => with.clone(),
+    #[pyclass]
+    #[derive(Clone, PartialEq)]
+    struct JobSecrets {
+        options: JobSecretsOptions,
+    }
+    #[pymethods]
+    impl JobSecrets {
+        #[new]
+        fn new(secrets: HashMap<String, StringLike>) -> Self {
+            Self {
+                options: JobSecretsOptions::Secrets(secrets),
             }
         }
-        fn run(&self) -> Option<&StringLike> {
-            match self {
-                StepAction::Run(script) => Some(script),
-                StepAction::Action { .. } => None,
+        #[staticmethod]
+        fn inherit() -> Self {
+            Self {
+                options: JobSecretsOptions::Inherit,
             }
         }
-    }
-
-    #[pyclass(subclass)]
-    #[derive(Clone)]
-    struct Step {
-        name: Option<StringLike>,
-        step_action: StepAction,
-        options: StepOptions,
-        recommended_permissions: Option<Permissions>,
-        skip_recommended_permissions: bool,
-    }
-
-    #[derive(Clone)]
-    struct StepOptions {
-        condition: Option<Either<BooleanExpression, String>>,
-        working_directory: Option<StringLike>,
-        shell: Option<String>,
-        id: Option<String>,
-        env: Option<PyMap<String, StringLike>>,
-        continue_on_error: Option<BoolLike>,
-        timeout_minutes: Option<IntLike>,
-    }
 
-    #[pymethods]
-    impl Step {
         fn __str__(&self) -> PyResult<String> {
             self.as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "JobSecrets")
+        }
     }
-    impl Yamlable for Step {
+    impl Yamlable for &JobSecrets {
         fn as_yaml(&self) -> Yaml {
-            let mut entries = Hash::new();
-            entries.insert_yaml_opt("name", &self.name);
-            entries.insert_yaml_opt("if", &self.options.condition);
-            entries.insert_yaml_opt("uses", self.step_action.uses());
-            entries.insert_yaml_opt("with", self.step_action.with());
-            entries.insert_yaml_opt("run", self.step_action.run());
-            entries.insert_yaml_opt("working-directory", &self.options.working_directory);
-            entries.insert_yaml_opt("shell", &self.options.shell);
-            entries.insert_yaml_opt("id", &self.options.id);
-            entries.insert_yaml_opt("env", &self.options.env);
-            entries.insert_yaml_opt("continue-on-error", &self.options.continue_on_error);
-            entries.insert_yaml_opt("timeout-minutes", &self.options.timeout_minutes);
-            Yaml::Hash(entries)
+            match &self.options {
+                JobSecretsOptions::Secrets(s) => {
+                    let mut hash = Hash::new();
+                    for (k, v) in s {
+                        hash.insert_yaml(k, v);
+                    }
+                    Yaml::Hash(hash)
+                }
+                JobSecretsOptions::Inherit => Yaml::String("inherit".to_string()),
+            }
         }
     }
-    fn collect_script_lines(script: Vec<StringLike>) -> StringLike {
-        let lines = script
-            .into_iter()
-            .map(|line| match line {
-                Either::A(expr) => expr.as_expression_string(),
-                Either::B(raw) => raw,
-            })
-            .collect::<Vec<String>>()
-            .join("\n");
-        Either::B(lines)
-    }
 
-    /// Generate a `Step` from a list of shell commands.
-    ///
-    /// Parameters
-    /// ----------
-    /// *script
-    ///     A list of shell commands to run in sequence. These will be concatenated with newlines
-    ///     and passed as the ``run`` key of the generated step. Note that this must not exceed
-    ///     21,000 characters in total.
-    /// name
-    ///     The name of the step to display on GitHub.
-    /// condition
-    ///     A boolean expression which must be met for the step to run. Note that this represents the ``if`` key in the actual YAML file.
-    /// working_directory
-    ///     Specifies the directory in which the script is run.
-    /// shell
-    ///     Used to override the default shell settings of the runner's OS (or `Job`/`Workflow` defaults).
-    /// id
-    ///     A unique identifier for the step which can be referenced in expressions.
-    /// env
-    ///     Used to specify environment variables for the step.
-    /// permissions
-    ///     Recommended permissions required to run this script. These are merged into the
-    ///     job permissions when ``use_recommended_permissions`` is True.
-    /// continue_on_error
-    ///     Prevents the job from failing if this step fails.
-    /// timeout_minutes
-    ///     The maximum number of minutes to let the step run before GitHub automatically cancels it (defaults to 360 if not specified).
+    /// A job in a `Workflow`.
     ///
-    #[pyfunction]
-    #[pyo3(signature = (*script, name = None, condition = None, working_directory = None, shell = None, id = None, env = None, permissions = None, continue_on_error = None, timeout_minutes= None))]
-    fn script(
-        script: &Bound<'_, PyTuple>,
+    /// Like `Step`, the data is shared through an `Arc` and copied on write.
+    #[pyclass]
+    #[derive(Clone)]
+    struct Job(Arc<JobData>);
+
+    #[derive(Clone, PartialEq)]
+    struct JobData {
         name: Option<StringLike>,
+        /// The effective permissions, including recommendations merged in from the steps.
+        permissions: Option<Permissions>,
+        requested_permissions: Option<Permissions>,
+        use_recommended_permissions: bool,
+        needs: Option<Vec<String>>,
         condition: Option<Either<BooleanExpression, String>>,
-        working_directory: Option<StringLike>,
-        shell: Option<String>,
-        id: Option<String>,
+        runs_on: Option<RunsOn>,
+        snapshot: Option<String>,
+        environment: Option<Environment>,
+        concurrency: Option<Concurrency>,
+        outputs: Option<PyMap<String, StringLike>>,
         env: Option<PyMap<String, StringLike>>,
-        permissions: Option<Permissions>,
-        continue_on_error: Option<BoolLike>,
+        defaults: Option<Defaults>,
+        steps: Option<Vec<Step>>,
         timeout_minutes: Option<IntLike>,
-    ) -> PyResult<Step> {
-        let script = script
-            .iter()
-            .map(|item| item.extract::<StringLike>())
-            .collect::<PyResult<Vec<StringLike>>>()?;
-        for line in &script {
-            validate_string_like(line, ALLOWED_STEP_RUN)?;
+        strategy: Option<Strategy>,
+        continue_on_error: Option<Either<StringLike, BoolLike>>,
+        container: Option<Container>,
+        services: Option<PyMap<String, Container>>,
+        uses: Option<String>,
+        with: Option<Hash>,
+        secrets: Option<JobSecrets>,
+    }
+    impl PartialEq for Job {
+        fn eq(&self, other: &Self) -> bool {
+            Arc::ptr_eq(&self.0, &other.0) || *self.0 == *other.0
         }
-        validate_step_options(
-            name.as_ref(),
-            condition.as_ref(),
-            working_directory.as_ref(),
-            env.as_ref(),
-            continue_on_error.as_ref(),
-            timeout_minutes.as_ref(),
-        )?;
-        let script = collect_script_lines(script);
-        Ok(Step {
-            name,
-            step_action: StepAction::Run(script),
-            options: StepOptions {
-                condition,
-                working_directory,
-                shell,
-                id,
-                env,
-                continue_on_error,
-                timeout_minutes,
-            },
-            recommended_permissions: permissions,
-            skip_recommended_permissions: false,
-        })
     }
-    fn make_action(
-        name: Option<StringLike>,
-        action: &str,
-        r#ref: Option<String>,
-        with_opts: Option<Hash>,
-        args: Option<StringLike>,
-        entrypoint: Option<StringLike>,
-        condition: Option<Either<BooleanExpression, String>>,
-        id: Option<String>,
-        env: Option<PyMap<String, StringLike>>,
-        continue_on_error: Option<BoolLike>,
-        timeout_minutes: Option<IntLike>,
-        skip_recommended_permissions: bool,
-        recommended_permissions: Option<Permissions>,
-    ) -> PyResult<Step> {
-        validate_step_options(
-            name.as_ref(),
-            condition.as_ref(),
-            None,
-            env.as_ref(),
-            continue_on_error.as_ref(),
-            timeout_minutes.as_ref(),
-        )?;
-        if let Some(args) = &args {
-            validate_string_like(args, ALLOWED_STEP_WITH)?;
+    impl From<JobData> for Job {
+        fn from(data: JobData) -> Self {
+            Self(Arc::new(data))
         }
-        if let Some(entrypoint) = &entrypoint {
-            validate_string_like(entrypoint, ALLOWED_STEP_WITH)?;
+    }
+    impl Deref for Job {
+        type Target = JobData;
+        fn deref(&self) -> &JobData {
+            &self.0
         }
-        let with_args = if with_opts.is_some() || args.is_some() || entrypoint.is_some() {
-            Some(WithArgs {
-                options: with_opts,
-                args,
-                entrypoint,
-            })
-        } else {
-            None
-        };
-        Ok(Step {
-            name,
-            step_action: StepAction::Action {
-                uses: format!(
-                    "{}{}",
-                    action,
-                    r#ref.map(|s| format!("@{s}")).unwrap_or_default()
-                ),
-                with: with_args,
-            },
-            options: StepOptions {
-                condition,
-                working_directory: None,
-                shell: None,
-                id,
-                env,
-                continue_on_error,
-                timeout_minutes,
-            },
-            recommended_permissions,
-            skip_recommended_permissions,
-        })
     }
-
-    /// Generate a `Step` from a reusable unit of code called an action.
-    ///
-    /// Parameters
-    /// ----------
-    /// name
-    ///     The name of the step to display on GitHub.
-    /// action
-    ///     The location of the action's public GitHub repository (a string of the form {owner}/{repo}).
-    /// ref
-    ///     The branch, ref, or SHA of the action's repository to use. This is used to specify a specific version of an action.
-    /// with_opts
-    ///     A map of input parameters for the action. These are passed as the ``with`` key of the generated step.
-    /// args
-    ///     The inputs for a Docker container which are passed to the container's entrypoint. This
-    ///     is a subkey of the ``with`` key of the generated step.
-    /// entrypoint
-    ///     Overrides the Docker ENTRYPOINT in the action's Dockerfile or sets one if it was not
-    ///     specified. Accepts a single string defining the executable to run (note that this is
-    ///     different from Docker's ENTRYPOINT instruction which has both a shell and exec form).
-    ///     This is a subkey of the ``with`` key of the generated step.
-    /// condition
-    ///     A boolean expression which must be met for the step to run. Note that this represents the ``if`` key in the actual YAML file.
-    /// id
-    ///     A unique identifier for the step which can be referenced in expressions.
-    /// env
-    ///     Used to specify environment variables for the step.
-    /// continue_on_error
-    ///     Prevents the job from failing if this step fails.
-    /// timeout_minutes
-    ///     The maximum number of minutes to let the step run before GitHub automatically cancels it (defaults to 360 if not specified).
-    /// skip_recommended_permissions
-    ///     If True, ignore this step's recommended permissions when merging job permissions.
-    /// recommended_permissions
-    ///     Recommended permissions required to run this action.
-    ///
-    #[pyfunction]
-    #[pyo3(signature = (name, action, *, r#ref = None, with_opts = None, args = None, entrypoint = None, condition = None, id = None, env = None, continue_on_error = None, timeout_minutes = None, skip_recommended_permissions = false, recommended_permissions = None))]
-    fn action(
-        name: Option<StringLike>,
-        action: &str,
-        r#ref: Option<String>,
-        with_opts: Option<Bound<PyDict>>,
-        args: Option<StringLike>,
-        entrypoint: Option<StringLike>,
-        condition: Option<Either<BooleanExpression, String>>,
-        id: Option<String>,
-        env: Option<PyMap<String, StringLike>>,
-        continue_on_error: Option<BoolLike>,
-        timeout_minutes: Option<IntLike>,
-        skip_recommended_permissions: bool,
-        recommended_permissions: Option<Permissions>,
-    ) -> PyResult<Step> {
-        if let Some(with_opts) = &with_opts {
-            validate_with_opts(with_opts, ALLOWED_STEP_WITH)?;
+    impl DerefMut for Job {
+        fn deref_mut(&mut self) -> &mut JobData {
+            Arc::make_mut(&mut self.0)
         }
-        make_action(
-            name,
-            action,
-            r#ref,
-            with_opts.map(|d| d.try_as_hash()).transpose()?,
-            args,
-            entrypoint,
-            condition,
-            id,
-            env,
-            continue_on_error,
-            timeout_minutes,
-            skip_recommended_permissions,
-            recommended_permissions,
-        )
     }
-
-    #[pyclass(extends=Step, subclass)]
-    struct ActionStep;
+    // TODO: support mapping syntax for snapshot argument
     #[pymethods]
-    impl ActionStep {
+    impl Job {
+        /// A set of `Step`s which runs in an isolated environemnt.
+        ///
+        /// All `Job`s in a `Workflow` run in parallel by default, but dependencies can be created
+        /// with the ``needs`` argument. `Job`s may also specify the ``uses`` argument to call
+        /// another reusable workflow rather than a set of `Step`s. Note that exactly one of ``runs_on`` or ``uses`` must be specified, and a `Job` which specifies ``uses`` may not have any ``steps``.
+        ///
+        /// Parameters
+        /// ----------
+        /// steps
+        ///     The set of `Step`s to run sequentially.
+        /// name
+        ///     The name of the job displayed in the GitHub UI.
+        /// permissions
+        ///     The permissions granted to the ``GITHUB_TOKEN`` for this job.
+        /// use_recommended_permissions
+        ///     Merge recommended permissions from steps into this job's permissions.
+        /// needs
+        ///     A list of `Job`s which must complete successfully before this job will run.
+        /// condition
+        ///     A condition which must be met for this job to run. Note that this represents the ``if`` key in the actual YAML file.
+        /// runs_on
+        ///     The type of machine on which the job will run (e.g. ``'ubuntu-latest'``)
+        /// snapshot
+        ///     Used to generate a custom image.
+        /// environment
+        ///     Used to define the environment which the job references. This is often used for trusted publishing.
+        /// concurrency
+        ///     The concurrency group for this job. Only a single `Job` or `Workflow` using the
+        ///     same concurrency group will run at a time.
+        /// outputs
+        ///     Used to create a set of outputs available to all downstream jobs which depend on this job.
+        /// env
+        ///     A map of environment variables available to all steps in the job.
+        /// defaults
+        ///     A map of default settings which apply to all steps in the job.
+        /// timeout_minutes
+        ///     The maximum number of minutes to let a job run before GitHub automatically cancels it (defaults to 360 if not specified).
+        /// strategy
+        ///     Used to create a matrix strategy for a job, generating multiple jobs from a single one based on combinations of matrix variables.
+        /// continue_on_error
+        ///     If True, this job's failure will not trigger workflow failure (or cause other matrix strategy jobs to fail if ``fail-fast`` is enabled).
+        /// container
+        ///     Used to create a container to run any steps of a job which do not already specify one.
+        /// services
+        ///     Used to host service containers for a job.
+        /// uses
+        ///     Used to specify the location and version of a reusable workflow file to run as a
+        ///     job. Such a job will not specify ``runs_on`` or ``steps``.
+        /// with_opts
+        ///     A map of inputs which are passed to a reusable workflow job specified by ``uses``. Note that this represents the ``with`` key in the actual YAML file.
+        /// secrets
+        ///     A map of secrets passed to a resulable workflow job specified by ``uses``.
         #[new]
-        #[pyo3(signature = (name, action, *, r#ref = None, with_opts = None, args = None, entrypoint = None, condition = None, id = None, env = None, continue_on_error = None, timeout_minutes = None, skip_recommended_permissions = false, recommended_permissions = None))]
+        #[pyo3(signature = (*, steps=None, name=None, permissions=None, use_recommended_permissions=true, needs=None, condition=None, runs_on=None, snapshot=None, environment=None, concurrency=None, outputs=None, env=None, defaults=None, timeout_minutes=None, strategy=None, continue_on_error=None, container=None, services=None, uses=None, with_opts=None, secrets=None))]
         fn new(
+            steps: Option<Vec<Step>>,
             name: Option<StringLike>,
-            action: &str,
-            r#ref: Option<String>,
-            with_opts: Option<Bound<PyDict>>,
-            args: Option<StringLike>,
-            entrypoint: Option<StringLike>,
+            permissions: Option<Permissions>,
+            use_recommended_permissions: bool,
+            needs: Option<Vec<String>>,
             condition: Option<Either<BooleanExpression, String>>,
-            id: Option<String>,
+            runs_on: Option<RunsOn>,
+            snapshot: Option<String>,
+            environment: Option<Environment>,
+            concurrency: Option<Concurrency>,
+            outputs: Option<PyMap<String, StringLike>>,
             env: Option<PyMap<String, StringLike>>,
-            continue_on_error: Option<BoolLike>,
+            defaults: Option<Defaults>,
             timeout_minutes: Option<IntLike>,
-            skip_recommended_permissions: bool,
-            recommended_permissions: Option<Permissions>,
-        ) -> PyResult<(Self, Step)> {
-            if let Some(with_opts) = &with_opts {
-                validate_with_opts(with_opts, ALLOWED_STEP_WITH)?;
-            }
-            let step = make_action(
+            strategy: Option<Strategy>,
+            continue_on_error: Option<Either<StringLike, BoolLike>>,
+            container: Option<Container>,
+            services: Option<PyMap<String, Container>>,
+            uses: Option<String>,
+            with_opts: Option<Bound<PyDict>>,
+            secrets: Option<JobSecrets>,
+        ) -> PyResult<Self> {
+            let mut job = Self::from(JobData {
                 name,
-                action,
-                r#ref,
-                with_opts.map(|d| d.try_as_hash()).transpose()?,
-                args,
-                entrypoint,
+                permissions: None,
+                requested_permissions: permissions,
+                use_recommended_permissions,
+                needs,
                 condition,
-                id,
+                runs_on,
+                snapshot,
+                environment,
+                concurrency,
+                outputs,
                 env,
-                continue_on_error,
+                defaults,
+                steps,
                 timeout_minutes,
-                skip_recommended_permissions,
-                recommended_permissions,
-            )?;
-            Ok((ActionStep, step))
-        }
-    }
-
-    #[derive(Clone, Copy)]
-    enum ReadWriteNonePermission {
-        Read,
-        Write,
-        None,
-    }
-    impl FromStr for ReadWriteNonePermission {
-        type Err = PyErr;
-        fn from_str(s: &str) -> Result<Self, Self::Err> {
-            match s.to_lowercase().as_str() {
-                "read" => Ok(Self::Read),
-                "write" => Ok(Self::Write),
-                "none" => Ok(Self::None),
-                _ => Err(PyValueError::new_err("Invalid permission")),
+                strategy,
+                continue_on_error,
+                container,
+                services,
+                uses,
+                with: None,
+                secrets,
+            });
+            job.validate_shape()?;
+            for field in Self::FIELDS {
+                job.validate_field(field)?;
+            }
+            if let Some(with_opts) = &with_opts {
+                validate_with_opts(with_opts, ALLOWED_JOB_WITH)?;
+                job.with = Some(with_opts.try_as_hash()?);
             }
+            job.merge_recommended_permissions();
+            Ok(job)
         }
-    }
-    impl Yamlable for &ReadWriteNonePermission {
-        fn as_yaml(&self) -> Yaml {
-            match self {
-                ReadWriteNonePermission::Read => "read",
-                ReadWriteNonePermission::Write => "write",
-                ReadWriteNonePermission::None => "none",
+        /// Return a copy of the job with the given fields replaced.
+        ///
+        /// Only the replaced fields are validated. Keyword arguments are the same as those of
+        /// the `Job` constructor.
+        ///
+        /// Returns
+        /// -------
+        /// Job
+        ///
+        #[pyo3(signature = (**changes))]
+        fn replace(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            let mut job = self.clone();
+            let Some(changes) = changes else {
+                return Ok(job);
+            };
+            let mut merge_permissions = false;
+            for (key, value) in changes.iter() {
+                let field = key.extract::<String>()?;
+                match field.as_str() {
+                    "steps" => {
+                        job.steps = value.extract()?;
+                        merge_permissions = true;
+                    }
+                    "name" => job.name = value.extract()?,
+                    "permissions" => {
+                        job.requested_permissions = value.extract()?;
+                        merge_permissions = true;
+                    }
+                    "use_recommended_permissions" => {
+                        job.use_recommended_permissions = value.extract()?;
+                        merge_permissions = true;
+                    }
+                    "needs" => job.needs = value.extract()?,
+                    "condition" => job.condition = value.extract()?,
+                    "runs_on" => job.runs_on = value.extract()?,
+                    "snapshot" => job.snapshot = value.extract()?,
+                    "environment" => job.environment = value.extract()?,
+                    "concurrency" => job.concurrency = value.extract()?,
+                    "outputs" => job.outputs = value.extract()?,
+                    "env" => job.env = value.extract()?,
+                    "defaults" => job.defaults = value.extract()?,
+                    "timeout_minutes" => job.timeout_minutes = value.extract()?,
+                    "strategy" => job.strategy = value.extract()?,
+                    "continue_on_error" => job.continue_on_error = value.extract()?,
+                    "container" => job.container = value.extract()?,
+                    "services" => job.services = value.extract()?,
+                    "uses" => job.uses = value.extract()?,
+                    "with_opts" => {
+                        let with_opts = value.extract::<Option<Bound<PyDict>>>()?;
+                        if let Some(with_opts) = &with_opts {
+                            validate_with_opts(with_opts, ALLOWED_JOB_WITH)?;
+                        }
+                        job.with = with_opts.map(|w| w.try_as_hash()).transpose()?;
+                    }
+                    "secrets" => job.secrets = value.extract()?,
+                    _ => {
+                        return Err(PyTypeError::new_err(format!(
+                            "Job.replace() got an unexpected keyword argument '{field}'"
+                        )));
+                    }
+                }
+                job.validate_field(&field)?;
             }
-            .as_yaml()
+            job.validate_shape()?;
+            if merge_permissions {
+                job.merge_recommended_permissions();
+            }
+            Ok(job)
+        }
+        /// An alias of `Job.replace`.
+        #[pyo3(signature = (**changes))]
+        fn evolve(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            self.replace(changes)
+        }
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        /// Pickle the job (and support `copy.deepcopy`) through its binary encoding.
+        ///
+        /// The job and its steps are encoded by value, so steps it shares with other jobs are
+        /// unpickled as separate (equal) copies.
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Job")
         }
     }
-    #[derive(Clone, Copy)]
-    enum WriteNonePermission {
-        Write,
-        None,
-    }
-    impl FromStr for WriteNonePermission {
-        type Err = PyErr;
-        fn from_str(s: &str) -> Result<Self, Self::Err> {
-            match s.to_lowercase().as_str() {
-                "write" => Ok(Self::Write),
-                "none" => Ok(Self::None),
-                _ => Err(PyValueError::new_err("Invalid permission")),
+    impl Job {
+        /// Fields whose expressions are checked against the contexts they allow.
+        const FIELDS: [&str; 14] = [
+            "name",
+            "condition",
+            "runs_on",
+            "environment",
+            "concurrency",
+            "outputs",
+            "env",
+            "defaults",
+            "strategy",
+            "timeout_minutes",
+            "continue_on_error",
+            "container",
+            "services",
+            "secrets",
+        ];
+
+        /// Check that exactly one of ``uses`` and ``runs_on`` is set, and that ``steps`` match.
+        fn validate_shape(&self) -> PyResult<()> {
+            match (&self.uses, &self.runs_on) {
+                (Some(_), Some(_)) => {
+                    return Err(PyValueError::new_err(
+                        "Job cannot set both 'uses' and 'runs_on'",
+                    ));
+                }
+                (None, None) => {
+                    return Err(PyValueError::new_err(
+                        "Job must set either 'uses' or 'runs_on'",
+                    ));
+                }
+                _ => {}
+            }
+            if self.uses.is_some() {
+                if let Some(steps) = &self.steps
+                    && !steps.is_empty()
+                {
+                    return Err(PyValueError::new_err(
+                        "Job using 'uses' cannot define 'steps'",
+                    ));
+                }
+            } else {
+                match &self.steps {
+                    Some(steps) if !steps.is_empty() => {}
+                    _ => {
+                        return Err(PyValueError::new_err(
+                            "Job with 'runs_on' must define at least one step",
+                        ));
+                    }
+                }
             }
+            Ok(())
         }
-    }
-    impl Yamlable for &WriteNonePermission {
-        fn as_yaml(&self) -> Yaml {
-            match self {
-                WriteNonePermission::Write => "write",
-                WriteNonePermission::None => "none",
+
+        /// Check the expressions in a single field (named as in the constructor).
+        fn validate_field(&self, field: &str) -> PyResult<()> {
+            match field {
+                "name" => {
+                    if let Some(name) = &self.name {
+                        validate_string_like(name, ALLOWED_JOB_NAME)?;
+                    }
+                }
+                "condition" => {
+                    if let Some(condition) = &self.condition {
+                        validate_condition(condition, ALLOWED_JOB_IF)?;
+                    }
+                }
+                "runs_on" => {
+                    if let Some(runs_on) = &self.runs_on {
+                        validate_runs_on(runs_on)?;
+                    }
+                }
+                "environment" => {
+                    if let Some(environment) = &self.environment {
+                        validate_environment(environment)?;
+                    }
+                }
+                "concurrency" => {
+                    if let Some(concurrency) = &self.concurrency {
+                        validate_concurrency(concurrency, ALLOWED_JOB_CONCURRENCY)?;
+                    }
+                }
+                "outputs" => {
+                    if let Some(outputs) = &self.outputs {
+                        validate_string_map(outputs, ALLOWED_JOB_OUTPUTS)?;
+                    }
+                }
+                "env" => {
+                    if let Some(env) = &self.env {
+                        validate_string_map(env, ALLOWED_JOB_ENV)?;
+                    }
+                }
+                "defaults" => {
+                    if let Some(defaults) = &self.defaults
+                        && let Some(run_defaults) = &defaults.run_defaults
+                    {
+                        if let Some(shell) = &run_defaults.shell {
+                            validate_string_like(shell, ALLOWED_JOB_DEFAULTS_RUN)?;
+                        }
+                        if let Some(working_directory) = &run_defaults.working_directory {
+                            validate_string_like(working_directory, ALLOWED_JOB_DEFAULTS_RUN)?;
+                        }
+                    }
+                }
+                "strategy" => {
+                    if let Some(strategy) = &self.strategy {
+                        if let Some(fast_fail) = &strategy.fast_fail {
+                            validate_bool_like(fast_fail, ALLOWED_JOB_STRATEGY)?;
+                        }
+                        if let Some(max_parallel) = &strategy.max_parallel {
+                            validate_int_like(max_parallel, ALLOWED_JOB_STRATEGY)?;
+                        }
+                    }
+                }
+                "timeout_minutes" => {
+                    if let Some(timeout_minutes) = &self.timeout_minutes {
+                        validate_int_like(timeout_minutes, ALLOWED_JOB_TIMEOUT_MINUTES)?;
+                    }
+                }
+                "continue_on_error" => match &self.continue_on_error {
+                    Some(Either::A(string_like)) => {
+                        validate_string_like(string_like, ALLOWED_JOB_CONTINUE_ON_ERROR)?;
+                    }
+                    Some(Either::B(bool_like)) => {
+                        validate_bool_like(bool_like, ALLOWED_JOB_CONTINUE_ON_ERROR)?;
+                    }
+                    None => {}
+                },
+                "container" => {
+                    if let Some(container) = &self.container {
+                        validate_container_for_job(container)?;
+                    }
+                }
+                "services" => {
+                    if let Some(services) = &self.services {
+                        for (_, container) in services.iter() {
+                            validate_container_for_service(container)?;
+                        }
+                    }
+                }
+                "secrets" => {
+                    if let Some(secrets) = &self.secrets
+                        && let JobSecretsOptions::Secrets(values) = &secrets.options
+                    {
+                        for value in values.values() {
+                            validate_string_like(value, ALLOWED_JOB_SECRETS)?;
+                        }
+                    }
+                }
+                _ => {}
             }
-            .as_yaml()
+            Ok(())
         }
-    }
-    #[derive(Clone, Copy)]
-    enum ReadNonePermission {
-        Read,
-        None,
-    }
-    impl FromStr for ReadNonePermission {
-        type Err = PyErr;
-        fn from_str(s: &str) -> Result<Self, Self::Err> {
-            match s.to_lowercase().as_str() {
-                "read" => Ok(Self::Read),
-                "none" => Ok(Self::None),
-                _ => Err(PyValueError::new_err("Invalid permission")),
+
+        /// Recompute ``permissions`` from the requested permissions and the recommendations of
+        /// the job's steps.
+        fn merge_recommended_permissions(&mut self) {
+            let mut permissions = self.requested_permissions.clone();
+            if self.use_recommended_permissions
+                && let Some(steps) = &self.steps
+            {
+                let mut saw_recommendation = false;
+                let mut merged: Option<Permissions> = None;
+                for step in steps {
+                    if step.skip_recommended_permissions {
+                        continue;
+                    }
+                    if let Some(step_permissions) = &step.recommended_permissions {
+                        saw_recommendation = true;
+                        merged = Some(match &merged {
+                            Some(current) => merge_permissions(current, step_permissions),
+                            None => step_permissions.clone(),
+                        });
+                    }
+                }
+                if saw_recommendation {
+                    let mut merged = merged.unwrap_or_else(Permissions::none);
+                    if is_empty_individual_permissions(&merged) {
+                        merged = Permissions::none();
+                    }
+                    permissions = Some(match permissions {
+                        Some(current) => merge_permissions(&current, &merged),
+                        None => merged,
+                    });
+                }
+            }
+            self.permissions = permissions;
+        }
+
+        /// A copy of the job with unreachable steps removed, or `None` if the job can never run.
+        fn pruned(&self, context: &Value) -> Option<Self> {
+            let mut job = self.clone();
+            match known_condition(&job.condition, context) {
+                Some(false) => return None,
+                Some(true) => job.condition = None,
+                None => {}
+            }
+            if let Some(steps) = &self.steps {
+                let outcomes: Vec<Option<bool>> = steps
+                    .iter()
+                    .map(|step| known_condition(&step.options.condition, context))
+                    .collect();
+                // untouched steps (and jobs) keep sharing their data
+                if outcomes.iter().any(Option::is_some) {
+                    let kept: Vec<Step> = steps
+                        .iter()
+                        .zip(outcomes)
+                        .filter_map(|(step, outcome)| match outcome {
+                            Some(false) => None,
+                            Some(true) => {
+                                let mut step = step.clone();
+                                step.options.condition = None;
+                                Some(step)
+                            }
+                            None => Some(step.clone()),
+                        })
+                        .collect();
+                    // a job whose steps are all skipped still runs (and succeeds), so keep it
+                    // as it is rather than leave it without steps
+                    if !kept.is_empty() {
+                        job.steps = Some(kept);
+                    }
+                }
             }
+            Some(job)
         }
     }
-    impl Yamlable for &ReadNonePermission {
+    impl Yamlable for &Job {
         fn as_yaml(&self) -> Yaml {
-            match self {
-                ReadNonePermission::Read => "read",
-                ReadNonePermission::None => "none",
+            let mut out = Hash::new();
+            out.insert_yaml_opt("name", &self.name);
+            out.insert_yaml_opt("permissions", self.permissions.as_ref());
+            out.insert_yaml_opt("needs", &self.needs);
+            out.insert_yaml_opt("if", &self.condition);
+            out.insert_yaml_opt("runs-on", &self.runs_on);
+            out.insert_yaml_opt("snapshot", &self.snapshot);
+            out.insert_yaml_opt("environment", &self.environment);
+            out.insert_yaml_opt("concurrency", &self.concurrency);
+            out.insert_yaml_opt("outputs", &self.outputs);
+            out.insert_yaml_opt("env", &self.env);
+            if let Some(defaults) = &self.defaults {
+                out.insert_yaml_opt("defaults", defaults.maybe_as_yaml());
             }
-            .as_yaml()
+            out.insert_yaml_opt("strategy", &self.strategy);
+            out.insert_yaml_opt("steps", &self.steps);
+            out.insert_yaml_opt("timeout-minutes", &self.timeout_minutes);
+            out.insert_yaml_opt("continue-on-error", &self.continue_on_error);
+            out.insert_yaml_opt("container", &self.container);
+            out.insert_yaml_opt("services", &self.services);
+            out.insert_yaml_opt("uses", &self.uses);
+            out.insert_yaml_opt("with", self.with.clone().map(Yaml::Hash));
+            out.insert_yaml_opt("secrets", &self.secrets);
+            Yaml::Hash(out)
         }
     }
 
-    #[derive(Clone)]
-    struct IndividualPermissions {
-        actions: Option<ReadWriteNonePermission>,
-        artifact_metadata: Option<ReadWriteNonePermission>,
-        attestations: Option<ReadWriteNonePermission>,
-        checks: Option<ReadWriteNonePermission>,
-        contents: Option<ReadWriteNonePermission>,
-        deployments: Option<ReadWriteNonePermission>,
-        id_token: Option<WriteNonePermission>,
-        issues: Option<ReadWriteNonePermission>,
-        models: Option<ReadNonePermission>,
-        discussions: Option<ReadWriteNonePermission>,
-        packages: Option<ReadWriteNonePermission>,
-        pages: Option<ReadWriteNonePermission>,
-        pull_requests: Option<ReadWriteNonePermission>,
-        security_events: Option<ReadWriteNonePermission>,
-        statuses: Option<ReadWriteNonePermission>,
-    }
-    impl IndividualPermissions {
-        fn is_empty(&self) -> bool {
-            self.actions.is_none()
-                && self.artifact_metadata.is_none()
-                && self.attestations.is_none()
-                && self.checks.is_none()
-                && self.contents.is_none()
-                && self.deployments.is_none()
-                && self.id_token.is_none()
-                && self.issues.is_none()
-                && self.models.is_none()
-                && self.discussions.is_none()
-                && self.packages.is_none()
-                && self.pages.is_none()
-                && self.pull_requests.is_none()
-                && self.security_events.is_none()
-                && self.statuses.is_none()
-        }
-    }
-    #[derive(Clone)]
-    enum PermissionsOptions {
-        Individual(IndividualPermissions),
-        ReadAll,
-        WriteAll,
-        None,
-    }
     #[pyclass]
     #[derive(Clone)]
-    struct Permissions {
-        options: PermissionsOptions,
+    struct BranchProtectionRuleEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
     }
     #[pymethods]
-    impl Permissions {
+    impl BranchProtectionRuleEvent {
         #[new]
-        #[pyo3(signature= (actions=None, artifact_metadata=None, attestations=None, checks=None, contents=None, deployments=None, id_token=None, issues=None, models=None, discussions=None, packages=None, pages=None, pull_requests=None, security_events=None, statuses=None))]
-        fn new(
-            actions: Option<String>,
-            artifact_metadata: Option<String>,
-            attestations: Option<String>,
-            checks: Option<String>,
-            contents: Option<String>,
-            deployments: Option<String>,
-            id_token: Option<String>,
-            issues: Option<String>,
-            models: Option<String>,
-            discussions: Option<String>,
-            packages: Option<String>,
-            pages: Option<String>,
-            pull_requests: Option<String>,
-            security_events: Option<String>,
-            statuses: Option<String>,
-        ) -> PyResult<Self> {
-            Ok(Self {
-                options: PermissionsOptions::Individual(IndividualPermissions {
-                    actions: actions.map(|s| s.parse()).transpose()?,
-                    artifact_metadata: artifact_metadata.map(|s| s.parse()).transpose()?,
-                    attestations: attestations.map(|s| s.parse()).transpose()?,
-                    checks: checks.map(|s| s.parse()).transpose()?,
-                    contents: contents.map(|s| s.parse()).transpose()?,
-                    deployments: deployments.map(|s| s.parse()).transpose()?,
-                    id_token: id_token.map(|s| s.parse()).transpose()?,
-                    issues: issues.map(|s| s.parse()).transpose()?,
-                    models: models.map(|s| s.parse()).transpose()?,
-                    discussions: discussions.map(|s| s.parse()).transpose()?,
-                    packages: packages.map(|s| s.parse()).transpose()?,
-                    pages: pages.map(|s| s.parse()).transpose()?,
-                    pull_requests: pull_requests.map(|s| s.parse()).transpose()?,
-                    security_events: security_events.map(|s| s.parse()).transpose()?,
-                    statuses: statuses.map(|s| s.parse()).transpose()?,
-                }),
-            })
-        }
-        #[staticmethod]
-        fn none() -> Self {
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
+        fn new(created: bool, edited: bool, deleted: bool) -> Self {
             Self {
-                options: PermissionsOptions::None,
+                created,
+                edited,
+                deleted,
             }
         }
-        #[staticmethod]
-        fn read_all() -> Self {
-            Self {
-                options: PermissionsOptions::ReadAll,
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "BranchProtectionRuleEvent")
+        }
+    }
+    impl MaybeYamlable for &BranchProtectionRuleEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
         }
-        #[staticmethod]
-        fn write_all() -> Self {
+    }
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct CheckRunEvent {
+        created: bool,
+        rerequested: bool,
+        completed: bool,
+        requested_action: bool,
+    }
+    #[pymethods]
+    impl CheckRunEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false, rerequested=false, completed=false, requested_action=false))]
+        fn new(created: bool, rerequested: bool, completed: bool, requested_action: bool) -> Self {
             Self {
-                options: PermissionsOptions::WriteAll,
+                created,
+                rerequested,
+                completed,
+                requested_action,
             }
         }
+
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "CheckRunEvent")
         }
     }
-    impl Yamlable for &Permissions {
-        fn as_yaml(&self) -> Yaml {
-            match &self.options {
-                PermissionsOptions::Individual(indiv_perms) => {
-                    let mut permissions = Hash::new();
-                    permissions.insert_yaml_opt("actions", &indiv_perms.actions);
-                    permissions
-                        .insert_yaml_opt("artifact-metadata", &indiv_perms.artifact_metadata);
-                    permissions.insert_yaml_opt("attestations", &indiv_perms.attestations);
-                    permissions.insert_yaml_opt("checks", &indiv_perms.checks);
-                    permissions.insert_yaml_opt("contents", &indiv_perms.contents);
-                    permissions.insert_yaml_opt("deployments", &indiv_perms.deployments);
-                    permissions.insert_yaml_opt("id-token", &indiv_perms.id_token);
-                    permissions.insert_yaml_opt("issues", &indiv_perms.issues);
-                    permissions.insert_yaml_opt("models", &indiv_perms.models);
-                    permissions.insert_yaml_opt("discussion", &indiv_perms.discussions);
-                    permissions.insert_yaml_opt("packages", &indiv_perms.packages);
-                    permissions.insert_yaml_opt("pages", &indiv_perms.pages);
-                    permissions.insert_yaml_opt("pull-requests", &indiv_perms.pull_requests);
-                    permissions.insert_yaml_opt("security-events", &indiv_perms.security_events);
-                    permissions.insert_yaml_opt("statuses", &indiv_perms.statuses);
-                    Yaml::Hash(permissions)
-                }
-                PermissionsOptions::ReadAll => "read-all".as_yaml(),
-                PermissionsOptions::WriteAll => "write-all".as_yaml(),
-                PermissionsOptions::None => Yaml::Hash(Hash::new()), // TODO: test
+    impl MaybeYamlable for &CheckRunEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.rerequested || self.completed || self.requested_action {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("rerequested", self.rerequested);
+                arr.push_yaml_cond("completed", self.completed);
+                arr.push_yaml_cond("requested_action", self.requested_action);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
         }
     }
 
-    fn max_read_write_none(
-        left: ReadWriteNonePermission,
-        right: ReadWriteNonePermission,
-    ) -> ReadWriteNonePermission {
-        match (left, right) {
-            (ReadWriteNonePermission::Write, _) | (_, ReadWriteNonePermission::Write) => {
-                ReadWriteNonePermission::Write
-            }
-            (ReadWriteNonePermission::Read, _) | (_, ReadWriteNonePermission::Read) => {
-                ReadWriteNonePermission::Read
-            }
-            _ => ReadWriteNonePermission::None,
+    #[pyclass]
+    #[derive(Clone)]
+    struct CheckSuiteEvent {
+        created: bool,
+    }
+    #[pymethods]
+    impl CheckSuiteEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false))]
+        fn new(created: bool) -> Self {
+            Self { created }
+        }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "CheckSuiteEvent")
         }
     }
-    fn max_write_none(
-        left: WriteNonePermission,
-        right: WriteNonePermission,
-    ) -> WriteNonePermission {
-        match (left, right) {
-            (WriteNonePermission::Write, _) | (_, WriteNonePermission::Write) => {
-                WriteNonePermission::Write
+    impl MaybeYamlable for &CheckSuiteEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
-            _ => WriteNonePermission::None,
         }
     }
-    fn max_read_none(left: ReadNonePermission, right: ReadNonePermission) -> ReadNonePermission {
-        match (left, right) {
-            (ReadNonePermission::Read, _) | (_, ReadNonePermission::Read) => {
-                ReadNonePermission::Read
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct DiscussionEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
+        transferred: bool,
+        pinned: bool,
+        unpinned: bool,
+        labeled: bool,
+        unlabeled: bool,
+        locked: bool,
+        unlocked: bool,
+        category_changed: bool,
+        answered: bool,
+        unanswered: bool,
+    }
+    #[pymethods]
+    impl DiscussionEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false, transferred=false, pinned=false, unpinned=false, labeled=false, unlabeled=false, locked=false, unlocked=false, category_changed=false, answered=false, unanswered=false))]
+        fn new(
+            created: bool,
+            edited: bool,
+            deleted: bool,
+            transferred: bool,
+            pinned: bool,
+            unpinned: bool,
+            labeled: bool,
+            unlabeled: bool,
+            locked: bool,
+            unlocked: bool,
+            category_changed: bool,
+            answered: bool,
+            unanswered: bool,
+        ) -> Self {
+            Self {
+                created,
+                edited,
+                deleted,
+                transferred,
+                pinned,
+                unpinned,
+                labeled,
+                unlabeled,
+                locked,
+                unlocked,
+                category_changed,
+                answered,
+                unanswered,
             }
-            _ => ReadNonePermission::None,
         }
-    }
-    fn merge_rw_opt(
-        left: Option<ReadWriteNonePermission>,
-        right: Option<ReadWriteNonePermission>,
-    ) -> Option<ReadWriteNonePermission> {
-        match (left, right) {
-            (None, None) => None,
-            (Some(value), None) | (None, Some(value)) => Some(value),
-            (Some(left), Some(right)) => Some(max_read_write_none(left, right)),
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
         }
-    }
-    fn merge_write_opt(
-        left: Option<WriteNonePermission>,
-        right: Option<WriteNonePermission>,
-    ) -> Option<WriteNonePermission> {
-        match (left, right) {
-            (None, None) => None,
-            (Some(value), None) | (None, Some(value)) => Some(value),
-            (Some(left), Some(right)) => Some(max_write_none(left, right)),
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "DiscussionEvent")
         }
     }
-    fn merge_read_opt(
-        left: Option<ReadNonePermission>,
-        right: Option<ReadNonePermission>,
-    ) -> Option<ReadNonePermission> {
-        match (left, right) {
-            (None, None) => None,
-            (Some(value), None) | (None, Some(value)) => Some(value),
-            (Some(left), Some(right)) => Some(max_read_none(left, right)),
+    impl MaybeYamlable for &DiscussionEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created
+                || self.edited
+                || self.deleted
+                || self.transferred
+                || self.pinned
+                || self.unpinned
+                || self.labeled
+                || self.unlabeled
+                || self.locked
+                || self.unlocked
+                || self.category_changed
+                || self.answered
+                || self.unanswered
+            {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                arr.push_yaml_cond("transferred", self.transferred);
+                arr.push_yaml_cond("pinned", self.pinned);
+                arr.push_yaml_cond("unpinned", self.unpinned);
+                arr.push_yaml_cond("labeled", self.labeled);
+                arr.push_yaml_cond("unlabeled", self.unlabeled);
+                arr.push_yaml_cond("locked", self.locked);
+                arr.push_yaml_cond("unlocked", self.unlocked);
+                arr.push_yaml_cond("category_changed", self.category_changed);
+                arr.push_yaml_cond("answered", self.answered);
+                arr.push_yaml_cond("unanswered", self.unanswered);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
         }
     }
-    fn merge_individual(
-        left: &IndividualPermissions,
-        right: &IndividualPermissions,
-    ) -> IndividualPermissions {
-        IndividualPermissions {
-            actions: merge_rw_opt(left.actions, right.actions),
-            artifact_metadata: merge_rw_opt(left.artifact_metadata, right.artifact_metadata),
-            attestations: merge_rw_opt(left.attestations, right.attestations),
-            checks: merge_rw_opt(left.checks, right.checks),
-            contents: merge_rw_opt(left.contents, right.contents),
-            deployments: merge_rw_opt(left.deployments, right.deployments),
-            id_token: merge_write_opt(left.id_token, right.id_token),
-            issues: merge_rw_opt(left.issues, right.issues),
-            models: merge_read_opt(left.models, right.models),
-            discussions: merge_rw_opt(left.discussions, right.discussions),
-            packages: merge_rw_opt(left.packages, right.packages),
-            pages: merge_rw_opt(left.pages, right.pages),
-            pull_requests: merge_rw_opt(left.pull_requests, right.pull_requests),
-            security_events: merge_rw_opt(left.security_events, right.security_events),
-            statuses: merge_rw_opt(left.statuses, right.statuses),
-        }
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct DiscussionCommentEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
     }
-    fn individual_from_permissions(permissions: &Permissions) -> IndividualPermissions {
-        match &permissions.options {
-            PermissionsOptions::Individual(indiv) => indiv.clone(),
-            PermissionsOptions::None => IndividualPermissions {
-                actions: None,
-                artifact_metadata: None,
-                attestations: None,
-                checks: None,
-                contents: None,
-                deployments: None,
-                id_token: None,
-                issues: None,
-                models: None,
-                discussions: None,
-                packages: None,
-                pages: None,
-                pull_requests: None,
-                security_events: None,
-                statuses: None,
-            },
-            PermissionsOptions::ReadAll => IndividualPermissions {
-                actions: Some(ReadWriteNonePermission::Read),
-                artifact_metadata: Some(ReadWriteNonePermission::Read),
-                attestations: Some(ReadWriteNonePermission::Read),
-                checks: Some(ReadWriteNonePermission::Read),
-                contents: Some(ReadWriteNonePermission::Read),
-                deployments: Some(ReadWriteNonePermission::Read),
-                id_token: Some(WriteNonePermission::None),
-                issues: Some(ReadWriteNonePermission::Read),
-                models: Some(ReadNonePermission::Read),
-                discussions: Some(ReadWriteNonePermission::Read),
-                packages: Some(ReadWriteNonePermission::Read),
-                pages: Some(ReadWriteNonePermission::Read),
-                pull_requests: Some(ReadWriteNonePermission::Read),
-                security_events: Some(ReadWriteNonePermission::Read),
-                statuses: Some(ReadWriteNonePermission::Read),
-            },
-            PermissionsOptions::WriteAll => IndividualPermissions {
-                actions: Some(ReadWriteNonePermission::Write),
-                artifact_metadata: Some(ReadWriteNonePermission::Write),
-                attestations: Some(ReadWriteNonePermission::Write),
-                checks: Some(ReadWriteNonePermission::Write),
-                contents: Some(ReadWriteNonePermission::Write),
-                deployments: Some(ReadWriteNonePermission::Write),
-                id_token: Some(WriteNonePermission::Write),
-                issues: Some(ReadWriteNonePermission::Write),
-                models: Some(ReadNonePermission::Read),
-                discussions: Some(ReadWriteNonePermission::Write),
-                packages: Some(ReadWriteNonePermission::Write),
-                pages: Some(ReadWriteNonePermission::Write),
-                pull_requests: Some(ReadWriteNonePermission::Write),
-                security_events: Some(ReadWriteNonePermission::Write),
-                statuses: Some(ReadWriteNonePermission::Write),
-            },
+    #[pymethods]
+    impl DiscussionCommentEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
+        fn new(created: bool, edited: bool, deleted: bool) -> Self {
+            Self {
+                created,
+                edited,
+                deleted,
+            }
         }
-    }
-    fn merge_permissions(left: &Permissions, right: &Permissions) -> Permissions {
-        match (&left.options, &right.options) {
-            (PermissionsOptions::WriteAll, _) | (_, PermissionsOptions::WriteAll) => Permissions {
-                options: PermissionsOptions::WriteAll,
-            },
-            (PermissionsOptions::None, PermissionsOptions::None) => Permissions {
-                options: PermissionsOptions::None,
-            },
-            (
-                PermissionsOptions::ReadAll,
-                PermissionsOptions::None | PermissionsOptions::ReadAll,
-            )
-            | (PermissionsOptions::None, PermissionsOptions::ReadAll) => Permissions {
-                options: PermissionsOptions::ReadAll,
-            },
-            _ => Permissions {
-                options: PermissionsOptions::Individual(merge_individual(
-                    &individual_from_permissions(left),
-                    &individual_from_permissions(right),
-                )),
-            },
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "DiscussionCommentEvent")
         }
     }
-    fn is_empty_individual_permissions(permissions: &Permissions) -> bool {
-        match &permissions.options {
-            PermissionsOptions::Individual(indiv) => indiv.is_empty(),
-            _ => false,
+    impl MaybeYamlable for &DiscussionCommentEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
         }
     }
 
+    #[pyclass]
     #[derive(Clone)]
-    enum RunsOnSpecOptions {
-        Group(StringLike),
-        Labels(StringLike),
-        GroupAndLabels(StringLike, StringLike),
+    struct ImageVersionEvent {
+        names: Option<Vec<String>>,
+        versions: Option<Vec<String>>,
+    }
+    #[pymethods]
+    impl ImageVersionEvent {
+        #[new]
+        #[pyo3(signature = (*, names=None, versions=None))]
+        fn new(names: Option<Vec<String>>, versions: Option<Vec<String>>) -> Self {
+            let names = names.filter(|v| !v.is_empty());
+            let versions = versions.filter(|v| !v.is_empty());
+            Self { names, versions }
+        }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "ImageVersionEvent")
+        }
+    }
+    impl MaybeYamlable for &ImageVersionEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.names.is_some() || self.versions.is_some() {
+                let mut out = Hash::new();
+                out.insert_yaml_opt("names", self.names.as_ref());
+                out.insert_yaml_opt("versions", self.versions.as_ref());
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
+        }
     }
+
     #[pyclass]
     #[derive(Clone)]
-    struct RunsOnSpec {
-        options: RunsOnSpecOptions,
+    struct IssueCommentEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
     }
     #[pymethods]
-    impl RunsOnSpec {
+    impl IssueCommentEvent {
         #[new]
-        fn new(group: StringLike, labels: StringLike) -> Self {
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
+        fn new(created: bool, edited: bool, deleted: bool) -> Self {
             Self {
-                options: RunsOnSpecOptions::GroupAndLabels(group, labels),
+                created,
+                edited,
+                deleted,
             }
         }
-        #[staticmethod]
-        fn group(group: StringLike) -> Self {
-            Self {
-                options: RunsOnSpecOptions::Group(group),
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "IssueCommentEvent")
+        }
+    }
+    impl MaybeYamlable for &IssueCommentEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
         }
-        #[staticmethod]
-        fn labels(labels: StringLike) -> Self {
+    }
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct IssuesEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
+        transferred: bool,
+        pinned: bool,
+        unpinned: bool,
+        closed: bool,
+        reopened: bool,
+        assigned: bool,
+        unassigned: bool,
+        labeled: bool,
+        unlabeled: bool,
+        locked: bool,
+        unlocked: bool,
+        milestoned: bool,
+        demilestoned: bool,
+        typed: bool,
+        untyped: bool,
+    }
+    #[pymethods]
+    impl IssuesEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false,  transferred=false, pinned=false, unpinned=false, closed=false, reopened=false, assigned=false, unassigned=false, labeled=false, unlabeled=false, locked=false, unlocked=false, milestoned=false, demilestoned=false, typed=false, untyped=false))]
+        fn new(
+            created: bool,
+            edited: bool,
+            deleted: bool,
+            transferred: bool,
+            pinned: bool,
+            unpinned: bool,
+            closed: bool,
+            reopened: bool,
+            assigned: bool,
+            unassigned: bool,
+            labeled: bool,
+            unlabeled: bool,
+            locked: bool,
+            unlocked: bool,
+            milestoned: bool,
+            demilestoned: bool,
+            typed: bool,
+            untyped: bool,
+        ) -> Self {
             Self {
-                options: RunsOnSpecOptions::Labels(labels),
+                created,
+                edited,
+                deleted,
+                transferred,
+                pinned,
+                unpinned,
+                closed,
+                reopened,
+                assigned,
+                unassigned,
+                labeled,
+                unlabeled,
+                locked,
+                unlocked,
+                milestoned,
+                demilestoned,
+                typed,
+                untyped,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "IssuesEvent")
         }
     }
-    impl Yamlable for &RunsOnSpec {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            match &self.options {
-                RunsOnSpecOptions::Group(group) => out.insert_yaml("group", group),
-                RunsOnSpecOptions::Labels(labels) => out.insert_yaml("labels", labels),
-                RunsOnSpecOptions::GroupAndLabels(group, labels) => {
-                    out.insert_yaml("group", group);
-                    out.insert_yaml("labels", labels);
-                }
+    impl MaybeYamlable for &IssuesEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created
+                || self.edited
+                || self.deleted
+                || self.transferred
+                || self.pinned
+                || self.unpinned
+                || self.closed
+                || self.reopened
+                || self.assigned
+                || self.unassigned
+                || self.labeled
+                || self.unlabeled
+                || self.locked
+                || self.unlocked
+                || self.milestoned
+                || self.demilestoned
+                || self.typed
+                || self.untyped
+            {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                arr.push_yaml_cond("transferred", self.transferred);
+                arr.push_yaml_cond("pinned", self.pinned);
+                arr.push_yaml_cond("unpinned", self.unpinned);
+                arr.push_yaml_cond("closed", self.closed);
+                arr.push_yaml_cond("reopened", self.reopened);
+                arr.push_yaml_cond("assigned", self.assigned);
+                arr.push_yaml_cond("unassigned", self.unassigned);
+                arr.push_yaml_cond("labeled", self.labeled);
+                arr.push_yaml_cond("unlabeled", self.unlabeled);
+                arr.push_yaml_cond("locked", self.locked);
+                arr.push_yaml_cond("unlocked", self.unlocked);
+                arr.push_yaml_cond("milestoned", self.milestoned);
+                arr.push_yaml_cond("demilestoned", self.demilestoned);
+                arr.push_yaml_cond("typed", self.typed);
+                arr.push_yaml_cond("untyped", self.untyped);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
-            Yaml::Hash(out)
         }
     }
 
+    #[pyclass]
     #[derive(Clone)]
-    enum RunsOn {
-        String(StringLike),
-        Array(Vec<StringLike>),
-        Spec(RunsOnSpec),
+    struct LabelEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
     }
-    impl<'a, 'py> FromPyObject<'a, 'py> for RunsOn {
-        type Error = PyErr;
-
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            if let Ok(spec) = obj.extract::<RunsOnSpec>() {
-                Ok(Self::Spec(spec))
-            } else if let Ok(list) = obj.extract::<Vec<StringLike>>() {
-                Ok(Self::Array(list))
-            } else if let Ok(single) = obj.extract::<StringLike>() {
-                Ok(Self::String(single))
-            } else {
-                Err(PyValueError::new_err(
-                    "Expected a 'RunsOnSpec', list of strings, or a single string",
-                ))
+    #[pymethods]
+    impl LabelEvent {
+        #[new]
+        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
+        fn new(created: bool, edited: bool, deleted: bool) -> Self {
+            Self {
+                created,
+                edited,
+                deleted,
             }
         }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "LabelEvent")
+        }
     }
-    impl Yamlable for &RunsOn {
-        fn as_yaml(&self) -> Yaml {
-            match self {
-                RunsOn::String(s) => s.as_yaml(),
-                RunsOn::Array(l) => l.as_yaml(),
-                RunsOn::Spec(spec) => spec.as_yaml(),
+    impl MaybeYamlable for &LabelEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Environment {
-        name: StringLike,
-        url: Option<StringLike>,
+    struct MergeGroupEvent {
+        checks_requested: bool,
     }
     #[pymethods]
-    impl Environment {
+    impl MergeGroupEvent {
         #[new]
-        #[pyo3(signature = (name, url = None))]
-        fn new(name: StringLike, url: Option<StringLike>) -> Self {
-            Self { name, url }
+        #[pyo3(signature = (*, checks_requested=false))]
+        fn new(checks_requested: bool) -> Self {
+            Self { checks_requested }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "MergeGroupEvent")
         }
     }
-    impl Yamlable for &Environment {
-        fn as_yaml(&self) -> Yaml {
-            if let Some(url) = &self.url {
-                let mut sub = Hash::new();
-                sub.insert_yaml("name", &self.name);
-                sub.insert_yaml("url", url);
-                Yaml::Hash(sub)
+    impl MaybeYamlable for &MergeGroupEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.checks_requested {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("checks_requested", self.checks_requested);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
             } else {
-                self.name.as_yaml()
+                None
             }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Concurrency {
-        group: StringLike,
-        cancel_in_progress: Option<BoolLike>,
+    struct MilestoneEvent {
+        created: bool,
+        closed: bool,
+        opened: bool,
+        edited: bool,
+        deleted: bool,
     }
     #[pymethods]
-    impl Concurrency {
+    impl MilestoneEvent {
         #[new]
-        #[pyo3(signature = (group, *, cancel_in_progress=None))]
-        fn new(group: StringLike, cancel_in_progress: Option<BoolLike>) -> Self {
+        #[pyo3(signature = (*, created=false, closed=false, opened=false, edited=false, deleted=false))]
+        fn new(created: bool, closed: bool, opened: bool, edited: bool, deleted: bool) -> Self {
             Self {
-                group,
-                cancel_in_progress,
+                created,
+                closed,
+                opened,
+                edited,
+                deleted,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "MilestoneEvent")
         }
     }
-    impl Yamlable for &Concurrency {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml("group", &self.group);
-            out.insert_yaml_opt("cancel-in-progress", &self.cancel_in_progress);
-            Yaml::Hash(out)
+    impl MaybeYamlable for &MilestoneEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.closed || self.opened || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("closed", self.closed);
+                arr.push_yaml_cond("opened", self.opened);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct RunDefaults {
-        shell: Option<StringLike>,
-        working_directory: Option<StringLike>,
+    struct PullRequestEvent {
+        assigned: bool,
+        unassigned: bool,
+        labeled: bool,
+        unlabeled: bool,
+        opened: bool,
+        edited: bool,
+        closed: bool,
+        reopened: bool,
+        synchronize: bool,
+        converted_to_draft: bool,
+        locked: bool,
+        unlocked: bool,
+        enqueued: bool,
+        dequeued: bool,
+        milestoned: bool,
+        demilestoned: bool,
+        ready_for_review: bool,
+        review_requested: bool,
+        review_request_removed: bool,
+        auto_merge_enabled: bool,
+        auto_merge_disabled: bool,
+        branches: Option<Vec<String>>,
+        branches_ignore: Option<Vec<String>>,
+        paths: Option<Vec<String>>,
+        paths_ignore: Option<Vec<String>>,
     }
     #[pymethods]
-    impl RunDefaults {
+    impl PullRequestEvent {
         #[new]
-        #[pyo3(signature = (*, shell=None, working_directory=None))]
-        fn new(shell: Option<StringLike>, working_directory: Option<StringLike>) -> Self {
+        #[pyo3(signature = (*, branches=None, branches_ignore=None, paths=None, paths_ignore=None, assigned=false, unassigned=false, labeled=false, unlabeled=false, opened=false, edited=false, closed=false, reopened=false, synchronize=false, converted_to_draft=false, locked=false, unlocked=false, enqueued=false, dequeued=false, milestoned=false, demilestoned=false, ready_for_review=false, review_requested=false, review_request_removed=false, auto_merge_enabled=false, auto_merge_disabled=false))]
+        fn new(
+            branches: Option<Vec<String>>,
+            branches_ignore: Option<Vec<String>>,
+            paths: Option<Vec<String>>,
+            paths_ignore: Option<Vec<String>>,
+            assigned: bool,
+            unassigned: bool,
+            labeled: bool,
+            unlabeled: bool,
+            opened: bool,
+            edited: bool,
+            closed: bool,
+            reopened: bool,
+            synchronize: bool,
+            converted_to_draft: bool,
+            locked: bool,
+            unlocked: bool,
+            enqueued: bool,
+            dequeued: bool,
+            milestoned: bool,
+            demilestoned: bool,
+            ready_for_review: bool,
+            review_requested: bool,
+            review_request_removed: bool,
+            auto_merge_enabled: bool,
+            auto_merge_disabled: bool,
+        ) -> Self {
+            let branches = branches.filter(|v| !v.is_empty());
+            let branches_ignore = branches_ignore.filter(|v| !v.is_empty());
+            let paths = paths.filter(|v| !v.is_empty());
+            let paths_ignore = paths_ignore.filter(|v| !v.is_empty());
             Self {
-                shell,
-                working_directory,
+                assigned,
+                unassigned,
+                labeled,
+                unlabeled,
+                opened,
+                edited,
+                closed,
+                reopened,
+                synchronize,
+                converted_to_draft,
+                locked,
+                unlocked,
+                enqueued,
+                dequeued,
+                milestoned,
+                demilestoned,
+                ready_for_review,
+                review_requested,
+                review_request_removed,
+                auto_merge_enabled,
+                auto_merge_disabled,
+                branches,
+                branches_ignore,
+                paths,
+                paths_ignore,
             }
         }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "PullRequestEvent")
+        }
     }
-    impl MaybeYamlable for &RunDefaults {
+    impl MaybeYamlable for &PullRequestEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
             let mut out = Hash::new();
-            out.insert_yaml_opt("shell", &self.shell);
-            out.insert_yaml_opt("working-directory", &self.working_directory);
+            out.insert_yaml_opt("branches", self.branches.as_ref());
+            out.insert_yaml_opt("branches-ignore", self.branches_ignore.as_ref());
+            out.insert_yaml_opt("paths", self.paths.as_ref());
+            out.insert_yaml_opt("paths-ignore", self.paths_ignore.as_ref());
+            if self.assigned
+                || self.unassigned
+                || self.labeled
+                || self.unlabeled
+                || self.opened
+                || self.edited
+                || self.closed
+                || self.reopened
+                || self.synchronize
+                || self.converted_to_draft
+                || self.locked
+                || self.unlocked
+                || self.enqueued
+                || self.dequeued
+                || self.milestoned
+                || self.demilestoned
+                || self.ready_for_review
+                || self.review_requested
+                || self.review_request_removed
+                || self.auto_merge_enabled
+                || self.auto_merge_disabled
+            {
+                let mut arr = Array::new();
+                arr.push_yaml_cond("assigned", self.assigned);
+                arr.push_yaml_cond("unassigned", self.unassigned);
+                arr.push_yaml_cond("labeled", self.labeled);
+                arr.push_yaml_cond("unlabeled", self.unlabeled);
+                arr.push_yaml_cond("opened", self.opened);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("closed", self.closed);
+                arr.push_yaml_cond("reopened", self.reopened);
+                arr.push_yaml_cond("synchronize", self.synchronize);
+                arr.push_yaml_cond("converted_to_draft", self.converted_to_draft);
+                arr.push_yaml_cond("locked", self.locked);
+                arr.push_yaml_cond("unlocked", self.unlocked);
+                arr.push_yaml_cond("enqueued", self.enqueued);
+                arr.push_yaml_cond("dequeued", self.dequeued);
+                arr.push_yaml_cond("milestoned", self.milestoned);
+                arr.push_yaml_cond("demilestoned", self.demilestoned);
+                arr.push_yaml_cond("ready_for_review", self.ready_for_review);
+                arr.push_yaml_cond("review_requested", self.review_requested);
+                arr.push_yaml_cond("review_request_removed", self.review_request_removed);
+                arr.push_yaml_cond("auto_merge_enabled", self.auto_merge_enabled);
+                arr.push_yaml_cond("auto_merge_disabled", self.auto_merge_disabled);
+                out.insert_yaml("types", Yaml::Array(arr));
+            }
             if out.is_empty() {
                 None
             } else {
@@ -3458,574 +7400,249 @@ mod yamloom {
             }
         }
     }
+
     #[pyclass]
     #[derive(Clone)]
-    struct Defaults {
-        defaults: Option<PyMap<String, String>>,
-        run_defaults: Option<RunDefaults>,
+    struct PullRequestReviewEvent {
+        submitted: bool,
+        edited: bool,
+        dismissed: bool,
     }
     #[pymethods]
-    impl Defaults {
+    impl PullRequestReviewEvent {
         #[new]
-        #[pyo3(signature = (*, defaults=None, run_defaults=None))]
-        fn new(defaults: Option<PyMap<String, String>>, run_defaults: Option<RunDefaults>) -> Self {
+        #[pyo3(signature = (*, submitted=false, edited=false, dismissed=false))]
+        fn new(submitted: bool, edited: bool, dismissed: bool) -> Self {
             Self {
-                defaults,
-                run_defaults,
-            }
-        }
-    }
-    impl MaybeYamlable for &Defaults {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Hash::new();
-            if let Some(run_defaults) = &self.run_defaults {
-                out.insert_yaml_opt("run", run_defaults.maybe_as_yaml());
-            }
-            out.insert_yaml_opt("defaults", &self.defaults);
-            if out.is_empty() {
-                None
-            } else {
-                Some(Yaml::Hash(out))
+                submitted,
+                edited,
+                dismissed,
             }
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct Matrix {
-        matrix: Option<Hash>,
-        include: Option<Array>,
-        exclude: Option<Array>,
-    }
-    #[pymethods]
-    impl Matrix {
-        #[new]
-        #[pyo3(signature = (*, include = None, exclude = None, **matrix))]
-        fn new(
-            include: Option<&Bound<'_, PyList>>,
-            exclude: Option<&Bound<'_, PyList>>,
-            matrix: Option<&Bound<'_, PyDict>>,
-        ) -> PyResult<Self> {
-            Ok(Self {
-                matrix: matrix
-                    .map(|m| {
-                        let mut hash = Hash::new();
-                        for (k, v) in m.iter() {
-                            hash.insert_yaml(k.try_as_yaml()?, v.try_as_yaml()?);
-                        }
-                        Ok::<Hash, PyErr>(hash)
-                    })
-                    .transpose()?,
-                include: include
-                    .map(|i| {
-                        let mut arr = Array::new();
-                        for v in i.iter() {
-                            arr.push_yaml(v.try_as_yaml()?);
-                        }
-                        Ok::<Array, PyErr>(arr)
-                    })
-                    .transpose()?,
-                exclude: exclude
-                    .map(|e| {
-                        let mut arr = Array::new();
-                        for v in e.iter() {
-                            arr.push_yaml(v.try_as_yaml()?);
-                        }
-                        Ok::<Array, PyErr>(arr)
-                    })
-                    .transpose()?,
-            })
+        fn __str__(&self) -> PyResult<String> {
+            self.maybe_as_yaml_string()
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "PullRequestReviewEvent")
         }
     }
-    impl Yamlable for &Matrix {
-        fn as_yaml(&self) -> Yaml {
-            let mut matrix = self.matrix.clone().unwrap_or_default();
-            matrix.insert_yaml_opt("include", &self.include);
-            matrix.insert_yaml_opt("exclude", &self.exclude);
-            Yaml::Hash(matrix)
+    impl MaybeYamlable for &PullRequestReviewEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.submitted || self.edited || self.dismissed {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("submitted", self.submitted);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("dismissed", self.dismissed);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Strategy {
-        matrix: Option<Matrix>,
-        fast_fail: Option<BoolLike>,
-        max_parallel: Option<IntLike>,
+    struct PullRequestReviewCommentEvent {
+        created: bool,
+        edited: bool,
+        deleted: bool,
     }
     #[pymethods]
-    impl Strategy {
+    impl PullRequestReviewCommentEvent {
         #[new]
-        #[pyo3(signature = (*, matrix = None, fast_fail = None, max_parallel = None))]
-        fn new(
-            // TODO: prevent invalid state where all are None
-            matrix: Option<Matrix>,
-            fast_fail: Option<BoolLike>,
-            max_parallel: Option<IntLike>,
-        ) -> Self {
+        #[pyo3(signature = (*, created=false,edited=false, deleted=false))]
+        fn new(created: bool, edited: bool, deleted: bool) -> Self {
             Self {
-                matrix,
-                fast_fail,
-                max_parallel,
+                created,
+                edited,
+                deleted,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
-        }
-    }
-    impl Yamlable for &Strategy {
-        fn as_yaml(&self) -> Yaml {
-            let mut strategy = Hash::new();
-            strategy.insert_yaml_opt("matrix", &self.matrix);
-            strategy.insert_yaml_opt("fail-fast", &self.fast_fail);
-            strategy.insert_yaml_opt("max-parallel", &self.max_parallel);
-            Yaml::Hash(strategy)
-        }
-    }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct Credentials {
-        username: StringLike,
-        password: StringLike,
-    }
-    #[pymethods]
-    impl Credentials {
-        #[new]
-        fn new(username: StringLike, password: StringLike) -> Self {
-            Self { username, password }
+            self.maybe_as_yaml_string()
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "PullRequestReviewCommentEvent")
         }
     }
-    impl Yamlable for &Credentials {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml("username", &self.username);
-            out.insert_yaml("password", &self.password);
-            Yaml::Hash(out)
+    impl MaybeYamlable for &PullRequestReviewCommentEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.created || self.edited || self.deleted {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("created", self.created);
+                arr.push_yaml_cond("edited", self.edited);
+                arr.push_yaml_cond("deleted", self.deleted);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
+            }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Container {
-        image: StringLike,
-        credentials: Option<Credentials>,
-        env: Option<PyMap<String, StringLike>>,
-        ports: Option<Vec<IntLike>>,
-        volumes: Option<Vec<StringLike>>,
-        options: Option<StringLike>,
+    struct PushEvent {
+        branches: Option<Vec<String>>,
+        branches_ignore: Option<Vec<String>>,
+        tags: Option<Vec<String>>,
+        tags_ignore: Option<Vec<String>>,
+        paths: Option<Vec<String>>,
+        paths_ignore: Option<Vec<String>>,
     }
     #[pymethods]
-    impl Container {
+    impl PushEvent {
         #[new]
-        #[pyo3(signature = (image, *, credentials = None, env = None, ports = None, volumes = None, options = None))]
+        #[pyo3(signature = (*, branches=None, branches_ignore=None, tags=None, tags_ignore=None, paths=None, paths_ignore=None))]
         fn new(
-            image: StringLike,
-            credentials: Option<Credentials>,
-            env: Option<PyMap<String, StringLike>>,
-            ports: Option<Vec<IntLike>>,
-            volumes: Option<Vec<StringLike>>,
-            options: Option<StringLike>,
+            branches: Option<Vec<String>>,
+            branches_ignore: Option<Vec<String>>,
+            tags: Option<Vec<String>>,
+            tags_ignore: Option<Vec<String>>,
+            paths: Option<Vec<String>>,
+            paths_ignore: Option<Vec<String>>,
         ) -> Self {
             Self {
-                image,
-                credentials,
-                env,
-                ports,
-                volumes,
-                options,
+                branches,
+                branches_ignore,
+                tags,
+                tags_ignore,
+                paths,
+                paths_ignore,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
-        }
-    }
-    impl Yamlable for &Container {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml("image", &self.image);
-            out.insert_yaml_opt("credentials", &self.credentials);
-            out.insert_yaml_opt("env", &self.env);
-            out.insert_yaml_opt("ports", &self.ports);
-            out.insert_yaml_opt("volumes", &self.volumes);
-            out.insert_yaml_opt("options", &self.options);
-            Yaml::Hash(out)
-        }
-    }
-
-    #[derive(Clone)]
-    enum JobSecretsOptions {
-        Secrets(HashMap<String, StringLike>),
-        Inherit,
-    }
-    #[pyclass]
-    #[derive(Clone)]
-    struct JobSecrets {
-        options: JobSecretsOptions,
-    }
-    #[pymethods]
-    impl JobSecrets {
-        #[new]
-        fn new(secrets: HashMap<String, StringLike>) -> Self {
-            Self {
-                options: JobSecretsOptions::Secrets(secrets),
-            }
-        }
-        #[staticmethod]
-        fn inherit() -> Self {
-            Self {
-                options: JobSecretsOptions::Inherit,
-            }
+            self.maybe_as_yaml_string()
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "PushEvent")
         }
     }
-    impl Yamlable for &JobSecrets {
-        fn as_yaml(&self) -> Yaml {
-            match &self.options {
-                JobSecretsOptions::Secrets(s) => {
-                    let mut hash = Hash::new();
-                    for (k, v) in s {
-                        hash.insert_yaml(k, v);
-                    }
-                    Yaml::Hash(hash)
-                }
-                JobSecretsOptions::Inherit => Yaml::String("inherit".to_string()),
+    impl MaybeYamlable for &PushEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("branches", self.branches.as_ref());
+            out.insert_yaml_opt("branches-ignore", self.branches_ignore.as_ref());
+            out.insert_yaml_opt("tags", self.tags.as_ref());
+            out.insert_yaml_opt("tags-ignore", self.tags_ignore.as_ref());
+            out.insert_yaml_opt("paths", self.paths.as_ref());
+            out.insert_yaml_opt("paths-ignore", self.paths_ignore.as_ref());
+            if out.is_empty() {
+                None
+            } else {
+                Some(Yaml::Hash(out))
             }
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Job {
-        name: Option<StringLike>,
-        permissions: Option<Permissions>,
-        needs: Option<Vec<String>>,
-        condition: Option<Either<BooleanExpression, String>>,
-        runs_on: Option<RunsOn>,
-        snapshot: Option<String>,
-        environment: Option<Environment>,
-        concurrency: Option<Concurrency>,
-        outputs: Option<PyMap<String, StringLike>>,
-        env: Option<PyMap<String, StringLike>>,
-        defaults: Option<Defaults>,
-        steps: Option<Vec<Step>>,
-        timeout_minutes: Option<IntLike>,
-        strategy: Option<Strategy>,
-        continue_on_error: Option<Either<StringLike, BoolLike>>,
-        container: Option<Container>,
-        services: Option<PyMap<String, Container>>,
-        uses: Option<String>,
-        with: Option<Hash>,
-        secrets: Option<JobSecrets>,
+    struct RegistryPackageEvent {
+        published: bool,
+        updated: bool,
     }
-    // TODO: support mapping syntax for snapshot argument
     #[pymethods]
-    impl Job {
-        /// A set of `Step`s which runs in an isolated environemnt.
-        ///
-        /// All `Job`s in a `Workflow` run in parallel by default, but dependencies can be created
-        /// with the ``needs`` argument. `Job`s may also specify the ``uses`` argument to call
-        /// another reusable workflow rather than a set of `Step`s. Note that exactly one of ``runs_on`` or ``uses`` must be specified, and a `Job` which specifies ``uses`` may not have any ``steps``.
-        ///
-        /// Parameters
-        /// ----------
-        /// steps
-        ///     The set of `Step`s to run sequentially.
-        /// name
-        ///     The name of the job displayed in the GitHub UI.
-        /// permissions
-        ///     The permissions granted to the ``GITHUB_TOKEN`` for this job.
-        /// use_recommended_permissions
-        ///     Merge recommended permissions from steps into this job's permissions.
-        /// needs
-        ///     A list of `Job`s which must complete successfully before this job will run.
-        /// condition
-        ///     A condition which must be met for this job to run. Note that this represents the ``if`` key in the actual YAML file.
-        /// runs_on
-        ///     The type of machine on which the job will run (e.g. ``'ubuntu-latest'``)
-        /// snapshot
-        ///     Used to generate a custom image.
-        /// environment
-        ///     Used to define the environment which the job references. This is often used for trusted publishing.
-        /// concurrency
-        ///     The concurrency group for this job. Only a single `Job` or `Workflow` using the
-        ///     same concurrency group will run at a time.
-        /// outputs
-        ///     Used to create a set of outputs available to all downstream jobs which depend on this job.
-        /// env
-        ///     A map of environment variables available to all steps in the job.
-        /// defaults
-        ///     A map of default settings which apply to all steps in the job.
-        /// timeout_minutes
-        ///     The maximum number of minutes to let a job run before GitHub automatically cancels it (defaults to 360 if not specified).
-        /// strategy
-        ///     Used to create a matrix strategy for a job, generating multiple jobs from a single one based on combinations of matrix variables.
-        /// continue_on_error
-        ///     If True, this job's failure will not trigger workflow failure (or cause other matrix strategy jobs to fail if ``fail-fast`` is enabled).
-        /// container
-        ///     Used to create a container to run any steps of a job which do not already specify one.
-        /// services
-        ///     Used to host service containers for a job.
-        /// uses
-        ///     Used to specify the location and version of a reusable workflow file to run as a
-        ///     job. Such a job will not specify ``runs_on`` or ``steps``.
-        /// with_opts
-        ///     A map of inputs which are passed to a reusable workflow job specified by ``uses``. Note that this represents the ``with`` key in the actual YAML file.
-        /// secrets
-        ///     A map of secrets passed to a resulable workflow job specified by ``uses``.
+    impl RegistryPackageEvent {
         #[new]
-        #[pyo3(signature = (*, steps=None, name=None, permissions=None, use_recommended_permissions=true, needs=None, condition=None, runs_on=None, snapshot=None, environment=None, concurrency=None, outputs=None, env=None, defaults=None, timeout_minutes=None, strategy=None, continue_on_error=None, container=None, services=None, uses=None, with_opts=None, secrets=None))]
-        fn new(
-            steps: Option<Vec<Step>>,
-            name: Option<StringLike>,
-            permissions: Option<Permissions>,
-            use_recommended_permissions: bool,
-            needs: Option<Vec<String>>,
-            condition: Option<Either<BooleanExpression, String>>,
-            runs_on: Option<RunsOn>,
-            snapshot: Option<String>,
-            environment: Option<Environment>,
-            concurrency: Option<Concurrency>,
-            outputs: Option<PyMap<String, StringLike>>,
-            env: Option<PyMap<String, StringLike>>,
-            defaults: Option<Defaults>,
-            timeout_minutes: Option<IntLike>,
-            strategy: Option<Strategy>,
-            continue_on_error: Option<Either<StringLike, BoolLike>>,
-            container: Option<Container>,
-            services: Option<PyMap<String, Container>>,
-            uses: Option<String>,
-            with_opts: Option<Bound<PyDict>>,
-            secrets: Option<JobSecrets>,
-        ) -> PyResult<Self> {
-            match (&uses, &runs_on) {
-                (Some(_), Some(_)) => {
-                    return Err(PyValueError::new_err(
-                        "Job cannot set both 'uses' and 'runs_on'",
-                    ));
-                }
-                (None, None) => {
-                    return Err(PyValueError::new_err(
-                        "Job must set either 'uses' or 'runs_on'",
-                    ));
-                }
-                _ => {}
-            }
-            if uses.is_some() {
-                if let Some(steps) = &steps
-                    && !steps.is_empty()
-                {
-                    return Err(PyValueError::new_err(
-                        "Job using 'uses' cannot define 'steps'",
-                    ));
-                }
-            } else {
-                match &steps {
-                    Some(steps) if !steps.is_empty() => {}
-                    _ => {
-                        return Err(PyValueError::new_err(
-                            "Job with 'runs_on' must define at least one step",
-                        ));
-                    }
-                }
-            }
-            if let Some(name) = &name {
-                validate_string_like(name, ALLOWED_JOB_NAME)?;
-            }
-            if let Some(condition) = &condition {
-                validate_condition(condition, ALLOWED_JOB_IF)?;
-            }
-            if let Some(runs_on) = &runs_on {
-                validate_runs_on(runs_on)?;
-            }
-            if let Some(environment) = &environment {
-                validate_environment(environment)?;
-            }
-            if let Some(concurrency) = &concurrency {
-                validate_concurrency(concurrency, ALLOWED_JOB_CONCURRENCY)?;
-            }
-            if let Some(outputs) = &outputs {
-                validate_string_map(outputs, ALLOWED_JOB_OUTPUTS)?;
-            }
-            if let Some(env) = &env {
-                validate_string_map(env, ALLOWED_JOB_ENV)?;
-            }
-            if let Some(defaults) = &defaults
-                && let Some(run_defaults) = &defaults.run_defaults
-            {
-                if let Some(shell) = &run_defaults.shell {
-                    validate_string_like(shell, ALLOWED_JOB_DEFAULTS_RUN)?;
-                }
-                if let Some(working_directory) = &run_defaults.working_directory {
-                    validate_string_like(working_directory, ALLOWED_JOB_DEFAULTS_RUN)?;
-                }
-            }
-            if let Some(strategy) = &strategy {
-                if let Some(fast_fail) = &strategy.fast_fail {
-                    validate_bool_like(fast_fail, ALLOWED_JOB_STRATEGY)?;
-                }
-                if let Some(max_parallel) = &strategy.max_parallel {
-                    validate_int_like(max_parallel, ALLOWED_JOB_STRATEGY)?;
-                }
-            }
-            if let Some(timeout_minutes) = &timeout_minutes {
-                validate_int_like(timeout_minutes, ALLOWED_JOB_TIMEOUT_MINUTES)?;
-            }
-            if let Some(continue_on_error) = &continue_on_error {
-                match continue_on_error {
-                    Either::A(string_like) => {
-                        validate_string_like(string_like, ALLOWED_JOB_CONTINUE_ON_ERROR)?;
-                    }
-                    Either::B(bool_like) => {
-                        validate_bool_like(bool_like, ALLOWED_JOB_CONTINUE_ON_ERROR)?;
-                    }
-                }
-            }
-            if let Some(container) = &container {
-                validate_container_for_job(container)?;
-            }
-            if let Some(services) = &services {
-                for (_, container) in services.iter() {
-                    validate_container_for_service(container)?;
-                }
-            }
-            if let Some(with_opts) = &with_opts {
-                validate_with_opts(with_opts, ALLOWED_JOB_WITH)?;
-            }
-            if let Some(secrets) = &secrets
-                && let JobSecretsOptions::Secrets(values) = &secrets.options
-            {
-                for value in values.values() {
-                    validate_string_like(value, ALLOWED_JOB_SECRETS)?;
-                }
-            }
-            let mut permissions = permissions;
-            if use_recommended_permissions && let Some(steps) = &steps {
-                let mut saw_recommendation = false;
-                let mut merged: Option<Permissions> = None;
-                for step in steps {
-                    if step.skip_recommended_permissions {
-                        continue;
-                    }
-                    if let Some(step_permissions) = &step.recommended_permissions {
-                        saw_recommendation = true;
-                        merged = Some(match &merged {
-                            Some(current) => merge_permissions(current, step_permissions),
-                            None => step_permissions.clone(),
-                        });
-                    }
-                }
-                if saw_recommendation {
-                    let mut merged = merged.unwrap_or_else(Permissions::none);
-                    if is_empty_individual_permissions(&merged) {
-                        merged = Permissions::none();
-                    }
-                    permissions = Some(match permissions {
-                        Some(current) => merge_permissions(&current, &merged),
-                        None => merged,
-                    });
-                }
-            }
-            Ok(Self {
-                name,
-                permissions,
-                needs,
-                condition,
-                runs_on,
-                snapshot,
-                environment,
-                concurrency,
-                outputs,
-                env,
-                defaults,
-                steps,
-                timeout_minutes,
-                strategy,
-                continue_on_error,
-                container,
-                services,
-                uses,
-                with: with_opts.map(|w| w.try_as_hash()).transpose()?,
-                secrets,
-            })
+        #[pyo3(signature = (*, published=false, updated=false))]
+        fn new(published: bool, updated: bool) -> Self {
+            Self { published, updated }
         }
+
         fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+            self.maybe_as_yaml_string()
         }
-    }
-    impl Yamlable for &Job {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("name", &self.name);
-            out.insert_yaml_opt("permissions", self.permissions.as_ref());
-            out.insert_yaml_opt("needs", &self.needs);
-            out.insert_yaml_opt("if", &self.condition);
-            out.insert_yaml_opt("runs-on", &self.runs_on);
-            out.insert_yaml_opt("snapshot", &self.snapshot);
-            out.insert_yaml_opt("environment", &self.environment);
-            out.insert_yaml_opt("concurrency", &self.concurrency);
-            out.insert_yaml_opt("outputs", &self.outputs);
-            out.insert_yaml_opt("env", &self.env);
-            if let Some(defaults) = &self.defaults {
-                out.insert_yaml_opt("defaults", defaults.maybe_as_yaml());
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "RegistryPackageEvent")
+        }
+    }
+    impl MaybeYamlable for &RegistryPackageEvent {
+        fn maybe_as_yaml(&self) -> Option<Yaml> {
+            if self.published || self.updated {
+                let mut out = Hash::new();
+                let mut arr = Array::new();
+                arr.push_yaml_cond("published", self.published);
+                arr.push_yaml_cond("updated", self.updated);
+                out.insert_yaml("types", Yaml::Array(arr));
+                Some(Yaml::Hash(out))
+            } else {
+                None
             }
-            out.insert_yaml_opt("strategy", &self.strategy);
-            out.insert_yaml_opt("steps", &self.steps);
-            out.insert_yaml_opt("timeout-minutes", &self.timeout_minutes);
-            out.insert_yaml_opt("continue-on-error", &self.continue_on_error);
-            out.insert_yaml_opt("container", &self.container);
-            out.insert_yaml_opt("services", &self.services);
-            out.insert_yaml_opt("uses", &self.uses);
-            out.insert_yaml_opt("with", self.with.clone().map(Yaml::Hash));
-            out.insert_yaml_opt("secrets", &self.secrets);
-            Yaml::Hash(out)
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct BranchProtectionRuleEvent {
+    struct ReleaseEvent {
+        published: bool,
+        unpublished: bool,
         created: bool,
         edited: bool,
         deleted: bool,
+        prereleased: bool,
+        released: bool,
     }
     #[pymethods]
-    impl BranchProtectionRuleEvent {
+    impl ReleaseEvent {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
-        fn new(created: bool, edited: bool, deleted: bool) -> Self {
+        #[pyo3(signature = (*, published=false, unpublished=false, created=false, edited=false, deleted=false, prereleased=false, released=false))]
+        fn new(
+            published: bool,
+            unpublished: bool,
+            created: bool,
+            edited: bool,
+            deleted: bool,
+            prereleased: bool,
+            released: bool,
+        ) -> Self {
             Self {
+                published,
+                unpublished,
                 created,
                 edited,
                 deleted,
+                prereleased,
+                released,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "ReleaseEvent")
+        }
     }
-    impl MaybeYamlable for &BranchProtectionRuleEvent {
+    impl MaybeYamlable for &ReleaseEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.edited || self.deleted {
+            if self.published
+                || self.unpublished
+                || self.created
+                || self.edited
+                || self.deleted
+                || self.prereleased
+                || self.released
+            {
                 let mut out = Hash::new();
                 let mut arr = Array::new();
+                arr.push_yaml_cond("published", self.published);
+                arr.push_yaml_cond("unpublished", self.unpublished);
                 arr.push_yaml_cond("created", self.created);
                 arr.push_yaml_cond("edited", self.edited);
                 arr.push_yaml_cond("deleted", self.deleted);
+                arr.push_yaml_cond("prereleased", self.prereleased);
+                arr.push_yaml_cond("released", self.released);
                 out.insert_yaml("types", Yaml::Array(arr));
                 Some(Yaml::Hash(out))
             } else {
@@ -4036,399 +7653,481 @@ mod yamloom {
 
     #[pyclass]
     #[derive(Clone)]
-    struct CheckRunEvent {
-        created: bool,
-        rerequested: bool,
-        completed: bool,
-        requested_action: bool,
+    struct RepositoryDispatchEvent {
+        types: Option<Vec<String>>,
     }
     #[pymethods]
-    impl CheckRunEvent {
+    impl RepositoryDispatchEvent {
         #[new]
-        #[pyo3(signature = (*, created=false, rerequested=false, completed=false, requested_action=false))]
-        fn new(created: bool, rerequested: bool, completed: bool, requested_action: bool) -> Self {
-            Self {
-                created,
-                rerequested,
-                completed,
-                requested_action,
-            }
+        #[pyo3(signature = (*, types=None))]
+        fn new(types: Option<Vec<String>>) -> Self {
+            let types = types.filter(|v| !v.is_empty());
+            Self { types }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "RepositoryDispatchEvent")
+        }
     }
-    impl MaybeYamlable for &CheckRunEvent {
+    impl MaybeYamlable for &RepositoryDispatchEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.rerequested || self.completed || self.requested_action {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("rerequested", self.rerequested);
-                arr.push_yaml_cond("completed", self.completed);
-                arr.push_yaml_cond("requested_action", self.requested_action);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("types", self.types.as_ref());
+            if out.is_empty() {
                 None
+            } else {
+                Some(Yaml::Hash(out))
+            }
+        }
+    }
+
+    #[derive(Clone)]
+    enum CronStepType {
+        Value(u8),
+        List(Vec<u8>),
+        Range(u8, u8),
+        Step { start: Option<u8>, step: u8 },
+    }
+    impl Display for CronStepType {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(
+                f,
+                "{}",
+                match self {
+                    Self::Value(v) => v.to_string(),
+                    Self::List(items) => items
+                        .iter()
+                        .map(std::string::ToString::to_string)
+                        .collect::<Vec<String>>()
+                        .join(","),
+
+                    Self::Range(min, max) => format!("{min}-{max}"),
+                    Self::Step { start, step } => format!(
+                        "{}/{}",
+                        start.map(|s| s.to_string()).unwrap_or("*".to_string()),
+                        step
+                    ),
+                }
+            )
+        }
+    }
+
+    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
+    struct CronMinute(u8);
+
+    impl<'a, 'py> FromPyObject<'a, 'py> for CronMinute {
+        type Error = PyErr;
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            if let Ok(num) = obj.extract::<u8>()
+                && num <= 59
+            {
+                return Ok(CronMinute(num));
+            }
+            Err(PyValueError::new_err(
+                "Minute must be an integer in range 0..=59",
+            ))
+        }
+    }
+
+    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
+    struct CronHour(u8);
+
+    impl<'a, 'py> FromPyObject<'a, 'py> for CronHour {
+        type Error = PyErr;
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            if let Ok(num) = obj.extract::<u8>()
+                && num <= 23
+            {
+                return Ok(CronHour(num));
+            }
+            Err(PyValueError::new_err(
+                "Hour must be an integer in range 0..=23",
+            ))
+        }
+    }
+
+    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
+    struct CronDay(u8);
+
+    impl<'a, 'py> FromPyObject<'a, 'py> for CronDay {
+        type Error = PyErr;
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            if let Ok(num) = obj.extract::<u8>()
+                && (1..=31).contains(&num)
+            {
+                return Ok(CronDay(num));
+            }
+            Err(PyValueError::new_err(
+                "Hour must be an integer in range 1..=31",
+            ))
+        }
+    }
+
+    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
+    struct CronMonth(u8);
+
+    impl<'a, 'py> FromPyObject<'a, 'py> for CronMonth {
+        type Error = PyErr;
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            let msg = "Month must be an integer in range 1..=12";
+            if let Ok(num) = obj.extract::<u8>()
+                && (1..=12).contains(&num)
+            {
+                return Ok(CronMonth(num));
+            }
+            Err(PyValueError::new_err(msg))
+        }
+    }
+
+    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
+    struct CronDayOfWeek(u8);
+
+    impl<'a, 'py> FromPyObject<'a, 'py> for CronDayOfWeek {
+        type Error = PyErr;
+        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
+            let msg = "Day of week must be an integer in range 0..=6 (0=Sunday)";
+            if let Ok(num) = obj.extract::<u8>()
+                && num <= 6
+            {
+                return Ok(CronDayOfWeek(num));
+            }
+            Err(PyValueError::new_err(msg))
+        }
+    }
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct Minute(CronStepType);
+    impl Display for Minute {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(f, "{}", self.0)
+        }
+    }
+    #[pymethods]
+    impl Minute {
+        #[new]
+        fn new(minute: &Bound<PyAny>) -> PyResult<Self> {
+            if let Ok(l) = minute.extract::<Bound<PyList>>() {
+                let mut res = Vec::new();
+                for item in l.iter() {
+                    let item = item.extract::<CronMinute>()?;
+                    res.push(item.0);
+                }
+                return Ok(Self(CronStepType::List(res)));
             }
+            let minute = minute.extract::<CronMinute>()?;
+            Ok(Self(CronStepType::Value(minute.0)))
+        }
+        #[staticmethod]
+        fn between(start: &Bound<PyAny>, end: &Bound<PyAny>) -> PyResult<Self> {
+            let min = start.extract::<CronMinute>()?;
+            let max = end.extract::<CronMinute>()?;
+            Ok(Self(CronStepType::Range(min.0, max.0)))
+        }
+        #[staticmethod]
+        #[pyo3(signature = (interval, *, start = None))]
+        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
+            let start = start
+                .map(|a| a.extract::<CronMinute>())
+                .transpose()?
+                .map(|s| s.0);
+            let interval = interval.extract::<CronMinute>()?;
+            Ok(Self(CronStepType::Step {
+                start,
+                step: interval.0,
+            }))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Minute")
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct CheckSuiteEvent {
-        created: bool,
+    struct Hour(CronStepType);
+    impl Display for Hour {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(f, "{}", self.0)
+        }
     }
     #[pymethods]
-    impl CheckSuiteEvent {
+    impl Hour {
         #[new]
-        #[pyo3(signature = (*, created=false))]
-        fn new(created: bool) -> Self {
-            Self { created }
+        fn new(hour: &Bound<PyAny>) -> PyResult<Self> {
+            if let Ok(l) = hour.extract::<Bound<PyList>>() {
+                let mut res = Vec::new();
+                for item in l.iter() {
+                    let item = item.extract::<CronHour>()?;
+                    res.push(item.0);
+                }
+                return Ok(Self(CronStepType::List(res)));
+            }
+            let hour = hour.extract::<CronHour>()?;
+            Ok(Self(CronStepType::Value(hour.0)))
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        #[staticmethod]
+        fn between(start: &Bound<PyAny>, end: &Bound<PyAny>) -> PyResult<Self> {
+            let min = start.extract::<CronHour>()?;
+            let max = end.extract::<CronHour>()?;
+            Ok(Self(CronStepType::Range(min.0, max.0)))
         }
-    }
-    impl MaybeYamlable for &CheckSuiteEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+        #[staticmethod]
+        #[pyo3(signature = (interval, *, start = None))]
+        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
+            let start = start
+                .map(|a| a.extract::<CronHour>())
+                .transpose()?
+                .map(|s| s.0);
+            let interval = interval.extract::<CronHour>()?;
+            Ok(Self(CronStepType::Step {
+                start,
+                step: interval.0,
+            }))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Hour")
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct DiscussionEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
-        transferred: bool,
-        pinned: bool,
-        unpinned: bool,
-        labeled: bool,
-        unlabeled: bool,
-        locked: bool,
-        unlocked: bool,
-        category_changed: bool,
-        answered: bool,
-        unanswered: bool,
+    struct Day(CronStepType);
+    impl Display for Day {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(f, "{}", self.0)
+        }
     }
     #[pymethods]
-    impl DiscussionEvent {
+    impl Day {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false, transferred=false, pinned=false, unpinned=false, labeled=false, unlabeled=false, locked=false, unlocked=false, category_changed=false, answered=false, unanswered=false))]
-        fn new(
-            created: bool,
-            edited: bool,
-            deleted: bool,
-            transferred: bool,
-            pinned: bool,
-            unpinned: bool,
-            labeled: bool,
-            unlabeled: bool,
-            locked: bool,
-            unlocked: bool,
-            category_changed: bool,
-            answered: bool,
-            unanswered: bool,
-        ) -> Self {
-            Self {
-                created,
-                edited,
-                deleted,
-                transferred,
-                pinned,
-                unpinned,
-                labeled,
-                unlabeled,
-                locked,
-                unlocked,
-                category_changed,
-                answered,
-                unanswered,
+        fn new(day: &Bound<PyAny>) -> PyResult<Self> {
+            if let Ok(l) = day.extract::<Bound<PyList>>() {
+                let mut res = Vec::new();
+                for item in l.iter() {
+                    let item = item.extract::<CronDay>()?;
+                    res.push(item.0);
+                }
+                return Ok(Self(CronStepType::List(res)));
             }
+            let day = day.extract::<CronDay>()?;
+            Ok(Self(CronStepType::Value(day.0)))
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        #[staticmethod]
+        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
+            let min = min.extract::<CronDay>()?;
+            let max = max.extract::<CronDay>()?;
+            Ok(Self(CronStepType::Range(min.0, max.0)))
         }
-    }
-    impl MaybeYamlable for &DiscussionEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created
-                || self.edited
-                || self.deleted
-                || self.transferred
-                || self.pinned
-                || self.unpinned
-                || self.labeled
-                || self.unlabeled
-                || self.locked
-                || self.unlocked
-                || self.category_changed
-                || self.answered
-                || self.unanswered
-            {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                arr.push_yaml_cond("transferred", self.transferred);
-                arr.push_yaml_cond("pinned", self.pinned);
-                arr.push_yaml_cond("unpinned", self.unpinned);
-                arr.push_yaml_cond("labeled", self.labeled);
-                arr.push_yaml_cond("unlabeled", self.unlabeled);
-                arr.push_yaml_cond("locked", self.locked);
-                arr.push_yaml_cond("unlocked", self.unlocked);
-                arr.push_yaml_cond("category_changed", self.category_changed);
-                arr.push_yaml_cond("answered", self.answered);
-                arr.push_yaml_cond("unanswered", self.unanswered);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+        #[staticmethod]
+        #[pyo3(signature = (interval, *, start = None))]
+        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
+            let start = start
+                .map(|a| a.extract::<CronDay>())
+                .transpose()?
+                .map(|s| s.0);
+            let interval = interval.extract::<CronDay>()?;
+            Ok(Self(CronStepType::Step {
+                start,
+                step: interval.0,
+            }))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Day")
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct DiscussionCommentEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
+    struct Month(CronStepType);
+    impl Display for Month {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(f, "{}", self.0)
+        }
     }
     #[pymethods]
-    impl DiscussionCommentEvent {
+    impl Month {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
-        fn new(created: bool, edited: bool, deleted: bool) -> Self {
-            Self {
-                created,
-                edited,
-                deleted,
+        fn new(month: &Bound<PyAny>) -> PyResult<Self> {
+            if let Ok(l) = month.extract::<Bound<PyList>>() {
+                let mut res = Vec::new();
+                for item in l.iter() {
+                    let item = item.extract::<CronMonth>()?;
+                    res.push(item.0);
+                }
+                return Ok(Self(CronStepType::List(res)));
             }
+            let month = month.extract::<CronMonth>()?;
+            Ok(Self(CronStepType::Value(month.0)))
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        #[staticmethod]
+        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
+            let min = min.extract::<CronMonth>()?;
+            let max = max.extract::<CronMonth>()?;
+            Ok(Self(CronStepType::Range(min.0, max.0)))
         }
-    }
-    impl MaybeYamlable for &DiscussionCommentEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.edited || self.deleted {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+        #[staticmethod]
+        #[pyo3(signature = (interval, *, start = None))]
+        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
+            let start = start
+                .map(|a| a.extract::<CronMonth>())
+                .transpose()?
+                .map(|s| s.0);
+            let interval = interval.extract::<CronMonth>()?;
+            Ok(Self(CronStepType::Step {
+                start,
+                step: interval.0,
+            }))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Month")
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct ImageVersionEvent {
-        names: Option<Vec<String>>,
-        versions: Option<Vec<String>>,
+    struct DayOfWeek(CronStepType);
+    impl Display for DayOfWeek {
+        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
+            write!(f, "{}", self.0)
+        }
     }
     #[pymethods]
-    impl ImageVersionEvent {
+    impl DayOfWeek {
         #[new]
-        #[pyo3(signature = (*, names=None, versions=None))]
-        fn new(names: Option<Vec<String>>, versions: Option<Vec<String>>) -> Self {
-            let names = names.filter(|v| !v.is_empty());
-            let versions = versions.filter(|v| !v.is_empty());
-            Self { names, versions }
+        fn new(day_of_week: &Bound<PyAny>) -> PyResult<Self> {
+            if let Ok(l) = day_of_week.extract::<Bound<PyList>>() {
+                let mut res = Vec::new();
+                for item in l.iter() {
+                    let item = item.extract::<CronDayOfWeek>()?;
+                    res.push(item.0);
+                }
+                return Ok(Self(CronStepType::List(res)));
+            }
+            let day_of_week = day_of_week.extract::<CronMonth>()?;
+            Ok(Self(CronStepType::Value(day_of_week.0)))
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        #[staticmethod]
+        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
+            let min = min.extract::<CronDayOfWeek>()?;
+            let max = max.extract::<CronDayOfWeek>()?;
+            Ok(Self(CronStepType::Range(min.0, max.0)))
         }
-    }
-    impl MaybeYamlable for &ImageVersionEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.names.is_some() || self.versions.is_some() {
-                let mut out = Hash::new();
-                out.insert_yaml_opt("names", self.names.as_ref());
-                out.insert_yaml_opt("versions", self.versions.as_ref());
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+        #[staticmethod]
+        #[pyo3(signature = (interval, *, start = None))]
+        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
+            let start = start
+                .map(|a| a.extract::<CronDayOfWeek>())
+                .transpose()?
+                .map(|s| s.0);
+            let interval = interval.extract::<CronDayOfWeek>()?;
+            Ok(Self(CronStepType::Step {
+                start,
+                step: interval.0,
+            }))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "DayOfWeek")
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct IssueCommentEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
+    struct Cron {
+        minute: Option<Minute>,
+        hour: Option<Hour>,
+        day: Option<Day>,
+        month: Option<Month>,
+        day_of_week: Option<DayOfWeek>,
     }
     #[pymethods]
-    impl IssueCommentEvent {
+    impl Cron {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
-        fn new(created: bool, edited: bool, deleted: bool) -> Self {
+        #[pyo3(signature = (*, minute = None, hour = None, day = None, month = None, day_of_week = None))]
+        fn new(
+            minute: Option<Minute>,
+            hour: Option<Hour>,
+            day: Option<Day>,
+            month: Option<Month>,
+            day_of_week: Option<DayOfWeek>,
+        ) -> Self {
             Self {
-                created,
-                edited,
-                deleted,
+                minute,
+                hour,
+                day,
+                month,
+                day_of_week,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Cron")
         }
     }
-    impl MaybeYamlable for &IssueCommentEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.edited || self.deleted {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+    impl Yamlable for &Cron {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            let s = format!(
+                "{} {} {} {} {}",
+                self.minute
+                    .clone()
+                    .map_or("*".to_string(), |s| s.to_string()),
+                self.hour.clone().map_or("*".to_string(), |s| s.to_string()),
+                self.day.clone().map_or("*".to_string(), |s| s.to_string()),
+                self.month
+                    .clone()
+                    .map_or("*".to_string(), |s| s.to_string()),
+                self.day_of_week
+                    .clone()
+                    .map_or("*".to_string(), |s| s.to_string())
+            );
+            out.insert_yaml("cron", s);
+            Yaml::Hash(out)
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct IssuesEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
-        transferred: bool,
-        pinned: bool,
-        unpinned: bool,
-        closed: bool,
-        reopened: bool,
-        assigned: bool,
-        unassigned: bool,
-        labeled: bool,
-        unlabeled: bool,
-        locked: bool,
-        unlocked: bool,
-        milestoned: bool,
-        demilestoned: bool,
-        typed: bool,
-        untyped: bool,
+    struct ScheduleEvent {
+        crons: Option<Vec<Cron>>,
     }
     #[pymethods]
-    impl IssuesEvent {
+    impl ScheduleEvent {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false,  transferred=false, pinned=false, unpinned=false, closed=false, reopened=false, assigned=false, unassigned=false, labeled=false, unlabeled=false, locked=false, unlocked=false, milestoned=false, demilestoned=false, typed=false, untyped=false))]
-        fn new(
-            created: bool,
-            edited: bool,
-            deleted: bool,
-            transferred: bool,
-            pinned: bool,
-            unpinned: bool,
-            closed: bool,
-            reopened: bool,
-            assigned: bool,
-            unassigned: bool,
-            labeled: bool,
-            unlabeled: bool,
-            locked: bool,
-            unlocked: bool,
-            milestoned: bool,
-            demilestoned: bool,
-            typed: bool,
-            untyped: bool,
-        ) -> Self {
-            Self {
-                created,
-                edited,
-                deleted,
-                transferred,
-                pinned,
-                unpinned,
-                closed,
-                reopened,
-                assigned,
-                unassigned,
-                labeled,
-                unlabeled,
-                locked,
-                unlocked,
-                milestoned,
-                demilestoned,
-                typed,
-                untyped,
-            }
+        #[pyo3(signature = (*, crons=None))]
+        fn new(crons: Option<Vec<Cron>>) -> Self {
+            let crons = crons.filter(|v| !v.is_empty());
+            Self { crons }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "ScheduleEvent")
+        }
     }
-    impl MaybeYamlable for &IssuesEvent {
+    impl MaybeYamlable for &ScheduleEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created
-                || self.edited
-                || self.deleted
-                || self.transferred
-                || self.pinned
-                || self.unpinned
-                || self.closed
-                || self.reopened
-                || self.assigned
-                || self.unassigned
-                || self.labeled
-                || self.unlabeled
-                || self.locked
-                || self.unlocked
-                || self.milestoned
-                || self.demilestoned
-                || self.typed
-                || self.untyped
-            {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                arr.push_yaml_cond("transferred", self.transferred);
-                arr.push_yaml_cond("pinned", self.pinned);
-                arr.push_yaml_cond("unpinned", self.unpinned);
-                arr.push_yaml_cond("closed", self.closed);
-                arr.push_yaml_cond("reopened", self.reopened);
-                arr.push_yaml_cond("assigned", self.assigned);
-                arr.push_yaml_cond("unassigned", self.unassigned);
-                arr.push_yaml_cond("labeled", self.labeled);
-                arr.push_yaml_cond("unlabeled", self.unlabeled);
-                arr.push_yaml_cond("locked", self.locked);
-                arr.push_yaml_cond("unlocked", self.unlocked);
-                arr.push_yaml_cond("milestoned", self.milestoned);
-                arr.push_yaml_cond("demilestoned", self.demilestoned);
-                arr.push_yaml_cond("typed", self.typed);
-                arr.push_yaml_cond("untyped", self.untyped);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
+            let mut out = Array::new();
+            if let Some(crons) = &self.crons {
+                for cron in crons {
+                    out.push_yaml(cron);
+                }
+                Some(Yaml::Array(out))
             } else {
                 None
             }
@@ -4437,35 +8136,31 @@ mod yamloom {
 
     #[pyclass]
     #[derive(Clone)]
-    struct LabelEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
+    struct WatchEvent {
+        started: bool,
     }
     #[pymethods]
-    impl LabelEvent {
+    impl WatchEvent {
         #[new]
-        #[pyo3(signature = (*, created=false, edited=false, deleted=false))]
-        fn new(created: bool, edited: bool, deleted: bool) -> Self {
-            Self {
-                created,
-                edited,
-                deleted,
-            }
+        #[pyo3(signature = (*, started=false))]
+        fn new(started: bool) -> Self {
+            Self { started }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WatchEvent")
+        }
     }
-    impl MaybeYamlable for &LabelEvent {
+    impl MaybeYamlable for &WatchEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.edited || self.deleted {
+            if self.started {
                 let mut out = Hash::new();
                 let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
+                arr.push_yaml_cond("started", self.started);
                 out.insert_yaml("types", Yaml::Array(arr));
                 Some(Yaml::Hash(out))
             } else {
@@ -4474,232 +8169,168 @@ mod yamloom {
         }
     }
 
+    #[derive(Clone)]
+    enum WorkflowInputType {
+        Boolean { default: Option<BoolLike> },
+        Number { default: Option<IntLike> },
+        String { default: Option<StringLike> },
+    }
+    impl WorkflowInputType {
+        fn get_type(&self) -> Yaml {
+            match self {
+                Self::Boolean { .. } => Yaml::from_str("boolean"),
+                Self::Number { .. } => Yaml::from_str("number"),
+                Self::String { .. } => Yaml::from_str("string"),
+            }
+        }
+        fn get_default(&self) -> Option<Yaml> {
+            match self {
+                Self::Boolean { default } => default.clone().map(|b| b.as_yaml()),
+                Self::Number { default } => default.clone().map(|n| n.as_yaml()),
+                Self::String { default } => default.clone().map(|s| s.as_yaml()),
+            }
+        }
+    }
+
     #[pyclass]
     #[derive(Clone)]
-    struct MergeGroupEvent {
-        checks_requested: bool,
+    struct WorkflowInput {
+        description: Option<String>,
+        input_type: WorkflowInputType,
+        required: Option<bool>,
     }
     #[pymethods]
-    impl MergeGroupEvent {
-        #[new]
-        #[pyo3(signature = (*, checks_requested=false))]
-        fn new(checks_requested: bool) -> Self {
-            Self { checks_requested }
+    impl WorkflowInput {
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn boolean(
+            description: Option<String>,
+            default: Option<BoolLike>,
+            required: Option<bool>,
+        ) -> PyResult<Self> {
+            if let Some(default) = &default {
+                validate_bool_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+            }
+            Ok(Self {
+                description,
+                input_type: WorkflowInputType::Boolean { default },
+                required,
+            })
+        }
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn number(
+            description: Option<String>,
+            default: Option<IntLike>,
+            required: Option<bool>,
+        ) -> PyResult<Self> {
+            if let Some(default) = &default {
+                validate_int_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+            }
+            Ok(Self {
+                description,
+                input_type: WorkflowInputType::Number { default },
+                required,
+            })
+        }
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn string(
+            description: Option<String>,
+            default: Option<StringLike>,
+            required: Option<bool>,
+        ) -> PyResult<Self> {
+            if let Some(default) = &default {
+                validate_string_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+            }
+            Ok(Self {
+                description,
+                input_type: WorkflowInputType::String { default },
+                required,
+            })
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowInput")
         }
     }
-    impl MaybeYamlable for &MergeGroupEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.checks_requested {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("checks_requested", self.checks_requested);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+    impl Yamlable for &WorkflowInput {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("description", &self.description);
+            out.insert_yaml("type", self.input_type.get_type());
+            out.insert_yaml_opt("required", self.required);
+            out.insert_yaml_opt("default", self.input_type.get_default());
+            Yaml::Hash(out)
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct MilestoneEvent {
-        created: bool,
-        closed: bool,
-        opened: bool,
-        edited: bool,
-        deleted: bool,
+    struct WorkflowOutput {
+        description: Option<String>,
+        value: StringLike,
     }
     #[pymethods]
-    impl MilestoneEvent {
+    impl WorkflowOutput {
         #[new]
-        #[pyo3(signature = (*, created=false, closed=false, opened=false, edited=false, deleted=false))]
-        fn new(created: bool, closed: bool, opened: bool, edited: bool, deleted: bool) -> Self {
-            Self {
-                created,
-                closed,
-                opened,
-                edited,
-                deleted,
-            }
+        #[pyo3(signature = (value, *, description=None))]
+        fn new(value: StringLike, description: Option<String>) -> PyResult<Self> {
+            validate_string_like(&value, ALLOWED_WORKFLOW_CALL_OUTPUT_VALUE)?;
+            Ok(Self { description, value })
         }
 
         fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowOutput")
         }
     }
-    impl MaybeYamlable for &MilestoneEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.closed || self.opened || self.edited || self.deleted {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("closed", self.closed);
-                arr.push_yaml_cond("opened", self.opened);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+    impl Yamlable for &WorkflowOutput {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("description", &self.description);
+            out.insert_yaml("value", &self.value);
+            Yaml::Hash(out)
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct PullRequestEvent {
-        assigned: bool,
-        unassigned: bool,
-        labeled: bool,
-        unlabeled: bool,
-        opened: bool,
-        edited: bool,
-        closed: bool,
-        reopened: bool,
-        synchronize: bool,
-        converted_to_draft: bool,
-        locked: bool,
-        unlocked: bool,
-        enqueued: bool,
-        dequeued: bool,
-        milestoned: bool,
-        demilestoned: bool,
-        ready_for_review: bool,
-        review_requested: bool,
-        review_request_removed: bool,
-        auto_merge_enabled: bool,
-        auto_merge_disabled: bool,
-        branches: Option<Vec<String>>,
-        branches_ignore: Option<Vec<String>>,
-        paths: Option<Vec<String>>,
-        paths_ignore: Option<Vec<String>>,
+    struct WorkflowSecret {
+        description: Option<String>,
+        required: Option<bool>,
     }
     #[pymethods]
-    impl PullRequestEvent {
+    impl WorkflowSecret {
         #[new]
-        #[pyo3(signature = (*, branches=None, branches_ignore=None, paths=None, paths_ignore=None, assigned=false, unassigned=false, labeled=false, unlabeled=false, opened=false, edited=false, closed=false, reopened=false, synchronize=false, converted_to_draft=false, locked=false, unlocked=false, enqueued=false, dequeued=false, milestoned=false, demilestoned=false, ready_for_review=false, review_requested=false, review_request_removed=false, auto_merge_enabled=false, auto_merge_disabled=false))]
-        fn new(
-            branches: Option<Vec<String>>,
-            branches_ignore: Option<Vec<String>>,
-            paths: Option<Vec<String>>,
-            paths_ignore: Option<Vec<String>>,
-            assigned: bool,
-            unassigned: bool,
-            labeled: bool,
-            unlabeled: bool,
-            opened: bool,
-            edited: bool,
-            closed: bool,
-            reopened: bool,
-            synchronize: bool,
-            converted_to_draft: bool,
-            locked: bool,
-            unlocked: bool,
-            enqueued: bool,
-            dequeued: bool,
-            milestoned: bool,
-            demilestoned: bool,
-            ready_for_review: bool,
-            review_requested: bool,
-            review_request_removed: bool,
-            auto_merge_enabled: bool,
-            auto_merge_disabled: bool,
-        ) -> Self {
-            let branches = branches.filter(|v| !v.is_empty());
-            let branches_ignore = branches_ignore.filter(|v| !v.is_empty());
-            let paths = paths.filter(|v| !v.is_empty());
-            let paths_ignore = paths_ignore.filter(|v| !v.is_empty());
+        #[pyo3(signature = (*, description=None, required=None))]
+        fn new(description: Option<String>, required: Option<bool>) -> Self {
             Self {
-                assigned,
-                unassigned,
-                labeled,
-                unlabeled,
-                opened,
-                edited,
-                closed,
-                reopened,
-                synchronize,
-                converted_to_draft,
-                locked,
-                unlocked,
-                enqueued,
-                dequeued,
-                milestoned,
-                demilestoned,
-                ready_for_review,
-                review_requested,
-                review_request_removed,
-                auto_merge_enabled,
-                auto_merge_disabled,
-                branches,
-                branches_ignore,
-                paths,
-                paths_ignore,
+                description,
+                required,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowSecret")
+        }
     }
-    impl MaybeYamlable for &PullRequestEvent {
+    impl MaybeYamlable for &WorkflowSecret {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
             let mut out = Hash::new();
-            out.insert_yaml_opt("branches", self.branches.as_ref());
-            out.insert_yaml_opt("branches-ignore", self.branches_ignore.as_ref());
-            out.insert_yaml_opt("paths", self.paths.as_ref());
-            out.insert_yaml_opt("paths-ignore", self.paths_ignore.as_ref());
-            if self.assigned
-                || self.unassigned
-                || self.labeled
-                || self.unlabeled
-                || self.opened
-                || self.edited
-                || self.closed
-                || self.reopened
-                || self.synchronize
-                || self.converted_to_draft
-                || self.locked
-                || self.unlocked
-                || self.enqueued
-                || self.dequeued
-                || self.milestoned
-                || self.demilestoned
-                || self.ready_for_review
-                || self.review_requested
-                || self.review_request_removed
-                || self.auto_merge_enabled
-                || self.auto_merge_disabled
-            {
-                let mut arr = Array::new();
-                arr.push_yaml_cond("assigned", self.assigned);
-                arr.push_yaml_cond("unassigned", self.unassigned);
-                arr.push_yaml_cond("labeled", self.labeled);
-                arr.push_yaml_cond("unlabeled", self.unlabeled);
-                arr.push_yaml_cond("opened", self.opened);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("closed", self.closed);
-                arr.push_yaml_cond("reopened", self.reopened);
-                arr.push_yaml_cond("synchronize", self.synchronize);
-                arr.push_yaml_cond("converted_to_draft", self.converted_to_draft);
-                arr.push_yaml_cond("locked", self.locked);
-                arr.push_yaml_cond("unlocked", self.unlocked);
-                arr.push_yaml_cond("enqueued", self.enqueued);
-                arr.push_yaml_cond("dequeued", self.dequeued);
-                arr.push_yaml_cond("milestoned", self.milestoned);
-                arr.push_yaml_cond("demilestoned", self.demilestoned);
-                arr.push_yaml_cond("ready_for_review", self.ready_for_review);
-                arr.push_yaml_cond("review_requested", self.review_requested);
-                arr.push_yaml_cond("review_request_removed", self.review_request_removed);
-                arr.push_yaml_cond("auto_merge_enabled", self.auto_merge_enabled);
-                arr.push_yaml_cond("auto_merge_disabled", self.auto_merge_disabled);
-                out.insert_yaml("types", Yaml::Array(arr));
-            }
+            out.insert_yaml_opt("description", &self.description);
+            out.insert_yaml_opt("required", self.required);
             if out.is_empty() {
                 None
             } else {
@@ -4710,37 +8341,109 @@ mod yamloom {
 
     #[pyclass]
     #[derive(Clone)]
-    struct PullRequestReviewEvent {
-        submitted: bool,
-        edited: bool,
-        dismissed: bool,
+    struct WorkflowCallEvent {
+        inputs: PyMap<String, WorkflowInput>,
+        outputs: PyMap<String, WorkflowOutput>,
+        secrets: PyMap<String, WorkflowSecret>,
     }
     #[pymethods]
-    impl PullRequestReviewEvent {
+    impl WorkflowCallEvent {
         #[new]
-        #[pyo3(signature = (*, submitted=false, edited=false, dismissed=false))]
-        fn new(submitted: bool, edited: bool, dismissed: bool) -> Self {
+        #[pyo3(signature = (*, inputs=None, outputs=None, secrets=None))]
+        fn new(
+            inputs: Option<PyMap<String, WorkflowInput>>,
+            outputs: Option<PyMap<String, WorkflowOutput>>,
+            secrets: Option<PyMap<String, WorkflowSecret>>,
+        ) -> Self {
             Self {
-                submitted,
-                edited,
-                dismissed,
+                inputs: inputs.unwrap_or_default(),
+                outputs: outputs.unwrap_or_default(),
+                secrets: secrets.unwrap_or_default(),
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowCallEvent")
+        }
     }
-    impl MaybeYamlable for &PullRequestReviewEvent {
+    impl MaybeYamlable for WorkflowCallEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.submitted || self.edited || self.dismissed {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("submitted", self.submitted);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("dismissed", self.dismissed);
-                out.insert_yaml("types", Yaml::Array(arr));
+            let mut out = Hash::new();
+            let mut inputs = Hash::new();
+            for (k, v) in self.inputs.iter() {
+                inputs.insert_yaml(k, v);
+            }
+            if !inputs.is_empty() {
+                out.insert_yaml("inputs", Yaml::Hash(inputs));
+            }
+            let mut outputs = Hash::new();
+            for (k, v) in self.outputs.iter() {
+                outputs.insert_yaml(k, v);
+            }
+            if !outputs.is_empty() {
+                out.insert_yaml("outputs", Yaml::Hash(outputs));
+            }
+            let mut secrets = Hash::new();
+            for (k, v) in self.secrets.iter() {
+                secrets.insert_yaml(k, v.maybe_as_yaml().unwrap_or(Yaml::Null));
+            }
+            if !secrets.is_empty() {
+                out.insert_yaml("secrets", Yaml::Hash(secrets));
+            }
+            if out.is_empty() {
+                None
+            } else {
                 Some(Yaml::Hash(out))
+            }
+        }
+    }
+
+    #[derive(Clone)]
+    enum WorkflowDispatchInputType {
+        Boolean {
+            default: Option<bool>,
+        },
+        Choice {
+            default: Option<String>,
+            options: Vec<String>,
+        },
+        Number {
+            default: Option<i64>,
+        },
+        Environment,
+        String {
+            default: Option<String>,
+        },
+    }
+    impl WorkflowDispatchInputType {
+        fn get_type(&self) -> Yaml {
+            match self {
+                Self::Boolean { .. } => Yaml::from_str("boolean"),
+                Self::Choice { .. } => Yaml::from_str("choice"),
+                Self::Number { .. } => Yaml::from_str("number"),
+                Self::Environment => Yaml::from_str("environment"),
+                Self::String { .. } => Yaml::from_str("string"),
+            }
+        }
+        fn get_default(&self) -> Option<Yaml> {
+            match self {
+                Self::Boolean { default } => default.map(Yaml::Boolean),
+                Self::Choice { default, .. } | Self::String { default } => {
+                    default.clone().map(Yaml::String)
+                }
+                Self::Number { default } => default.map(Yaml::Integer),
+                Self::Environment => None, // TODO: check if environment can have a default
+            }
+        }
+        fn get_options(&self) -> Option<Yaml> {
+            if let Self::Choice { options, .. } = self {
+                Some(Yaml::Array(
+                    options.iter().map(|s| Yaml::String(s.clone())).collect(),
+                ))
             } else {
                 None
             }
@@ -4749,36 +8452,126 @@ mod yamloom {
 
     #[pyclass]
     #[derive(Clone)]
-    struct PullRequestReviewCommentEvent {
-        created: bool,
-        edited: bool,
-        deleted: bool,
+    struct WorkflowDispatchInput {
+        description: Option<String>,
+        input_type: WorkflowDispatchInputType,
+        required: Option<bool>,
+    }
+    #[pymethods]
+    impl WorkflowDispatchInput {
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn boolean(
+            description: Option<String>,
+            default: Option<bool>,
+            required: Option<bool>,
+        ) -> Self {
+            Self {
+                description,
+                input_type: WorkflowDispatchInputType::Boolean { default },
+                required,
+            }
+        }
+        #[staticmethod]
+        #[pyo3(signature = (options, *, description=None, default=None, required=None))]
+        fn choice(
+            options: Vec<String>,
+            description: Option<String>,
+            default: Option<String>,
+            required: Option<bool>,
+        ) -> Self {
+            Self {
+                description,
+                input_type: WorkflowDispatchInputType::Choice { default, options },
+                required,
+            }
+        }
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn number(
+            description: Option<String>,
+            default: Option<i64>,
+            required: Option<bool>,
+        ) -> Self {
+            Self {
+                description,
+                input_type: WorkflowDispatchInputType::Number { default },
+                required,
+            }
+        }
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, required=None))]
+        fn environment(description: Option<String>, required: Option<bool>) -> Self {
+            Self {
+                description,
+                input_type: WorkflowDispatchInputType::Environment,
+                required,
+            }
+        }
+        #[staticmethod]
+        #[pyo3(signature = (*, description=None, default=None, required=None))]
+        fn string(
+            description: Option<String>,
+            default: Option<String>,
+            required: Option<bool>,
+        ) -> Self {
+            Self {
+                description,
+                input_type: WorkflowDispatchInputType::String { default },
+                required,
+            }
+        }
+
+        fn __str__(&self) -> PyResult<String> {
+            self.as_yaml_string()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowDispatchInput")
+        }
+    }
+    impl Yamlable for &WorkflowDispatchInput {
+        fn as_yaml(&self) -> Yaml {
+            let mut out = Hash::new();
+            out.insert_yaml_opt("description", &self.description);
+            out.insert_yaml("type", self.input_type.get_type());
+            out.insert_yaml_opt("required", self.required);
+            out.insert_yaml_opt("default", self.input_type.get_default());
+            out.insert_yaml_opt("options", self.input_type.get_options());
+            Yaml::Hash(out)
+        }
+    }
+
+    #[pyclass]
+    #[derive(Clone)]
+    struct WorkflowDispatchEvent {
+        inputs: Option<PyMap<String, WorkflowDispatchInput>>,
     }
     #[pymethods]
-    impl PullRequestReviewCommentEvent {
+    impl WorkflowDispatchEvent {
         #[new]
-        #[pyo3(signature = (*, created=false,edited=false, deleted=false))]
-        fn new(created: bool, edited: bool, deleted: bool) -> Self {
+        #[pyo3(signature = (*, inputs=None))]
+        fn new(inputs: Option<PyMap<String, WorkflowDispatchInput>>) -> Self {
             Self {
-                created,
-                edited,
-                deleted,
+                inputs: inputs.filter(|i| !i.is_empty()),
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowDispatchEvent")
+        }
     }
-    impl MaybeYamlable for &PullRequestReviewCommentEvent {
+    impl MaybeYamlable for &WorkflowDispatchEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.created || self.edited || self.deleted {
+            if let Some(inputs) = &self.inputs {
                 let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                out.insert_yaml("types", Yaml::Array(arr));
+                for (k, v) in inputs.iter() {
+                    out.insert_yaml(k, v);
+                }
                 Some(Yaml::Hash(out))
             } else {
                 None
@@ -4788,49 +8581,60 @@ mod yamloom {
 
     #[pyclass]
     #[derive(Clone)]
-    struct PushEvent {
+    struct WorkflowRunEvent {
+        workflows: Option<Vec<String>>,
+        completed: bool,
+        requested: bool,
+        in_progress: bool,
         branches: Option<Vec<String>>,
         branches_ignore: Option<Vec<String>>,
-        tags: Option<Vec<String>>,
-        tags_ignore: Option<Vec<String>>,
-        paths: Option<Vec<String>>,
-        paths_ignore: Option<Vec<String>>,
     }
     #[pymethods]
-    impl PushEvent {
+    impl WorkflowRunEvent {
         #[new]
-        #[pyo3(signature = (*, branches=None, branches_ignore=None, tags=None, tags_ignore=None, paths=None, paths_ignore=None))]
+        #[pyo3(signature = (*, workflows=None, completed=false, requested=false, in_progress=false, branches=None, branches_ignore=None))]
         fn new(
+            workflows: Option<Vec<String>>,
+            completed: bool,
+            requested: bool,
+            in_progress: bool,
             branches: Option<Vec<String>>,
             branches_ignore: Option<Vec<String>>,
-            tags: Option<Vec<String>>,
-            tags_ignore: Option<Vec<String>>,
-            paths: Option<Vec<String>>,
-            paths_ignore: Option<Vec<String>>,
         ) -> Self {
+            let workflows = workflows.filter(|w| !w.is_empty());
+            let branches = branches.filter(|b| !b.is_empty());
+            let branches_ignore = branches_ignore.filter(|b| !b.is_empty());
             Self {
+                workflows,
+                completed,
+                requested,
+                in_progress,
                 branches,
                 branches_ignore,
-                tags,
-                tags_ignore,
-                paths,
-                paths_ignore,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowRunEvent")
+        }
     }
-    impl MaybeYamlable for &PushEvent {
+    impl MaybeYamlable for &WorkflowRunEvent {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
             let mut out = Hash::new();
-            out.insert_yaml_opt("branches", self.branches.as_ref());
-            out.insert_yaml_opt("branches-ignore", self.branches_ignore.as_ref());
-            out.insert_yaml_opt("tags", self.tags.as_ref());
-            out.insert_yaml_opt("tags-ignore", self.tags_ignore.as_ref());
-            out.insert_yaml_opt("paths", self.paths.as_ref());
-            out.insert_yaml_opt("paths-ignore", self.paths_ignore.as_ref());
+            out.insert_yaml_opt("workflows", &self.workflows);
+            if self.completed || self.requested || self.in_progress {
+                let mut types = Array::new();
+                types.push_yaml_cond("completed", self.completed);
+                types.push_yaml_cond("requested", self.requested);
+                types.push_yaml_cond("in_progress", self.in_progress);
+                out.insert_yaml("types", Yaml::Array(types));
+            }
+            out.insert_yaml_opt("branches", &self.branches);
+            out.insert_yaml_opt("branches-ignore", &self.branches_ignore);
             if out.is_empty() {
                 None
             } else {
@@ -4840,1577 +8644,4571 @@ mod yamloom {
     }
 
     #[pyclass]
-    #[derive(Clone)]
-    struct RegistryPackageEvent {
-        published: bool,
-        updated: bool,
-    }
-    #[pymethods]
-    impl RegistryPackageEvent {
-        #[new]
-        #[pyo3(signature = (*, published=false, updated=false))]
-        fn new(published: bool, updated: bool) -> Self {
-            Self { published, updated }
-        }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
-        }
-    }
-    impl MaybeYamlable for &RegistryPackageEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.published || self.updated {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("published", self.published);
-                arr.push_yaml_cond("updated", self.updated);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
-        }
-    }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct ReleaseEvent {
-        published: bool,
-        unpublished: bool,
-        created: bool,
-        edited: bool,
-        deleted: bool,
-        prereleased: bool,
-        released: bool,
+    #[derive(Clone, Default)]
+    struct Events {
+        branch_protection_rule: Option<BranchProtectionRuleEvent>,
+        check_run: Option<CheckRunEvent>,
+        check_suite: Option<CheckSuiteEvent>,
+        create: bool,
+        delete: bool,
+        deployment: bool,
+        deployment_status: bool,
+        discussion: Option<DiscussionEvent>,
+        discussion_comment: Option<DiscussionCommentEvent>,
+        fork: bool,
+        gollum: bool,
+        image_version: Option<ImageVersionEvent>,
+        issue_comment: Option<IssueCommentEvent>,
+        issues: Option<IssuesEvent>,
+        label: Option<LabelEvent>,
+        merge_group: Option<MergeGroupEvent>,
+        milestone: Option<MilestoneEvent>,
+        page_build: bool,
+        public: bool,
+        pull_request: Option<PullRequestEvent>,
+        pull_request_review: Option<PullRequestReviewEvent>,
+        pull_request_review_comment: Option<PullRequestReviewCommentEvent>,
+        pull_request_target: Option<PullRequestEvent>,
+        push: Option<PushEvent>,
+        registry_package: Option<RegistryPackageEvent>,
+        release: Option<ReleaseEvent>,
+        schedule: Option<ScheduleEvent>,
+        status: bool,
+        watch: Option<WatchEvent>,
+        workflow_call: Option<WorkflowCallEvent>,
+        workflow_dispatch: Option<WorkflowDispatchEvent>,
+        workflow_run: Option<WorkflowRunEvent>,
     }
     #[pymethods]
-    impl ReleaseEvent {
+    impl Events {
+        /// A set of events which may trigger a Workflow.
+        ///
+        /// Parameters
+        /// ----------
+        /// branch_protection_rule
+        ///     Triggers when the branch protection rules for the repository are changed.
+        /// check_run
+        ///     Triggers when activity related to a check run occurs.
+        /// check_suite
+        ///     Triggers when activity related to a check suite occurs.
+        /// create
+        ///     Triggers when someone creates a new branch or tag (but not if more than three tags are made at once).
+        /// delete
+        ///     Triggers when someone deletes a new branch or tag
+        /// deployment
+        ///     Triggers when a deployment is created.
+        /// deployment_status
+        ///     Triggers when a third party service provides a deployment status (unlesss deployment status's state is set to ``inactive``).
+        /// discussion
+        ///     Triggers when a discussion is created or modified.
+        /// discussion_comment
+        ///     Triggers on a comment on a discussion.
+        /// fork
+        ///     Triggers when someone forks a repository.
+        /// gollum
+        ///     Triggers when someone creates/edits a Wiki page.
+        /// image_version
+        ///     Triggers when a new version of a specified image becomes available.
+        /// issue_comment
+        ///     Triggers when an issue or pull request comment is created, edited, or deleted.
+        /// issues
+        ///     Triggers when an issue is created or modified.
+        /// label
+        ///     Triggers when a label is created or modified.
+        /// merge_group
+        ///     Triggers when a pull request is added to a merge queue which adds the pull request
+        ///     to a merge group.
+        /// milestone
+        ///     Triggers when a milestone is created or modified.
+        /// page_build
+        ///     Triggers on pushes to a branch which is the publishing source for GitHub Pages.
+        /// public
+        ///     Triggers when the repository visibility is changed from private to public.
+        /// pull_request
+        ///     Triggers on activity related to a pull request
+        /// pull_request_review
+        ///     Triggers on actions related to a pull request review.
+        /// pull_request_review_comment
+        ///     Triggers when a pull request review comment is modified.
+        /// pull_request_target
+        ///     Triggers when some activity occurs on a pull request. This runs in the context of
+        ///     the default branch of the repository rather than the context of the merge commit
+        ///     (use the ``pull_request`` argument for that).
+        /// push
+        ///     Triggers when a commit or tag is pushed (also when a repository is created from a
+        ///     template).
+        /// registry_package
+        ///     Triggers on activity related to GitHub Packages
+        /// release
+        ///     Triggers on release activity.
+        /// repository_dispatch
+        ///     Triggers when the GitHub API is useed to trigger a webhook event called
+        ///     ``repository_dispatch`` (used to trigger a workflow for activity that happens
+        ///     outside of GitHub).
+        /// schedule
+        ///     Triggers on a fixed time schedule (cronjob).
+        /// status
+        ///     Triggers when the status of a commit changes.
+        /// watch
+        ///     Triggers when the repository is starred.
+        /// workflow_call
+        ///     Triggers when the workflow is called by another workflow.
+        /// workflow_dispatch
+        ///     Allows the workflow to be triggered manually through the GitHub API, CLI, or UI.
+        /// workflow_run
+        ///     Triggers when a workflow run is requested or completed.
+        ///
+        /// Notes
+        /// -----
+        /// See `the documentation on GitHub <https://docs.github.com/en/actions/reference/workflows-and-actions/events-that-trigger-workflows#branch_protection_rule>`_ for more details.
         #[new]
-        #[pyo3(signature = (*, published=false, unpublished=false, created=false, edited=false, deleted=false, prereleased=false, released=false))]
+        #[pyo3(signature = (*, branch_protection_rule=None, check_run=None, check_suite=None, create=false, delete=false, deployment=false, deployment_status=false, discussion=None, discussion_comment=None, fork=false, gollum=false, image_version=None, issue_comment=None, issues=None, label=None, merge_group=None, milestone=None, page_build=false, public=false, pull_request=None, pull_request_review=None, pull_request_review_comment=None, pull_request_target=None, push=None, registry_package=None, release=None, schedule=None, status=false, watch=None, workflow_call=None, workflow_dispatch=None, workflow_run=None))]
         fn new(
-            published: bool,
-            unpublished: bool,
-            created: bool,
-            edited: bool,
-            deleted: bool,
-            prereleased: bool,
-            released: bool,
+            branch_protection_rule: Option<BranchProtectionRuleEvent>,
+            check_run: Option<CheckRunEvent>,
+            check_suite: Option<CheckSuiteEvent>,
+            create: bool,
+            delete: bool,
+            deployment: bool,
+            deployment_status: bool,
+            discussion: Option<DiscussionEvent>,
+            discussion_comment: Option<DiscussionCommentEvent>,
+            fork: bool,
+            gollum: bool,
+            image_version: Option<ImageVersionEvent>,
+            issue_comment: Option<IssueCommentEvent>,
+            issues: Option<IssuesEvent>,
+            label: Option<LabelEvent>,
+            merge_group: Option<MergeGroupEvent>,
+            milestone: Option<MilestoneEvent>,
+            page_build: bool,
+            public: bool,
+            pull_request: Option<PullRequestEvent>,
+            pull_request_review: Option<PullRequestReviewEvent>,
+            pull_request_review_comment: Option<PullRequestReviewCommentEvent>,
+            pull_request_target: Option<PullRequestEvent>,
+            push: Option<PushEvent>,
+            registry_package: Option<RegistryPackageEvent>,
+            release: Option<ReleaseEvent>,
+            schedule: Option<ScheduleEvent>,
+            status: bool,
+            watch: Option<WatchEvent>,
+            workflow_call: Option<WorkflowCallEvent>,
+            workflow_dispatch: Option<WorkflowDispatchEvent>,
+            workflow_run: Option<WorkflowRunEvent>,
         ) -> Self {
             Self {
-                published,
-                unpublished,
-                created,
-                edited,
-                deleted,
-                prereleased,
-                released,
+                branch_protection_rule,
+                check_run,
+                check_suite,
+                create,
+                delete,
+                deployment,
+                deployment_status,
+                discussion,
+                discussion_comment,
+                fork,
+                gollum,
+                image_version,
+                issue_comment,
+                issues,
+                label,
+                merge_group,
+                milestone,
+                page_build,
+                public,
+                pull_request,
+                pull_request_review,
+                pull_request_review_comment,
+                pull_request_target,
+                push,
+                registry_package,
+                release,
+                schedule,
+                status,
+                watch,
+                workflow_call,
+                workflow_dispatch,
+                workflow_run,
             }
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.maybe_as_yaml_string()
         }
-    }
-    impl MaybeYamlable for &ReleaseEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.published
-                || self.unpublished
-                || self.created
-                || self.edited
-                || self.deleted
-                || self.prereleased
-                || self.released
-            {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("published", self.published);
-                arr.push_yaml_cond("unpublished", self.unpublished);
-                arr.push_yaml_cond("created", self.created);
-                arr.push_yaml_cond("edited", self.edited);
-                arr.push_yaml_cond("deleted", self.deleted);
-                arr.push_yaml_cond("prereleased", self.prereleased);
-                arr.push_yaml_cond("released", self.released);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
-        }
-    }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct RepositoryDispatchEvent {
-        types: Option<Vec<String>>,
-    }
-    #[pymethods]
-    impl RepositoryDispatchEvent {
-        #[new]
-        #[pyo3(signature = (*, types=None))]
-        fn new(types: Option<Vec<String>>) -> Self {
-            let types = types.filter(|v| !v.is_empty());
-            Self { types }
-        }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Events")
         }
     }
-    impl MaybeYamlable for &RepositoryDispatchEvent {
+    impl MaybeYamlable for &Events {
         fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("types", self.types.as_ref());
-            if out.is_empty() {
-                None
-            } else {
-                Some(Yaml::Hash(out))
-            }
-        }
-    }
+            let mut configured = Hash::new();
+            let mut simple_names: Vec<&str> = Vec::new();
 
-    #[derive(Clone)]
-    enum CronStepType {
-        Value(u8),
-        List(Vec<u8>),
-        Range(u8, u8),
-        Step { start: Option<u8>, step: u8 },
-    }
-    impl Display for CronStepType {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(
-                f,
-                "{}",
-                match self {
-                    Self::Value(v) => v.to_string(),
-                    Self::List(items) => items
-                        .iter()
-                        .map(std::string::ToString::to_string)
-                        .collect::<Vec<String>>()
-                        .join(","),
+            if let Some(event) = &self.branch_protection_rule {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("branch_protection_rule", yaml);
+                } else {
+                    simple_names.push("branch_protection_rule");
+                }
+            }
+            if let Some(event) = &self.check_run {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("check_run", yaml);
+                } else {
+                    simple_names.push("check_run");
+                }
+            }
+            if let Some(event) = &self.check_suite {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("check_suite", yaml);
+                } else {
+                    simple_names.push("check_suite");
+                }
+            }
+            if let Some(event) = &self.discussion {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("discussion", yaml);
+                } else {
+                    simple_names.push("discussion");
+                }
+            }
+            if let Some(event) = &self.discussion_comment {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("discussion_comment", yaml);
+                } else {
+                    simple_names.push("discussion_comment");
+                }
+            }
 
-                    Self::Range(min, max) => format!("{min}-{max}"),
-                    Self::Step { start, step } => format!(
-                        "{}/{}",
-                        start.map(|s| s.to_string()).unwrap_or("*".to_string()),
-                        step
-                    ),
+            if let Some(event) = &self.image_version {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("image_version", yaml);
+                } else {
+                    simple_names.push("image_version");
+                }
+            }
+            if let Some(event) = &self.issue_comment {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("issue_comment", yaml);
+                } else {
+                    simple_names.push("issue_comment");
+                }
+            }
+            if let Some(event) = &self.issues {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("issues", yaml);
+                } else {
+                    simple_names.push("issues");
+                }
+            }
+            if let Some(event) = &self.label {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("label", yaml);
+                } else {
+                    simple_names.push("label");
+                }
+            }
+            if let Some(event) = &self.merge_group {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("merge_group", yaml);
+                } else {
+                    simple_names.push("merge_group");
+                }
+            }
+            if let Some(event) = &self.milestone {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("milestone", yaml);
+                } else {
+                    simple_names.push("milestone");
+                }
+            }
+            if let Some(event) = &self.pull_request {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("pull_request", yaml);
+                } else {
+                    simple_names.push("pull_request");
+                }
+            }
+            if let Some(event) = &self.pull_request_review {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("pull_request_review", yaml);
+                } else {
+                    simple_names.push("pull_request_review");
+                }
+            }
+            if let Some(event) = &self.pull_request_review_comment {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("pull_request_review_comment", yaml);
+                } else {
+                    simple_names.push("pull_request_review_comment");
+                }
+            }
+            if let Some(event) = &self.pull_request_target {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("pull_request_target", yaml);
+                } else {
+                    simple_names.push("pull_request_target");
+                }
+            }
+            if let Some(event) = &self.push {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("push", yaml);
+                } else {
+                    simple_names.push("push");
+                }
+            }
+            if let Some(event) = &self.registry_package {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("registry_package", yaml);
+                } else {
+                    simple_names.push("registry_package");
                 }
-            )
-        }
-    }
-
-    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
-    struct CronMinute(u8);
-
-    impl<'a, 'py> FromPyObject<'a, 'py> for CronMinute {
-        type Error = PyErr;
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            if let Ok(num) = obj.extract::<u8>()
-                && num <= 59
-            {
-                return Ok(CronMinute(num));
             }
-            Err(PyValueError::new_err(
-                "Minute must be an integer in range 0..=59",
-            ))
-        }
-    }
-
-    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
-    struct CronHour(u8);
-
-    impl<'a, 'py> FromPyObject<'a, 'py> for CronHour {
-        type Error = PyErr;
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            if let Ok(num) = obj.extract::<u8>()
-                && num <= 23
-            {
-                return Ok(CronHour(num));
+            if let Some(event) = &self.release {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("release", yaml);
+                } else {
+                    simple_names.push("release");
+                }
             }
-            Err(PyValueError::new_err(
-                "Hour must be an integer in range 0..=23",
-            ))
-        }
-    }
-
-    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
-    struct CronDay(u8);
-
-    impl<'a, 'py> FromPyObject<'a, 'py> for CronDay {
-        type Error = PyErr;
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            if let Ok(num) = obj.extract::<u8>()
-                && (1..=31).contains(&num)
-            {
-                return Ok(CronDay(num));
+            if let Some(event) = &self.schedule {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("schedule", yaml);
+                } else {
+                    simple_names.push("schedule");
+                }
             }
-            Err(PyValueError::new_err(
-                "Hour must be an integer in range 1..=31",
-            ))
-        }
-    }
-
-    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
-    struct CronMonth(u8);
-
-    impl<'a, 'py> FromPyObject<'a, 'py> for CronMonth {
-        type Error = PyErr;
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            let msg = "Month must be an integer in range 1..=12";
-            if let Ok(num) = obj.extract::<u8>()
-                && (1..=12).contains(&num)
-            {
-                return Ok(CronMonth(num));
+            if let Some(event) = &self.watch {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("watch", yaml);
+                } else {
+                    simple_names.push("watch");
+                }
             }
-            Err(PyValueError::new_err(msg))
-        }
-    }
-
-    #[derive(Debug, Copy, Clone, Eq, PartialEq)]
-    struct CronDayOfWeek(u8);
-
-    impl<'a, 'py> FromPyObject<'a, 'py> for CronDayOfWeek {
-        type Error = PyErr;
-        fn extract(obj: Borrowed<'a, 'py, PyAny>) -> Result<Self, Self::Error> {
-            let msg = "Day of week must be an integer in range 0..=6 (0=Sunday)";
-            if let Ok(num) = obj.extract::<u8>()
-                && num <= 6
-            {
-                return Ok(CronDayOfWeek(num));
+            if let Some(event) = &self.workflow_call {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("workflow_call", yaml);
+                } else {
+                    simple_names.push("workflow_call");
+                }
             }
-            Err(PyValueError::new_err(msg))
-        }
-    }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct Minute(CronStepType);
-    impl Display for Minute {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(f, "{}", self.0)
-        }
-    }
-    #[pymethods]
-    impl Minute {
-        #[new]
-        fn new(minute: &Bound<PyAny>) -> PyResult<Self> {
-            if let Ok(l) = minute.extract::<Bound<PyList>>() {
-                let mut res = Vec::new();
-                for item in l.iter() {
-                    let item = item.extract::<CronMinute>()?;
-                    res.push(item.0);
+            if let Some(event) = &self.workflow_dispatch {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("workflow_dispatch", yaml);
+                } else {
+                    simple_names.push("workflow_dispatch");
                 }
-                return Ok(Self(CronStepType::List(res)));
             }
-            let minute = minute.extract::<CronMinute>()?;
-            Ok(Self(CronStepType::Value(minute.0)))
-        }
-        #[staticmethod]
-        fn between(start: &Bound<PyAny>, end: &Bound<PyAny>) -> PyResult<Self> {
-            let min = start.extract::<CronMinute>()?;
-            let max = end.extract::<CronMinute>()?;
-            Ok(Self(CronStepType::Range(min.0, max.0)))
-        }
-        #[staticmethod]
-        #[pyo3(signature = (interval, *, start = None))]
-        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
-            let start = start
-                .map(|a| a.extract::<CronMinute>())
-                .transpose()?
-                .map(|s| s.0);
-            let interval = interval.extract::<CronMinute>()?;
-            Ok(Self(CronStepType::Step {
-                start,
-                step: interval.0,
-            }))
-        }
-    }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct Hour(CronStepType);
-    impl Display for Hour {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(f, "{}", self.0)
-        }
-    }
-    #[pymethods]
-    impl Hour {
-        #[new]
-        fn new(hour: &Bound<PyAny>) -> PyResult<Self> {
-            if let Ok(l) = hour.extract::<Bound<PyList>>() {
-                let mut res = Vec::new();
-                for item in l.iter() {
-                    let item = item.extract::<CronHour>()?;
-                    res.push(item.0);
+            if let Some(event) = &self.workflow_run {
+                if let Some(yaml) = event.maybe_as_yaml() {
+                    configured.insert_yaml("workflow_run", yaml);
+                } else {
+                    simple_names.push("workflow_run");
                 }
-                return Ok(Self(CronStepType::List(res)));
             }
-            let hour = hour.extract::<CronHour>()?;
-            Ok(Self(CronStepType::Value(hour.0)))
-        }
-        #[staticmethod]
-        fn between(start: &Bound<PyAny>, end: &Bound<PyAny>) -> PyResult<Self> {
-            let min = start.extract::<CronHour>()?;
-            let max = end.extract::<CronHour>()?;
-            Ok(Self(CronStepType::Range(min.0, max.0)))
-        }
-        #[staticmethod]
-        #[pyo3(signature = (interval, *, start = None))]
-        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
-            let start = start
-                .map(|a| a.extract::<CronHour>())
-                .transpose()?
-                .map(|s| s.0);
-            let interval = interval.extract::<CronHour>()?;
-            Ok(Self(CronStepType::Step {
-                start,
-                step: interval.0,
-            }))
-        }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct Day(CronStepType);
-    impl Display for Day {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(f, "{}", self.0)
-        }
-    }
-    #[pymethods]
-    impl Day {
-        #[new]
-        fn new(day: &Bound<PyAny>) -> PyResult<Self> {
-            if let Ok(l) = day.extract::<Bound<PyList>>() {
-                let mut res = Vec::new();
-                for item in l.iter() {
-                    let item = item.extract::<CronDay>()?;
-                    res.push(item.0);
+            if self.create {
+                simple_names.push("create");
+            }
+            if self.delete {
+                simple_names.push("delete");
+            }
+            if self.deployment {
+                simple_names.push("deployment");
+            }
+            if self.deployment_status {
+                simple_names.push("deployment_status");
+            }
+            if self.fork {
+                simple_names.push("fork");
+            }
+            if self.gollum {
+                simple_names.push("gollum");
+            }
+            if self.page_build {
+                simple_names.push("page_build");
+            }
+            if self.public {
+                simple_names.push("public");
+            }
+            if self.status {
+                simple_names.push("status");
+            }
+
+            if configured.is_empty() {
+                match simple_names.len() {
+                    0 => None,
+                    1 => Some(simple_names[0].as_yaml()),
+                    _ => {
+                        let mut arr = Array::new();
+                        for name in simple_names {
+                            arr.push_yaml(name);
+                        }
+                        Some(Yaml::Array(arr))
+                    }
+                }
+            } else {
+                for name in simple_names {
+                    configured.insert_yaml(name, Yaml::Null);
                 }
-                return Ok(Self(CronStepType::List(res)));
+                Some(Yaml::Hash(configured))
             }
-            let day = day.extract::<CronDay>()?;
-            Ok(Self(CronStepType::Value(day.0)))
-        }
-        #[staticmethod]
-        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
-            let min = min.extract::<CronDay>()?;
-            let max = max.extract::<CronDay>()?;
-            Ok(Self(CronStepType::Range(min.0, max.0)))
-        }
-        #[staticmethod]
-        #[pyo3(signature = (interval, *, start = None))]
-        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
-            let start = start
-                .map(|a| a.extract::<CronDay>())
-                .transpose()?
-                .map(|s| s.0);
-            let interval = interval.extract::<CronDay>()?;
-            Ok(Self(CronStepType::Step {
-                start,
-                step: interval.0,
-            }))
         }
     }
 
     #[pyclass]
     #[derive(Clone)]
-    struct Month(CronStepType);
-    impl Display for Month {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(f, "{}", self.0)
-        }
+    struct Workflow {
+        name: Option<String>,
+        run_name: Option<StringLike>,
+        on: Events,
+        permissions: Option<Permissions>,
+        env: Option<PyMap<String, StringLike>>,
+        defaults: Option<Defaults>,
+        concurrency: Option<Concurrency>,
+        jobs: Arc<PyMap<String, Job>>,
     }
     #[pymethods]
-    impl Month {
+    impl Workflow {
+        /// A configurable automated process made up of one or more jobs.
+        ///
+        /// Workflows are the primary entrypoint for ``yamloom``. Typical actions include constructing
+        /// workflows and then writing them to a file with ``Workflow.dump('path/to/file.yml')``.
+        ///
+        /// Parameters
+        /// ----------
+        /// jobs
+        ///     Jobs to run (in parallel by default).
+        /// on
+        ///     Events which may trigger the workflow.
+        /// name
+        ///     The name of the workflow.
+        /// run_name
+        ///     The name given to a particular run of the workflow.
+        /// permissions
+        ///     The default permissions granted to the ``GITHUB_TOKEN``.
+        /// env
+        ///     Global environment variables available at any step of any job in the workflow.
+        /// defaults
+        ///     Default settings which are applied to all jobs.
+        /// concurrency
+        ///     Settings to ensure only a single workflow of the given concurrency group runs at a time.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///
         #[new]
-        fn new(month: &Bound<PyAny>) -> PyResult<Self> {
-            if let Ok(l) = month.extract::<Bound<PyList>>() {
-                let mut res = Vec::new();
-                for item in l.iter() {
-                    let item = item.extract::<CronMonth>()?;
-                    res.push(item.0);
-                }
-                return Ok(Self(CronStepType::List(res)));
+        #[pyo3(signature = (*, jobs, on, name = None, run_name = None, permissions = None, env = None, defaults = None, concurrency = None))]
+        fn new(
+            jobs: PyMap<String, Job>,
+            on: Events,
+            name: Option<String>,
+            run_name: Option<StringLike>,
+            permissions: Option<Permissions>,
+            env: Option<PyMap<String, StringLike>>,
+            defaults: Option<Defaults>,
+            concurrency: Option<Concurrency>,
+        ) -> PyResult<Self> {
+            if let Some(run_name) = &run_name {
+                validate_string_like(run_name, ALLOWED_WORKFLOW_RUN_NAME)?;
             }
-            let month = month.extract::<CronMonth>()?;
-            Ok(Self(CronStepType::Value(month.0)))
-        }
-        #[staticmethod]
-        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
-            let min = min.extract::<CronMonth>()?;
-            let max = max.extract::<CronMonth>()?;
-            Ok(Self(CronStepType::Range(min.0, max.0)))
-        }
-        #[staticmethod]
-        #[pyo3(signature = (interval, *, start = None))]
-        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
-            let start = start
-                .map(|a| a.extract::<CronMonth>())
-                .transpose()?
-                .map(|s| s.0);
-            let interval = interval.extract::<CronMonth>()?;
-            Ok(Self(CronStepType::Step {
-                start,
-                step: interval.0,
-            }))
+            if let Some(env) = &env {
+                validate_string_map(env, ALLOWED_WORKFLOW_ENV)?;
+            }
+            if let Some(concurrency) = &concurrency {
+                validate_concurrency(concurrency, ALLOWED_WORKFLOW_CONCURRENCY)?;
+            }
+            Ok(Self {
+                name,
+                run_name,
+                on,
+                permissions,
+                env,
+                defaults,
+                concurrency,
+                jobs: Arc::new(jobs),
+            })
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct DayOfWeek(CronStepType);
-    impl Display for DayOfWeek {
-        fn fmt(&self, f: &mut std::fmt::Formatter<'_>) -> std::fmt::Result {
-            write!(f, "{}", self.0)
-        }
-    }
-    #[pymethods]
-    impl DayOfWeek {
-        #[new]
-        fn new(day_of_week: &Bound<PyAny>) -> PyResult<Self> {
-            if let Ok(l) = day_of_week.extract::<Bound<PyList>>() {
-                let mut res = Vec::new();
-                for item in l.iter() {
-                    let item = item.extract::<CronDayOfWeek>()?;
-                    res.push(item.0);
+        /// Return a copy of the workflow with the given fields replaced.
+        ///
+        /// Only the replaced fields are validated. Keyword arguments are the same as those of
+        /// the `Workflow` constructor.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///
+        #[pyo3(signature = (**changes))]
+        fn replace(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            let mut workflow = self.clone();
+            let Some(changes) = changes else {
+                return Ok(workflow);
+            };
+            for (key, value) in changes.iter() {
+                let field = key.extract::<String>()?;
+                match field.as_str() {
+                    "jobs" => workflow.jobs = Arc::new(value.extract()?),
+                    "on" => workflow.on = value.extract()?,
+                    "name" => workflow.name = value.extract()?,
+                    "run_name" => {
+                        workflow.run_name = value.extract()?;
+                        if let Some(run_name) = &workflow.run_name {
+                            validate_string_like(run_name, ALLOWED_WORKFLOW_RUN_NAME)?;
+                        }
+                    }
+                    "permissions" => workflow.permissions = value.extract()?,
+                    "env" => {
+                        workflow.env = value.extract()?;
+                        if let Some(env) = &workflow.env {
+                            validate_string_map(env, ALLOWED_WORKFLOW_ENV)?;
+                        }
+                    }
+                    "defaults" => workflow.defaults = value.extract()?,
+                    "concurrency" => {
+                        workflow.concurrency = value.extract()?;
+                        if let Some(concurrency) = &workflow.concurrency {
+                            validate_concurrency(concurrency, ALLOWED_WORKFLOW_CONCURRENCY)?;
+                        }
+                    }
+                    _ => {
+                        return Err(PyTypeError::new_err(format!(
+                            "Workflow.replace() got an unexpected keyword argument '{field}'"
+                        )));
+                    }
                 }
-                return Ok(Self(CronStepType::List(res)));
             }
-            let day_of_week = day_of_week.extract::<CronMonth>()?;
-            Ok(Self(CronStepType::Value(day_of_week.0)))
-        }
-        #[staticmethod]
-        fn between(min: &Bound<PyAny>, max: &Bound<PyAny>) -> PyResult<Self> {
-            let min = min.extract::<CronDayOfWeek>()?;
-            let max = max.extract::<CronDayOfWeek>()?;
-            Ok(Self(CronStepType::Range(min.0, max.0)))
+            Ok(workflow)
         }
-        #[staticmethod]
-        #[pyo3(signature = (interval, *, start = None))]
-        fn every(interval: &Bound<PyAny>, start: Option<Bound<PyAny>>) -> PyResult<Self> {
-            let start = start
-                .map(|a| a.extract::<CronDayOfWeek>())
-                .transpose()?
-                .map(|s| s.0);
-            let interval = interval.extract::<CronDayOfWeek>()?;
-            Ok(Self(CronStepType::Step {
-                start,
-                step: interval.0,
-            }))
+        /// An alias of `Workflow.replace`.
+        #[pyo3(signature = (**changes))]
+        fn evolve(&self, changes: Option<&Bound<'_, PyDict>>) -> PyResult<Self> {
+            self.replace(changes)
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct Cron {
-        minute: Option<Minute>,
-        hour: Option<Hour>,
-        day: Option<Day>,
-        month: Option<Month>,
-        day_of_week: Option<DayOfWeek>,
-    }
-    #[pymethods]
-    impl Cron {
-        #[new]
-        #[pyo3(signature = (*, minute = None, hour = None, day = None, month = None, day_of_week = None))]
-        fn new(
-            minute: Option<Minute>,
-            hour: Option<Hour>,
-            day: Option<Day>,
-            month: Option<Month>,
-            day_of_week: Option<DayOfWeek>,
-        ) -> Self {
-            Self {
-                minute,
-                hour,
-                day,
-                month,
-                day_of_week,
+        /// Run validation against the schemastore JSON schema for GitHub Workflows and raise a
+        /// RuntimeError if validation fails, or if a job needs an unknown job or the needs of the
+        /// jobs form a cycle.
+        fn validate(&self) -> PyResult<()> {
+            let graph = job_graph(&self.jobs, &HashMap::new());
+            if let Some((job_id, need)) = graph.unknown_needs.first() {
+                return Err(PyRuntimeError::new_err(format!(
+                    "Job '{job_id}' needs unknown job '{need}'"
+                )));
+            }
+            if let Some(cycle) = graph.cycles.first() {
+                return Err(PyRuntimeError::new_err(format!(
+                    "Jobs {} need each other in a cycle",
+                    cycle
+                        .iter()
+                        .map(|id| format!("'{id}'"))
+                        .collect::<Vec<_>>()
+                        .join(", ")
+                )));
             }
+            let workflow_yaml = self.as_yaml();
+            let workflow_json = yaml_to_json(&workflow_yaml)?;
+            WORKFLOW_SCHEMA
+                .validate(&workflow_json)
+                .map_err(|e| PyRuntimeError::new_err(e.to_string()))
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        /// Check if the workflow is valid YAML according to the schemastore JSON schema for GitHub
+        /// Workflows.
+        fn is_valid(&self) -> bool {
+            self.validate().is_ok()
         }
-    }
-    impl Yamlable for &Cron {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            let s = format!(
-                "{} {} {} {} {}",
-                self.minute
-                    .clone()
-                    .map_or("*".to_string(), |s| s.to_string()),
-                self.hour.clone().map_or("*".to_string(), |s| s.to_string()),
-                self.day.clone().map_or("*".to_string(), |s| s.to_string()),
-                self.month
-                    .clone()
-                    .map_or("*".to_string(), |s| s.to_string()),
-                self.day_of_week
-                    .clone()
-                    .map_or("*".to_string(), |s| s.to_string())
-            );
-            out.insert_yaml("cron", s);
-            Yaml::Hash(out)
+
+        /// Encode the workflow in a compact, versioned binary format for caching.
+        ///
+        /// The output starts with a fixed 24-byte header (magic bytes, format version, schema
+        /// fingerprint and payload length, all little-endian), so it can be stored on disk and
+        /// decoded directly from a memory-mapped file by `Workflow.from_cache_bytes`.
+        ///
+        /// Returns
+        /// -------
+        /// bytes
+        ///
+        fn to_cache_bytes<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+            PyBytes::new(py, &encode_cache(self))
+        }
+
+        /// Rebuild a workflow from the output of `Workflow.to_cache_bytes`.
+        ///
+        /// Jobs and steps are cached by value, so a job or step which the cached workflow used
+        /// in several places is rebuilt as separate, equal copies.
+        ///
+        /// Parameters
+        /// ----------
+        /// data
+        ///     The cached ``bytes``, or any object supporting the buffer protocol (such as a
+        ///     ``memoryview`` or ``mmap``).
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If the data is not a workflow cache, is truncated, or was written by a different
+        ///     format version or against a different workflow schema (see
+        ///     `Workflow.cache_version`).
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///
+        #[staticmethod]
+        fn from_cache_bytes(data: &Bound<'_, PyAny>) -> PyResult<Self> {
+            if let Ok(bytes) = data.cast::<PyBytes>() {
+                return decode_cache(bytes.as_bytes());
+            }
+            let bytes = data.py().get_type::<PyBytes>().call1((data,))?;
+            decode_cache(bytes.cast::<PyBytes>()?.as_bytes())
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct ScheduleEvent {
-        crons: Option<Vec<Cron>>,
-    }
-    #[pymethods]
-    impl ScheduleEvent {
-        #[new]
-        #[pyo3(signature = (*, crons=None))]
-        fn new(crons: Option<Vec<Cron>>) -> Self {
-            let crons = crons.filter(|v| !v.is_empty());
-            Self { crons }
+        /// The version of the cache format, which combines the format version with a
+        /// fingerprint of the vendored workflow schema.
+        ///
+        /// Caches written under a different version cannot be read, so this is suitable as
+        /// part of a cache key.
+        ///
+        /// Returns
+        /// -------
+        /// str
+        ///
+        #[staticmethod]
+        fn cache_version() -> String {
+            format!("{CACHE_FORMAT_VERSION}-{WORKFLOW_SCHEMA_FINGERPRINT:016x}")
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        /// Import an existing workflow from YAML.
+        ///
+        /// The YAML is parsed without holding the GIL, so several files can be imported in
+        /// parallel from threads. Strings which consist of a single ``${{ }}`` expression become
+        /// typed expressions, while other strings are kept as written (and still validated).
+        ///
+        /// Parameters
+        /// ----------
+        /// text_or_path
+        ///     The YAML text, or the path of a workflow file. A string is read as a path if it
+        ///     names an existing file, or if it is a single line ending in ``.yml`` or ``.yaml``
+        ///     or without a ``:``.
+        ///
+        /// Raises
+        /// ------
+        /// FileNotFoundError
+        ///     If the path of a workflow file does not exist.
+        /// ValueError
+        ///     If the YAML is invalid or uses keys or values which cannot be represented.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///
+        #[staticmethod]
+        fn from_yaml(py: Python<'_>, text_or_path: &Bound<'_, PyAny>) -> PyResult<Self> {
+            let source = match text_or_path.extract::<String>() {
+                Ok(text) if !looks_like_path(&text) => Either::B(text),
+                _ => Either::A(text_or_path.extract::<PathBuf>()?),
+            };
+            let yaml = py.detach(|| load_workflow_yaml(source))?;
+            import_workflow(py, &yaml)
         }
-    }
-    impl MaybeYamlable for &ScheduleEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Array::new();
-            if let Some(crons) = &self.crons {
-                for cron in crons {
-                    out.push_yaml(cron);
-                }
-                Some(Yaml::Array(out))
+
+        /// Write the YAML representation of the workflow to a file.
+        ///
+        /// Parameters
+        /// ----------
+        /// path
+        ///     The path of the file to which the YAML is written.
+        /// overwrite
+        ///     If True, the file is overwritten if it already exists, otherwise nothing will happen.
+        /// validate
+        ///     If True, perform validation against the schemastore JSON schema for GitHub
+        ///     Workflows.
+        ///
+        #[pyo3(signature = (path, *, overwrite = true, validate = true))]
+        fn dump(&self, path: &Bound<PyAny>, overwrite: bool, validate: bool) -> PyResult<()> {
+            if validate {
+                self.validate()?;
+            }
+            if let Ok(p) = path.extract::<PathBuf>() {
+                self.write_to_file(p, overwrite)
+            } else if let Ok(s) = path.extract::<String>() {
+                self.write_to_file(s, overwrite)
             } else {
-                None
+                Err(PyValueError::new_err("Invalid path"))
             }
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WatchEvent {
-        started: bool,
-    }
-    #[pymethods]
-    impl WatchEvent {
-        #[new]
-        #[pyo3(signature = (*, started=false))]
-        fn new(started: bool) -> Self {
-            Self { started }
+        /// Compare this workflow with another one.
+        ///
+        /// Both workflows are walked together rather than rendered, and jobs or steps which are
+        /// shared or structurally equal are skipped without being rendered and compared key by
+        /// key.
+        /// Steps are matched by identity (``id``, ``name``, ``uses`` or ``run``) so that moving
+        /// a step is reported as a single reordering rather than as a change to every step.
+        ///
+        /// Parameters
+        /// ----------
+        /// other
+        ///     The workflow to compare against, treated as the newer version.
+        ///
+        /// Returns
+        /// -------
+        /// list of WorkflowChange
+        ///     Added and removed jobs and steps, changed keys, and reordered steps. Empty if the
+        ///     workflows are equivalent.
+        fn diff(&self, other: &Workflow) -> Vec<WorkflowChange> {
+            let mut changes = Changes(Vec::new());
+            let settings = |workflow: &Workflow| {
+                (&Workflow {
+                    jobs: Arc::default(),
+                    ..workflow.clone()
+                })
+                    .as_yaml()
+            };
+            changes.diff_yaml(&[], &settings(self), &settings(other), Some("jobs"));
+            if Arc::ptr_eq(&self.jobs, &other.jobs) {
+                return changes.0;
+            }
+            let path = |id: &str| vec!["jobs".to_string(), id.to_string()];
+            for (id, job) in self.jobs.0.iter() {
+                match other.jobs.0.get(id) {
+                    Some(other_job) => changes.diff_job(path(id), job, other_job),
+                    None => changes.push(ChangeKind::Removed, path(id), Some(job.as_yaml()), None),
+                }
+            }
+            for (id, job) in other.jobs.0.iter() {
+                if !self.jobs.0.contains_key(id) {
+                    changes.push(ChangeKind::Added, path(id), None, Some(job.as_yaml()));
+                }
+            }
+            changes.0
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+        /// Analyse the dependency graph formed by the ``needs`` of each job.
+        ///
+        /// Parameters
+        /// ----------
+        /// durations
+        ///     Optional duration hints in seconds, used to find the critical path. Either a mapping
+        ///     of job IDs to a duration or a list of historical durations (whose median is used),
+        ///     or the path of a JSON file containing such a mapping.
+        ///
+        /// Returns
+        /// -------
+        /// JobGraph
+        ///     The topological levels, cycles, unknown needs and critical path of the jobs.
+        #[pyo3(signature = (durations = None))]
+        fn graph(
+            &self,
+            py: Python<'_>,
+            durations: Option<&Bound<'_, PyAny>>,
+        ) -> PyResult<JobGraph> {
+            let durations = match durations {
+                Some(durations) => load_timings(py, durations)?
+                    .into_iter()
+                    .filter_map(|(id, samples)| Some((id, percentile(&samples, 50.0)?)))
+                    .collect(),
+                None => HashMap::new(),
+            };
+            Ok(job_graph(&self.jobs, &durations))
         }
-    }
-    impl MaybeYamlable for &WatchEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if self.started {
-                let mut out = Hash::new();
-                let mut arr = Array::new();
-                arr.push_yaml_cond("started", self.started);
-                out.insert_yaml("types", Yaml::Array(arr));
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+
+        /// Convert the workflow to plain Python objects, as it would be written to YAML.
+        ///
+        /// Returns
+        /// -------
+        /// dict
+        ///     The workflow as nested dicts, lists and scalars, keyed like the YAML file (e.g.
+        ///     ``runs-on``), with expressions as ``${{ ... }}`` strings.
+        fn to_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+            yaml_to_py(py, &self.as_yaml(), "workflow")
         }
-    }
 
-    #[derive(Clone)]
-    enum WorkflowInputType {
-        Boolean { default: Option<BoolLike> },
-        Number { default: Option<IntLike> },
-        String { default: Option<StringLike> },
-    }
-    impl WorkflowInputType {
-        fn get_type(&self) -> Yaml {
-            match self {
-                Self::Boolean { .. } => Yaml::from_str("boolean"),
-                Self::Number { .. } => Yaml::from_str("number"),
-                Self::String { .. } => Yaml::from_str("string"),
-            }
+        /// Trace the artifacts uploaded and downloaded by the jobs.
+        ///
+        /// Downloads are matched to the uploads of artifacts whose name matches their ``name`` or
+        /// ``pattern``, where expressions in names (such as ``${{ matrix.os }}``) may stand for
+        /// any text. Downloads by artifact ID or from other workflow runs are ignored.
+        ///
+        /// Returns
+        /// -------
+        /// ArtifactGraph
+        ///     Which jobs consume the artifacts of which others, downloads without a producer or
+        ///     whose producer the job does not need, unused uploads, and uploads of already
+        ///     compressed files.
+        fn artifact_graph(&self) -> ArtifactGraph {
+            artifact_graph(&self.jobs)
         }
-        fn get_default(&self) -> Option<Yaml> {
-            match self {
-                Self::Boolean { default } => default.clone().map(|b| b.as_yaml()),
-                Self::Number { default } => default.clone().map(|n| n.as_yaml()),
-                Self::String { default } => default.clone().map(|s| s.as_yaml()),
+
+        /// Apply optimization passes to the workflow.
+        ///
+        /// Parameters
+        /// ----------
+        /// needs
+        ///     If ``'reduce'``, remove each ``needs`` entry which is already implied through
+        ///     another need of the same job (a transitive reduction of the job graph). Needs
+        ///     which the job refers to, e.g. through ``context.needs.build.outputs``, are kept.
+        /// steps
+        ///     If ``'merge'``, merge runs of adjacent `script` steps into a single step, saving a
+        ///     shell process and a log group per step. Steps are only merged if they have the
+        ///     same ``shell``, ``working_directory``, ``env`` and ``condition``, no
+        ///     ``continue_on_error`` or ``timeout_minutes``, no ``id`` referenced in the job, no
+        ///     status function such as ``always()`` in their condition, and run in ``bash`` or
+        ///     ``sh``. A script writing to ``GITHUB_ENV``, ``GITHUB_PATH`` or ``GITHUB_OUTPUT``
+        ///     ends a merged step, since GitHub only applies those files between steps. Each
+        ///     original script runs in a subshell, so the merged step fails as soon as one of
+        ///     them does, as under ``set -e``, and changes of directory or variables do not leak
+        ///     into the next script.
+        /// jobs
+        ///     If ``'fuse'``, fuse independent jobs into one job running their steps one after
+        ///     another, saving a runner (and its boot time) per fused job. Jobs are only fused if
+        ///     they have the same ``runs_on``, ``container``, ``permissions``, ``needs`` and other
+        ///     settings apart from their name and steps, no matrix, outputs, services,
+        ///     environment, concurrency or timeout, and no other job refers to their results.
+        ///     Jobs are fused only where the cost model says that the workflow as a whole does
+        ///     not get slower: each job takes ``boot_time`` plus its median duration, and the
+        ///     critical path of the workflow must not grow. Note that a failing step skips the
+        ///     steps of the jobs fused after it.
+        /// durations
+        ///     Historical durations of the jobs in seconds, used by ``jobs='fuse'``: a mapping of
+        ///     job IDs to a duration or a list of durations, or the path of a JSON file
+        ///     containing one. Jobs without timings are assumed to take the mean duration of the
+        ///     others (or a minute if none have timings).
+        /// boot_time
+        ///     The time to provision a runner and set up a job, in seconds.
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If an option has an unknown value, or the jobs to optimize need each other in a
+        ///     cycle.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///     An optimized copy of the workflow. Unchanged jobs are shared with this workflow.
+        #[pyo3(signature = (*, needs = None, steps = None, jobs = None, durations = None, boot_time = 30.0))]
+        fn optimize(
+            &self,
+            py: Python<'_>,
+            needs: Option<&str>,
+            steps: Option<&str>,
+            jobs: Option<&str>,
+            durations: Option<&Bound<'_, PyAny>>,
+            boot_time: f64,
+        ) -> PyResult<Self> {
+            let mut workflow = self.clone();
+            match needs {
+                None | Some("keep") => {}
+                Some("reduce") => workflow.jobs = Arc::new(reduce_needs(&self.jobs)?),
+                Some(other) => {
+                    return Err(PyValueError::new_err(format!(
+                        "Unknown needs optimization '{other}', expected 'reduce' or 'keep'"
+                    )));
+                }
+            }
+            match jobs {
+                None | Some("keep") => {}
+                Some("fuse") => {
+                    let durations = match durations {
+                        Some(durations) => load_timings(py, durations)?
+                            .into_iter()
+                            .filter_map(|(id, samples)| Some((id, percentile(&samples, 50.0)?)))
+                            .collect(),
+                        None => HashMap::new(),
+                    };
+                    workflow.jobs = Arc::new(fuse_jobs(&workflow.jobs, &durations, boot_time)?);
+                }
+                Some(other) => {
+                    return Err(PyValueError::new_err(format!(
+                        "Unknown jobs optimization '{other}', expected 'fuse' or 'keep'"
+                    )));
+                }
+            }
+            match steps {
+                None | Some("keep") => {}
+                Some("merge") => {
+                    let workflow_shell = self
+                        .defaults
+                        .as_ref()
+                        .and_then(|defaults| defaults.run_defaults.as_ref())
+                        .and_then(|run| run.shell.as_ref());
+                    let mut jobs = (*workflow.jobs).clone();
+                    for job in jobs.0.values_mut() {
+                        if let Some(steps) = merge_scripts(job, workflow_shell)? {
+                            // only now copy the (possibly shared) job data
+                            let job: &mut JobData = job;
+                            job.steps = Some(steps);
+                        }
+                    }
+                    workflow.jobs = Arc::new(jobs);
+                }
+                Some(other) => {
+                    return Err(PyValueError::new_err(format!(
+                        "Unknown steps optimization '{other}', expected 'merge' or 'keep'"
+                    )));
+                }
             }
+            Ok(workflow)
         }
-    }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowInput {
-        description: Option<String>,
-        input_type: WorkflowInputType,
-        required: Option<bool>,
-    }
-    #[pymethods]
-    impl WorkflowInput {
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn boolean(
-            description: Option<String>,
-            default: Option<BoolLike>,
-            required: Option<bool>,
+        /// Set timeouts on jobs and steps without one, from their historical durations.
+        ///
+        /// Without an explicit timeout, a hung job runs for the default of 360 minutes. This
+        /// sets ``timeout_minutes`` to the given percentile of the durations of a job or step,
+        /// times a safety margin, rounded up to whole minutes. Jobs and steps without timings,
+        /// jobs calling reusable workflows, and timeouts which are already set are left alone.
+        ///
+        /// Parameters
+        /// ----------
+        /// durations
+        ///     Historical durations in seconds: a mapping of job IDs (and ``<job_id>.<step>``
+        ///     for steps, where a step is identified by its ID, name, action or script) to a
+        ///     duration or a list of durations, or the path of a JSON file containing one.
+        /// percentile
+        ///     The percentile of the durations to allow for, between 0 and 100.
+        /// margin
+        ///     The factor to multiply the percentile by, at least 1.
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If the durations are invalid, or the percentile or margin are out of range.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///     A copy of the workflow with the timeouts set.
+        #[pyo3(signature = (durations, *, percentile = 95.0, margin = 1.5))]
+        fn infer_timeouts(
+            &self,
+            py: Python<'_>,
+            durations: &Bound<'_, PyAny>,
+            percentile: f64,
+            margin: f64,
         ) -> PyResult<Self> {
-            if let Some(default) = &default {
-                validate_bool_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+            if !(0.0..=100.0).contains(&percentile) {
+                return Err(PyValueError::new_err(format!(
+                    "Percentile must be between 0 and 100, got {percentile}"
+                )));
+            }
+            if !(margin >= 1.0 && margin.is_finite()) {
+                return Err(PyValueError::new_err(format!(
+                    "Margin must be a finite factor of at least 1, got {margin}"
+                )));
+            }
+            let durations = load_timings(py, durations)?;
+            let timeout = |key: &str| -> Option<IntLike> {
+                let seconds = self::percentile(durations.get(key)?, percentile)?;
+                Some(Either::B(((seconds * margin / 60.0).ceil() as i64).max(1)))
+            };
+            let mut jobs = (*self.jobs).clone();
+            for (job_id, job) in jobs.0.iter_mut() {
+                if job.uses.is_some() {
+                    continue;
+                }
+                let job_timeout = job
+                    .timeout_minutes
+                    .is_none()
+                    .then(|| timeout(job_id.as_str()))
+                    .flatten();
+                let step_timeouts: Vec<Option<IntLike>> = match &job.steps {
+                    Some(steps) => steps
+                        .iter()
+                        .zip(step_keys(steps))
+                        .map(|(step, key)| {
+                            step.options
+                                .timeout_minutes
+                                .is_none()
+                                .then(|| timeout(format!("{job_id}.{key}").as_str()))
+                                .flatten()
+                        })
+                        .collect(),
+                    None => Vec::new(),
+                };
+                if job_timeout.is_none() && step_timeouts.iter().all(Option::is_none) {
+                    continue;
+                }
+                // only now copy the (possibly shared) job data
+                let job: &mut JobData = job;
+                if job_timeout.is_some() {
+                    job.timeout_minutes = job_timeout;
+                }
+                for (step, timeout) in job.steps.iter_mut().flatten().zip(step_timeouts) {
+                    if timeout.is_some() {
+                        let step: &mut StepData = step;
+                        step.options.timeout_minutes = timeout;
+                    }
+                }
             }
-            Ok(Self {
-                description,
-                input_type: WorkflowInputType::Boolean { default },
-                required,
-            })
+            let mut workflow = self.clone();
+            workflow.jobs = Arc::new(jobs);
+            Ok(workflow)
         }
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn number(
-            description: Option<String>,
-            default: Option<IntLike>,
-            required: Option<bool>,
-        ) -> PyResult<Self> {
-            if let Some(default) = &default {
-                validate_int_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+
+        /// Fill in concurrency groups which cancel superseded runs.
+        ///
+        /// Runs are grouped by workflow and ref (and job, at job level), so a new push to a pull
+        /// request cancels the run still in progress for the previous push. Runs on the default
+        /// branch and on tags are never cancelled: each gets a concurrency group of its own.
+        ///
+        /// Parameters
+        /// ----------
+        /// policy
+        ///     Which runs may be cancelled: ``'pull-requests'`` for runs triggered by
+        ///     ``pull_request`` events, or ``'branches'`` for any run which is not on the default
+        ///     branch or a tag. Runs of events whose payload has no repository (and so no known
+        ///     default branch), such as ``schedule``, are never cancelled.
+        /// level
+        ///     Whether to set the concurrency of the ``'workflow'`` or of each of its ``'jobs'``.
+        /// overwrite
+        ///     If True, replace existing concurrency settings, otherwise keep them.
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If the policy or level is unknown.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///     A copy of the workflow with concurrency settings filled in.
+        #[pyo3(signature = (policy = "pull-requests", *, level = "workflow", overwrite = false))]
+        fn auto_concurrency(&self, policy: &str, level: &str, overwrite: bool) -> PyResult<Self> {
+            let concurrency = auto_concurrency(policy, None)?;
+            let mut workflow = self.clone();
+            match level {
+                "workflow" => {
+                    if overwrite || workflow.concurrency.is_none() {
+                        workflow.concurrency = Some(concurrency);
+                    }
+                }
+                "jobs" => {
+                    let mut jobs = (*self.jobs).clone();
+                    for (job_id, job) in jobs.0.iter_mut() {
+                        if overwrite || job.concurrency.is_none() {
+                            let job: &mut JobData = job;
+                            job.concurrency = Some(auto_concurrency(policy, Some(job_id))?);
+                        }
+                    }
+                    workflow.jobs = Arc::new(jobs);
+                }
+                other => {
+                    return Err(PyValueError::new_err(format!(
+                        "Unknown concurrency level '{other}', expected 'workflow' or 'jobs'"
+                    )));
+                }
             }
-            Ok(Self {
-                description,
-                input_type: WorkflowInputType::Number { default },
-                required,
-            })
+            Ok(workflow)
         }
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn string(
-            description: Option<String>,
-            default: Option<StringLike>,
-            required: Option<bool>,
-        ) -> PyResult<Self> {
-            if let Some(default) = &default {
-                validate_string_like(default, ALLOWED_WORKFLOW_CALL_INPUT_DEFAULT)?;
+
+        /// Add dependency caches to jobs whose toolchain setup steps do not cache dependencies.
+        ///
+        /// For setup steps of Python, uv, Node.js, Go, Rust, Java and .NET whose built-in
+        /// ``cache`` option is unset (or disabled, for actions which cache by default), a cache
+        /// step is inserted directly after the setup step. Its key hashes the toolchain's
+        /// lockfiles, e.g. ``${{ runner.os }}-pip-${{ hashFiles('**/requirements*.txt', ...) }}``.
+        /// Jobs which already cache the same directory are left alone.
+        ///
+        /// The cached directories are those of Linux, so jobs are only changed if they run in a
+        /// container or on a runner with an ``ubuntu`` or ``linux`` label. For other jobs, such as
+        /// Windows and macOS jobs or jobs whose runner is an expression, the missing cache is
+        /// reported but not added.
+        ///
+        /// Parameters
+        /// ----------
+        /// restore_only
+        ///     If True, insert ``actions/cache/restore`` steps, which never save the cache (for
+        ///     example for workflows run on untrusted pull requests).
+        ///
+        /// Returns
+        /// -------
+        /// tuple of (Workflow, list of str)
+        ///     A copy of the workflow with the caches added, and a description of each change.
+        #[pyo3(signature = (*, restore_only = false))]
+        fn cache_dependencies(&self, restore_only: bool) -> PyResult<(Self, Vec<String>)> {
+            let mut report = Vec::new();
+            let mut jobs = (*self.jobs).clone();
+            for (job_id, job) in jobs.0.iter_mut() {
+                let Some(steps) = &job.steps else {
+                    continue;
+                };
+                let linux = runs_on_linux(job);
+                if let Some(steps) =
+                    add_dependency_caches(job_id, steps, linux, restore_only, &mut report)?
+                {
+                    let job: &mut JobData = job;
+                    job.steps = Some(steps);
+                }
+            }
+            let mut workflow = self.clone();
+            if !report.is_empty() {
+                workflow.jobs = Arc::new(jobs);
+            }
+            Ok((workflow, report))
+        }
+
+        /// Specialize the workflow for a partially known context.
+        ///
+        /// Jobs and steps whose ``if:`` condition can never be true are dropped, as are jobs which
+        /// need a dropped job (unless a status function like ``always()`` keeps them running, in
+        /// which case the dropped job is removed from their ``needs``). Conditions which are
+        /// always true are removed.
+        ///
+        /// Parameters
+        /// ----------
+        /// known_context
+        ///     A mapping of context names to their known contents, e.g.
+        ///     ``{'github': {'event_name': 'push'}}``. Anything missing is treated as unknown.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///     A pruned copy of the workflow.
+        fn prune(&self, known_context: &Bound<PyAny>) -> PyResult<Self> {
+            let context = py_to_json(known_context)?;
+            let mut pruned = HashSet::new();
+            let mut jobs = LinkedHashMap::with_capacity(self.jobs.0.len());
+            for (id, job) in self.jobs.0.iter() {
+                match job.pruned(&context) {
+                    Some(job) => {
+                        jobs.insert(id.clone(), job);
+                    }
+                    None => {
+                        pruned.insert(id.clone());
+                    }
+                }
+            }
+            let mut skipped: Vec<String> = Vec::new();
+            loop {
+                for (id, job) in jobs.iter_mut() {
+                    let needs_pruned = job
+                        .needs
+                        .as_ref()
+                        .is_some_and(|needs| needs.iter().any(|need| pruned.contains(need)));
+                    if !needs_pruned {
+                        continue;
+                    }
+                    match runs_after_skipped_needs(&job.condition, &pruned, &context) {
+                        Some(condition) => {
+                            // only now copy the (possibly shared) job data
+                            let job: &mut JobData = job;
+                            if let Some(needs) = job.needs.as_mut() {
+                                needs.retain(|need| !pruned.contains(need));
+                            }
+                            if job.needs.as_ref().is_some_and(Vec::is_empty) {
+                                job.needs = None;
+                            }
+                            job.condition = condition;
+                        }
+                        None => skipped.push(id.clone()),
+                    }
+                }
+                if skipped.is_empty() {
+                    break;
+                }
+                for id in skipped.drain(..) {
+                    jobs.remove(&id);
+                    pruned.insert(id);
+                }
             }
             Ok(Self {
-                description,
-                input_type: WorkflowInputType::String { default },
-                required,
+                jobs: Arc::new(PyMap(jobs)),
+                ..self.clone()
             })
         }
 
         fn __str__(&self) -> PyResult<String> {
             self.as_yaml_string()
         }
-    }
-    impl Yamlable for &WorkflowInput {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("description", &self.description);
-            out.insert_yaml("type", self.input_type.get_type());
-            out.insert_yaml_opt("required", self.required);
-            out.insert_yaml_opt("default", self.input_type.get_default());
-            Yaml::Hash(out)
+
+        /// Pickle the workflow (and support `copy.deepcopy`) through its binary encoding.
+        ///
+        /// Jobs and steps are encoded by value, so a job or step which appears several times
+        /// (e.g. a `Step` reused in several jobs) is unpickled as separate, equal copies, which
+        /// no longer share memory.
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "Workflow")
+        }
+    }
+    /// Check a job ID against GitHub's rules: a letter or ``_`` followed by alphanumeric
+    /// characters, ``-`` or ``_``.
+    fn validate_job_id(job_id: &str) -> PyResult<()> {
+        let mut chars = job_id.chars();
+        let valid = chars
+            .next()
+            .is_some_and(|c| c.is_ascii_alphabetic() || c == '_')
+            && chars.all(|c| c.is_ascii_alphanumeric() || c == '-' || c == '_');
+        if valid {
+            Ok(())
+        } else {
+            Err(PyValueError::new_err(format!(
+                "Invalid job ID '{job_id}': must start with a letter or '_' and contain only alphanumeric characters, '-', or '_'"
+            )))
         }
     }
 
     #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowOutput {
-        description: Option<String>,
-        value: StringLike,
+    struct WorkflowBuilder {
+        workflow: Workflow,
     }
     #[pymethods]
-    impl WorkflowOutput {
+    impl WorkflowBuilder {
+        /// A mutable builder which collects `Job`s one at a time and freezes into a `Workflow`.
+        ///
+        /// Parameters
+        /// ----------
+        /// on
+        ///     Events which may trigger the workflow.
+        /// name
+        ///     The name of the workflow.
+        /// run_name
+        ///     The name given to a particular run of the workflow.
+        /// permissions
+        ///     The default permissions granted to the ``GITHUB_TOKEN``.
+        /// env
+        ///     Global environment variables available at any step of any job in the workflow.
+        /// defaults
+        ///     Default settings which are applied to all jobs.
+        /// concurrency
+        ///     Settings to ensure only a single workflow of the given concurrency group runs at a time.
+        ///
+        /// Returns
+        /// -------
+        /// WorkflowBuilder
+        ///
         #[new]
-        #[pyo3(signature = (value, *, description=None))]
-        fn new(value: StringLike, description: Option<String>) -> PyResult<Self> {
-            validate_string_like(&value, ALLOWED_WORKFLOW_CALL_OUTPUT_VALUE)?;
-            Ok(Self { description, value })
+        #[pyo3(signature = (*, on, name = None, run_name = None, permissions = None, env = None, defaults = None, concurrency = None))]
+        fn new(
+            on: Events,
+            name: Option<String>,
+            run_name: Option<StringLike>,
+            permissions: Option<Permissions>,
+            env: Option<PyMap<String, StringLike>>,
+            defaults: Option<Defaults>,
+            concurrency: Option<Concurrency>,
+        ) -> PyResult<Self> {
+            Ok(Self {
+                workflow: Workflow::new(
+                    PyMap::default(),
+                    on,
+                    name,
+                    run_name,
+                    permissions,
+                    env,
+                    defaults,
+                    concurrency,
+                )?,
+            })
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        /// Add a job to the workflow.
+        ///
+        /// Parameters
+        /// ----------
+        /// job_id
+        ///     The unique identifier of the job, used as its key under ``jobs``.
+        /// job
+        ///     The job to add.
+        /// replace
+        ///     If True, an existing job with the same ID is replaced (keeping its position),
+        ///     otherwise a ValueError is raised.
+        ///
+        #[pyo3(signature = (job_id, job, *, replace = false))]
+        fn add_job(&mut self, job_id: String, job: Job, replace: bool) -> PyResult<()> {
+            validate_job_id(&job_id)?;
+            if !replace && self.workflow.jobs.0.contains_key(&job_id) {
+                return Err(PyValueError::new_err(format!(
+                    "Workflow already has a job with ID '{job_id}'"
+                )));
+            }
+            // only copies the jobs if a frozen workflow still shares them
+            let jobs = &mut Arc::make_mut(&mut self.workflow.jobs).0;
+            match jobs.get_mut(&job_id) {
+                Some(existing) => *existing = job,
+                None => {
+                    jobs.insert(job_id, job);
+                }
+            }
+            Ok(())
+        }
+
+        /// Remove a job from the workflow.
+        ///
+        /// Parameters
+        /// ----------
+        /// job_id
+        ///     The ID of the job to remove.
+        ///
+        /// Returns
+        /// -------
+        /// Job
+        ///     The removed job.
+        ///
+        fn remove_job(&mut self, job_id: &str) -> PyResult<Job> {
+            if !self.workflow.jobs.0.contains_key(job_id) {
+                return Err(PyKeyError::new_err(job_id.to_string()));
+            }
+            Arc::make_mut(&mut self.workflow.jobs)
+                .0
+                .remove(job_id)
+                .ok_or_else(|| PyKeyError::new_err(job_id.to_string()))
+        }
+
+        /// Create a `Workflow` from the jobs added so far.
+        ///
+        /// The jobs are shared with the builder rather than copied, so this is cheap and the
+        /// builder may continue to be used afterwards.
+        ///
+        /// Raises
+        /// ------
+        /// ValueError
+        ///     If there are no jobs, or a job needs a job which is not in the workflow.
+        ///
+        /// Returns
+        /// -------
+        /// Workflow
+        ///
+        fn freeze(&self) -> PyResult<Workflow> {
+            let jobs = &self.workflow.jobs.0;
+            if jobs.is_empty() {
+                return Err(PyValueError::new_err(
+                    "Workflow must define at least one job",
+                ));
+            }
+            for (job_id, job) in jobs.iter() {
+                for need in job.needs.iter().flatten() {
+                    if !jobs.contains_key(need) {
+                        return Err(PyValueError::new_err(format!(
+                            "Job '{job_id}' needs unknown job '{need}'"
+                        )));
+                    }
+                }
+            }
+            Ok(self.workflow.clone())
+        }
+
+        fn __len__(&self) -> usize {
+            self.workflow.jobs.0.len()
+        }
+
+        fn __contains__(&self, job_id: &str) -> bool {
+            self.workflow.jobs.0.contains_key(job_id)
+        }
+
+        /// Pickle the builder (and support `copy.deepcopy`) through the binary encoding of its
+        /// workflow, which does not preserve sharing (see `Workflow.__reduce__`).
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowBuilder")
         }
     }
-    impl Yamlable for &WorkflowOutput {
+    impl Yamlable for &Workflow {
         fn as_yaml(&self) -> Yaml {
             let mut out = Hash::new();
-            out.insert_yaml_opt("description", &self.description);
-            out.insert_yaml("value", &self.value);
+            out.insert_yaml_opt("name", &self.name);
+            out.insert_yaml_opt("run-name", &self.run_name);
+            out.insert_yaml_opt("on", (&self.on).maybe_as_yaml());
+            out.insert_yaml_opt("permissions", &self.permissions);
+            out.insert_yaml_opt("env", &self.env);
+            if let Some(defaults) = &self.defaults {
+                out.insert_yaml_opt("defaults", defaults.maybe_as_yaml());
+            }
+            out.insert_yaml_opt("concurrency", &self.concurrency);
+            out.insert_yaml("jobs", &*self.jobs);
             Yaml::Hash(out)
         }
     }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowSecret {
-        description: Option<String>,
-        required: Option<bool>,
-    }
-    #[pymethods]
-    impl WorkflowSecret {
-        #[new]
-        #[pyo3(signature = (*, description=None, required=None))]
-        fn new(description: Option<String>, required: Option<bool>) -> Self {
-            Self {
-                description,
-                required,
+    // Binary encoding, used for pickling
+
+    impl_codec!(WithArgs {
+        options,
+        args,
+        entrypoint
+    });
+
+    impl Encode for StepAction {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                StepAction::Run(script) => {
+                    out.push(0);
+                    script.encode(out);
+                }
+                StepAction::Action { uses, with } => {
+                    out.push(1);
+                    uses.encode(out);
+                    with.encode(out);
+                }
             }
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+    }
+    impl Decode for StepAction {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => StepAction::Run(StringLike::decode(input)?),
+                1 => StepAction::Action {
+                    uses: String::decode(input)?,
+                    with: Option::decode(input)?,
+                },
+                tag => return Err(input.invalid_tag(tag)),
+            })
         }
     }
-    impl MaybeYamlable for &WorkflowSecret {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("description", &self.description);
-            out.insert_yaml_opt("required", self.required);
-            if out.is_empty() {
-                None
-            } else {
-                Some(Yaml::Hash(out))
+
+    impl_codec!(StepOptions {
+        condition,
+        working_directory,
+        shell,
+        id,
+        env,
+        continue_on_error,
+        timeout_minutes
+    });
+    impl_codec!(StepData {
+        name,
+        step_action,
+        options,
+        recommended_permissions,
+        skip_recommended_permissions
+    });
+    // steps (and jobs) are encoded by value, so decoding never shares them between jobs
+    impl_codec!(Step(Arc<StepData>));
+
+    impl_codec!(
+        enum ReadWriteNonePermission {
+            Read,
+            Write,
+            None,
+        }
+    );
+    impl_codec!(
+        enum WriteNonePermission {
+            Write,
+            None,
+        }
+    );
+    impl_codec!(
+        enum ReadNonePermission {
+            Read,
+            None,
+        }
+    );
+    impl_codec!(IndividualPermissions {
+        actions,
+        artifact_metadata,
+        attestations,
+        checks,
+        contents,
+        deployments,
+        id_token,
+        issues,
+        models,
+        discussions,
+        packages,
+        pages,
+        pull_requests,
+        security_events,
+        statuses
+    });
+
+    impl Encode for PermissionsOptions {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                PermissionsOptions::Individual(permissions) => {
+                    out.push(0);
+                    permissions.encode(out);
+                }
+                PermissionsOptions::ReadAll => out.push(1),
+                PermissionsOptions::WriteAll => out.push(2),
+                PermissionsOptions::None => out.push(3),
             }
         }
     }
-
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowCallEvent {
-        inputs: PyMap<String, WorkflowInput>,
-        outputs: PyMap<String, WorkflowOutput>,
-        secrets: PyMap<String, WorkflowSecret>,
+    impl Decode for PermissionsOptions {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => PermissionsOptions::Individual(IndividualPermissions::decode(input)?),
+                1 => PermissionsOptions::ReadAll,
+                2 => PermissionsOptions::WriteAll,
+                3 => PermissionsOptions::None,
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
     }
-    #[pymethods]
-    impl WorkflowCallEvent {
-        #[new]
-        #[pyo3(signature = (*, inputs=None, outputs=None, secrets=None))]
-        fn new(
-            inputs: Option<PyMap<String, WorkflowInput>>,
-            outputs: Option<PyMap<String, WorkflowOutput>>,
-            secrets: Option<PyMap<String, WorkflowSecret>>,
-        ) -> Self {
-            Self {
-                inputs: inputs.unwrap_or_default(),
-                outputs: outputs.unwrap_or_default(),
-                secrets: secrets.unwrap_or_default(),
+    impl_codec!(Permissions { options });
+
+    impl Encode for RunsOnSpecOptions {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                RunsOnSpecOptions::Group(group) => {
+                    out.push(0);
+                    group.encode(out);
+                }
+                RunsOnSpecOptions::Labels(labels) => {
+                    out.push(1);
+                    labels.encode(out);
+                }
+                RunsOnSpecOptions::GroupAndLabels(group, labels) => {
+                    out.push(2);
+                    group.encode(out);
+                    labels.encode(out);
+                }
             }
         }
-
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+    }
+    impl Decode for RunsOnSpecOptions {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => RunsOnSpecOptions::Group(StringLike::decode(input)?),
+                1 => RunsOnSpecOptions::Labels(StringLike::decode(input)?),
+                2 => RunsOnSpecOptions::GroupAndLabels(
+                    StringLike::decode(input)?,
+                    StringLike::decode(input)?,
+                ),
+                tag => return Err(input.invalid_tag(tag)),
+            })
         }
     }
-    impl MaybeYamlable for WorkflowCallEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Hash::new();
-            let mut inputs = Hash::new();
-            for (k, v) in self.inputs.iter() {
-                inputs.insert_yaml(k, v);
-            }
-            if !inputs.is_empty() {
-                out.insert_yaml("inputs", Yaml::Hash(inputs));
-            }
-            let mut outputs = Hash::new();
-            for (k, v) in self.outputs.iter() {
-                outputs.insert_yaml(k, v);
-            }
-            if !outputs.is_empty() {
-                out.insert_yaml("outputs", Yaml::Hash(outputs));
-            }
-            let mut secrets = Hash::new();
-            for (k, v) in self.secrets.iter() {
-                secrets.insert_yaml(k, v.maybe_as_yaml().unwrap_or(Yaml::Null));
+    impl_codec!(RunsOnSpec { options });
+
+    impl Encode for RunsOn {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                RunsOn::String(label) => {
+                    out.push(0);
+                    label.encode(out);
+                }
+                RunsOn::Array(labels) => {
+                    out.push(1);
+                    labels.encode(out);
+                }
+                RunsOn::Spec(spec) => {
+                    out.push(2);
+                    spec.encode(out);
+                }
             }
-            if !secrets.is_empty() {
-                out.insert_yaml("secrets", Yaml::Hash(secrets));
+        }
+    }
+    impl Decode for RunsOn {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => RunsOn::String(StringLike::decode(input)?),
+                1 => RunsOn::Array(Vec::decode(input)?),
+                2 => RunsOn::Spec(RunsOnSpec::decode(input)?),
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
+    }
+
+    impl_codec!(Environment { name, url });
+    impl_codec!(Concurrency {
+        group,
+        cancel_in_progress
+    });
+    impl_codec!(RunDefaults {
+        shell,
+        working_directory
+    });
+    impl_codec!(Defaults {
+        defaults,
+        run_defaults
+    });
+    impl_codec!(Matrix {
+        matrix,
+        include,
+        exclude
+    });
+    impl_codec!(Strategy {
+        matrix,
+        fast_fail,
+        max_parallel
+    });
+    impl_codec!(Credentials { username, password });
+    impl_codec!(Container {
+        image,
+        credentials,
+        env,
+        ports,
+        volumes,
+        options
+    });
+
+    impl Encode for JobSecretsOptions {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                JobSecretsOptions::Secrets(secrets) => {
+                    out.push(0);
+                    secrets.encode(out);
+                }
+                JobSecretsOptions::Inherit => out.push(1),
             }
-            if out.is_empty() {
-                None
-            } else {
-                Some(Yaml::Hash(out))
+        }
+    }
+    impl Decode for JobSecretsOptions {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => JobSecretsOptions::Secrets(HashMap::decode(input)?),
+                1 => JobSecretsOptions::Inherit,
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
+    }
+    impl_codec!(JobSecrets { options });
+
+    impl_codec!(JobData {
+        name,
+        permissions,
+        requested_permissions,
+        use_recommended_permissions,
+        needs,
+        condition,
+        runs_on,
+        snapshot,
+        environment,
+        concurrency,
+        outputs,
+        env,
+        defaults,
+        steps,
+        timeout_minutes,
+        strategy,
+        continue_on_error,
+        container,
+        services,
+        uses,
+        with,
+        secrets
+    });
+    impl_codec!(Job(Arc<JobData>));
+
+    impl_codec!(BranchProtectionRuleEvent {
+        created,
+        edited,
+        deleted
+    });
+    impl_codec!(CheckRunEvent {
+        created,
+        rerequested,
+        completed,
+        requested_action
+    });
+    impl_codec!(CheckSuiteEvent { created });
+    impl_codec!(DiscussionEvent {
+        created,
+        edited,
+        deleted,
+        transferred,
+        pinned,
+        unpinned,
+        labeled,
+        unlabeled,
+        locked,
+        unlocked,
+        category_changed,
+        answered,
+        unanswered
+    });
+    impl_codec!(DiscussionCommentEvent {
+        created,
+        edited,
+        deleted
+    });
+    impl_codec!(ImageVersionEvent { names, versions });
+    impl_codec!(IssueCommentEvent {
+        created,
+        edited,
+        deleted
+    });
+    impl_codec!(IssuesEvent {
+        created,
+        edited,
+        deleted,
+        transferred,
+        pinned,
+        unpinned,
+        closed,
+        reopened,
+        assigned,
+        unassigned,
+        labeled,
+        unlabeled,
+        locked,
+        unlocked,
+        milestoned,
+        demilestoned,
+        typed,
+        untyped
+    });
+    impl_codec!(LabelEvent {
+        created,
+        edited,
+        deleted
+    });
+    impl_codec!(MergeGroupEvent { checks_requested });
+    impl_codec!(MilestoneEvent {
+        created,
+        closed,
+        opened,
+        edited,
+        deleted
+    });
+    impl_codec!(PullRequestEvent {
+        assigned,
+        unassigned,
+        labeled,
+        unlabeled,
+        opened,
+        edited,
+        closed,
+        reopened,
+        synchronize,
+        converted_to_draft,
+        locked,
+        unlocked,
+        enqueued,
+        dequeued,
+        milestoned,
+        demilestoned,
+        ready_for_review,
+        review_requested,
+        review_request_removed,
+        auto_merge_enabled,
+        auto_merge_disabled,
+        branches,
+        branches_ignore,
+        paths,
+        paths_ignore
+    });
+    impl_codec!(PullRequestReviewEvent {
+        submitted,
+        edited,
+        dismissed
+    });
+    impl_codec!(PullRequestReviewCommentEvent {
+        created,
+        edited,
+        deleted
+    });
+    impl_codec!(PushEvent {
+        branches,
+        branches_ignore,
+        tags,
+        tags_ignore,
+        paths,
+        paths_ignore
+    });
+    impl_codec!(RegistryPackageEvent { published, updated });
+    impl_codec!(ReleaseEvent {
+        published,
+        unpublished,
+        created,
+        edited,
+        deleted,
+        prereleased,
+        released
+    });
+    impl_codec!(RepositoryDispatchEvent { types });
+
+    impl Encode for CronStepType {
+        fn encode(&self, out: &mut Vec<u8>) {
+            match self {
+                CronStepType::Value(value) => {
+                    out.push(0);
+                    value.encode(out);
+                }
+                CronStepType::List(values) => {
+                    out.push(1);
+                    values.encode(out);
+                }
+                CronStepType::Range(start, end) => {
+                    out.push(2);
+                    start.encode(out);
+                    end.encode(out);
+                }
+                CronStepType::Step { start, step } => {
+                    out.push(3);
+                    start.encode(out);
+                    step.encode(out);
+                }
             }
         }
     }
-
-    #[derive(Clone)]
-    enum WorkflowDispatchInputType {
-        Boolean {
-            default: Option<bool>,
-        },
-        Choice {
-            default: Option<String>,
-            options: Vec<String>,
-        },
-        Number {
-            default: Option<i64>,
-        },
-        Environment,
-        String {
-            default: Option<String>,
-        },
+    impl Decode for CronStepType {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => CronStepType::Value(u8::decode(input)?),
+                1 => CronStepType::List(Vec::decode(input)?),
+                2 => CronStepType::Range(u8::decode(input)?, u8::decode(input)?),
+                3 => CronStepType::Step {
+                    start: Option::decode(input)?,
+                    step: u8::decode(input)?,
+                },
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
     }
-    impl WorkflowDispatchInputType {
-        fn get_type(&self) -> Yaml {
+    impl_codec!(Minute(CronStepType));
+    impl_codec!(Hour(CronStepType));
+    impl_codec!(Day(CronStepType));
+    impl_codec!(Month(CronStepType));
+    impl_codec!(DayOfWeek(CronStepType));
+    impl_codec!(Cron {
+        minute,
+        hour,
+        day,
+        month,
+        day_of_week
+    });
+    impl_codec!(ScheduleEvent { crons });
+    impl_codec!(WatchEvent { started });
+
+    impl Encode for WorkflowInputType {
+        fn encode(&self, out: &mut Vec<u8>) {
             match self {
-                Self::Boolean { .. } => Yaml::from_str("boolean"),
-                Self::Choice { .. } => Yaml::from_str("choice"),
-                Self::Number { .. } => Yaml::from_str("number"),
-                Self::Environment => Yaml::from_str("environment"),
-                Self::String { .. } => Yaml::from_str("string"),
+                WorkflowInputType::Boolean { default } => {
+                    out.push(0);
+                    default.encode(out);
+                }
+                WorkflowInputType::Number { default } => {
+                    out.push(1);
+                    default.encode(out);
+                }
+                WorkflowInputType::String { default } => {
+                    out.push(2);
+                    default.encode(out);
+                }
             }
         }
-        fn get_default(&self) -> Option<Yaml> {
+    }
+    impl Decode for WorkflowInputType {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => WorkflowInputType::Boolean {
+                    default: Option::decode(input)?,
+                },
+                1 => WorkflowInputType::Number {
+                    default: Option::decode(input)?,
+                },
+                2 => WorkflowInputType::String {
+                    default: Option::decode(input)?,
+                },
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
+    }
+    impl_codec!(WorkflowInput {
+        description,
+        input_type,
+        required
+    });
+    impl_codec!(WorkflowOutput { description, value });
+    impl_codec!(WorkflowSecret {
+        description,
+        required
+    });
+    impl_codec!(WorkflowCallEvent {
+        inputs,
+        outputs,
+        secrets
+    });
+
+    impl Encode for WorkflowDispatchInputType {
+        fn encode(&self, out: &mut Vec<u8>) {
             match self {
-                Self::Boolean { default } => default.map(Yaml::Boolean),
-                Self::Choice { default, .. } | Self::String { default } => {
-                    default.clone().map(Yaml::String)
+                WorkflowDispatchInputType::Boolean { default } => {
+                    out.push(0);
+                    default.encode(out);
+                }
+                WorkflowDispatchInputType::Choice { default, options } => {
+                    out.push(1);
+                    default.encode(out);
+                    options.encode(out);
+                }
+                WorkflowDispatchInputType::Number { default } => {
+                    out.push(2);
+                    default.encode(out);
+                }
+                WorkflowDispatchInputType::Environment => out.push(3),
+                WorkflowDispatchInputType::String { default } => {
+                    out.push(4);
+                    default.encode(out);
                 }
-                Self::Number { default } => default.map(Yaml::Integer),
-                Self::Environment => None, // TODO: check if environment can have a default
             }
         }
-        fn get_options(&self) -> Option<Yaml> {
-            if let Self::Choice { options, .. } = self {
-                Some(Yaml::Array(
-                    options.iter().map(|s| Yaml::String(s.clone())).collect(),
-                ))
-            } else {
-                None
-            }
+    }
+    impl Decode for WorkflowDispatchInputType {
+        fn decode(input: &mut Decoder<'_>) -> PyResult<Self> {
+            Ok(match input.byte()? {
+                0 => WorkflowDispatchInputType::Boolean {
+                    default: Option::decode(input)?,
+                },
+                1 => WorkflowDispatchInputType::Choice {
+                    default: Option::decode(input)?,
+                    options: Vec::decode(input)?,
+                },
+                2 => WorkflowDispatchInputType::Number {
+                    default: Option::decode(input)?,
+                },
+                3 => WorkflowDispatchInputType::Environment,
+                4 => WorkflowDispatchInputType::String {
+                    default: Option::decode(input)?,
+                },
+                tag => return Err(input.invalid_tag(tag)),
+            })
+        }
+    }
+    impl_codec!(WorkflowDispatchInput {
+        description,
+        input_type,
+        required
+    });
+    impl_codec!(WorkflowDispatchEvent { inputs });
+    impl_codec!(WorkflowRunEvent {
+        workflows,
+        completed,
+        requested,
+        in_progress,
+        branches,
+        branches_ignore
+    });
+    impl_codec!(Events {
+        branch_protection_rule,
+        check_run,
+        check_suite,
+        create,
+        delete,
+        deployment,
+        deployment_status,
+        discussion,
+        discussion_comment,
+        fork,
+        gollum,
+        image_version,
+        issue_comment,
+        issues,
+        label,
+        merge_group,
+        milestone,
+        page_build,
+        public,
+        pull_request,
+        pull_request_review,
+        pull_request_review_comment,
+        pull_request_target,
+        push,
+        registry_package,
+        release,
+        schedule,
+        status,
+        watch,
+        workflow_call,
+        workflow_dispatch,
+        workflow_run
+    });
+    impl_codec!(Workflow {
+        name,
+        run_name,
+        on,
+        permissions,
+        env,
+        defaults,
+        concurrency,
+        jobs
+    });
+    impl_codec!(WorkflowBuilder { workflow });
+
+    // Importing existing workflow YAML
+
+    fn import_error(path: &str, message: impl Display) -> PyErr {
+        if path.is_empty() {
+            PyValueError::new_err(format!("Invalid workflow YAML: {message}"))
+        } else {
+            PyValueError::new_err(format!("Invalid workflow YAML at '{path}': {message}"))
         }
     }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowDispatchInput {
-        description: Option<String>,
-        input_type: WorkflowDispatchInputType,
-        required: Option<bool>,
+    /// The entries of a YAML mapping being imported, which are removed as they are used so
+    /// that any unsupported keys left over can be reported.
+    struct Fields<'y> {
+        entries: Vec<(&'y str, &'y Yaml)>,
+        path: String,
     }
-    #[pymethods]
-    impl WorkflowDispatchInput {
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn boolean(
-            description: Option<String>,
-            default: Option<bool>,
-            required: Option<bool>,
-        ) -> Self {
-            Self {
-                description,
-                input_type: WorkflowDispatchInputType::Boolean { default },
-                required,
-            }
+
+    impl<'y> Fields<'y> {
+        fn new(yaml: &'y Yaml, path: &str) -> PyResult<Self> {
+            let entries = match yaml {
+                Yaml::Null => Vec::new(),
+                Yaml::Hash(hash) => hash
+                    .iter()
+                    .map(|(key, value)| match key {
+                        Yaml::String(key) => Ok((key.as_str(), value)),
+                        _ => Err(import_error(path, "mapping keys must be strings")),
+                    })
+                    .collect::<PyResult<_>>()?,
+                _ => return Err(import_error(path, "expected a mapping")),
+            };
+            Ok(Self {
+                entries,
+                path: path.to_string(),
+            })
         }
-        #[staticmethod]
-        #[pyo3(signature = (options, *, description=None, default=None, required=None))]
-        fn choice(
-            options: Vec<String>,
-            description: Option<String>,
-            default: Option<String>,
-            required: Option<bool>,
-        ) -> Self {
-            Self {
-                description,
-                input_type: WorkflowDispatchInputType::Choice { default, options },
-                required,
+
+        fn child(&self, key: &str) -> String {
+            if self.path.is_empty() {
+                key.to_string()
+            } else {
+                format!("{}.{key}", self.path)
             }
         }
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn number(
-            description: Option<String>,
-            default: Option<i64>,
-            required: Option<bool>,
-        ) -> Self {
-            Self {
-                description,
-                input_type: WorkflowDispatchInputType::Number { default },
-                required,
+
+        fn get<T>(
+            &mut self,
+            key: &str,
+            import: impl FnOnce(&'y Yaml, &str) -> PyResult<T>,
+        ) -> PyResult<Option<T>> {
+            match self.entries.iter().position(|(k, _)| *k == key) {
+                Some(index) => {
+                    let (_, value) = self.entries.remove(index);
+                    import(value, &self.child(key)).map(Some)
+                }
+                None => Ok(None),
             }
         }
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, required=None))]
-        fn environment(description: Option<String>, required: Option<bool>) -> Self {
-            Self {
-                description,
-                input_type: WorkflowDispatchInputType::Environment,
-                required,
-            }
+
+        fn require<T>(
+            &mut self,
+            key: &str,
+            import: impl FnOnce(&'y Yaml, &str) -> PyResult<T>,
+        ) -> PyResult<T> {
+            self.get(key, import)?
+                .ok_or_else(|| import_error(&self.path, format!("missing required key '{key}'")))
         }
-        #[staticmethod]
-        #[pyo3(signature = (*, description=None, default=None, required=None))]
-        fn string(
-            description: Option<String>,
-            default: Option<String>,
-            required: Option<bool>,
-        ) -> Self {
-            Self {
-                description,
-                input_type: WorkflowDispatchInputType::String { default },
-                required,
+
+        fn finish(self) -> PyResult<()> {
+            match self.entries.first() {
+                Some((key, _)) => Err(import_error(&self.path, format!("unsupported key '{key}'"))),
+                None => Ok(()),
             }
         }
+    }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+    fn import_text(yaml: &Yaml, path: &str) -> PyResult<String> {
+        match yaml {
+            Yaml::String(text) | Yaml::Real(text) => Ok(text.clone()),
+            Yaml::Integer(value) => Ok(value.to_string()),
+            Yaml::Boolean(value) => Ok(value.to_string()),
+            _ => Err(import_error(path, "expected a string")),
         }
     }
-    impl Yamlable for &WorkflowDispatchInput {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("description", &self.description);
-            out.insert_yaml("type", self.input_type.get_type());
-            out.insert_yaml_opt("required", self.required);
-            out.insert_yaml_opt("default", self.input_type.get_default());
-            out.insert_yaml_opt("options", self.input_type.get_options());
-            Yaml::Hash(out)
+
+    fn import_bool(yaml: &Yaml, path: &str) -> PyResult<bool> {
+        match yaml {
+            Yaml::Boolean(value) => Ok(*value),
+            _ => Err(import_error(path, "expected a boolean")),
         }
     }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowDispatchEvent {
-        inputs: Option<PyMap<String, WorkflowDispatchInput>>,
-    }
-    #[pymethods]
-    impl WorkflowDispatchEvent {
-        #[new]
-        #[pyo3(signature = (*, inputs=None))]
-        fn new(inputs: Option<PyMap<String, WorkflowDispatchInput>>) -> Self {
-            Self {
-                inputs: inputs.filter(|i| !i.is_empty()),
-            }
+    fn import_strings(yaml: &Yaml, path: &str) -> PyResult<Vec<String>> {
+        match yaml {
+            Yaml::Array(items) => items.iter().map(|item| import_text(item, path)).collect(),
+            _ => Ok(vec![import_text(yaml, path)?]),
         }
+    }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+    fn import_list<'y, T>(
+        yaml: &'y Yaml,
+        path: &str,
+        import: impl Fn(&'y Yaml, &str) -> PyResult<T>,
+    ) -> PyResult<Vec<T>> {
+        let Yaml::Array(items) = yaml else {
+            return Err(import_error(path, "expected a list"));
+        };
+        items
+            .iter()
+            .enumerate()
+            .map(|(i, item)| import(item, &format!("{path}[{i}]")))
+            .collect()
+    }
+
+    fn import_map<'y, T>(
+        yaml: &'y Yaml,
+        path: &str,
+        import: impl Fn(&'y Yaml, &str) -> PyResult<T>,
+    ) -> PyResult<PyMap<String, T>> {
+        let Yaml::Hash(hash) = yaml else {
+            return Err(import_error(path, "expected a mapping"));
+        };
+        let mut map = PyMap(LinkedHashMap::with_capacity(hash.len()));
+        for (key, value) in hash {
+            let key = import_text(key, path)?;
+            let value = import(value, &format!("{path}.{key}"))?;
+            map.0.insert(key, value);
         }
+        Ok(map)
     }
-    impl MaybeYamlable for &WorkflowDispatchEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            if let Some(inputs) = &self.inputs {
-                let mut out = Hash::new();
-                for (k, v) in inputs.iter() {
-                    out.insert_yaml(k, v);
-                }
-                Some(Yaml::Hash(out))
-            } else {
-                None
-            }
+
+    fn import_hash(yaml: &Yaml, path: &str) -> PyResult<Hash> {
+        match yaml {
+            Yaml::Hash(hash) => Ok(hash.clone()),
+            _ => Err(import_error(path, "expected a mapping")),
         }
     }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct WorkflowRunEvent {
-        workflows: Option<Vec<String>>,
-        completed: bool,
-        requested: bool,
-        in_progress: bool,
-        branches: Option<Vec<String>>,
-        branches_ignore: Option<Vec<String>>,
+    fn import_string_like(yaml: &Yaml, path: &str) -> PyResult<StringLike> {
+        let text = import_text(yaml, path)?;
+        Ok(match parse_raw_string_expression(&text)? {
+            Some(expr) => Either::A(expr),
+            None => Either::B(text),
+        })
     }
-    #[pymethods]
-    impl WorkflowRunEvent {
-        #[new]
-        #[pyo3(signature = (*, workflows=None, completed=false, requested=false, in_progress=false, branches=None, branches_ignore=None))]
-        fn new(
-            workflows: Option<Vec<String>>,
-            completed: bool,
-            requested: bool,
-            in_progress: bool,
-            branches: Option<Vec<String>>,
-            branches_ignore: Option<Vec<String>>,
-        ) -> Self {
-            let workflows = workflows.filter(|w| !w.is_empty());
-            let branches = branches.filter(|b| !b.is_empty());
-            let branches_ignore = branches_ignore.filter(|b| !b.is_empty());
-            Self {
-                workflows,
-                completed,
-                requested,
-                in_progress,
-                branches,
-                branches_ignore,
-            }
+
+    fn import_bool_like(yaml: &Yaml, path: &str) -> PyResult<BoolLike> {
+        match yaml {
+            Yaml::Boolean(value) => Ok(Either::B(*value)),
+            Yaml::String(text) => parse_raw_boolean_expression(text)?
+                .map(Either::A)
+                .ok_or_else(|| import_error(path, "expected a boolean or an expression")),
+            _ => Err(import_error(path, "expected a boolean or an expression")),
         }
+    }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+    fn import_int_like(yaml: &Yaml, path: &str) -> PyResult<IntLike> {
+        match yaml {
+            Yaml::Integer(value) => Ok(Either::B(*value)),
+            Yaml::String(text) => parse_raw_number_expression(text)?
+                .map(Either::A)
+                .ok_or_else(|| import_error(path, "expected an integer or an expression")),
+            _ => Err(import_error(path, "expected an integer or an expression")),
         }
     }
-    impl MaybeYamlable for &WorkflowRunEvent {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("workflows", &self.workflows);
-            if self.completed || self.requested || self.in_progress {
-                let mut types = Array::new();
-                types.push_yaml_cond("completed", self.completed);
-                types.push_yaml_cond("requested", self.requested);
-                types.push_yaml_cond("in_progress", self.in_progress);
-                out.insert_yaml("types", Yaml::Array(types));
+
+    fn import_condition(yaml: &Yaml, path: &str) -> PyResult<Either<BooleanExpression, String>> {
+        let text = import_text(yaml, path)?;
+        Ok(match parse_raw_condition(&text)? {
+            Some(expr) => Either::A(expr),
+            None => Either::B(text),
+        })
+    }
+
+    fn import_string_map(yaml: &Yaml, path: &str) -> PyResult<PyMap<String, StringLike>> {
+        import_map(yaml, path, import_string_like)
+    }
+
+    fn validate_with_hash(with: &Hash, allowed: Allowed) -> PyResult<()> {
+        for value in with.values() {
+            if let Yaml::String(text) = value {
+                validate_raw_string(text, allowed)?;
             }
-            out.insert_yaml_opt("branches", &self.branches);
-            out.insert_yaml_opt("branches-ignore", &self.branches_ignore);
-            if out.is_empty() {
-                None
-            } else {
-                Some(Yaml::Hash(out))
+        }
+        Ok(())
+    }
+
+    fn yaml_to_py<'py>(py: Python<'py>, yaml: &Yaml, path: &str) -> PyResult<Bound<'py, PyAny>> {
+        Ok(match yaml {
+            Yaml::Real(text) => text
+                .parse::<f64>()
+                .map_err(|_| import_error(path, format!("invalid number '{text}'")))?
+                .into_pyobject(py)?
+                .into_any(),
+            Yaml::Integer(value) => value.into_pyobject(py)?.into_any(),
+            Yaml::String(text) => text.into_pyobject(py)?.into_any(),
+            Yaml::Boolean(value) => PyBool::new(py, *value).to_owned().into_any(),
+            Yaml::Array(items) => {
+                let list = PyList::empty(py);
+                for item in items {
+                    list.append(yaml_to_py(py, item, path)?)?;
+                }
+                list.into_any()
+            }
+            Yaml::Hash(hash) => {
+                let dict = PyDict::new(py);
+                for (key, value) in hash {
+                    dict.set_item(import_text(key, path)?, yaml_to_py(py, value, path)?)?;
+                }
+                dict.into_any()
+            }
+            Yaml::Null => py.None().into_bound(py),
+            Yaml::Alias(_) | Yaml::BadValue => {
+                return Err(import_error(path, "unsupported YAML value"));
+            }
+        })
+    }
+
+    fn import_permissions(yaml: &Yaml, path: &str) -> PyResult<Permissions> {
+        match yaml {
+            Yaml::String(text) if text == "read-all" => Ok(Permissions::read_all()),
+            Yaml::String(text) if text == "write-all" => Ok(Permissions::write_all()),
+            Yaml::Hash(hash) if hash.is_empty() => Ok(Permissions::none()),
+            Yaml::Hash(_) => {
+                let mut fields = Fields::new(yaml, path)?;
+                let discussions = match fields.get("discussions", import_text)? {
+                    Some(discussions) => Some(discussions),
+                    None => fields.get("discussion", import_text)?,
+                };
+                let permissions = Permissions::new(
+                    fields.get("actions", import_text)?,
+                    fields.get("artifact-metadata", import_text)?,
+                    fields.get("attestations", import_text)?,
+                    fields.get("checks", import_text)?,
+                    fields.get("contents", import_text)?,
+                    fields.get("deployments", import_text)?,
+                    fields.get("id-token", import_text)?,
+                    fields.get("issues", import_text)?,
+                    fields.get("models", import_text)?,
+                    discussions,
+                    fields.get("packages", import_text)?,
+                    fields.get("pages", import_text)?,
+                    fields.get("pull-requests", import_text)?,
+                    fields.get("security-events", import_text)?,
+                    fields.get("statuses", import_text)?,
+                )
+                .map_err(|e| import_error(path, e))?;
+                fields.finish()?;
+                Ok(permissions)
+            }
+            _ => Err(import_error(
+                path,
+                "expected 'read-all', 'write-all' or a mapping of scopes",
+            )),
+        }
+    }
+
+    fn import_runs_on(yaml: &Yaml, path: &str) -> PyResult<RunsOn> {
+        match yaml {
+            Yaml::Array(_) => Ok(RunsOn::Array(import_list(yaml, path, import_string_like)?)),
+            Yaml::Hash(_) => {
+                let mut fields = Fields::new(yaml, path)?;
+                let group = fields.get("group", import_string_like)?;
+                let labels = fields.get("labels", import_string_like)?;
+                fields.finish()?;
+                let options = match (group, labels) {
+                    (Some(group), Some(labels)) => RunsOnSpecOptions::GroupAndLabels(group, labels),
+                    (Some(group), None) => RunsOnSpecOptions::Group(group),
+                    (None, Some(labels)) => RunsOnSpecOptions::Labels(labels),
+                    (None, None) => {
+                        return Err(import_error(path, "expected 'group' and/or 'labels'"));
+                    }
+                };
+                Ok(RunsOn::Spec(RunsOnSpec { options }))
             }
+            _ => Ok(RunsOn::String(import_string_like(yaml, path)?)),
         }
     }
 
-    #[pyclass]
-    #[derive(Clone)]
-    struct Events {
-        branch_protection_rule: Option<BranchProtectionRuleEvent>,
-        check_run: Option<CheckRunEvent>,
-        check_suite: Option<CheckSuiteEvent>,
-        create: bool,
-        delete: bool,
-        deployment: bool,
-        deployment_status: bool,
-        discussion: Option<DiscussionEvent>,
-        discussion_comment: Option<DiscussionCommentEvent>,
-        fork: bool,
-        gollum: bool,
-        image_version: Option<ImageVersionEvent>,
-        issue_comment: Option<IssueCommentEvent>,
-        issues: Option<IssuesEvent>,
-        label: Option<LabelEvent>,
-        merge_group: Option<MergeGroupEvent>,
-        milestone: Option<MilestoneEvent>,
-        page_build: bool,
-        public: bool,
-        pull_request: Option<PullRequestEvent>,
-        pull_request_review: Option<PullRequestReviewEvent>,
-        pull_request_review_comment: Option<PullRequestReviewCommentEvent>,
-        pull_request_target: Option<PullRequestEvent>,
-        push: Option<PushEvent>,
-        registry_package: Option<RegistryPackageEvent>,
-        release: Option<ReleaseEvent>,
-        schedule: Option<ScheduleEvent>,
-        status: bool,
-        watch: Option<WatchEvent>,
-        workflow_call: Option<WorkflowCallEvent>,
-        workflow_dispatch: Option<WorkflowDispatchEvent>,
-        workflow_run: Option<WorkflowRunEvent>,
-    }
-    #[pymethods]
-    impl Events {
-        /// A set of events which may trigger a Workflow.
-        ///
-        /// Parameters
-        /// ----------
-        /// branch_protection_rule
-        ///     Triggers when the branch protection rules for the repository are changed.
-        /// check_run
-        ///     Triggers when activity related to a check run occurs.
-        /// check_suite
-        ///     Triggers when activity related to a check suite occurs.
-        /// create
-        ///     Triggers when someone creates a new branch or tag (but not if more than three tags are made at once).
-        /// delete
-        ///     Triggers when someone deletes a new branch or tag
-        /// deployment
-        ///     Triggers when a deployment is created.
-        /// deployment_status
-        ///     Triggers when a third party service provides a deployment status (unlesss deployment status's state is set to ``inactive``).
-        /// discussion
-        ///     Triggers when a discussion is created or modified.
-        /// discussion_comment
-        ///     Triggers on a comment on a discussion.
-        /// fork
-        ///     Triggers when someone forks a repository.
-        /// gollum
-        ///     Triggers when someone creates/edits a Wiki page.
-        /// image_version
-        ///     Triggers when a new version of a specified image becomes available.
-        /// issue_comment
-        ///     Triggers when an issue or pull request comment is created, edited, or deleted.
-        /// issues
-        ///     Triggers when an issue is created or modified.
-        /// label
-        ///     Triggers when a label is created or modified.
-        /// merge_group
-        ///     Triggers when a pull request is added to a merge queue which adds the pull request
-        ///     to a merge group.
-        /// milestone
-        ///     Triggers when a milestone is created or modified.
-        /// page_build
-        ///     Triggers on pushes to a branch which is the publishing source for GitHub Pages.
-        /// public
-        ///     Triggers when the repository visibility is changed from private to public.
-        /// pull_request
-        ///     Triggers on activity related to a pull request
-        /// pull_request_review
-        ///     Triggers on actions related to a pull request review.
-        /// pull_request_review_comment
-        ///     Triggers when a pull request review comment is modified.
-        /// pull_request_target
-        ///     Triggers when some activity occurs on a pull request. This runs in the context of
-        ///     the default branch of the repository rather than the context of the merge commit
-        ///     (use the ``pull_request`` argument for that).
-        /// push
-        ///     Triggers when a commit or tag is pushed (also when a repository is created from a
-        ///     template).
-        /// registry_package
-        ///     Triggers on activity related to GitHub Packages
-        /// release
-        ///     Triggers on release activity.
-        /// repository_dispatch
-        ///     Triggers when the GitHub API is useed to trigger a webhook event called
-        ///     ``repository_dispatch`` (used to trigger a workflow for activity that happens
-        ///     outside of GitHub).
-        /// schedule
-        ///     Triggers on a fixed time schedule (cronjob).
-        /// status
-        ///     Triggers when the status of a commit changes.
-        /// watch
-        ///     Triggers when the repository is starred.
-        /// workflow_call
-        ///     Triggers when the workflow is called by another workflow.
-        /// workflow_dispatch
-        ///     Allows the workflow to be triggered manually through the GitHub API, CLI, or UI.
-        /// workflow_run
-        ///     Triggers when a workflow run is requested or completed.
-        ///
-        /// Notes
-        /// -----
-        /// See `the documentation on GitHub <https://docs.github.com/en/actions/reference/workflows-and-actions/events-that-trigger-workflows#branch_protection_rule>`_ for more details.
-        #[new]
-        #[pyo3(signature = (*, branch_protection_rule=None, check_run=None, check_suite=None, create=false, delete=false, deployment=false, deployment_status=false, discussion=None, discussion_comment=None, fork=false, gollum=false, image_version=None, issue_comment=None, issues=None, label=None, merge_group=None, milestone=None, page_build=false, public=false, pull_request=None, pull_request_review=None, pull_request_review_comment=None, pull_request_target=None, push=None, registry_package=None, release=None, schedule=None, status=false, watch=None, workflow_call=None, workflow_dispatch=None, workflow_run=None))]
-        fn new(
-            branch_protection_rule: Option<BranchProtectionRuleEvent>,
-            check_run: Option<CheckRunEvent>,
-            check_suite: Option<CheckSuiteEvent>,
-            create: bool,
-            delete: bool,
-            deployment: bool,
-            deployment_status: bool,
-            discussion: Option<DiscussionEvent>,
-            discussion_comment: Option<DiscussionCommentEvent>,
-            fork: bool,
-            gollum: bool,
-            image_version: Option<ImageVersionEvent>,
-            issue_comment: Option<IssueCommentEvent>,
-            issues: Option<IssuesEvent>,
-            label: Option<LabelEvent>,
-            merge_group: Option<MergeGroupEvent>,
-            milestone: Option<MilestoneEvent>,
-            page_build: bool,
-            public: bool,
-            pull_request: Option<PullRequestEvent>,
-            pull_request_review: Option<PullRequestReviewEvent>,
-            pull_request_review_comment: Option<PullRequestReviewCommentEvent>,
-            pull_request_target: Option<PullRequestEvent>,
-            push: Option<PushEvent>,
-            registry_package: Option<RegistryPackageEvent>,
-            release: Option<ReleaseEvent>,
-            schedule: Option<ScheduleEvent>,
-            status: bool,
-            watch: Option<WatchEvent>,
-            workflow_call: Option<WorkflowCallEvent>,
-            workflow_dispatch: Option<WorkflowDispatchEvent>,
-            workflow_run: Option<WorkflowRunEvent>,
-        ) -> Self {
-            Self {
-                branch_protection_rule,
-                check_run,
-                check_suite,
-                create,
-                delete,
-                deployment,
-                deployment_status,
-                discussion,
-                discussion_comment,
-                fork,
-                gollum,
-                image_version,
-                issue_comment,
-                issues,
-                label,
-                merge_group,
-                milestone,
-                page_build,
-                public,
-                pull_request,
-                pull_request_review,
-                pull_request_review_comment,
-                pull_request_target,
-                push,
-                registry_package,
-                release,
-                schedule,
-                status,
-                watch,
-                workflow_call,
-                workflow_dispatch,
-                workflow_run,
-            }
+    fn import_environment(yaml: &Yaml, path: &str) -> PyResult<Environment> {
+        if !matches!(yaml, Yaml::Hash(_)) {
+            return Ok(Environment::new(import_string_like(yaml, path)?, None));
         }
+        let mut fields = Fields::new(yaml, path)?;
+        let environment = Environment::new(
+            fields.require("name", import_string_like)?,
+            fields.get("url", import_string_like)?,
+        );
+        fields.finish()?;
+        Ok(environment)
+    }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.maybe_as_yaml_string()
+    fn import_concurrency(yaml: &Yaml, path: &str) -> PyResult<Concurrency> {
+        if !matches!(yaml, Yaml::Hash(_)) {
+            return Ok(Concurrency::new(import_string_like(yaml, path)?, None));
         }
+        let mut fields = Fields::new(yaml, path)?;
+        let concurrency = Concurrency::new(
+            fields.require("group", import_string_like)?,
+            fields.get("cancel-in-progress", import_bool_like)?,
+        );
+        fields.finish()?;
+        Ok(concurrency)
     }
-    impl MaybeYamlable for &Events {
-        fn maybe_as_yaml(&self) -> Option<Yaml> {
-            let mut configured = Hash::new();
-            let mut simple_names: Vec<&str> = Vec::new();
 
-            if let Some(event) = &self.branch_protection_rule {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("branch_protection_rule", yaml);
+    fn import_defaults(yaml: &Yaml, path: &str) -> PyResult<Defaults> {
+        let mut fields = Fields::new(yaml, path)?;
+        let run_defaults = fields.get("run", |yaml, path| {
+            let mut fields = Fields::new(yaml, path)?;
+            let run_defaults = RunDefaults::new(
+                fields.get("shell", import_string_like)?,
+                fields.get("working-directory", import_string_like)?,
+            );
+            fields.finish()?;
+            Ok(run_defaults)
+        })?;
+        fields.finish()?;
+        Ok(Defaults::new(None, run_defaults))
+    }
+
+    fn import_matrix(yaml: &Yaml, path: &str) -> PyResult<Matrix> {
+        let Yaml::Hash(hash) = yaml else {
+            return Err(import_error(path, "only literal matrices are supported"));
+        };
+        let mut matrix = hash.clone();
+        let mut array = |key: &str| match matrix.remove(&Yaml::String(key.to_string())) {
+            Some(Yaml::Array(items)) => Ok(Some(items)),
+            Some(_) => Err(import_error(path, format!("'{key}' must be a list"))),
+            None => Ok(None),
+        };
+        let include = array("include")?;
+        let exclude = array("exclude")?;
+        Ok(Matrix {
+            matrix: (!matrix.is_empty()).then_some(matrix),
+            include,
+            exclude,
+        })
+    }
+
+    fn import_strategy(yaml: &Yaml, path: &str) -> PyResult<Strategy> {
+        let mut fields = Fields::new(yaml, path)?;
+        let strategy = Strategy::new(
+            fields.get("matrix", import_matrix)?,
+            fields.get("fail-fast", import_bool_like)?,
+            fields.get("max-parallel", import_int_like)?,
+        );
+        fields.finish()?;
+        Ok(strategy)
+    }
+
+    fn import_container(yaml: &Yaml, path: &str) -> PyResult<Container> {
+        if !matches!(yaml, Yaml::Hash(_)) {
+            let image = import_string_like(yaml, path)?;
+            return Ok(Container::new(image, None, None, None, None, None));
+        }
+        let mut fields = Fields::new(yaml, path)?;
+        let container = Container::new(
+            fields.require("image", import_string_like)?,
+            fields.get("credentials", |yaml, path| {
+                let mut fields = Fields::new(yaml, path)?;
+                let credentials = Credentials::new(
+                    fields.require("username", import_string_like)?,
+                    fields.require("password", import_string_like)?,
+                );
+                fields.finish()?;
+                Ok(credentials)
+            })?,
+            fields.get("env", import_string_map)?,
+            fields.get("ports", |yaml, path| {
+                import_list(yaml, path, import_int_like)
+            })?,
+            fields.get("volumes", |yaml, path| {
+                import_list(yaml, path, import_string_like)
+            })?,
+            fields.get("options", import_string_like)?,
+        );
+        fields.finish()?;
+        Ok(container)
+    }
+
+    fn import_job_secrets(yaml: &Yaml, path: &str) -> PyResult<JobSecrets> {
+        match yaml {
+            Yaml::String(text) if text == "inherit" => Ok(JobSecrets::inherit()),
+            _ => Ok(JobSecrets::new(
+                import_string_map(yaml, path)?.0.into_iter().collect(),
+            )),
+        }
+    }
+
+    fn import_step(yaml: &Yaml, path: &str) -> PyResult<Step> {
+        let mut fields = Fields::new(yaml, path)?;
+        let name = fields.get("name", import_string_like)?;
+        let condition = fields.get("if", import_condition)?;
+        let id = fields.get("id", import_text)?;
+        let env = fields.get("env", import_string_map)?;
+        let continue_on_error = fields.get("continue-on-error", import_bool_like)?;
+        let timeout_minutes = fields.get("timeout-minutes", import_int_like)?;
+        let step = if let Some(run) = fields.get("run", import_text)? {
+            make_script(
+                vec![Either::B(run)],
+                name,
+                condition,
+                fields.get("working-directory", import_string_like)?,
+                fields.get("shell", import_text)?,
+                id,
+                env,
+                None,
+                continue_on_error,
+                timeout_minutes,
+            )
+        } else if let Some(uses) = fields.get("uses", import_text)? {
+            let mut with = fields.get("with", import_hash)?;
+            let mut with_arg = |key: &str| {
+                with.as_mut()
+                    .and_then(|with| with.remove(&Yaml::String(key.to_string())))
+                    .map(|value| import_string_like(&value, &format!("{path}.with.{key}")))
+                    .transpose()
+            };
+            let args = with_arg("args")?;
+            let entrypoint = with_arg("entrypoint")?;
+            let with = with.filter(|with| !with.is_empty());
+            if let Some(with) = &with {
+                validate_with_hash(with, ALLOWED_STEP_WITH)?;
+            }
+            let (action, r#ref) = match uses.rsplit_once('@') {
+                Some((action, r#ref)) => (action, Some(r#ref.to_string())),
+                None => (uses.as_str(), None),
+            };
+            make_action(
+                name,
+                action,
+                r#ref,
+                with,
+                args,
+                entrypoint,
+                condition,
+                id,
+                env,
+                continue_on_error,
+                timeout_minutes,
+                true,
+                None,
+            )
+        } else {
+            return Err(import_error(path, "a step needs either 'run' or 'uses'"));
+        }
+        .map_err(|e| import_error(path, e))?;
+        fields.finish()?;
+        Ok(step)
+    }
+
+    fn import_job(py: Python<'_>, yaml: &Yaml, path: &str) -> PyResult<Job> {
+        let mut fields = Fields::new(yaml, path)?;
+        let with_opts = fields
+            .get("with", |yaml, path| yaml_to_py(py, yaml, path))?
+            .map(|with| with.cast_into::<PyDict>())
+            .transpose()
+            .map_err(|_| import_error(path, "'with' must be a mapping"))?;
+        let job = Job::new(
+            fields.get("steps", |yaml, path| import_list(yaml, path, import_step))?,
+            fields.get("name", import_string_like)?,
+            fields.get("permissions", import_permissions)?,
+            false,
+            fields.get("needs", import_strings)?,
+            fields.get("if", import_condition)?,
+            fields.get("runs-on", import_runs_on)?,
+            fields.get("snapshot", import_text)?,
+            fields.get("environment", import_environment)?,
+            fields.get("concurrency", import_concurrency)?,
+            fields.get("outputs", import_string_map)?,
+            fields.get("env", import_string_map)?,
+            fields.get("defaults", import_defaults)?,
+            fields.get("timeout-minutes", import_int_like)?,
+            fields.get("strategy", import_strategy)?,
+            fields
+                .get("continue-on-error", import_bool_like)?
+                .map(Either::B),
+            fields.get("container", import_container)?,
+            fields.get("services", |yaml, path| {
+                import_map(yaml, path, import_container)
+            })?,
+            fields.get("uses", import_text)?,
+            with_opts,
+            fields.get("secrets", import_job_secrets)?,
+        )
+        .map_err(|e| import_error(path, e))?;
+        fields.finish()?;
+        Ok(job)
+    }
+
+    fn import_cron_field(
+        field: &str,
+        range: std::ops::RangeInclusive<u8>,
+        path: &str,
+    ) -> PyResult<Option<CronStepType>> {
+        if field == "*" {
+            return Ok(None);
+        }
+        let number = |text: &str| {
+            text.parse::<u8>()
+                .ok()
+                .filter(|value| range.contains(value))
+                .ok_or_else(|| import_error(path, format!("unsupported cron field '{field}'")))
+        };
+        let step_type = if let Some((start, step)) = field.split_once('/') {
+            CronStepType::Step {
+                start: if start == "*" {
+                    None
                 } else {
-                    simple_names.push("branch_protection_rule");
-                }
+                    Some(number(start)?)
+                },
+                step: number(step)?,
             }
-            if let Some(event) = &self.check_run {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("check_run", yaml);
-                } else {
-                    simple_names.push("check_run");
+        } else if field.contains(',') {
+            CronStepType::List(field.split(',').map(number).collect::<PyResult<_>>()?)
+        } else if let Some((min, max)) = field.split_once('-') {
+            CronStepType::Range(number(min)?, number(max)?)
+        } else {
+            CronStepType::Value(number(field)?)
+        };
+        Ok(Some(step_type))
+    }
+
+    fn import_cron(yaml: &Yaml, path: &str) -> PyResult<Cron> {
+        let mut fields = Fields::new(yaml, path)?;
+        let text = fields.require("cron", import_text)?;
+        fields.finish()?;
+        let [minute, hour, day, month, day_of_week] =
+            text.split_whitespace().collect::<Vec<_>>()[..]
+        else {
+            return Err(import_error(
+                path,
+                format!("expected five fields in '{text}'"),
+            ));
+        };
+        Ok(Cron {
+            minute: import_cron_field(minute, 0..=59, path)?.map(Minute),
+            hour: import_cron_field(hour, 0..=23, path)?.map(Hour),
+            day: import_cron_field(day, 1..=31, path)?.map(Day),
+            month: import_cron_field(month, 1..=12, path)?.map(Month),
+            day_of_week: import_cron_field(day_of_week, 0..=6, path)?.map(DayOfWeek),
+        })
+    }
+
+    fn import_workflow_input(yaml: &Yaml, path: &str) -> PyResult<WorkflowInput> {
+        let mut fields = Fields::new(yaml, path)?;
+        let description = fields.get("description", import_text)?;
+        let required = fields.get("required", import_bool)?;
+        let input = match fields.require("type", import_text)?.as_str() {
+            "boolean" => WorkflowInput::boolean(
+                description,
+                fields.get("default", import_bool_like)?,
+                required,
+            ),
+            "number" => WorkflowInput::number(
+                description,
+                fields.get("default", import_int_like)?,
+                required,
+            ),
+            "string" => WorkflowInput::string(
+                description,
+                fields.get("default", import_string_like)?,
+                required,
+            ),
+            other => return Err(import_error(path, format!("unknown input type '{other}'"))),
+        }
+        .map_err(|e| import_error(path, e))?;
+        fields.finish()?;
+        Ok(input)
+    }
+
+    fn import_workflow_output(yaml: &Yaml, path: &str) -> PyResult<WorkflowOutput> {
+        let mut fields = Fields::new(yaml, path)?;
+        let description = fields.get("description", import_text)?;
+        let output = WorkflowOutput::new(fields.require("value", import_string_like)?, description)
+            .map_err(|e| import_error(path, e))?;
+        fields.finish()?;
+        Ok(output)
+    }
+
+    fn import_workflow_secret(yaml: &Yaml, path: &str) -> PyResult<WorkflowSecret> {
+        let mut fields = Fields::new(yaml, path)?;
+        let secret = WorkflowSecret::new(
+            fields.get("description", import_text)?,
+            fields.get("required", import_bool)?,
+        );
+        fields.finish()?;
+        Ok(secret)
+    }
+
+    fn import_workflow_dispatch_input(yaml: &Yaml, path: &str) -> PyResult<WorkflowDispatchInput> {
+        let mut fields = Fields::new(yaml, path)?;
+        let description = fields.get("description", import_text)?;
+        let required = fields.get("required", import_bool)?;
+        let kind = fields.get("type", import_text)?;
+        let input = match kind.as_deref().unwrap_or("string") {
+            "boolean" => WorkflowDispatchInput::boolean(
+                description,
+                fields.get("default", import_bool)?,
+                required,
+            ),
+            "choice" => {
+                let options = fields.require("options", import_strings)?;
+                let default = fields.get("default", import_text)?;
+                WorkflowDispatchInput::choice(options, description, default, required)
+            }
+            "number" => WorkflowDispatchInput::number(
+                description,
+                fields.get("default", |yaml, path| match yaml {
+                    Yaml::Integer(value) => Ok(*value),
+                    _ => Err(import_error(path, "expected an integer")),
+                })?,
+                required,
+            ),
+            "environment" => WorkflowDispatchInput::environment(description, required),
+            "string" => WorkflowDispatchInput::string(
+                description,
+                fields.get("default", import_text)?,
+                required,
+            ),
+            other => return Err(import_error(path, format!("unknown input type '{other}'"))),
+        };
+        fields.finish()?;
+        Ok(input)
+    }
+
+    fn import_event(events: &mut Events, name: &str, config: &Yaml, path: &str) -> PyResult<()> {
+        if name == "schedule" {
+            events.schedule = Some(ScheduleEvent {
+                crons: Some(import_list(config, path, import_cron)?),
+            });
+            return Ok(());
+        }
+        let mut fields = Fields::new(config, path)?;
+        // sets each activity flag named in `types`, rejecting any unknown activity types
+        macro_rules! activity_types {
+            ($event:ident [$($flag:ident),* $(,)?] $(, $field:ident: $value:expr)* $(,)?) => {{
+                let types = fields.get("types", import_strings)?.unwrap_or_default();
+                if let Some(unknown) = types
+                    .iter()
+                    .find(|t| ![$(stringify!($flag)),*].contains(&t.as_str()))
+                {
+                    return Err(import_error(
+                        path,
+                        format!("unknown activity type '{unknown}'"),
+                    ));
                 }
-            }
-            if let Some(event) = &self.check_suite {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("check_suite", yaml);
-                } else {
-                    simple_names.push("check_suite");
+                $event {
+                    $($flag: types.iter().any(|t| t == stringify!($flag)),)*
+                    $($field: $value,)*
                 }
+            }};
+        }
+        match name {
+            "branch_protection_rule" => {
+                events.branch_protection_rule = Some(activity_types!(
+                    BranchProtectionRuleEvent[created, edited, deleted]
+                ));
             }
-            if let Some(event) = &self.discussion {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("discussion", yaml);
-                } else {
-                    simple_names.push("discussion");
-                }
+            "check_run" => {
+                events.check_run = Some(activity_types!(
+                    CheckRunEvent[created, rerequested, completed, requested_action]
+                ));
             }
-            if let Some(event) = &self.discussion_comment {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("discussion_comment", yaml);
-                } else {
-                    simple_names.push("discussion_comment");
-                }
+            "check_suite" => events.check_suite = Some(activity_types!(CheckSuiteEvent[created])),
+            "create" => events.create = true,
+            "delete" => events.delete = true,
+            "deployment" => events.deployment = true,
+            "deployment_status" => events.deployment_status = true,
+            "discussion" => {
+                events.discussion = Some(activity_types!(DiscussionEvent[
+                    created,
+                    edited,
+                    deleted,
+                    transferred,
+                    pinned,
+                    unpinned,
+                    labeled,
+                    unlabeled,
+                    locked,
+                    unlocked,
+                    category_changed,
+                    answered,
+                    unanswered,
+                ]));
+            }
+            "discussion_comment" => {
+                events.discussion_comment = Some(activity_types!(
+                    DiscussionCommentEvent[created, edited, deleted]
+                ));
             }
-
-            if let Some(event) = &self.image_version {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("image_version", yaml);
-                } else {
-                    simple_names.push("image_version");
-                }
+            "fork" => events.fork = true,
+            "gollum" => events.gollum = true,
+            "image_version" => {
+                events.image_version = Some(ImageVersionEvent {
+                    names: fields.get("names", import_strings)?,
+                    versions: fields.get("versions", import_strings)?,
+                });
+            }
+            "issue_comment" => {
+                events.issue_comment = Some(activity_types!(
+                    IssueCommentEvent[created, edited, deleted]
+                ));
             }
-            if let Some(event) = &self.issue_comment {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("issue_comment", yaml);
-                } else {
-                    simple_names.push("issue_comment");
-                }
+            "issues" => {
+                events.issues = Some(activity_types!(IssuesEvent[
+                    created,
+                    edited,
+                    deleted,
+                    transferred,
+                    pinned,
+                    unpinned,
+                    closed,
+                    reopened,
+                    assigned,
+                    unassigned,
+                    labeled,
+                    unlabeled,
+                    locked,
+                    unlocked,
+                    milestoned,
+                    demilestoned,
+                    typed,
+                    untyped,
+                ]));
+            }
+            "label" => events.label = Some(activity_types!(LabelEvent[created, edited, deleted])),
+            "merge_group" => {
+                events.merge_group = Some(activity_types!(MergeGroupEvent[checks_requested]));
+            }
+            "milestone" => {
+                events.milestone = Some(activity_types!(
+                    MilestoneEvent[created, closed, opened, edited, deleted]
+                ));
             }
-            if let Some(event) = &self.issues {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("issues", yaml);
+            "page_build" => events.page_build = true,
+            "public" => events.public = true,
+            "pull_request" | "pull_request_target" => {
+                let event = activity_types!(
+                    PullRequestEvent[
+                        assigned,
+                        unassigned,
+                        labeled,
+                        unlabeled,
+                        opened,
+                        edited,
+                        closed,
+                        reopened,
+                        synchronize,
+                        converted_to_draft,
+                        locked,
+                        unlocked,
+                        enqueued,
+                        dequeued,
+                        milestoned,
+                        demilestoned,
+                        ready_for_review,
+                        review_requested,
+                        review_request_removed,
+                        auto_merge_enabled,
+                        auto_merge_disabled,
+                    ],
+                    branches: fields.get("branches", import_strings)?,
+                    branches_ignore: fields.get("branches-ignore", import_strings)?,
+                    paths: fields.get("paths", import_strings)?,
+                    paths_ignore: fields.get("paths-ignore", import_strings)?,
+                );
+                if name == "pull_request" {
+                    events.pull_request = Some(event);
                 } else {
-                    simple_names.push("issues");
+                    events.pull_request_target = Some(event);
                 }
             }
-            if let Some(event) = &self.label {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("label", yaml);
-                } else {
-                    simple_names.push("label");
-                }
+            "pull_request_review" => {
+                events.pull_request_review = Some(activity_types!(
+                    PullRequestReviewEvent[submitted, edited, dismissed]
+                ));
             }
-            if let Some(event) = &self.merge_group {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("merge_group", yaml);
-                } else {
-                    simple_names.push("merge_group");
-                }
+            "pull_request_review_comment" => {
+                events.pull_request_review_comment = Some(activity_types!(
+                    PullRequestReviewCommentEvent[created, edited, deleted]
+                ));
             }
-            if let Some(event) = &self.milestone {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("milestone", yaml);
-                } else {
-                    simple_names.push("milestone");
-                }
+            "push" => {
+                events.push = Some(PushEvent {
+                    branches: fields.get("branches", import_strings)?,
+                    branches_ignore: fields.get("branches-ignore", import_strings)?,
+                    tags: fields.get("tags", import_strings)?,
+                    tags_ignore: fields.get("tags-ignore", import_strings)?,
+                    paths: fields.get("paths", import_strings)?,
+                    paths_ignore: fields.get("paths-ignore", import_strings)?,
+                });
+            }
+            "registry_package" => {
+                events.registry_package =
+                    Some(activity_types!(RegistryPackageEvent[published, updated]));
+            }
+            "release" => {
+                events.release = Some(activity_types!(ReleaseEvent[
+                    published,
+                    unpublished,
+                    created,
+                    edited,
+                    deleted,
+                    prereleased,
+                    released,
+                ]));
+            }
+            "repository_dispatch" => {
+                events.repository_dispatch = Some(RepositoryDispatchEvent {
+                    types: fields.get("types", import_strings)?,
+                });
+            }
+            "status" => events.status = true,
+            "watch" => events.watch = Some(activity_types!(WatchEvent[started])),
+            "workflow_call" => {
+                events.workflow_call = Some(WorkflowCallEvent::new(
+                    fields.get("inputs", |yaml, path| {
+                        import_map(yaml, path, import_workflow_input)
+                    })?,
+                    fields.get("outputs", |yaml, path| {
+                        import_map(yaml, path, import_workflow_output)
+                    })?,
+                    fields.get("secrets", |yaml, path| {
+                        import_map(yaml, path, import_workflow_secret)
+                    })?,
+                ));
             }
-            if let Some(event) = &self.pull_request {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("pull_request", yaml);
-                } else {
-                    simple_names.push("pull_request");
-                }
+            "workflow_dispatch" => {
+                events.workflow_dispatch = Some(WorkflowDispatchEvent {
+                    inputs: fields.get("inputs", |yaml, path| {
+                        import_map(yaml, path, import_workflow_dispatch_input)
+                    })?,
+                });
+            }
+            "workflow_run" => {
+                events.workflow_run = Some(activity_types!(
+                    WorkflowRunEvent[completed, requested, in_progress],
+                    workflows: fields.get("workflows", import_strings)?,
+                    branches: fields.get("branches", import_strings)?,
+                    branches_ignore: fields.get("branches-ignore", import_strings)?,
+                ));
             }
-            if let Some(event) = &self.pull_request_review {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("pull_request_review", yaml);
-                } else {
-                    simple_names.push("pull_request_review");
+            _ => return Err(import_error(path, format!("unknown event '{name}'"))),
+        }
+        fields.finish()
+    }
+
+    fn import_events(yaml: &Yaml, path: &str) -> PyResult<Events> {
+        let mut events = Events::default();
+        match yaml {
+            Yaml::Hash(hash) => {
+                for (name, config) in hash {
+                    let name = import_text(name, path)?;
+                    import_event(&mut events, &name, config, &format!("{path}.{name}"))?;
                 }
             }
-            if let Some(event) = &self.pull_request_review_comment {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("pull_request_review_comment", yaml);
-                } else {
-                    simple_names.push("pull_request_review_comment");
+            _ => {
+                for name in import_strings(yaml, path)? {
+                    import_event(&mut events, &name, &Yaml::Null, &format!("{path}.{name}"))?;
                 }
             }
-            if let Some(event) = &self.pull_request_target {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("pull_request_target", yaml);
-                } else {
-                    simple_names.push("pull_request_target");
-                }
+        }
+        Ok(events)
+    }
+
+    fn import_workflow(py: Python<'_>, yaml: &Yaml) -> PyResult<Workflow> {
+        let mut fields = Fields::new(yaml, "")?;
+        let jobs = fields.require("jobs", |yaml, path| {
+            let jobs = import_map(yaml, path, |job, path| import_job(py, job, path))?;
+            for job_id in jobs.0.keys() {
+                validate_job_id(job_id).map_err(|e| import_error(path, e))?;
             }
-            if let Some(event) = &self.push {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("push", yaml);
-                } else {
-                    simple_names.push("push");
+            Ok(jobs)
+        })?;
+        let workflow = Workflow::new(
+            jobs,
+            fields.require("on", import_events)?,
+            fields.get("name", import_text)?,
+            fields.get("run-name", import_string_like)?,
+            fields.get("permissions", import_permissions)?,
+            fields.get("env", import_string_map)?,
+            fields.get("defaults", import_defaults)?,
+            fields.get("concurrency", import_concurrency)?,
+        )
+        .map_err(|e| import_error("", e))?;
+        fields.finish()?;
+        Ok(workflow)
+    }
+
+    /// Read (if given a path) and parse the first document of a workflow file.
+    /// Whether a string passed to `Workflow.from_yaml` is a path rather than YAML text, so that
+    /// a mistyped path fails as a missing file rather than as invalid YAML.
+    fn looks_like_path(text: &str) -> bool {
+        if text.contains('\n') {
+            return false;
+        }
+        let trimmed = text.trim();
+        std::path::Path::new(text).is_file()
+            || trimmed.ends_with(".yml")
+            || trimmed.ends_with(".yaml")
+            || !trimmed.contains(':')
+    }
+
+    fn load_workflow_yaml(source: Either<PathBuf, String>) -> PyResult<Yaml> {
+        let text = match source {
+            Either::A(path) => std::fs::read_to_string(path)?,
+            Either::B(text) => text,
+        };
+        YamlLoader::load_from_str(&text)
+            .map_err(|e| PyValueError::new_err(format!("Invalid workflow YAML: {e}")))?
+            .into_iter()
+            .next()
+            .ok_or_else(|| PyValueError::new_err("Invalid workflow YAML: the document is empty"))
+    }
+
+    const CACHE_MAGIC: &[u8; 4] = b"YLMC";
+    /// Bumped whenever the encoding of any cached struct changes.
+    const CACHE_FORMAT_VERSION: u32 = 1;
+    /// Magic bytes, format version, schema fingerprint and payload length.
+    const CACHE_HEADER_LEN: usize = 24;
+
+    fn encode_cache(workflow: &Workflow) -> Vec<u8> {
+        let mut out = Vec::with_capacity(CACHE_HEADER_LEN + 1024);
+        out.extend_from_slice(CACHE_MAGIC);
+        out.extend_from_slice(&CACHE_FORMAT_VERSION.to_le_bytes());
+        out.extend_from_slice(&WORKFLOW_SCHEMA_FINGERPRINT.to_le_bytes());
+        out.extend_from_slice(&[0; 8]);
+        workflow.encode(&mut out);
+        let len = (out.len() - CACHE_HEADER_LEN) as u64;
+        out[16..CACHE_HEADER_LEN].copy_from_slice(&len.to_le_bytes());
+        out
+    }
+
+    fn decode_cache(data: &[u8]) -> PyResult<Workflow> {
+        let (header, payload) = data
+            .split_at_checked(CACHE_HEADER_LEN)
+            .filter(|(header, _)| &header[..4] == CACHE_MAGIC)
+            .ok_or_else(|| PyValueError::new_err("Data is not a yamloom workflow cache"))?;
+        let word = |range: std::ops::Range<usize>| {
+            let mut bytes = [0; 8];
+            bytes[..range.len()].copy_from_slice(&header[range]);
+            u64::from_le_bytes(bytes)
+        };
+        let version = word(4..8);
+        if version != u64::from(CACHE_FORMAT_VERSION) {
+            return Err(PyValueError::new_err(format!(
+                "Workflow cache has format version {version}, expected {CACHE_FORMAT_VERSION}"
+            )));
+        }
+        if word(8..16) != WORKFLOW_SCHEMA_FINGERPRINT {
+            return Err(PyValueError::new_err(
+                "Workflow cache was written against a different workflow schema",
+            ));
+        }
+        if word(16..24) != payload.len() as u64 {
+            return Err(PyValueError::new_err("Workflow cache is truncated"));
+        }
+        Workflow::from_bytes(payload)
+    }
+
+    /// The value returned by ``__reduce__``: a call to `_unpickle` with the encoded object.
+    type Reduced<'py> = (Bound<'py, PyAny>, (&'static str, Bound<'py, PyBytes>));
+
+    fn reduce<'py, T: Encode>(
+        py: Python<'py>,
+        value: &T,
+        kind: &'static str,
+    ) -> PyResult<Reduced<'py>> {
+        let unpickle = py.import("yamloom._yamloom")?.getattr("_unpickle")?;
+        Ok((unpickle, (kind, PyBytes::new(py, &value.to_bytes()))))
+    }
+
+    /// Rebuild a pickled object from its class name and encoded data.
+    #[pyfunction]
+    fn _unpickle(py: Python<'_>, kind: &str, data: &[u8]) -> PyResult<Py<PyAny>> {
+        macro_rules! decode_as {
+            ($($class:ident),* $(,)?) => {
+                match kind {
+                    $(stringify!($class) => Ok(Py::new(py, $class::from_bytes(data)?)?.into_any()),)*
+                    _ => Err(PyValueError::new_err(format!("Cannot unpickle unknown type '{kind}'"))),
                 }
+            };
+        }
+        decode_as!(
+            BooleanExpression,
+            NumberExpression,
+            StringExpression,
+            ArrayExpression,
+            ObjectExpression,
+            Step,
+            Permissions,
+            RunsOnSpec,
+            Environment,
+            Concurrency,
+            RunDefaults,
+            Defaults,
+            Matrix,
+            Strategy,
+            Credentials,
+            Container,
+            JobSecrets,
+            Job,
+            BranchProtectionRuleEvent,
+            CheckRunEvent,
+            CheckSuiteEvent,
+            DiscussionEvent,
+            DiscussionCommentEvent,
+            ImageVersionEvent,
+            IssueCommentEvent,
+            IssuesEvent,
+            LabelEvent,
+            MergeGroupEvent,
+            MilestoneEvent,
+            PullRequestEvent,
+            PullRequestReviewEvent,
+            PullRequestReviewCommentEvent,
+            PushEvent,
+            RegistryPackageEvent,
+            ReleaseEvent,
+            RepositoryDispatchEvent,
+            Minute,
+            Hour,
+            Day,
+            Month,
+            DayOfWeek,
+            Cron,
+            ScheduleEvent,
+            WatchEvent,
+            WorkflowInput,
+            WorkflowOutput,
+            WorkflowSecret,
+            WorkflowCallEvent,
+            WorkflowDispatchInput,
+            WorkflowDispatchEvent,
+            WorkflowRunEvent,
+            Events,
+            Workflow,
+            WorkflowBuilder,
+            WorkflowChange,
+            JobGraph,
+            ArtifactGraph,
+        )
+    }
+
+    /// Rebuild a pickled `ActionStep`, or an instance of a subclass such as a prebuilt action,
+    /// from its type and encoded step.
+    #[pyfunction]
+    fn _unpickle_step<'py>(cls: &Bound<'py, PyType>, data: &[u8]) -> PyResult<Bound<'py, PyAny>> {
+        let py = cls.py();
+        let step = Step::from_bytes(data)?;
+        // `ActionStep.__new__` allocates an instance of `cls` without calling the `__new__` of a
+        // subclass (whose arguments are unknown here), and its placeholder step is replaced
+        let instance = py
+            .get_type::<ActionStep>()
+            .call_method1("__new__", (cls, py.None(), "_"))?;
+        instance.cast::<Step>()?.borrow_mut().0 = step.0;
+        Ok(instance)
+    }
+
+    // Comparing workflows
+
+    #[derive(Clone, Copy)]
+    enum ChangeKind {
+        Added,
+        Removed,
+        Changed,
+        Reordered,
+    }
+
+    /// A single difference between two workflows, as returned by `Workflow.diff`.
+    #[pyclass(frozen)]
+    struct WorkflowChange {
+        kind: ChangeKind,
+        path: Vec<String>,
+        old: Option<Yaml>,
+        new: Option<Yaml>,
+    }
+    #[pymethods]
+    impl WorkflowChange {
+        /// One of ``'added'``, ``'removed'``, ``'changed'`` or ``'reordered'``.
+        #[getter]
+        fn kind(&self) -> &'static str {
+            match self.kind {
+                ChangeKind::Added => "added",
+                ChangeKind::Removed => "removed",
+                ChangeKind::Changed => "changed",
+                ChangeKind::Reordered => "reordered",
             }
-            if let Some(event) = &self.registry_package {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("registry_package", yaml);
-                } else {
-                    simple_names.push("registry_package");
+        }
+
+        /// The keys leading to the changed value, such as ``['jobs', 'test', 'runs-on']``.
+        ///
+        /// Steps are identified by their ``id``, ``name``, ``uses`` or ``run`` key (whichever
+        /// is set first), with ``#2``, ``#3``, ... appended to repeated identifiers.
+        #[getter]
+        fn path(&self) -> Vec<String> {
+            self.path.clone()
+        }
+
+        /// The previous value as plain Python data, or None if it was added.
+        ///
+        /// For reordered steps, this is the list of step identifiers in their previous order.
+        #[getter]
+        fn old<'py>(&self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyAny>>> {
+            self.old
+                .as_ref()
+                .map(|old| yaml_to_py(py, old, ""))
+                .transpose()
+        }
+
+        /// The new value as plain Python data, or None if it was removed.
+        ///
+        /// For reordered steps, this is the list of step identifiers in their new order.
+        #[getter(new)]
+        fn new_value<'py>(&self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyAny>>> {
+            self.new
+                .as_ref()
+                .map(|new| yaml_to_py(py, new, ""))
+                .transpose()
+        }
+
+        fn __str__(&self) -> String {
+            format!("{} {}", self.kind(), self.path.join("."))
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "WorkflowChange")
+        }
+    }
+
+    impl_codec!(
+        enum ChangeKind {
+            Added,
+            Removed,
+            Changed,
+            Reordered,
+        }
+    );
+    impl_codec!(WorkflowChange {
+        kind,
+        path,
+        old,
+        new
+    });
+
+    struct Changes(Vec<WorkflowChange>);
+
+    impl Changes {
+        fn push(
+            &mut self,
+            kind: ChangeKind,
+            path: Vec<String>,
+            old: Option<Yaml>,
+            new: Option<Yaml>,
+        ) {
+            self.0.push(WorkflowChange {
+                kind,
+                path,
+                old,
+                new,
+            });
+        }
+
+        fn diff_yaml(&mut self, path: &[String], old: &Yaml, new: &Yaml, skip: Option<&str>) {
+            let (Yaml::Hash(old_hash), Yaml::Hash(new_hash)) = (old, new) else {
+                if old != new {
+                    self.push(
+                        ChangeKind::Changed,
+                        path.to_vec(),
+                        Some(old.clone()),
+                        Some(new.clone()),
+                    );
                 }
-            }
-            if let Some(event) = &self.release {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("release", yaml);
-                } else {
-                    simple_names.push("release");
+                return;
+            };
+            let child = |key: &Yaml| {
+                let mut child = path.to_vec();
+                child.push(key.as_str().unwrap_or_default().to_string());
+                child
+            };
+            for (key, value) in old_hash {
+                if skip.is_some() && key.as_str() == skip {
+                    continue;
                 }
-            }
-            if let Some(event) = &self.schedule {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("schedule", yaml);
-                } else {
-                    simple_names.push("schedule");
+                match new_hash.get(key) {
+                    None => self.push(ChangeKind::Removed, child(key), Some(value.clone()), None),
+                    Some(other) if other != value => self.push(
+                        ChangeKind::Changed,
+                        child(key),
+                        Some(value.clone()),
+                        Some(other.clone()),
+                    ),
+                    Some(_) => {}
                 }
             }
-            if let Some(event) = &self.watch {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("watch", yaml);
-                } else {
-                    simple_names.push("watch");
+            for (key, value) in new_hash {
+                if (skip.is_some() && key.as_str() == skip) || old_hash.contains_key(key) {
+                    continue;
                 }
+                self.push(ChangeKind::Added, child(key), None, Some(value.clone()));
             }
-            if let Some(event) = &self.workflow_call {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("workflow_call", yaml);
-                } else {
-                    simple_names.push("workflow_call");
+        }
+
+        fn diff_job(&mut self, path: Vec<String>, old: &Job, new: &Job) {
+            // shared subtrees (steps, expressions) compare by pointer before by value
+            if old == new {
+                return;
+            }
+            self.diff_yaml(&path, &old.as_yaml(), &new.as_yaml(), Some("steps"));
+            let mut path = path;
+            path.push("steps".to_string());
+            self.diff_steps(
+                path,
+                old.steps.as_deref().unwrap_or_default(),
+                new.steps.as_deref().unwrap_or_default(),
+            );
+        }
+
+        fn diff_steps(&mut self, path: Vec<String>, old: &[Step], new: &[Step]) {
+            let old_keys = step_keys(old);
+            let new_keys = step_keys(new);
+            let old_index: HashMap<&str, usize> = old_keys
+                .iter()
+                .enumerate()
+                .map(|(i, key)| (key.as_str(), i))
+                .collect();
+            let new_index: HashMap<&str, usize> = new_keys
+                .iter()
+                .enumerate()
+                .map(|(i, key)| (key.as_str(), i))
+                .collect();
+            let child = |key: &str| {
+                let mut child = path.clone();
+                child.push(key.to_string());
+                child
+            };
+            for (key, step) in old_keys.iter().zip(old) {
+                match new_index.get(key.as_str()) {
+                    None => self.push(ChangeKind::Removed, child(key), Some(step.as_yaml()), None),
+                    Some(&i) => {
+                        let other = &new[i];
+                        if step != other {
+                            self.diff_yaml(&child(key), &step.as_yaml(), &other.as_yaml(), None);
+                        }
+                    }
                 }
             }
-            if let Some(event) = &self.workflow_dispatch {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("workflow_dispatch", yaml);
-                } else {
-                    simple_names.push("workflow_dispatch");
+            for (key, step) in new_keys.iter().zip(new) {
+                if !old_index.contains_key(key.as_str()) {
+                    self.push(ChangeKind::Added, child(key), None, Some(step.as_yaml()));
                 }
             }
-            if let Some(event) = &self.workflow_run {
-                if let Some(yaml) = event.maybe_as_yaml() {
-                    configured.insert_yaml("workflow_run", yaml);
+            let order = |keys: &[String], others: &HashMap<&str, usize>| -> Vec<Yaml> {
+                keys.iter()
+                    .filter(|key| others.contains_key(key.as_str()))
+                    .map(|key| Yaml::String(key.clone()))
+                    .collect()
+            };
+            let old_order = order(&old_keys, &new_index);
+            let new_order = order(&new_keys, &old_index);
+            if old_order != new_order {
+                self.push(
+                    ChangeKind::Reordered,
+                    path,
+                    Some(Yaml::Array(old_order)),
+                    Some(Yaml::Array(new_order)),
+                );
+            }
+        }
+    }
+
+    /// Identify steps by ``id``, ``name``, ``uses`` or ``run``, numbering repeats.
+    fn step_keys(steps: &[Step]) -> Vec<String> {
+        let text = |value: &StringLike| match value {
+            Either::A(expr) => expr.as_expression_string(),
+            Either::B(raw) => raw.clone(),
+        };
+        let mut seen: HashMap<String, usize> = HashMap::new();
+        steps
+            .iter()
+            .map(|step| {
+                let key = step
+                    .options
+                    .id
+                    .clone()
+                    .or_else(|| step.name.as_ref().map(text))
+                    .or_else(|| step.step_action.uses())
+                    .or_else(|| step.step_action.run().map(text))
+                    .unwrap_or_default();
+                let count = seen.entry(key.clone()).or_default();
+                *count += 1;
+                if *count == 1 {
+                    key
                 } else {
-                    simple_names.push("workflow_run");
+                    format!("{key}#{count}")
                 }
-            }
+            })
+            .collect()
+    }
 
-            if self.create {
-                simple_names.push("create");
-            }
-            if self.delete {
-                simple_names.push("delete");
-            }
-            if self.deployment {
-                simple_names.push("deployment");
-            }
-            if self.deployment_status {
-                simple_names.push("deployment_status");
+    // Job dependency graphs
+
+    /// Read historical durations (in seconds) from a mapping or a JSON file.
+    ///
+    /// Each key maps to a single duration or a non-empty list of past durations. A path which
+    /// does not exist yet is treated as having no timings.
+    fn load_timings(
+        py: Python<'_>,
+        source: &Bound<'_, PyAny>,
+    ) -> PyResult<HashMap<String, Vec<f64>>> {
+        let json = if let Ok(mapping) = source.cast::<PyMapping>() {
+            // any mapping, not just dicts, e.g. a `types.MappingProxyType`
+            let dict = PyDict::new(py);
+            dict.update(&mapping)?;
+            py_to_json(dict.as_any())?
+        } else {
+            let path = source.extract::<PathBuf>()?;
+            py.detach(|| -> PyResult<Value> {
+                let text = match std::fs::read_to_string(&path) {
+                    Ok(text) => text,
+                    Err(e) if e.kind() == std::io::ErrorKind::NotFound => {
+                        return Ok(Value::Object(Map::new()));
+                    }
+                    Err(e) => return Err(e.into()),
+                };
+                serde_json::from_str(&text).map_err(|e| {
+                    PyValueError::new_err(format!("Invalid timings file '{}': {e}", path.display()))
+                })
+            })?
+        };
+        let Value::Object(entries) = json else {
+            return Err(PyValueError::new_err(
+                "Timings must be a mapping of names to durations",
+            ));
+        };
+        entries
+            .into_iter()
+            .map(|(key, value)| {
+                let samples = match &value {
+                    Value::Array(items) => items.iter().map(Value::as_f64).collect(),
+                    _ => value.as_f64().map(|sample| vec![sample]),
+                };
+                match samples {
+                    Some(samples)
+                        if !samples.is_empty()
+                            && samples.iter().all(|s| s.is_finite() && *s >= 0.0) =>
+                    {
+                        Ok((key, samples))
+                    }
+                    _ => Err(PyValueError::new_err(format!(
+                        "Timings for '{key}' must be a non-negative number or a list of them"
+                    ))),
+                }
+            })
+            .collect()
+    }
+
+    /// Load historical durations for `yamloom.sharding.load_samples`, so that Python and the
+    /// job graph share one parser.
+    #[pyfunction]
+    fn _load_samples(
+        py: Python<'_>,
+        timings: &Bound<'_, PyAny>,
+    ) -> PyResult<HashMap<String, Vec<f64>>> {
+        load_timings(py, timings)
+    }
+
+    /// The ``q``-th percentile of the samples, interpolating linearly between them.
+    fn percentile(samples: &[f64], q: f64) -> Option<f64> {
+        let mut sorted = samples.to_vec();
+        sorted.sort_by(f64::total_cmp);
+        let last = sorted.len().checked_sub(1)?;
+        let rank = q.clamp(0.0, 100.0) / 100.0 * last as f64;
+        let (below, above) = (rank.floor() as usize, rank.ceil() as usize);
+        Some(sorted[below] + (sorted[above] - sorted[below]) * (rank - below as f64))
+    }
+
+    /// The dependency graph formed by the ``needs`` of each job, as returned by
+    /// `Workflow.graph`.
+    #[pyclass(frozen)]
+    struct JobGraph {
+        levels: Vec<Vec<String>>,
+        cycles: Vec<Vec<String>>,
+        unknown_needs: Vec<(String, String)>,
+        critical_path: Vec<String>,
+        critical_path_duration: f64,
+    }
+    #[pymethods]
+    impl JobGraph {
+        /// The jobs grouped by topological level: the first level needs no other jobs, and every
+        /// later job only needs jobs from earlier levels. Jobs in (or after) a cycle are omitted.
+        #[getter]
+        fn levels(&self) -> Vec<Vec<String>> {
+            self.levels.clone()
+        }
+
+        /// The groups of jobs which (directly or indirectly) need each other.
+        #[getter]
+        fn cycles(&self) -> Vec<Vec<String>> {
+            self.cycles.clone()
+        }
+
+        /// ``(job_id, need)`` pairs for each need which is not a job in the workflow.
+        #[getter]
+        fn unknown_needs(&self) -> Vec<(String, String)> {
+            self.unknown_needs.clone()
+        }
+
+        /// The chain of jobs with the longest total duration, which bounds the wall time of the
+        /// workflow. Jobs without a duration hint count as zero, and ties are broken by length.
+        #[getter]
+        fn critical_path(&self) -> Vec<String> {
+            self.critical_path.clone()
+        }
+
+        /// The total duration hint of the jobs on the critical path, in seconds.
+        #[getter]
+        fn critical_path_duration(&self) -> f64 {
+            self.critical_path_duration
+        }
+
+        /// Whether every need refers to a job in the workflow and there are no cycles.
+        fn is_valid(&self) -> bool {
+            self.cycles.is_empty() && self.unknown_needs.is_empty()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "JobGraph")
+        }
+    }
+
+    impl_codec!(JobGraph {
+        levels,
+        cycles,
+        unknown_needs,
+        critical_path,
+        critical_path_duration
+    });
+
+    /// Tarjan's algorithm for the strongly connected components of a graph.
+    struct Components<'a> {
+        edges: &'a [Vec<usize>],
+        index: Vec<Option<usize>>,
+        low: Vec<usize>,
+        on_stack: Vec<bool>,
+        stack: Vec<usize>,
+        components: Vec<Vec<usize>>,
+    }
+
+    impl<'a> Components<'a> {
+        fn find(edges: &'a [Vec<usize>]) -> Vec<Vec<usize>> {
+            let n = edges.len();
+            let mut search = Self {
+                edges,
+                index: vec![None; n],
+                low: vec![0; n],
+                on_stack: vec![false; n],
+                stack: Vec::new(),
+                components: Vec::new(),
+            };
+            let mut next = 0;
+            for node in 0..n {
+                if search.index[node].is_none() {
+                    search.visit(node, &mut next);
+                }
             }
-            if self.fork {
-                simple_names.push("fork");
+            search.components
+        }
+
+        fn visit(&mut self, node: usize, next: &mut usize) {
+            self.index[node] = Some(*next);
+            self.low[node] = *next;
+            *next += 1;
+            self.stack.push(node);
+            self.on_stack[node] = true;
+            let edges = self.edges;
+            for &other in &edges[node] {
+                match self.index[other] {
+                    None => {
+                        self.visit(other, next);
+                        self.low[node] = self.low[node].min(self.low[other]);
+                    }
+                    Some(index) if self.on_stack[other] => {
+                        self.low[node] = self.low[node].min(index);
+                    }
+                    Some(_) => {}
+                }
             }
-            if self.gollum {
-                simple_names.push("gollum");
+            if Some(self.low[node]) == self.index[node] {
+                let mut component = Vec::new();
+                while let Some(member) = self.stack.pop() {
+                    self.on_stack[member] = false;
+                    component.push(member);
+                    if member == node {
+                        break;
+                    }
+                }
+                component.sort_unstable();
+                self.components.push(component);
             }
-            if self.page_build {
-                simple_names.push("page_build");
+        }
+    }
+
+    fn job_graph(jobs: &PyMap<String, Job>, durations: &HashMap<String, f64>) -> JobGraph {
+        let ids: Vec<&String> = jobs.0.keys().collect();
+        let index: HashMap<&str, usize> = ids
+            .iter()
+            .enumerate()
+            .map(|(i, id)| (id.as_str(), i))
+            .collect();
+        let mut unknown_needs = Vec::new();
+        let mut needs: Vec<Vec<usize>> = Vec::with_capacity(ids.len());
+        for (id, job) in jobs.0.iter() {
+            let mut known = Vec::new();
+            for need in job.needs.iter().flatten() {
+                match index.get(need.as_str()) {
+                    Some(&i) if !known.contains(&i) => known.push(i),
+                    Some(_) => {}
+                    None => unknown_needs.push((id.clone(), need.clone())),
+                }
             }
-            if self.public {
-                simple_names.push("public");
+            needs.push(known);
+        }
+        let mut dependents = vec![Vec::new(); ids.len()];
+        for (job, job_needs) in needs.iter().enumerate() {
+            for &need in job_needs {
+                dependents[need].push(job);
             }
-            if self.status {
-                simple_names.push("status");
+        }
+
+        // Kahn's algorithm, one level at a time, keeping the declaration order within levels
+        let mut waiting: Vec<usize> = needs.iter().map(Vec::len).collect();
+        let mut order = Vec::with_capacity(ids.len());
+        let mut levels = Vec::new();
+        let mut level: Vec<usize> = (0..ids.len()).filter(|&i| waiting[i] == 0).collect();
+        while !level.is_empty() {
+            let mut next = Vec::new();
+            for &job in &level {
+                for &dependent in &dependents[job] {
+                    waiting[dependent] -= 1;
+                    if waiting[dependent] == 0 {
+                        next.push(dependent);
+                    }
+                }
             }
+            next.sort_unstable();
+            levels.push(level.iter().map(|&i| ids[i].clone()).collect());
+            order.extend_from_slice(&level);
+            level = next;
+        }
 
-            if configured.is_empty() {
-                match simple_names.len() {
-                    0 => None,
-                    1 => Some(simple_names[0].as_yaml()),
-                    _ => {
-                        let mut arr = Array::new();
-                        for name in simple_names {
-                            arr.push_yaml(name);
-                        }
-                        Some(Yaml::Array(arr))
+        let cycles = if order.len() == ids.len() {
+            Vec::new()
+        } else {
+            Components::find(&needs)
+                .into_iter()
+                .filter(|component| {
+                    component.len() > 1 || needs[component[0]].contains(&component[0])
+                })
+                .map(|component| component.into_iter().map(|i| ids[i].clone()).collect())
+                .collect()
+        };
+
+        // longest path by (total duration, number of jobs), visiting jobs in topological order
+        let mut finish: Vec<(f64, usize)> = vec![(0.0, 0); ids.len()];
+        let mut previous: Vec<Option<usize>> = vec![None; ids.len()];
+        let longer = |a: (f64, usize), b: (f64, usize)| a.0 > b.0 || (a.0 == b.0 && a.1 > b.1);
+        for &job in &order {
+            let mut best = (0.0, 0);
+            for &need in &needs[job] {
+                if longer(finish[need], best) {
+                    best = finish[need];
+                    previous[job] = Some(need);
+                }
+            }
+            let duration = durations.get(ids[job].as_str()).copied().unwrap_or(0.0);
+            finish[job] = (best.0 + duration, best.1 + 1);
+        }
+        let mut end = None;
+        for &job in &order {
+            if end.is_none_or(|end: usize| longer(finish[job], finish[end])) {
+                end = Some(job);
+            }
+        }
+        let critical_path_duration = end.map_or(0.0, |end| finish[end].0);
+        let mut critical_path = Vec::new();
+        while let Some(job) = end {
+            critical_path.push(ids[job].clone());
+            end = previous[job];
+        }
+        critical_path.reverse();
+
+        JobGraph {
+            levels,
+            cycles,
+            unknown_needs,
+            critical_path,
+            critical_path_duration,
+        }
+    }
+
+    /// Whether rendered YAML refers to ``<context>.<name>`` (or ``<context>['<name>']``) in an
+    /// expression, e.g. ``needs.build`` or ``steps['version']``, or possibly refers to it through
+    /// the whole context, e.g. ``needs.*.result``, ``needs[matrix.job]`` or ``toJSON(needs)``.
+    fn references_context(text: &str, context: &str, name: &str) -> bool {
+        let text = text.to_lowercase();
+        let name = name.to_lowercase();
+        let is_name_char = |c: char| c.is_alphanumeric() || c == '_' || c == '-';
+        let occurrences = |text: &str| -> Vec<usize> {
+            text.match_indices(context)
+                .map(|(i, _)| i)
+                .filter(|&i| {
+                    !text[..i]
+                        .chars()
+                        .next_back()
+                        .is_some_and(|c| is_name_char(c) || c == '.')
+                        && !text[i + context.len()..].starts_with(is_name_char)
+                })
+                .collect()
+        };
+        let named = occurrences(&text).into_iter().any(|i| {
+            let rest = &text[i + context.len()..];
+            if let Some(rest) = rest.strip_prefix('.') {
+                rest.strip_prefix(name.as_str())
+                    .is_some_and(|after| !after.starts_with(is_name_char))
+            } else {
+                rest.strip_prefix('[')
+                    .map(|rest| rest.trim_start_matches(['\'', '"']))
+                    .and_then(|rest| rest.strip_prefix(name.as_str()))
+                    .is_some_and(|after| after.starts_with(['\'', '"']))
+            }
+        });
+        named
+            || expression_texts(&text).into_iter().any(|expression| {
+                occurrences(expression).into_iter().any(|i| {
+                    let rest = expression[i + context.len()..].trim_start();
+                    match rest.chars().next() {
+                        Some('.') => rest[1..].trim_start().starts_with('*'),
+                        Some('[') => !rest[1..].trim_start().starts_with(['\'', '"']),
+                        _ => true,
                     }
+                })
+            })
+    }
+
+    /// The expressions of rendered YAML: the contents of each ``${{ ... }}`` and the values of
+    /// ``if:`` keys, which are expressions even without ``${{ }}``.
+    fn expression_texts(text: &str) -> Vec<&str> {
+        let mut expressions = Vec::new();
+        let mut rest = text;
+        while let Some(start) = rest.find("${{") {
+            let inner = &rest[start + 3..];
+            let end = inner.find("}}").unwrap_or(inner.len());
+            expressions.push(&inner[..end]);
+            rest = &inner[end..];
+        }
+        for line in text.lines() {
+            let line = line.trim_start().trim_start_matches("- ");
+            if let Some(condition) = line.strip_prefix("if:")
+                && !condition.contains("${{")
+            {
+                expressions.push(condition);
+            }
+        }
+        expressions
+    }
+
+    /// Remove needs which are implied by another need of the same job, keeping any which the job
+    /// refers to in an expression (for example to read their outputs or result).
+    fn reduce_needs(jobs: &PyMap<String, Job>) -> PyResult<PyMap<String, Job>> {
+        let graph = job_graph(jobs, &HashMap::new());
+        if let Some(cycle) = graph.cycles.first() {
+            return Err(PyValueError::new_err(format!(
+                "Cannot reduce needs: jobs {} need each other in a cycle",
+                cycle
+                    .iter()
+                    .map(|id| format!("'{id}'"))
+                    .collect::<Vec<_>>()
+                    .join(", ")
+            )));
+        }
+        // the jobs which must have succeeded for a job to run: none if its condition checks their
+        // status, since e.g. a job with ``if: always()`` also runs after they fail
+        let mut ancestors: HashMap<&str, HashSet<&str>> = HashMap::new();
+        for id in graph.levels.iter().flatten() {
+            let mut reachable = HashSet::new();
+            let job = jobs.0.get(id);
+            if job.is_some_and(|job| checks_status(&job.condition)) {
+                ancestors.insert(id, reachable);
+                continue;
+            }
+            let needs = job.and_then(|job| job.needs.as_ref());
+            for need in needs.into_iter().flatten() {
+                if let Some(theirs) = ancestors.get(need.as_str()) {
+                    reachable.insert(need.as_str());
+                    reachable.extend(theirs.iter().copied());
                 }
+            }
+            ancestors.insert(id, reachable);
+        }
+        let mut reduced = jobs.clone();
+        for job in reduced.0.values_mut() {
+            let Some(needs) = &job.needs else {
+                continue;
+            };
+            let implied = |need: &String| {
+                needs.iter().any(|other| {
+                    other != need
+                        && ancestors
+                            .get(other.as_str())
+                            .is_some_and(|theirs| theirs.contains(need.as_str()))
+                })
+            };
+            if !needs.iter().any(implied) {
+                continue;
+            }
+            let text = (&*job).as_yaml_string()?;
+            let kept: Vec<String> = needs
+                .iter()
+                .filter(|need| !implied(need) || references_context(&text, "needs", need))
+                .cloned()
+                .collect();
+            if kept.len() != needs.len() {
+                // only now copy the (possibly shared) job data
+                let job: &mut JobData = job;
+                job.needs = Some(kept);
+            }
+        }
+        Ok(reduced)
+    }
+
+    // Dependency caches
+
+    /// A toolchain setup action, and the dependency cache it needs if its built-in cache is off.
+    ///
+    /// The cached paths are those of Linux runners and containers.
+    struct DependencyCache {
+        action: &'static str,
+        option: &'static str,
+        enabled_by_default: bool,
+        tool: &'static str,
+        paths: &'static [&'static str],
+        lockfiles: &'static [&'static str],
+    }
+
+    const DEPENDENCY_CACHES: [DependencyCache; 7] = [
+        DependencyCache {
+            action: "actions/setup-python",
+            option: "cache",
+            enabled_by_default: false,
+            tool: "pip",
+            paths: &["~/.cache/pip"],
+            lockfiles: &[
+                "**/requirements*.txt",
+                "**/pyproject.toml",
+                "**/poetry.lock",
+                "**/Pipfile.lock",
+            ],
+        },
+        DependencyCache {
+            action: "astral-sh/setup-uv",
+            option: "enable-cache",
+            enabled_by_default: true,
+            tool: "uv",
+            paths: &["~/.cache/uv"],
+            lockfiles: &["**/uv.lock", "**/pyproject.toml"],
+        },
+        DependencyCache {
+            action: "actions/setup-node",
+            option: "cache",
+            enabled_by_default: false,
+            tool: "npm",
+            paths: &["~/.npm"],
+            lockfiles: &["**/package-lock.json", "**/npm-shrinkwrap.json"],
+        },
+        DependencyCache {
+            action: "actions/setup-go",
+            option: "cache",
+            enabled_by_default: true,
+            tool: "go",
+            paths: &["~/go/pkg/mod", "~/.cache/go-build"],
+            lockfiles: &["**/go.sum"],
+        },
+        DependencyCache {
+            action: "actions-rust-lang/setup-rust-toolchain",
+            option: "cache",
+            enabled_by_default: true,
+            tool: "cargo",
+            paths: &[
+                "~/.cargo/registry/index",
+                "~/.cargo/registry/cache",
+                "~/.cargo/git/db",
+            ],
+            lockfiles: &["**/Cargo.lock"],
+        },
+        DependencyCache {
+            action: "actions/setup-java",
+            option: "cache",
+            enabled_by_default: false,
+            tool: "java",
+            paths: &["~/.m2/repository", "~/.gradle/caches", "~/.gradle/wrapper"],
+            lockfiles: &["**/pom.xml", "**/*.gradle*", "**/gradle-wrapper.properties"],
+        },
+        DependencyCache {
+            action: "actions/setup-dotnet",
+            option: "cache",
+            enabled_by_default: false,
+            tool: "nuget",
+            paths: &["~/.nuget/packages"],
+            lockfiles: &["**/packages.lock.json"],
+        },
+    ];
+
+    /// The action a step uses, without its ref, e.g. ``actions/cache``.
+    fn action_name(step: &Step) -> Option<String> {
+        step.step_action
+            .uses()
+            .map(|uses| uses.split('@').next().unwrap_or_default().to_string())
+    }
+
+    /// An option of the ``with`` mapping of an action step.
+    fn step_with_option<'s>(step: &'s Step, key: &str) -> Option<&'s Yaml> {
+        match &step.step_action {
+            StepAction::Action {
+                with:
+                    Some(WithArgs {
+                        options: Some(options),
+                        ..
+                    }),
+                ..
+            } => options.get(&Yaml::String(key.to_string())),
+            _ => None,
+        }
+    }
+
+    /// Whether the job is known to run on Linux: in a container, or on a runner with an
+    /// ``ubuntu`` or ``linux`` label.
+    fn runs_on_linux(job: &JobData) -> bool {
+        if job.container.is_some() {
+            return true;
+        }
+        let labels = match &job.runs_on {
+            Some(RunsOn::String(label)) => vec![label],
+            Some(RunsOn::Array(labels)) => labels.iter().collect(),
+            _ => return false,
+        };
+        labels.into_iter().any(|label| {
+            matches!(label, Either::B(label) if {
+                let label = label.to_lowercase();
+                label.starts_with("ubuntu") || label == "linux"
+            })
+        })
+    }
+
+    /// Insert a cache step after each setup step of the job whose built-in cache is off, unless
+    /// the job already caches the same directory. On runners which are not known to run Linux,
+    /// the step is only reported as skipped.
+    fn add_dependency_caches(
+        job_id: &str,
+        steps: &[Step],
+        linux: bool,
+        restore_only: bool,
+        report: &mut Vec<String>,
+    ) -> PyResult<Option<Vec<Step>>> {
+        let caches_path = |path: &str| {
+            steps.iter().any(|step| {
+                action_name(step).is_some_and(|action| action.starts_with("actions/cache"))
+                    && step_with_option(step, "path").is_some_and(|cached| match cached {
+                        Yaml::String(cached) => cached.lines().any(|line| line.trim() == path),
+                        Yaml::Array(cached) => {
+                            cached.iter().any(|line| line.as_str() == Some(path))
+                        }
+                        _ => false,
+                    })
+            })
+        };
+        let mut planned = steps.to_vec();
+        let mut inserted = 0;
+        for (i, step) in steps.iter().enumerate() {
+            let Some(action) = action_name(step) else {
+                continue;
+            };
+            let Some(cache) = DEPENDENCY_CACHES
+                .iter()
+                .find(|cache| cache.action == action)
+            else {
+                continue;
+            };
+            let built_in = match step_with_option(step, cache.option) {
+                None => cache.enabled_by_default,
+                Some(Yaml::Boolean(enabled)) => *enabled,
+                Some(Yaml::String(value)) => !value.is_empty() && value != "false",
+                Some(_) => true,
+            };
+            if built_in || caches_path(cache.paths[0]) {
+                continue;
+            }
+            let tool = cache.tool;
+            if !linux {
+                report.push(format!(
+                    "jobs.{job_id}: skipped the {tool} cache for the {action} step at position {}, \
+                     its paths are only known for Linux runners",
+                    i + 1
+                ));
+                continue;
+            }
+            let hashed = cache
+                .lockfiles
+                .iter()
+                .map(|lockfile| format!("'{lockfile}'"))
+                .collect::<Vec<_>>()
+                .join(", ");
+            let mut with = Hash::new();
+            with.insert_yaml("path", cache.paths.to_vec());
+            with.insert_yaml(
+                "key",
+                format!("${{{{ runner.os }}}}-{tool}-${{{{ hashFiles({hashed}) }}}}"),
+            );
+            with.insert_yaml("restore-keys", format!("${{{{ runner.os }}}}-{tool}-"));
+            let (name, cache_action) = if restore_only {
+                (format!("Restore {tool} cache"), "actions/cache/restore")
             } else {
-                for name in simple_names {
-                    configured.insert_yaml(name, Yaml::Null);
+                (format!("Cache {tool} dependencies"), "actions/cache")
+            };
+            let cache_step = make_action(
+                Some(Either::B(name.clone())),
+                cache_action,
+                Some("v5".to_string()),
+                Some(with),
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+                true,
+                None,
+            )?;
+            planned.insert(i + 1 + inserted, cache_step);
+            inserted += 1;
+            report.push(format!(
+                "jobs.{job_id}: added '{name}' after the {action} step at position {}",
+                i + 1
+            ));
+        }
+        Ok((inserted > 0).then_some(planned))
+    }
+
+    // Script merging
+
+    /// Whether scripts of the job run in a POSIX shell with ``-e`` set, as ``bash`` and ``sh``
+    /// (and the default shell of Linux and macOS runners and of containers) do.
+    fn runs_posix_shell(
+        shell: Option<&str>,
+        job: &JobData,
+        workflow_shell: Option<&StringLike>,
+    ) -> bool {
+        let default_shell = |defaults: &Option<Defaults>| {
+            defaults
+                .as_ref()
+                .and_then(|defaults| defaults.run_defaults.as_ref())
+                .and_then(|run| run.shell.as_ref())
+        };
+        let shell = match shell {
+            Some(shell) => Some(shell),
+            None => match default_shell(&job.defaults).or(workflow_shell) {
+                Some(Either::B(shell)) => Some(shell.as_str()),
+                Some(Either::A(_)) => return false,
+                None => None,
+            },
+        };
+        match shell {
+            Some(shell) => matches!(shell, "bash" | "sh"),
+            None if job.container.is_some() => true,
+            None => {
+                let labels = match &job.runs_on {
+                    Some(RunsOn::String(label)) => vec![label],
+                    Some(RunsOn::Array(labels)) => labels.iter().collect(),
+                    _ => return false,
+                };
+                labels.into_iter().all(|label| {
+                    matches!(label, Either::B(label) if !label.to_lowercase().contains("windows"))
+                })
+            }
+        }
+    }
+
+    /// Merge runs of adjacent ``run`` steps which only differ in their name and script into
+    /// single steps, running each original script in a subshell.
+    fn merge_scripts(
+        job: &Job,
+        workflow_shell: Option<&StringLike>,
+    ) -> PyResult<Option<Vec<Step>>> {
+        let Some(steps) = &job.steps else {
+            return Ok(None);
+        };
+        let text = job.as_yaml_string()?;
+        // the encoding of everything but the name, script and (unreferenced) id of a step
+        let merge_key = |step: &Step| {
+            if !matches!(step.step_action, StepAction::Run(_))
+                || checks_status(&step.options.condition)
+                || step.options.continue_on_error.is_some()
+                || step.options.timeout_minutes.is_some()
+                || step
+                    .options
+                    .id
+                    .as_ref()
+                    .is_some_and(|id| references_context(&text, "steps", id))
+                || !runs_posix_shell(step.options.shell.as_deref(), job, workflow_shell)
+            {
+                return None;
+            }
+            let mut rest = StepData::clone(step);
+            rest.name = None;
+            rest.step_action = StepAction::Run(Either::B(String::new()));
+            rest.options.id = None;
+            Some(rest.to_bytes())
+        };
+        let keys: Vec<Option<Vec<u8>>> = steps.iter().map(merge_key).collect();
+        // GitHub only applies these files between steps, so a script writing to them ends a group
+        let ends_group = |step: &Step| {
+            let script = match step.step_action.run() {
+                Some(Either::A(expr)) => expr.as_expression_string(),
+                Some(Either::B(script)) => script.clone(),
+                None => return true,
+            };
+            ["GITHUB_ENV", "GITHUB_PATH", "GITHUB_OUTPUT"]
+                .iter()
+                .any(|file| script.contains(file))
+        };
+        let mut merged = Vec::with_capacity(steps.len());
+        let mut start = 0;
+        while start < steps.len() {
+            let mut end = start + 1;
+            while end < steps.len()
+                && keys[start].is_some()
+                && keys[end] == keys[start]
+                && !ends_group(&steps[end - 1])
+            {
+                end += 1;
+            }
+            if end - start == 1 {
+                merged.push(steps[start].clone());
+                start = end;
+                continue;
+            }
+            let group = &steps[start..end];
+            let names = group
+                .iter()
+                .filter_map(|step| step.name.as_ref())
+                .map(|name| match name {
+                    Either::A(expr) => expr.as_expression_string(),
+                    Either::B(name) => name.clone(),
+                })
+                .collect::<Vec<_>>();
+            let script = group
+                .iter()
+                .filter_map(|step| step.step_action.run())
+                .map(|script| match script {
+                    Either::A(expr) => format!("(\n{}\n)", expr.as_expression_string()),
+                    Either::B(script) => format!("(\n{script}\n)"),
+                })
+                .collect::<Vec<_>>()
+                .join("\n");
+            let mut step = group[0].clone();
+            let data: &mut StepData = &mut step;
+            data.name = (!names.is_empty()).then(|| Either::B(names.join("; ")));
+            data.step_action = StepAction::Run(Either::B(script));
+            data.options.id = None;
+            merged.push(step);
+            start = end;
+        }
+        Ok((merged.len() < steps.len()).then_some(merged))
+    }
+
+    // Job fusion
+
+    /// The assumed duration of a job without timings, if no job has any, in seconds.
+    const DEFAULT_JOB_DURATION: f64 = 60.0;
+
+    /// Replace each group of jobs by a single job running their steps one after another, in the
+    /// place of the first job of the group. Jobs needing a fused job need the new one instead.
+    fn apply_fusion(jobs: &PyMap<String, Job>, groups: &[Vec<&str>]) -> PyMap<String, Job> {
+        let mut fused_into: HashMap<&str, &str> = HashMap::new();
+        for group in groups {
+            for id in &group[1..] {
+                fused_into.insert(*id, group[0]);
+            }
+        }
+        let mut fused = LinkedHashMap::with_capacity(jobs.0.len());
+        for (id, job) in jobs.0.iter() {
+            if fused_into.contains_key(id.as_str()) {
+                continue;
+            }
+            let mut job = job.clone();
+            if let Some(group) = groups.iter().find(|group| group[0] == id.as_str()) {
+                let members: Vec<&Job> = group.iter().filter_map(|id| jobs.0.get(*id)).collect();
+                let names = group
+                    .iter()
+                    .zip(&members)
+                    .map(|(id, member)| match &member.name {
+                        Some(Either::A(expr)) => expr.as_expression_string(),
+                        Some(Either::B(name)) => name.clone(),
+                        None => id.to_string(),
+                    })
+                    .collect::<Vec<_>>()
+                    .join(", ");
+                let steps = members
+                    .iter()
+                    .flat_map(|member| member.steps.iter().flatten().cloned())
+                    .collect();
+                let data: &mut JobData = &mut job;
+                data.name = Some(Either::B(names));
+                data.steps = Some(steps);
+            }
+            if job
+                .needs
+                .iter()
+                .flatten()
+                .any(|need| fused_into.contains_key(need.as_str()))
+            {
+                // only now copy the (possibly shared) job data
+                let data: &mut JobData = &mut job;
+                let mut needs: Vec<String> = Vec::new();
+                for need in data.needs.iter().flatten() {
+                    let need = fused_into
+                        .get(need.as_str())
+                        .copied()
+                        .unwrap_or(need.as_str());
+                    if !needs.iter().any(|other| other == need) {
+                        needs.push(need.to_string());
+                    }
                 }
-                Some(Yaml::Hash(configured))
+                data.needs = Some(needs);
             }
+            fused.insert(id.clone(), job);
         }
+        PyMap(fused)
     }
 
-    #[pyclass]
-    struct Workflow {
-        name: Option<String>,
-        run_name: Option<StringLike>,
-        on: Events,
-        permissions: Option<Permissions>,
-        env: Option<PyMap<String, StringLike>>,
-        defaults: Option<Defaults>,
-        concurrency: Option<Concurrency>,
-        jobs: PyMap<String, Job>,
+    /// The IDs of the steps of a job.
+    fn step_ids<'j>(jobs: &'j PyMap<String, Job>, id: &str) -> HashSet<&'j str> {
+        jobs.0
+            .get(id)
+            .and_then(|job| job.steps.as_ref())
+            .into_iter()
+            .flatten()
+            .filter_map(|step| step.options.id.as_deref())
+            .collect()
     }
-    #[pymethods]
-    impl Workflow {
-        /// A configurable automated process made up of one or more jobs.
-        ///
-        /// Workflows are the primary entrypoint for ``yamloom``. Typical actions include constructing
-        /// workflows and then writing them to a file with ``Workflow.dump('path/to/file.yml')``.
-        ///
-        /// Parameters
-        /// ----------
-        /// jobs
-        ///     Jobs to run (in parallel by default).
-        /// on
-        ///     Events which may trigger the workflow.
-        /// name
-        ///     The name of the workflow.
-        /// run_name
-        ///     The name given to a particular run of the workflow.
-        /// permissions
-        ///     The default permissions granted to the ``GITHUB_TOKEN``.
-        /// env
-        ///     Global environment variables available at any step of any job in the workflow.
-        /// defaults
-        ///     Default settings which are applied to all jobs.
-        /// concurrency
-        ///     Settings to ensure only a single workflow of the given concurrency group runs at a time.
-        ///
-        /// Returns
-        /// -------
-        /// Workflow
-        ///
-        #[new]
-        #[pyo3(signature = (*, jobs, on, name = None, run_name = None, permissions = None, env = None, defaults = None, concurrency = None))]
-        fn new(
-            jobs: PyMap<String, Job>,
-            on: Events,
-            name: Option<String>,
-            run_name: Option<StringLike>,
-            permissions: Option<Permissions>,
-            env: Option<PyMap<String, StringLike>>,
-            defaults: Option<Defaults>,
-            concurrency: Option<Concurrency>,
-        ) -> PyResult<Self> {
-            if let Some(run_name) = &run_name {
-                validate_string_like(run_name, ALLOWED_WORKFLOW_RUN_NAME)?;
-            }
-            if let Some(env) = &env {
-                validate_string_map(env, ALLOWED_WORKFLOW_ENV)?;
+
+    /// Fuse independent jobs which run on the same runner with the same settings and needs,
+    /// wherever this does not lengthen the critical path of the workflow.
+    ///
+    /// Every job is assumed to take ``boot_time`` seconds to get a runner plus its median
+    /// duration, so each fused job saves one runner boot (and the minimum billed minute).
+    fn fuse_jobs(
+        jobs: &PyMap<String, Job>,
+        durations: &HashMap<String, f64>,
+        boot_time: f64,
+    ) -> PyResult<PyMap<String, Job>> {
+        let graph = job_graph(jobs, &HashMap::new());
+        if let Some(cycle) = graph.cycles.first() {
+            return Err(PyValueError::new_err(format!(
+                "Cannot fuse jobs: jobs {} need each other in a cycle",
+                cycle
+                    .iter()
+                    .map(|id| format!("'{id}'"))
+                    .collect::<Vec<_>>()
+                    .join(", ")
+            )));
+        }
+        let known: Vec<f64> = jobs
+            .0
+            .keys()
+            .filter_map(|id| durations.get(id).copied())
+            .collect();
+        let default_duration = if known.is_empty() {
+            DEFAULT_JOB_DURATION
+        } else {
+            known.iter().sum::<f64>() / known.len() as f64
+        };
+        let duration = |id: &str| durations.get(id).copied().unwrap_or(default_duration);
+        let texts = jobs
+            .0
+            .iter()
+            .map(|(id, job)| Ok((id.as_str(), job.as_yaml_string()?)))
+            .collect::<PyResult<Vec<_>>>()?;
+
+        // jobs which only differ in their name and steps, and which no other job reads from
+        let mut candidates: Vec<(Vec<u8>, &str)> = Vec::new();
+        for (id, job) in jobs.0.iter() {
+            if job.steps.is_none()
+                || job.uses.is_some()
+                || job.strategy.is_some()
+                || job.outputs.is_some()
+                || job.services.is_some()
+                || job.environment.is_some()
+                || job.concurrency.is_some()
+                || job.continue_on_error.is_some()
+                || job.timeout_minutes.is_some()
+                || job.snapshot.is_some()
+                || texts.iter().any(|(other, text)| {
+                    *other != id.as_str() && references_context(text, "needs", id)
+                })
+            {
+                continue;
+            }
+            let mut rest = JobData::clone(job);
+            rest.name = None;
+            rest.steps = None;
+            if let Some(needs) = rest.needs.as_mut() {
+                needs.sort();
+                needs.dedup();
+            }
+            candidates.push((rest.to_bytes(), id.as_str()));
+        }
+        candidates.sort_by(|a, b| duration(a.1).total_cmp(&duration(b.1)));
+
+        let critical_path = |groups: &[Vec<&str>]| {
+            let fused = apply_fusion(jobs, groups);
+            let mut costs: HashMap<String, f64> = fused
+                .0
+                .keys()
+                .map(|id| (id.clone(), boot_time + duration(id.as_str())))
+                .collect();
+            for group in groups {
+                let total = group.iter().map(|id| duration(*id)).sum::<f64>();
+                costs.insert(group[0].to_string(), boot_time + total);
+            }
+            job_graph(&fused, &costs).critical_path_duration
+        };
+        let longest = critical_path(&[]);
+        let order: HashMap<&str, usize> = jobs
+            .0
+            .keys()
+            .enumerate()
+            .map(|(i, id)| (id.as_str(), i))
+            .collect();
+        let mut groups: Vec<(&[u8], Vec<&str>)> = Vec::new();
+        for (key, id) in candidates.iter().map(|(key, id)| (key.as_slice(), *id)) {
+            let ids = step_ids(jobs, id);
+            let mut placed = false;
+            for g in 0..groups.len() {
+                if groups[g].0 != key
+                    || groups[g]
+                        .1
+                        .iter()
+                        .any(|member| !step_ids(jobs, member).is_disjoint(&ids))
+                {
+                    continue;
+                }
+                let mut trial: Vec<Vec<&str>> =
+                    groups.iter().map(|(_, group)| group.clone()).collect();
+                trial[g].push(id);
+                trial[g].sort_by_key(|member| order[member]);
+                trial.retain(|group| group.len() > 1);
+                if critical_path(&trial) <= longest + 1e-9 {
+                    groups[g].1.push(id);
+                    groups[g].1.sort_by_key(|member| order[member]);
+                    placed = true;
+                    break;
+                }
             }
-            if let Some(concurrency) = &concurrency {
-                validate_concurrency(concurrency, ALLOWED_WORKFLOW_CONCURRENCY)?;
+            if !placed {
+                groups.push((key, vec![id]));
             }
-            Ok(Self {
-                name,
-                run_name,
-                on,
-                permissions,
-                env,
-                defaults,
-                concurrency,
-                jobs,
-            })
+        }
+        let groups: Vec<Vec<&str>> = groups
+            .into_iter()
+            .map(|(_, group)| group)
+            .filter(|group| group.len() > 1)
+            .collect();
+        Ok(apply_fusion(jobs, &groups))
+    }
+
+    // Artifacts
+
+    /// File extensions of formats which are already compressed, so compressing them again only
+    /// costs time.
+    const COMPRESSED_EXTENSIONS: [&str; 24] = [
+        ".whl", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".jar", ".war", ".nupkg",
+        ".gem", ".crate", ".deb", ".rpm", ".apk", ".dmg", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+        ".mp4", ".pdf",
+    ];
+
+    /// The flow of artifacts between jobs, as returned by `Workflow.artifact_graph`.
+    #[pyclass(frozen)]
+    struct ArtifactGraph {
+        edges: Vec<(String, String, String)>,
+        unmatched_downloads: Vec<(String, String)>,
+        missing_needs: Vec<(String, String)>,
+        unused_uploads: Vec<(String, String)>,
+        already_compressed: Vec<(String, String)>,
+    }
+    #[pymethods]
+    impl ArtifactGraph {
+        /// ``(producer, consumer, artifact)`` triples for each artifact uploaded by the producer
+        /// job and downloaded by the consumer job.
+        #[getter]
+        fn edges(&self) -> Vec<(String, String, String)> {
+            self.edges.clone()
         }
 
-        /// Run validation against the schemastore JSON schema for GitHub Workflows and raise a
-        /// RuntimeError if validation fails.
-        fn validate(&self) -> PyResult<()> {
-            let workflow_yaml = self.as_yaml();
-            let workflow_json = yaml_to_json(&workflow_yaml)?;
-            WORKFLOW_SCHEMA
-                .validate(&workflow_json)
-                .map_err(|e| PyRuntimeError::new_err(e.to_string()))
+        /// ``(job_id, pattern)`` pairs for each download which no job uploads an artifact for.
+        #[getter]
+        fn unmatched_downloads(&self) -> Vec<(String, String)> {
+            self.unmatched_downloads.clone()
         }
 
-        /// Check if the workflow is valid YAML according to the schemastore JSON schema for GitHub
-        /// Workflows.
-        fn is_valid(&self) -> bool {
-            self.validate().is_ok()
+        /// ``(consumer, producer)`` pairs for each job downloading an artifact from a job it does
+        /// not (directly or indirectly) need, so the artifact may not exist yet.
+        #[getter]
+        fn missing_needs(&self) -> Vec<(String, String)> {
+            self.missing_needs.clone()
         }
 
-        /// Write the YAML representation of the workflow to a file.
-        ///
-        /// Parameters
-        /// ----------
-        /// path
-        ///     The path of the file to which the YAML is written.
-        /// overwrite
-        ///     If True, the file is overwritten if it already exists, otherwise nothing will happen.
-        /// validate
-        ///     If True, perform validation against the schemastore JSON schema for GitHub
-        ///     Workflows.
+        /// ``(job_id, artifact)`` pairs for each upload which no job downloads.
+        #[getter]
+        fn unused_uploads(&self) -> Vec<(String, String)> {
+            self.unused_uploads.clone()
+        }
+
+        /// ``(job_id, artifact)`` pairs for each upload of already compressed files (such as
+        /// wheels or tarballs) which does not set ``compression_level=0``.
+        #[getter]
+        fn already_compressed(&self) -> Vec<(String, String)> {
+            self.already_compressed.clone()
+        }
+
+        /// Describe each problem found, and how to fix it.
         ///
-        #[pyo3(signature = (path, *, overwrite = true, validate = true))]
-        fn dump(&self, path: &Bound<PyAny>, overwrite: bool, validate: bool) -> PyResult<()> {
-            if validate {
-                self.validate()?;
-            }
-            if let Ok(p) = path.extract::<PathBuf>() {
-                self.write_to_file(p, overwrite)
-            } else if let Ok(s) = path.extract::<String>() {
-                self.write_to_file(s, overwrite)
-            } else {
-                Err(PyValueError::new_err("Invalid path"))
-            }
+        /// Returns
+        /// -------
+        /// list of str
+        fn suggestions(&self) -> Vec<String> {
+            let missing = self.missing_needs.iter().map(|(consumer, producer)| {
+                format!(
+                    "Job '{consumer}' downloads artifacts of job '{producer}', so it should need \
+                     '{producer}'"
+                )
+            });
+            let unmatched = self.unmatched_downloads.iter().map(|(job, pattern)| {
+                format!("Job '{job}' downloads '{pattern}', but no job uploads it")
+            });
+            let unused = self.unused_uploads.iter().map(|(job, artifact)| {
+                format!("Job '{job}' uploads '{artifact}', but no job downloads it")
+            });
+            let compressed = self.already_compressed.iter().map(|(job, artifact)| {
+                format!(
+                    "Job '{job}' uploads '{artifact}', which is already compressed: set \
+                     compression_level=0"
+                )
+            });
+            missing
+                .chain(unmatched)
+                .chain(unused)
+                .chain(compressed)
+                .collect()
         }
 
-        fn __str__(&self) -> PyResult<String> {
-            self.as_yaml_string()
+        /// Whether every download has an upload in a job which runs before it.
+        fn is_valid(&self) -> bool {
+            self.unmatched_downloads.is_empty() && self.missing_needs.is_empty()
+        }
+
+        fn __reduce__<'py>(&self, py: Python<'py>) -> PyResult<Reduced<'py>> {
+            reduce(py, self, "ArtifactGraph")
+        }
+    }
+
+    impl_codec!(ArtifactGraph {
+        edges,
+        unmatched_downloads,
+        missing_needs,
+        unused_uploads,
+        already_compressed
+    });
+
+    /// The text of a scalar option.
+    fn yaml_scalar(yaml: &Yaml) -> Option<String> {
+        match yaml {
+            Yaml::String(text) | Yaml::Real(text) => Some(text.clone()),
+            Yaml::Integer(value) => Some(value.to_string()),
+            Yaml::Boolean(value) => Some(value.to_string()),
+            _ => None,
+        }
+    }
+
+    /// A glob for the values a name can take, where each expression may stand for anything.
+    fn name_glob(name: &str) -> String {
+        let mut glob = String::with_capacity(name.len());
+        let mut rest = name;
+        while let Some(start) = rest.find("${{") {
+            let Some(end) = rest[start..].find("}}") else {
+                break;
+            };
+            glob.push_str(&rest[..start]);
+            glob.push('*');
+            rest = &rest[start + end + 2..];
+        }
+        glob.push_str(rest);
+        glob
+    }
+
+    /// Whether some name matches both globs, where ``*`` matches any text and ``?`` any single
+    /// character.
+    fn globs_overlap(a: &str, b: &str) -> bool {
+        let (a, b): (Vec<char>, Vec<char>) = (a.chars().collect(), b.chars().collect());
+        // overlap[i][j]: whether the suffixes a[i..] and b[j..] can match the same text
+        let mut overlap = vec![vec![false; b.len() + 1]; a.len() + 1];
+        for i in (0..=a.len()).rev() {
+            for j in (0..=b.len()).rev() {
+                overlap[i][j] = match (a.get(i), b.get(j)) {
+                    (None, None) => true,
+                    (Some('*'), _) if overlap[i + 1][j] => true,
+                    (_, Some('*')) if overlap[i][j + 1] => true,
+                    (Some('*'), Some(_)) => overlap[i][j + 1],
+                    (Some(_), Some('*')) => overlap[i + 1][j],
+                    (Some(x), Some(y)) => {
+                        (x == y || *x == '?' || *y == '?') && overlap[i + 1][j + 1]
+                    }
+                    _ => false,
+                };
+            }
         }
+        overlap[0][0]
     }
-    impl Yamlable for &Workflow {
-        fn as_yaml(&self) -> Yaml {
-            let mut out = Hash::new();
-            out.insert_yaml_opt("name", &self.name);
-            out.insert_yaml_opt("run-name", &self.run_name);
-            out.insert_yaml_opt("on", (&self.on).maybe_as_yaml());
-            out.insert_yaml_opt("permissions", &self.permissions);
-            out.insert_yaml_opt("env", &self.env);
-            if let Some(defaults) = &self.defaults {
-                out.insert_yaml_opt("defaults", defaults.maybe_as_yaml());
+
+    /// An upload or download of artifacts by a step.
+    struct ArtifactStep<'j> {
+        job: &'j str,
+        position: usize,
+        /// The artifact name or pattern as written.
+        name: String,
+        glob: String,
+    }
+
+    impl<'j> ArtifactStep<'j> {
+        fn new(job: &'j str, position: usize, name: String) -> Self {
+            let glob = name_glob(&name);
+            Self {
+                job,
+                position,
+                name,
+                glob,
+            }
+        }
+    }
+
+    fn artifact_graph(jobs: &PyMap<String, Job>) -> ArtifactGraph {
+        let mut uploads = Vec::new();
+        let mut downloads = Vec::new();
+        let mut already_compressed = Vec::new();
+        for (job_id, job) in jobs.0.iter() {
+            for (position, step) in job.steps.iter().flatten().enumerate() {
+                let option = |key: &str| step_with_option(step, key).and_then(yaml_scalar);
+                match action_name(step).as_deref() {
+                    Some("actions/upload-artifact") => {
+                        let upload = ArtifactStep::new(
+                            job_id,
+                            position,
+                            option("name").unwrap_or_else(|| "artifact".to_string()),
+                        );
+                        let paths = match step_with_option(step, "path") {
+                            Some(Yaml::Array(paths)) => paths
+                                .iter()
+                                .filter_map(yaml_scalar)
+                                .collect::<Vec<_>>()
+                                .join("\n"),
+                            path => path.and_then(yaml_scalar).unwrap_or_default(),
+                        };
+                        let files: Vec<&str> = paths
+                            .lines()
+                            .map(str::trim)
+                            .filter(|path| !path.is_empty() && !path.starts_with('!'))
+                            .collect();
+                        if !files.is_empty()
+                            && files.iter().all(|path| {
+                                let path = path.to_lowercase();
+                                COMPRESSED_EXTENSIONS
+                                    .iter()
+                                    .any(|extension| path.ends_with(extension))
+                            })
+                            && option("compression-level").as_deref() != Some("0")
+                        {
+                            already_compressed.push((job_id.clone(), upload.name.clone()));
+                        }
+                        uploads.push(upload);
+                    }
+                    Some("actions/upload-artifact/merge") => {
+                        downloads.push(ArtifactStep::new(
+                            job_id,
+                            position,
+                            option("pattern").unwrap_or_else(|| "*".to_string()),
+                        ));
+                        uploads.push(ArtifactStep::new(
+                            job_id,
+                            position,
+                            option("name").unwrap_or_else(|| "merged-artifacts".to_string()),
+                        ));
+                    }
+                    // downloads by ID or from other runs cannot be traced
+                    Some("actions/download-artifact")
+                        if option("artifact-ids").is_none() && option("run-id").is_none() =>
+                    {
+                        downloads.push(ArtifactStep::new(
+                            job_id,
+                            position,
+                            option("name")
+                                .or_else(|| option("pattern"))
+                                .unwrap_or_else(|| "*".to_string()),
+                        ));
+                    }
+                    _ => {}
+                }
             }
-            out.insert_yaml_opt("concurrency", &self.concurrency);
-            out.insert_yaml("jobs", &self.jobs);
-            Yaml::Hash(out)
+        }
+
+        let ancestors = |job_id: &str| {
+            let mut seen: HashSet<&str> = HashSet::new();
+            let mut stack = vec![job_id];
+            while let Some(id) = stack.pop() {
+                for need in jobs
+                    .0
+                    .get(id)
+                    .and_then(|job| job.needs.as_ref())
+                    .into_iter()
+                    .flatten()
+                {
+                    if seen.insert(need.as_str()) {
+                        stack.push(need.as_str());
+                    }
+                }
+            }
+            seen
+        };
+        let mut edges: Vec<(String, String, String)> = Vec::new();
+        let mut unmatched_downloads = Vec::new();
+        let mut missing_needs: Vec<(String, String)> = Vec::new();
+        let mut used = vec![false; uploads.len()];
+        for download in &downloads {
+            let needed = ancestors(download.job);
+            let mut matched = false;
+            for (upload, used) in uploads.iter().zip(used.iter_mut()) {
+                let before = if upload.job == download.job {
+                    upload.position < download.position
+                } else {
+                    true
+                };
+                if !before || !globs_overlap(&upload.glob, &download.glob) {
+                    continue;
+                }
+                matched = true;
+                *used = true;
+                let edge = (
+                    upload.job.to_string(),
+                    download.job.to_string(),
+                    upload.name.clone(),
+                );
+                if !edges.contains(&edge) {
+                    edges.push(edge);
+                }
+                let missing = (download.job.to_string(), upload.job.to_string());
+                if upload.job != download.job
+                    && !needed.contains(upload.job)
+                    && !missing_needs.contains(&missing)
+                {
+                    missing_needs.push(missing);
+                }
+            }
+            if !matched {
+                unmatched_downloads.push((download.job.to_string(), download.name.clone()));
+            }
+        }
+        let unused_uploads = uploads
+            .iter()
+            .zip(&used)
+            .filter(|(_, used)| !**used)
+            .map(|(upload, _)| (upload.job.to_string(), upload.name.clone()))
+            .collect();
+        ArtifactGraph {
+            edges,
+            unmatched_downloads,
+            missing_needs,
+            unused_uploads,
+            already_compressed,
         }
     }
 }
@@ -6449,9 +13247,25 @@ fn yaml_to_json(yaml: &Yaml) -> PyResult<Value> {
     })
 }
 
+const WORKFLOW_SCHEMA_SOURCE: &str = include_str!("../schemas/github-workflow.json");
+
+/// A 64-bit FNV-1a hash, usable at compile time.
+const fn fnv1a(bytes: &[u8]) -> u64 {
+    let mut hash = 0xcbf2_9ce4_8422_2325u64;
+    let mut i = 0;
+    while i < bytes.len() {
+        hash ^= bytes[i] as u64;
+        hash = hash.wrapping_mul(0x0100_0000_01b3);
+        i += 1;
+    }
+    hash
+}
+
+/// A fingerprint of the vendored workflow schema, computed at compile time.
+const WORKFLOW_SCHEMA_FINGERPRINT: u64 = fnv1a(WORKFLOW_SCHEMA_SOURCE.as_bytes());
+
 static WORKFLOW_SCHEMA: LazyLock<Validator> = LazyLock::new(|| {
-    let schema: Value = serde_json::from_str(include_str!("../schemas/github-workflow.json"))
-        .expect("invalid JSON schema");
+    let schema: Value = serde_json::from_str(WORKFLOW_SCHEMA_SOURCE).expect("invalid JSON schema");
     jsonschema::options()
         .with_base_uri(
             schema
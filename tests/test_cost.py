@@ -0,0 +1,72 @@
+import pytest
+
+from yamloom import (
+    Events,
+    Job,
+    Matrix,
+    PullRequestEvent,
+    PushEvent,
+    Strategy,
+    Workflow,
+    script,
+)
+from yamloom.cost import estimate
+from yamloom.expressions import context
+
+
+def _workflow() -> Workflow:
+    return Workflow(
+        on=Events(push=PushEvent(), pull_request=PullRequestEvent()),
+        jobs={
+            'test': Job(
+                steps=[script('pytest')],
+                runs_on=context.matrix.os,
+                strategy=Strategy(
+                    matrix=Matrix(
+                        os=['ubuntu-latest', 'windows-latest'], python=['3.12', '3.13']
+                    )
+                ),
+            ),
+            'deploy': Job(
+                steps=[script('make deploy')],
+                runs_on='ubuntu-latest',
+                condition=context.github.event_name == 'push',
+            ),
+        },
+    )
+
+
+def test_estimate_reports_minutes_per_event_and_runner() -> None:
+    history = {'test': [50, 70], 'deploy': 150}
+    costs = estimate(_workflow(), history)
+    by_event = costs.by_event()
+    assert by_event['pull_request'].minutes == pytest.approx(6.0)
+    assert by_event['push'].minutes == pytest.approx(9.0)
+    by_runner = costs.by_runner('pull_request')
+    assert by_runner['ubuntu-latest'].minutes == pytest.approx(3.0)
+    assert by_runner['windows-latest'].cost == pytest.approx(3.0 * 0.016)
+
+
+def test_estimate_reports_marginal_cost_of_matrix_axes() -> None:
+    costs = estimate(_workflow(), {'test': 60}, {'ubuntu': 1.0, 'windows': 2.0})
+    axes = {(a.event, a.axis): a for a in costs.axes}
+    assert axes['push', 'python'].minutes == pytest.approx(2.0)
+    assert axes['push', 'python'].cost == pytest.approx(3.0)
+    assert axes['push', 'os'].cost == pytest.approx(4.0)
+
+
+def test_estimate_counts_matrices_from_expressions_as_one_run() -> None:
+    oses = '${{ fromJSON(needs.setup.outputs.oses) }}'
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'test': Job(
+                steps=[script('pytest')],
+                runs_on=context.matrix.os,
+                strategy=Strategy(matrix=Matrix(os=oses, python=['3.12', '3.13'])),
+            ),
+        },
+    )
+    costs = estimate(workflow, {'test': 60})
+    assert costs.by_event()['push'].minutes == pytest.approx(1.0)
+    assert [axis.minutes for axis in costs.axes] == [pytest.approx(0.0)]
@@ -0,0 +1,125 @@
+from functools import reduce
+
+import pytest
+
+from yamloom import Job, script
+from yamloom.expressions import (
+    all_of,
+    always,
+    any_of,
+    context,
+    lit_bool,
+    lit_str,
+)
+
+
+def test_operators_render_expected_text() -> None:
+    is_main = context.github.ref == 'refs/heads/main'
+    is_push = context.github.event_name == lit_str('push')
+    expr = ~(is_main & is_push) | context.github.ref_protected
+    assert str(expr) == (
+        "${{ !(github.ref == 'refs/heads/main' && "
+        "github.event_name == 'push') || github.ref_protected }}"
+    )
+
+
+def test_dynamic_accessors_render_expected_text() -> None:
+    assert str(context.steps['my step'].outputs.value) == (
+        "${{ steps['my step'].outputs.value }}"
+    )
+    assert str(context.needs.build.result) == '${{ needs.build.result }}'
+
+
+def test_long_condition_chain_renders_every_operand() -> None:
+    checks = [context.github.ref == f'refs/heads/b{i}' for i in range(500)]
+    expr = reduce(lambda acc, check: acc | check, checks)
+    text = str(expr)
+    assert text.count('github.ref ==') == 500
+    assert "'refs/heads/b499'" in text
+
+
+def test_boolean_literals_are_folded() -> None:
+    is_main = context.github.ref == 'refs/heads/main'
+    assert str(is_main & True) == "${{ github.ref == 'refs/heads/main' }}"
+    assert str(is_main & lit_bool(True)) == "${{ github.ref == 'refs/heads/main' }}"
+    assert str(is_main | True) == '${{ true }}'
+    assert str(is_main & False) == '${{ false }}'
+    assert str(~lit_bool(True)) == '${{ false }}'
+
+
+def test_status_functions_are_never_folded_away() -> None:
+    assert str(always() | True) == '${{ always() || true }}'
+
+
+def test_double_negation_is_removed() -> None:
+    is_main = context.github.ref == 'refs/heads/main'
+    assert str(~~is_main) == "${{ github.ref == 'refs/heads/main' }}"
+
+
+def test_identical_operands_are_deduplicated() -> None:
+    is_main = context.github.ref == 'refs/heads/main'
+    is_push = context.github.event_name == 'push'
+    expr = (is_main & is_push) & (context.github.ref == 'refs/heads/main')
+    assert str(expr) == (
+        "${{ github.ref == 'refs/heads/main' && github.event_name == 'push' }}"
+    )
+
+
+def test_parentheses_are_kept_where_precedence_requires_them() -> None:
+    is_main = context.github.ref == 'refs/heads/main'
+    is_push = context.github.event_name == 'push'
+    expr = (is_main | is_push) & context.github.ref_protected
+    assert str(expr) == (
+        "${{ (github.ref == 'refs/heads/main' || github.event_name == 'push') "
+        '&& github.ref_protected }}'
+    )
+
+
+def test_all_of_and_any_of_build_flat_expressions() -> None:
+    checks = [context.github.ref == f'refs/heads/b{i}' for i in range(3)]
+    assert str(any_of(checks)) == (
+        "${{ github.ref == 'refs/heads/b0' || github.ref == 'refs/heads/b1' "
+        "|| github.ref == 'refs/heads/b2' }}"
+    )
+    assert str(all_of(check for check in checks[:2])) == (
+        "${{ github.ref == 'refs/heads/b0' && github.ref == 'refs/heads/b1' }}"
+    )
+    assert str(all_of([])) == '${{ true }}'
+    assert str(any_of([])) == '${{ false }}'
+
+
+def test_all_of_merges_context_metadata() -> None:
+    condition = all_of([context.secrets.token == 'x', True])
+    with pytest.raises(Exception):
+        Job(steps=[script('echo hi')], runs_on='ubuntu-latest', condition=condition)
+
+
+def test_cache_key_identifies_structurally_equal_expressions() -> None:
+    first = context.github.ref == 'refs/heads/main'
+    second = context.github.ref == lit_str('refs/heads/main')
+    other = context.github.ref == 'refs/heads/dev'
+    assert first.cache_key() == second.cache_key()
+    assert len({first.cache_key(), second.cache_key(), other.cache_key()}) == 2
+    assert str(context.github.event.key) == '${{ github.event.key }}'
+    assert first.same_as(second)
+    assert not first.same_as(other)
+    assert not first.same_as('refs/heads/main')
+
+
+def test_evaluate_uses_known_context() -> None:
+    is_push = context.github.event_name == 'push'
+    assert is_push.evaluate({'github': {'event_name': 'PUSH'}}) is True
+    assert is_push.evaluate({'github': {'event_name': 'pull_request'}}) is False
+    assert is_push.evaluate({}) is None
+
+
+def test_evaluate_uses_three_valued_logic() -> None:
+    is_push = context.github.event_name == 'push'
+    from_input = context.inputs.deploy == 'yes'
+    known = {'github': {'event_name': 'pull_request'}}
+    assert (from_input & is_push).evaluate(known) is False
+    assert (from_input | is_push).evaluate(known) is None
+    assert (always() & is_push).evaluate(known) is False
+    assert context.github.ref.startswith('refs/tags/').evaluate(
+        {'github': {'ref': 'refs/tags/v1'}}
+    )
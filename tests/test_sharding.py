@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from yamloom import Events, Job, PushEvent, Workflow, script
+from yamloom.sharding import assign, load_samples, load_timings, shard
+
+
+def test_assign_balances_longest_items_first() -> None:
+    timings = {'a.py': 10, 'b.py': [8, 9, 100], 'c.py': 3, 'd.py': 3}
+    shards = assign(['a.py', 'b.py', 'c.py', 'd.py', 'e.py'], timings, 2)
+    assert shards == [['a.py', 'c.py', 'd.py'], ['b.py', 'e.py']]
+
+
+def test_assign_never_returns_empty_shards() -> None:
+    assert assign(['a.py', 'b.py'], None, 5) == [['a.py'], ['b.py']]
+    with pytest.raises(ValueError):
+        assign([], None, 2)
+
+
+def test_load_timings_reads_json_and_tolerates_missing_file(tmp_path) -> None:
+    path = tmp_path / 'timings.json'
+    assert load_timings(path) == {}
+    path.write_text(json.dumps({'a.py': [1, 2, 9]}))
+    assert load_timings(path) == {'a.py': 2.0}
+    with pytest.raises(ValueError):
+        load_timings({'a.py': 'slow'})
+
+
+def test_timings_are_read_like_workflow_durations(tmp_path) -> None:
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'build': Job(steps=[script('make')], runs_on='ubuntu-latest')},
+    )
+    missing = tmp_path / 'timings.json'
+    assert load_samples(missing) == {}
+    assert str(workflow.infer_timeouts(missing)) == str(workflow)
+    for invalid in [{'build': []}, {'build': 'slow'}, {'build': [-1]}]:
+        with pytest.raises(ValueError):
+            load_samples(invalid)
+        with pytest.raises(ValueError):
+            workflow.infer_timeouts(invalid)
+
+
+def test_shard_builds_strategy_and_items_expression() -> None:
+    strategy, files = shard(['tests/a b.py', 'tests/c.py'], None, 2)
+    assert str(files) == '${{ matrix.shard }}'
+    job = Job(
+        steps=[script(f'pytest {files}')],
+        runs_on='ubuntu-latest',
+        strategy=strategy,
+    )
+    text = str(job)
+    assert "'tests/a b.py'" in text
+    assert 'pytest ${{ matrix.shard }}' in text
@@ -103,3 +103,36 @@ def test_script_permissions_merge_like_recommended_permissions() -> None:
         runs_on='ubuntu-latest',
     )
     assert '\npermissions:\n  contents: read\n' in str(job)
+
+
+def test_raw_string_expressions_are_checked() -> None:
+    with pytest.raises(Exception):
+        Job(steps=[script('echo hi')], runs_on='${{ secrets.runner }}')
+
+
+def test_raw_string_expressions_must_parse() -> None:
+    with pytest.raises(ValueError):
+        script('echo ${{ github.ref == }}')
+
+
+def test_raw_condition_is_parsed_without_braces() -> None:
+    Job(
+        steps=[script('echo hi')],
+        runs_on='ubuntu-latest',
+        condition="github.ref == 'x'",
+    )
+    with pytest.raises(Exception):
+        Job(
+            steps=[script('echo hi')],
+            runs_on='ubuntu-latest',
+            condition="secrets.token == 'x'",
+        )
+
+
+def test_raw_with_opts_are_checked() -> None:
+    action('checkout', 'actions/checkout', with_opts={'token': '${{ secrets.token }}'})
+    with pytest.raises(Exception):
+        Job(
+            uses='org/repo/.github/workflows/reuse.yml@v1',
+            with_opts={'ref': '${{ steps.meta.outputs.ref }}'},
+        )
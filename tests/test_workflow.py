@@ -0,0 +1,752 @@
+import copy
+import pickle
+from types import MappingProxyType
+
+import pytest
+
+from yamloom import (
+    ActionStep,
+    Events,
+    Job,
+    Matrix,
+    PushEvent,
+    Step,
+    Workflow,
+    WorkflowBuilder,
+    action,
+    script,
+)
+from yamloom.actions.ci.coverage import Codecov
+from yamloom.expressions import always, context, failure, success
+
+
+def _workflow() -> Workflow:
+    is_pr = context.github.event_name == 'pull_request'
+    is_push = context.github.event_name == 'push'
+    return Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'lint': Job(
+                steps=[
+                    script('echo lint'),
+                    script('echo comment', condition=is_pr),
+                ],
+                runs_on='ubuntu-latest',
+            ),
+            'preview': Job(
+                steps=[script('echo preview')],
+                runs_on='ubuntu-latest',
+                condition=is_pr,
+            ),
+            'comment': Job(
+                steps=[script('echo comment')],
+                runs_on='ubuntu-latest',
+                needs=['preview'],
+            ),
+            'report': Job(
+                steps=[script('echo report')],
+                runs_on='ubuntu-latest',
+                needs=['lint', 'preview'],
+                condition=always(),
+            ),
+            'release': Job(
+                steps=[script('echo release')],
+                runs_on='ubuntu-latest',
+                condition=is_push,
+            ),
+        },
+    )
+
+
+def test_prune_drops_unreachable_jobs_and_steps() -> None:
+    pruned = str(_workflow().prune({'github': {'event_name': 'push'}}))
+    assert 'preview' not in pruned
+    assert 'comment' not in pruned
+    assert 'echo report' in pruned
+    assert '- lint' in pruned
+    assert 'github.event_name' not in pruned
+
+
+def test_prune_keeps_conditions_with_unknown_values() -> None:
+    workflow = _workflow()
+    assert str(workflow.prune({})) == str(workflow)
+
+
+def test_prune_understands_raw_conditions() -> None:
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'docs': Job(
+                steps=[script('echo docs')],
+                runs_on='ubuntu-latest',
+                condition="${{ startsWith(github.ref, 'refs/tags/') }}",
+            ),
+            'test': Job(steps=[script('echo test')], runs_on='ubuntu-latest'),
+        },
+    )
+    pruned = str(workflow.prune({'github': {'ref': 'refs/heads/main'}}))
+    assert 'docs' not in pruned
+    assert 'echo test' in pruned
+
+
+def test_prune_keeps_jobs_whose_steps_are_all_skipped() -> None:
+    is_pr = context.github.event_name == 'pull_request'
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'preview': Job(
+                steps=[script('echo preview', condition=is_pr)],
+                runs_on='ubuntu-latest',
+            ),
+            'deploy': Job(
+                steps=[script('echo deploy')],
+                runs_on='ubuntu-latest',
+                needs=['preview'],
+            ),
+        },
+    )
+    pruned = str(workflow.prune({'github': {'event_name': 'push'}}))
+    assert 'echo deploy' in pruned
+    assert '- preview' in pruned
+
+
+def test_prune_skips_dependents_which_need_success_or_failure() -> None:
+    is_pr = context.github.event_name == 'pull_request'
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest', needs=['preview'])
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'preview': Job(
+                steps=[script('echo preview')], runs_on='ubuntu-latest', condition=is_pr
+            ),
+            'succeeded': job.replace(condition=success() & (context.github.ref != '')),
+            'failed': job.replace(condition=failure()),
+            'always': job.replace(condition=always()),
+            'skipped': job.replace(
+                condition=always() & (context.needs.preview.result == 'skipped')
+            ),
+        },
+    )
+    pruned = str(workflow.prune({'github': {'event_name': 'push'}}))
+    assert 'succeeded' not in pruned
+    assert 'failed' not in pruned
+    assert 'always:' in pruned
+    assert 'skipped:' in pruned
+    assert 'needs.preview' not in pruned
+
+
+def test_job_replace_changes_only_the_given_fields() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest', timeout_minutes=5)
+    replaced = job.replace(runs_on='macos-latest')
+    assert 'macos-latest' in str(replaced)
+    assert 'timeout-minutes: 5' in str(replaced)
+    assert 'ubuntu-latest' in str(job)
+    assert str(job.evolve(runs_on='macos-latest')) == str(replaced)
+
+
+def test_replace_validates_changed_fields() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    with pytest.raises(Exception):
+        job.replace(runs_on=context.secrets.runner)
+    with pytest.raises(ValueError):
+        job.replace(steps=[])
+    with pytest.raises(TypeError):
+        job.replace(runs_in='ubuntu-latest')
+
+
+def test_step_and_workflow_replace() -> None:
+    step = script('echo hi', name='greet')
+    assert 'name: wave' in str(step.replace(name='wave'))
+    with pytest.raises(ValueError):
+        action('checkout', 'actions/checkout').replace(shell='bash')
+    workflow = _workflow().replace(name='ci')
+    assert 'name: ci' in str(workflow)
+
+
+def test_shared_step_is_unaffected_by_pruning_other_jobs() -> None:
+    step = script('echo hi', condition=context.github.event_name == 'push')
+    jobs = {f'job{i}': Job(steps=[step], runs_on='ubuntu-latest') for i in range(500)}
+    workflow = Workflow(on=Events(push=PushEvent()), jobs=jobs)
+    pruned = workflow.prune({'github': {'event_name': 'push'}})
+    assert str(pruned).count('echo hi') == 500
+    assert 'github.event_name' not in str(pruned)
+    assert 'github.event_name' in str(step)
+
+
+def test_workflow_builder_adds_and_removes_jobs() -> None:
+    builder = WorkflowBuilder(on=Events(push=PushEvent()), name='ci')
+    for name in ('lint', 'test', 'docs'):
+        job = Job(steps=[script(f'echo {name}')], runs_on='ubuntu-latest')
+        builder.add_job(name, job)
+    builder.add_job(
+        'deploy',
+        Job(steps=[script('echo deploy')], runs_on='ubuntu-latest', needs=['test']),
+    )
+    assert 'echo docs' in str(builder.remove_job('docs'))
+    assert len(builder) == 3
+    assert 'docs' not in builder
+    frozen = builder.freeze()
+    builder.add_job('docs', Job(steps=[script('echo docs')], runs_on='ubuntu-latest'))
+    assert 'echo docs' not in str(frozen)
+    assert 'echo docs' in str(builder.freeze())
+
+
+def test_workflow_builder_validates_jobs() -> None:
+    builder = WorkflowBuilder(on=Events(push=PushEvent()))
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    with pytest.raises(ValueError):
+        builder.freeze()
+    with pytest.raises(ValueError):
+        builder.add_job('1st', job)
+    builder.add_job('first', job)
+    with pytest.raises(ValueError):
+        builder.add_job('first', job)
+    builder.add_job('first', job, replace=True)
+    with pytest.raises(KeyError):
+        builder.remove_job('missing')
+    builder.add_job('second', job.replace(needs=['missing']))
+    with pytest.raises(ValueError):
+        builder.freeze()
+
+
+def test_workflow_pickle_round_trip() -> None:
+    workflow = _workflow()
+    restored = pickle.loads(pickle.dumps(workflow))
+    assert isinstance(restored, Workflow)
+    assert str(restored) == str(workflow)
+    assert str(restored.prune({'github': {'event_name': 'push'}})) == str(
+        workflow.prune({'github': {'event_name': 'push'}})
+    )
+
+
+def test_pickle_round_trips_jobs_steps_and_expressions() -> None:
+    step = action('checkout', 'actions/checkout', with_opts={'fetch-depth': 0})
+    job = Job(steps=[step], runs_on=['self-hosted', 'linux'], timeout_minutes=5)
+    condition = context.github.ref.startswith('refs/tags/') | always()
+    for value in (step, job, condition, Events(push=PushEvent(branches=['main']))):
+        assert str(pickle.loads(pickle.dumps(value))) == str(value)
+    restored = pickle.loads(pickle.dumps(condition))
+    assert restored.same_as(condition)
+    secret = pickle.loads(pickle.dumps(context.secrets.token == 'x'))
+    with pytest.raises(Exception):
+        Job(steps=[step], runs_on='ubuntu-latest', condition=secret)
+
+
+def test_pickle_keeps_action_step_types() -> None:
+    checkout = ActionStep('checkout', 'actions/checkout', ref='v5')
+    codecov = Codecov(name='Upload coverage', fail_ci_if_error=True)
+    for step in (checkout, codecov):
+        restored = pickle.loads(pickle.dumps(step))
+        assert type(restored) is type(step)
+        assert str(restored) == str(step)
+    with pytest.raises(TypeError):
+        pickle.dumps(context.github)
+
+
+def test_pickle_round_trips_analysis_results() -> None:
+    workflow = _workflow()
+    changed = workflow.prune({'github': {'event_name': 'push'}})
+    for change in workflow.diff(changed):
+        restored = pickle.loads(pickle.dumps(change))
+        assert (str(restored), restored.old, restored.new) == (
+            str(change),
+            change.old,
+            change.new,
+        )
+    graph = pickle.loads(pickle.dumps(workflow.graph({'lint': 60})))
+    assert graph.levels == workflow.graph().levels
+    assert graph.critical_path_duration == 60
+    artifacts = pickle.loads(pickle.dumps(workflow.artifact_graph()))
+    assert artifacts.suggestions() == workflow.artifact_graph().suggestions()
+
+
+def test_deepcopy_uses_pickle_support() -> None:
+    builder = WorkflowBuilder(on=Events(push=PushEvent()))
+    builder.add_job('lint', Job(steps=[script('echo lint')], runs_on='ubuntu-latest'))
+    copied = copy.deepcopy(builder)
+    copied.add_job('test', Job(steps=[script('echo test')], runs_on='ubuntu-latest'))
+    assert len(builder) == 1
+    assert len(copied) == 2
+
+
+def test_cache_bytes_round_trip() -> None:
+    workflow = _workflow()
+    data = workflow.to_cache_bytes()
+    assert data[:4] == b'YLMC'
+    assert str(Workflow.from_cache_bytes(data)) == str(workflow)
+    assert str(Workflow.from_cache_bytes(memoryview(data))) == str(workflow)
+    assert Workflow.cache_version().startswith('1-')
+
+
+def test_cache_bytes_reject_foreign_or_truncated_data() -> None:
+    data = _workflow().to_cache_bytes()
+    with pytest.raises(ValueError, match='not a yamloom workflow cache'):
+        Workflow.from_cache_bytes(b'not a cache')
+    with pytest.raises(ValueError, match='truncated'):
+        Workflow.from_cache_bytes(data[:-1])
+    with pytest.raises(ValueError, match='format version'):
+        Workflow.from_cache_bytes(data[:4] + b'\x63' + data[5:])
+    with pytest.raises(ValueError, match='schema'):
+        Workflow.from_cache_bytes(data[:8] + bytes(8) + data[16:])
+
+
+IMPORTED = """\
+name: CI
+on:
+  push:
+    branches: [main]
+  pull_request:
+    types: [opened, synchronize]
+jobs:
+  test:
+    runs-on: ${{ matrix.os }}
+    if: ${{ github.event_name == 'push' }}
+    strategy:
+      matrix:
+        os: [ubuntu-latest, macos-latest]
+    steps:
+      - uses: actions/checkout@v5
+        with:
+          fetch-depth: 0
+      - name: Test
+        run: pytest
+        env:
+          REF: ${{ github.ref }}
+"""
+
+
+def test_from_yaml_builds_typed_workflow(tmp_path) -> None:
+    workflow = Workflow.from_yaml(IMPORTED)
+    assert str(workflow) == str(Workflow.from_yaml(str(workflow)))
+    assert 'runs-on: ${{ matrix.os }}' in str(workflow)
+    assert 'fetch-depth: 0' in str(workflow)
+    with pytest.raises(ValueError):
+        Workflow.from_yaml(IMPORTED.replace('github.event_name', 'secrets.token'))
+    path = tmp_path / 'ci.yml'
+    path.write_text(IMPORTED)
+    assert str(Workflow.from_yaml(path)) == str(workflow)
+    assert str(Workflow.from_yaml(str(path))) == str(workflow)
+    with pytest.raises(FileNotFoundError):
+        Workflow.from_yaml(str(tmp_path / 'missing.yml'))
+    with pytest.raises(FileNotFoundError):
+        Workflow.from_yaml(str(tmp_path / 'workflows'))
+
+
+def test_from_yaml_round_trips_generated_workflow() -> None:
+    workflow = _workflow()
+    assert str(Workflow.from_yaml(str(workflow))) == str(workflow)
+
+
+def test_from_yaml_rejects_unsupported_keys() -> None:
+    with pytest.raises(ValueError, match="jobs.test: unsupported key 'runs_on'"):
+        Workflow.from_yaml(IMPORTED.replace('runs-on', 'runs_on'))
+    with pytest.raises(ValueError, match="missing required key 'on'"):
+        Workflow.from_yaml('jobs: {}\n')
+
+
+def test_diff_of_equal_workflows_is_empty() -> None:
+    workflow = _workflow()
+    assert workflow.diff(workflow) == []
+    assert workflow.diff(pickle.loads(pickle.dumps(workflow))) == []
+
+
+def test_diff_reports_jobs_keys_and_reordered_steps() -> None:
+    is_pr = context.github.event_name == 'pull_request'
+    old = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'lint': Job(
+                steps=[script('echo lint'), script('echo comment', condition=is_pr)],
+                runs_on='ubuntu-latest',
+            ),
+            'comment': Job(steps=[script('echo comment')], runs_on='ubuntu-latest'),
+        },
+    )
+    new = Workflow(
+        name='CI',
+        on=Events(push=PushEvent()),
+        jobs={
+            'lint': Job(
+                steps=[script('echo comment', condition=~is_pr), script('echo lint')],
+                runs_on='macos-latest',
+            ),
+            'docs': Job(steps=[script('echo docs')], runs_on='ubuntu-latest'),
+        },
+    )
+    changes = {(c.kind, '.'.join(c.path)): c for c in old.diff(new)}
+    assert set(changes) == {
+        ('added', 'name'),
+        ('changed', 'jobs.lint.runs-on'),
+        ('changed', 'jobs.lint.steps.echo comment.if'),
+        ('reordered', 'jobs.lint.steps'),
+        ('removed', 'jobs.comment'),
+        ('added', 'jobs.docs'),
+    }
+    runs_on = changes['changed', 'jobs.lint.runs-on']
+    assert (runs_on.old, runs_on.new) == ('ubuntu-latest', 'macos-latest')
+    reordered = changes['reordered', 'jobs.lint.steps']
+    assert reordered.new == ['echo comment', 'echo lint']
+
+
+def test_graph_reports_levels_and_critical_path(tmp_path) -> None:
+    graph = _workflow().graph()
+    assert graph.levels == [['lint', 'preview', 'release'], ['comment', 'report']]
+    assert graph.is_valid()
+    timings = tmp_path / 'timings.json'
+    timings.write_text('{"lint": [50, 70, 60], "report": 5, "preview": 10}')
+    graph = _workflow().graph(timings)
+    assert graph.critical_path == ['lint', 'report']
+    assert graph.critical_path_duration == 65
+    assert _workflow().graph({'comment': 100}).critical_path == ['preview', 'comment']
+
+
+def test_graph_finds_cycles_and_unknown_needs() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'a': job.replace(needs=['c']),
+            'b': job.replace(needs=['a']),
+            'c': job.replace(needs=['b', 'missing']),
+            'd': job,
+        },
+    )
+    graph = workflow.graph()
+    assert graph.cycles == [['a', 'b', 'c']]
+    assert graph.unknown_needs == [('c', 'missing')]
+    assert graph.levels == [['d']]
+    assert not graph.is_valid()
+    with pytest.raises(RuntimeError, match="needs unknown job 'missing'"):
+        workflow.validate()
+
+
+def test_optimize_reduces_implied_needs() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'build': job,
+            'test': job.replace(needs=['build']),
+            'lint': job.replace(needs=['build']),
+            'deploy': job.replace(needs=['build', 'test', 'lint']),
+            'notify': Job(
+                steps=[script(f'echo {context.needs.build.result}')],
+                runs_on='ubuntu-latest',
+                needs=['build', 'deploy'],
+            ),
+        },
+    )
+    optimized = workflow.optimize(needs='reduce')
+    graph = optimized.graph()
+    assert graph.levels == workflow.graph().levels
+    changes = {'.'.join(c.path): c for c in workflow.diff(optimized)}
+    assert set(changes) == {'jobs.deploy.needs'}
+    assert changes['jobs.deploy.needs'].new == ['test', 'lint']
+    assert str(workflow.optimize()) == str(workflow)
+    with pytest.raises(ValueError):
+        workflow.optimize(needs='sort')
+
+
+def test_optimize_keeps_needs_implied_through_status_checks() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'build': job,
+            'test': job.replace(needs=['build'], condition=always()),
+            'deploy': job.replace(needs=['build', 'test']),
+        },
+    )
+    assert str(workflow.optimize(needs='reduce')) == str(workflow)
+
+
+def test_optimize_keeps_needs_read_through_the_whole_context() -> None:
+    job = Job(steps=[script('echo hi')], runs_on='ubuntu-latest')
+    readers = [
+        job.replace(condition="always() && contains(needs.*.result, 'failure')"),
+        job.replace(steps=[script('echo ${{ toJSON(needs) }}')]),
+    ]
+    for reader in readers:
+        workflow = Workflow(
+            on=Events(push=PushEvent()),
+            jobs={
+                'a': job,
+                'b': job.replace(needs=['a']),
+                'c': reader.replace(needs=['a', 'b']),
+            },
+        )
+        assert str(workflow.optimize(needs='reduce')) == str(workflow)
+
+
+def test_optimize_merges_adjacent_scripts() -> None:
+    steps = [
+        script('cargo clippy', name='Lint'),
+        script('cargo test', name='Test'),
+        script('uv venv', id='venv'),
+        script('make', working_directory='docs'),
+        script('echo ok', id='check'),
+        script(f'echo {context.steps.check.outcome}'),
+    ]
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'build': Job(steps=steps, runs_on='ubuntu-latest')},
+    )
+    optimized = workflow.optimize(steps='merge')
+    text = str(optimized)
+    lines = [line.strip() for line in text.splitlines()]
+    assert 'name: Lint; Test' in text
+    start = lines.index('cargo clippy') - 1
+    assert lines[start : start + 9] == [
+        '(',
+        'cargo clippy',
+        ')',
+        '(',
+        'cargo test',
+        ')',
+        '(',
+        'uv venv',
+        ')',
+    ]
+    assert 'id: venv' not in text
+    assert 'id: check' in text
+    assert sum(line.startswith('- ') for line in lines) == 4
+    windows = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'build': Job(steps=steps, runs_on='windows-latest')},
+    )
+    assert str(windows.optimize(steps='merge')) == str(windows)
+    with pytest.raises(ValueError):
+        workflow.optimize(steps='squash')
+
+
+def test_optimize_ends_merged_steps_after_writing_to_github_env() -> None:
+    steps = [
+        script('echo "VERSION=1" >> "$GITHUB_ENV"'),
+        script('echo "$VERSION"'),
+        script('echo "$HOME/bin" >> "$GITHUB_PATH"'),
+        script('tool --version'),
+    ]
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'build': Job(steps=steps, runs_on='ubuntu-latest')},
+    )
+    assert str(workflow.optimize(steps='merge')) == str(workflow)
+
+
+def test_optimize_keeps_steps_with_status_checks_apart() -> None:
+    steps = [
+        script('make upload-logs', condition=always()),
+        script('make clean', condition=always()),
+        script('make report', condition='${{ failure() }}'),
+        script('make notify', condition='${{ failure() }}'),
+    ]
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'build': Job(steps=steps, runs_on='ubuntu-latest')},
+    )
+    assert str(workflow.optimize(steps='merge')) == str(workflow)
+
+
+def test_optimize_fuses_small_jobs_off_the_critical_path() -> None:
+    def job(command: str, **kwargs) -> Job:
+        return Job(steps=[script(command)], runs_on='ubuntu-latest', **kwargs)
+
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'lint': job('ruff check'),
+            'types': job('ty check'),
+            'test': job('pytest'),
+            'windows': Job(steps=[script('pytest')], runs_on='windows-latest'),
+            'docs': job('mkdocs build', needs=['lint']),
+        },
+    )
+    timings = {'lint': 10, 'types': 20, 'test': 600, 'windows': 5, 'docs': 30}
+    fused = workflow.optimize(jobs='fuse', durations=timings)
+    assert fused.graph().levels == [['lint', 'test', 'windows'], ['docs']]
+    text = str(fused)
+    assert 'name: lint, types' in text
+    assert text.index('ruff check') < text.index('ty check')
+    pair = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={'lint': job('ruff check'), 'types': job('ty check')},
+    )
+    assert str(pair.optimize(jobs='fuse')) == str(pair)
+    with pytest.raises(ValueError):
+        workflow.optimize(jobs='merge')
+
+
+def test_matrix_expand_follows_include_and_exclude_rules() -> None:
+    matrix = Matrix(
+        fruit=['apple', 'pear'],
+        animal=['cat', 'dog'],
+        include=[
+            {'color': 'green'},
+            {'color': 'pink', 'animal': 'cat'},
+            {'fruit': 'apple', 'shape': 'circle'},
+            {'fruit': 'banana'},
+            {'fruit': 'banana', 'animal': 'cat'},
+        ],
+    )
+    assert matrix.expand() == [
+        {'fruit': 'apple', 'animal': 'cat', 'color': 'pink', 'shape': 'circle'},
+        {'fruit': 'apple', 'animal': 'dog', 'color': 'green', 'shape': 'circle'},
+        {'fruit': 'pear', 'animal': 'cat', 'color': 'pink'},
+        {'fruit': 'pear', 'animal': 'dog', 'color': 'green'},
+        {'fruit': 'banana'},
+        {'fruit': 'banana', 'animal': 'cat'},
+    ]
+    excluded = Matrix(
+        os=['linux', 'windows'], py=['3.12', '3.13'], exclude=[{'os': 'windows'}]
+    )
+    assert excluded.expand() == [
+        {'os': 'linux', 'py': '3.12'},
+        {'os': 'linux', 'py': '3.13'},
+    ]
+
+
+def test_matrix_expand_warns_near_job_limit() -> None:
+    matrix = Matrix(a=list(range(16)), b=list(range(16)), c=[1, 2])
+    with pytest.warns(UserWarning, match='more than'):
+        assert len(matrix.expand()) == 512
+    with pytest.warns(UserWarning, match='close to'):
+        Matrix(a=list(range(10)), b=list(range(10))).expand(warn_at=100)
+    with pytest.raises(ValueError):
+        Matrix(os=context.inputs.oses).expand()
+
+
+def test_auto_concurrency_only_cancels_pull_request_runs() -> None:
+    text = str(_workflow().auto_concurrency())
+    assert (
+        "group: ${{ format('{0}-{1}', github.workflow, "
+        "github.event_name == 'pull_request' && github.ref || github.run_id) }}"
+    ) in text
+    assert "cancel-in-progress: ${{ github.event_name == 'pull_request' }}" in text
+
+
+def test_auto_concurrency_at_job_level_keeps_existing_settings() -> None:
+    workflow = _workflow()
+    text = str(workflow.auto_concurrency('branches', level='jobs'))
+    assert "format('{0}-lint-{1}', github.workflow" in text
+    assert "startsWith(github.ref, 'refs/tags/')" in text
+    # without a default branch (as for `schedule` events), runs are never cancelled
+    assert (
+        'cancel-in-progress: ${{ github.event.repository.default_branch && github.ref'
+    ) in text
+    grouped = workflow.auto_concurrency()
+    assert str(grouped.auto_concurrency('branches')) == str(grouped)
+    assert str(grouped.auto_concurrency('branches', overwrite=True)) != str(grouped)
+    with pytest.raises(ValueError):
+        workflow.auto_concurrency('everything')
+
+
+def test_cache_dependencies_adds_cache_after_setup_steps() -> None:
+    steps = [
+        action('Setup Python', 'actions/setup-python', ref='v6'),
+        action('Setup Go', 'actions/setup-go', ref='v6'),
+        action(
+            'Setup Node', 'actions/setup-node', ref='v6', with_opts={'cache': 'npm'}
+        ),
+        script('make'),
+    ]
+    workflow = Workflow(
+        jobs={'build': Job(steps=steps, runs_on='ubuntu-latest')},
+        on=Events(push=PushEvent()),
+    )
+    cached, report = workflow.cache_dependencies()
+    assert report == [
+        "jobs.build: added 'Cache pip dependencies' after the "
+        'actions/setup-python step at position 1'
+    ]
+    text = str(cached)
+    assert 'uses: actions/cache@v5' in text
+    assert "-pip-${{ hashFiles('**/requirements*.txt', '**/pyproject.toml'" in text
+    assert text.index('actions/setup-python') < text.index('actions/cache')
+    assert text.index('actions/cache') < text.index('actions/setup-go')
+    assert cached.cache_dependencies()[1] == []
+    restored, _ = workflow.cache_dependencies(restore_only=True)
+    assert 'uses: actions/cache/restore@v5' in str(restored)
+
+
+def test_cache_dependencies_only_changes_linux_jobs() -> None:
+    steps = [action('Setup Python', 'actions/setup-python', ref='v6')]
+    workflow = Workflow(
+        jobs={
+            'windows': Job(steps=steps, runs_on='windows-latest'),
+            'matrix': Job(steps=steps, runs_on=context.matrix.os),
+            'linux': Job(steps=steps, runs_on=['self-hosted', 'linux']),
+        },
+        on=Events(push=PushEvent()),
+    )
+    cached, report = workflow.cache_dependencies()
+    assert report == [
+        'jobs.windows: skipped the pip cache for the actions/setup-python step at '
+        'position 1, its paths are only known for Linux runners',
+        'jobs.matrix: skipped the pip cache for the actions/setup-python step at '
+        'position 1, its paths are only known for Linux runners',
+        "jobs.linux: added 'Cache pip dependencies' after the "
+        'actions/setup-python step at position 1',
+    ]
+    assert str(cached).count('actions/cache@v5') == 1
+
+
+def test_artifact_graph_connects_uploads_and_downloads() -> None:
+    def upload(name: str, path: str) -> Step:
+        options = {'name': name, 'path': path}
+        return action('Upload', 'actions/upload-artifact', ref='v6', with_opts=options)
+
+    def download(**options: str) -> Step:
+        return action(
+            'Download', 'actions/download-artifact', ref='v7', with_opts=options
+        )
+
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'wheels': Job(
+                steps=[upload(f'wheels-{context.matrix.os}', 'dist/*.whl')],
+                runs_on='ubuntu-latest',
+            ),
+            'docs': Job(steps=[upload('docs', 'site/')], runs_on='ubuntu-latest'),
+            'release': Job(
+                steps=[download(pattern='wheels-*'), download(name='sdist')],
+                runs_on='ubuntu-latest',
+            ),
+        },
+    )
+    graph = workflow.artifact_graph()
+    assert graph.edges == [('wheels', 'release', 'wheels-${{ matrix.os }}')]
+    assert graph.missing_needs == [('release', 'wheels')]
+    assert graph.unmatched_downloads == [('release', 'sdist')]
+    assert graph.unused_uploads == [('docs', 'docs')]
+    assert graph.already_compressed == [('wheels', 'wheels-${{ matrix.os }}')]
+    assert len(graph.suggestions()) == 4
+    assert not graph.is_valid()
+
+
+def test_infer_timeouts_from_durations() -> None:
+    workflow = Workflow(
+        on=Events(push=PushEvent()),
+        jobs={
+            'build': Job(
+                steps=[script('make', name='Compile'), script('make test')],
+                runs_on='ubuntu-latest',
+            ),
+            'lint': Job(
+                steps=[script('ruff check')],
+                runs_on='ubuntu-latest',
+                timeout_minutes=5,
+            ),
+        },
+    )
+    durations = {'build': [600, 900, 1200], 'build.Compile': 30, 'lint': 6000}
+    text = str(workflow.infer_timeouts(durations, percentile=50, margin=2))
+    assert 'timeout-minutes: 30' in text
+    assert 'timeout-minutes: 1' in text
+    assert 'timeout-minutes: 5' in text
+    assert 'timeout-minutes: 200' not in text
+    assert text.count('timeout-minutes') == 3
+    with pytest.raises(ValueError):
+        workflow.infer_timeouts(durations, margin=0.5)
+    proxy = str(workflow.infer_timeouts(MappingProxyType(durations), percentile=50))
+    assert proxy == str(workflow.infer_timeouts(durations, percentile=50))